@@ -13,6 +13,7 @@ import time
 import traceback
 import uuid
 from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from glob import glob
 from os import rename, makedirs
 from os.path import dirname, join
@@ -21,7 +22,9 @@ from tkinter import Tk, messagebox
 from typing import TYPE_CHECKING, Type, List, Tuple, Union
 
 from LabExT.Experiments.AutosaveDict import AutosaveDict
+from LabExT.Experiments.ToDoOrdering import optimize_todo_order
 from LabExT.Measurements.MeasAPI.Measurement import Measurement
+from LabExT.Measurements.MeasAPI.PostProcessing import PostProcessingPipeline
 from LabExT.Movement.MoverNew import MoverNew
 from LabExT.PluginLoader import PluginLoader
 from LabExT.Utils import make_filename_compliant, get_labext_version
@@ -116,6 +119,13 @@ class StandardExperiment:
         self.measurements_hashes = []
         self._meas_control_settings = MeasurementControlSettings()
 
+        # post-processing of finished measurements runs on a single worker, so datasets are saved in order
+        self._post_processing_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="PostProcessing")
+        self._post_processing_futures: List[Future] = []
+
+        # True while the ToDo list is executed, the first ToDo is then being measured
+        self.running = False
+
         self.__setup__()
 
     @property
@@ -178,6 +188,17 @@ class StandardExperiment:
         messagebox.showinfo("Measurements finished!", "Measurements finished!")
 
     def run(self):
+        self.running = True
+        try:
+            self._run_to_do_list()
+        finally:
+            # also register the ToDos still being processed if the run stopped with an error
+            try:
+                self.wait_for_post_processing()
+            finally:
+                self.running = False
+
+    def _run_to_do_list(self):
         self.logger.info("Running experiment.")
 
         # update local exctrl variables from GUI, just for safety
@@ -196,6 +217,10 @@ class StandardExperiment:
 
         # we iterate over every measurement of every device in the To Do Queue
         while 0 < len(self.to_do_list):
+            # load the results the post-processing worker finished in the meantime
+            if not self.collect_post_processing_results():
+                break
+
             current_todo = self.to_do_list[0]
             device = current_todo.device
             measurement = current_todo.measurement
@@ -273,7 +298,11 @@ class StandardExperiment:
             # execute automatic search for peak
             if self.exctrl_enable_sfp:
                 self._peak_searcher.update_params_from_savefile()
-                data["search for peak"] = self._peak_searcher.search_for_peak()
+                data["search for peak"] = self._peak_searcher.search_for_peak_on_device(self._chip, device)
+                if self.exctrl_auto_move_stages and self._peak_searcher.all_dimensions_optimized(
+                        data["search for peak"]):
+                    # optimized positions improve the predicted positions of the following devices
+                    self._mover.record_coupling_position(device)
                 self.logger.info("Search for peak done.")
             else:
                 data["search for peak"] = None
@@ -282,8 +311,10 @@ class StandardExperiment:
             self.logger.info("Executing measurement %s on device %s.", measurement.get_name_with_id(), device)
 
             measurement_executed = False
+            post_processing = None
             try:
                 measurement.measure(device, data)
+                post_processing = measurement.get_post_processing_pipeline()
                 save_file_ending = ".json"
                 measurement_executed = True
             except Exception as exc:
@@ -318,59 +349,24 @@ class StandardExperiment:
                 data["timestamp"] = ts
                 data["finished"] = True
 
-                # save current measurement's data on disk
-                data.save(indented=self._meas_control_settings.json_indented)
-                data.auto_save = False
-                final_path = save_file_path + save_file_ending
-                rename(data.file_path, final_path)
-
-                self.logger.info(
-                    "Saved data of current measurement: %s to %s", measurement.get_name_with_id(), final_path
-                )
-
-                if current_todo.part_of_sweep:
-                    sweep_params = current_todo.sweep_parameters
-                    # update sweep information
-                    meas_mask = sweep_params["metadata", "id"] == measurement.id.hex
-                    meas_index = sweep_params[meas_mask].index.to_list()[0]
-
-                    sweep_params.loc[meas_index, ("metadata", "finished")] = True
-                    sweep_params.loc[meas_index, ("metadata", "file_path")] = final_path
-
-                    # make sure all measurements of this sweep share the same summary dictionary
-                    if not current_todo.dictionary_wrapper.available:
-                        current_todo.dictionary_wrapper.wrap(
-                            self._write_metadata(file_path=save_file_path + "_sweep_summary.json")
-                        )
-
-                    # this is the dictionary storing the association list of measurements and
-                    # parameters in the summary file
-                    sweep_list = list()
-
-                    # go through all measurements and store parameters and metadata for each
-                    for _, row in sweep_params.iterrows():
-                        temp_dict = OrderedDict()
-                        temp_dict["metadata"] = {
-                            name: value
-                            for name, value in zip(row["metadata"].index, row["metadata"])
-                            if name not in ["finished"]
-                        }
-                        temp_dict["measurement settings"] = {
-                            name: value
-                            for name, value in zip(row["measurement settings"].index, row["measurement settings"])
-                        }
-                        sweep_list.append(temp_dict)
-
-                    # store summary data in shared dictionary and write to disk
-                    current_todo.dictionary_wrapper.get["sweep_association_list"] = sweep_list
-                    current_todo.dictionary_wrapper.get.save()
-
                 # save executed device-measurement pair for later recall by "Redo last measurement" button
                 self.last_executed_todos.append((device, self.duplicate_measurement(measurement)))
 
+                if post_processing:
+                    # process and save on the worker thread, such that the next ToDo can already start
+                    self._post_processing_futures.append(
+                        self._post_processing_executor.submit(
+                            self._post_process_and_save, post_processing, current_todo, data, save_file_path
+                        )
+                    )
+                else:
+                    # save current measurement's data on disk
+                    self._save_measurement_data(
+                        current_todo, data, save_file_path, save_file_ending, load_dataset=measurement_executed
+                    )
+
             # shift to do to executed measurements when successful
             if measurement_executed:
-                self.load_measurement_dataset(data, final_path, force_gui_update=False)
                 self.to_do_list.pop(0)
 
             # tell GUI to update
@@ -378,11 +374,14 @@ class StandardExperiment:
 
             # if manual mode activated, break here
             if self.exctrl_pause_after_device:
+                self.wait_for_post_processing()
                 break
 
             # if we finished all the devices in the to_do_list
             # then we finished measuring everything
             if not self.to_do_list:
+                if not self.wait_for_post_processing():
+                    break
                 self.show_meas_finished_infobox()
                 self.logger.info("Experiment and hereby all measurements finished.")
                 return
@@ -391,6 +390,152 @@ class StandardExperiment:
                 self.logger.info(f"Waiting {self.exctrl_inter_measurement_wait_time:.0f}s before continuing...")
                 time.sleep(self.exctrl_inter_measurement_wait_time)
 
+    def _save_measurement_data(
+        self, current_todo: ToDo, data: AutosaveDict, save_file_path: str, save_file_ending: str, load_dataset: bool
+    ) -> str:
+        """Writes the data of a finished ToDo to disk, updates the sweep summary and, if requested, loads the
+        dataset into the list of finished measurements.
+
+        Returns:
+            The path of the saved file.
+        """
+        final_path = self._write_measurement_file(current_todo, data, save_file_path, save_file_ending)
+        self._register_saved_measurement(current_todo, data, save_file_path, final_path, load_dataset)
+        return final_path
+
+    def _write_measurement_file(
+        self, current_todo: ToDo, data: AutosaveDict, save_file_path: str, save_file_ending: str
+    ) -> str:
+        """Writes the data of a finished ToDo to disk.
+
+        Returns:
+            The path of the saved file.
+        """
+        data.save(indented=self._meas_control_settings.json_indented)
+        data.auto_save = False
+        final_path = save_file_path + save_file_ending
+        rename(data.file_path, final_path)
+
+        self.logger.info(
+            "Saved data of current measurement: %s to %s", current_todo.measurement.get_name_with_id(), final_path
+        )
+        return final_path
+
+    def _register_saved_measurement(
+        self, current_todo: ToDo, data: AutosaveDict, save_file_path: str, final_path: str, load_dataset: bool
+    ):
+        """Updates the sweep summary of a saved ToDo and, if requested, loads the dataset into the list of finished
+        measurements. Must run on the experiment thread, since it changes the state shown in the GUI.
+        """
+        measurement = current_todo.measurement
+
+        if current_todo.part_of_sweep:
+            sweep_params = current_todo.sweep_parameters
+            # update sweep information
+            meas_mask = sweep_params["metadata", "id"] == measurement.id.hex
+            meas_index = sweep_params[meas_mask].index.to_list()[0]
+
+            sweep_params.loc[meas_index, ("metadata", "finished")] = True
+            sweep_params.loc[meas_index, ("metadata", "file_path")] = final_path
+
+            # make sure all measurements of this sweep share the same summary dictionary
+            if not current_todo.dictionary_wrapper.available:
+                current_todo.dictionary_wrapper.wrap(
+                    self._write_metadata(file_path=save_file_path + "_sweep_summary.json")
+                )
+
+            # this is the dictionary storing the association list of measurements and
+            # parameters in the summary file
+            sweep_list = list()
+
+            # go through all measurements and store parameters and metadata for each
+            for _, row in sweep_params.iterrows():
+                temp_dict = OrderedDict()
+                temp_dict["metadata"] = {
+                    name: value
+                    for name, value in zip(row["metadata"].index, row["metadata"])
+                    if name not in ["finished"]
+                }
+                temp_dict["measurement settings"] = {
+                    name: value
+                    for name, value in zip(row["measurement settings"].index, row["measurement settings"])
+                }
+                sweep_list.append(temp_dict)
+
+            # store summary data in shared dictionary and write to disk
+            current_todo.dictionary_wrapper.get["sweep_association_list"] = sweep_list
+            current_todo.dictionary_wrapper.get.save()
+
+        if load_dataset:
+            self.load_measurement_dataset(data, final_path, force_gui_update=False)
+
+    def _post_process_and_save(
+        self, post_processing: PostProcessingPipeline, current_todo: ToDo, data: AutosaveDict, save_file_path: str
+    ) -> Tuple[ToDo, AutosaveDict, str, str, bool]:
+        """Runs on the post-processing worker thread: applies the measurement's pipeline and saves the data to disk.
+
+        The worker does not touch the experiment state or the GUI. The returned ToDo, data, file paths and whether
+        the processing succeeded are registered on the experiment thread, see `collect_post_processing_results`.
+        """
+        try:
+            data["values"] = post_processing(data["values"])
+            save_file_ending = ".json"
+            processed = True
+        except Exception as exc:
+            etype, evalue, _ = sys.exc_info()
+            data["error"] = OrderedDict()
+            data["error"]["type"] = str(etype)
+            data["error"]["desc"] = repr(evalue)
+            data["error"]["traceback"] = traceback.format_exc()
+            self.logger.exception("Error occurred during post-processing: " + repr(exc))
+            save_file_ending = "_error.json"
+            processed = False
+
+        final_path = self._write_measurement_file(current_todo, data, save_file_path, save_file_ending)
+        return current_todo, data, save_file_path, final_path, processed
+
+    def collect_post_processing_results(self, wait: bool = False) -> bool:
+        """Registers the ToDos processed by the post-processing worker, in the order they were executed.
+
+        Like a failed measurement, a ToDo whose post-processing failed is put back to the front of the ToDo list and
+        the experiment goes into pause mode.
+
+        Args:
+            wait: If True, blocks until all ToDos are processed. Otherwise, stops at the first unfinished one.
+
+        Returns:
+            False if the post-processing of a ToDo failed.
+        """
+        collected = False
+        failed_todos = []
+        while self._post_processing_futures and (wait or self._post_processing_futures[0].done()):
+            current_todo, data, save_file_path, final_path, processed = self._post_processing_futures.pop(0).result()
+            self._register_saved_measurement(current_todo, data, save_file_path, final_path, load_dataset=processed)
+            if not processed:
+                failed_todos.append(current_todo)
+            collected = True
+
+        if failed_todos:
+            self.to_do_list[0:0] = failed_todos
+            self._experiment_manager.main_window.model.var_mm_pause.set(True)
+            msg = "Error occurred during post-processing of: " + ", ".join(
+                todo.measurement.get_name_with_id() for todo in failed_todos)
+            messagebox.showinfo("Post-Processing Error", msg)
+            self.logger.error(msg)
+
+        if collected:
+            self.update(plot_new_meas=True)
+
+        return not failed_todos
+
+    def wait_for_post_processing(self) -> bool:
+        """Blocks until the data of all executed ToDos is processed, saved and loaded.
+
+        Returns:
+            False if the post-processing of a ToDo failed, see `collect_post_processing_results`.
+        """
+        return self.collect_post_processing_results(wait=True)
+
     def _write_metadata(self, target: dict = None, file_path: str = "tmp.json") -> dict:
         """Writes the metadata of a measurement to the given dictionary.
         If no dictionary is provided, a new one will be created.
@@ -556,6 +701,35 @@ class StandardExperiment:
 
         return new_meas
 
+    def optimize_to_do_list(self) -> Tuple[float, float]:
+        """Reorders the ToDo queue such that the stages travel as short as possible between the devices.
+
+        All ToDos of a device stay together and pinned ToDos keep their place, see `ToDoQueueOptimizer`.
+        While the experiment is running, the first ToDo is being measured and keeps its place as well.
+        The travel time is estimated with the speed and acceleration configured in the mover.
+
+        Returns:
+            The estimated stage travel time in [s] before and after reordering.
+
+        Raises:
+            ValueError: If a device of a ToDo has no input or output position.
+        """
+        todos = list(self.to_do_list)
+        start_device = self.last_executed_todos[-1][0] if self.last_executed_todos else None
+        # the running experiment removes the first ToDo once it is measured, so it must stay in front
+        n_fixed = 1 if self.running and todos else 0
+        if n_fixed:
+            start_device = todos[0].device
+
+        ordered, time_before, time_after = optimize_todo_order(
+            todos[n_fixed:], self._mover.speed_xy, self._mover.acceleration_xy, start_device=start_device)
+
+        # to_do_list must not be redefined, it is referenced by the GUI
+        self.to_do_list[n_fixed:] = ordered
+        self.logger.info(
+            f"Reordered {len(ordered)} ToDos, estimated stage travel time {time_before:.1f}s -> {time_after:.1f}s.")
+        return time_before, time_after
+
     def update_chip(self, chip: Chip):
         """Update reference to chip and respective parameters.
 
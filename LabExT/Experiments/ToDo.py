@@ -19,7 +19,8 @@ class ToDo:
                  measurement: Measurement,
                  part_of_sweep: bool = False,
                  sweep_parameters: DataFrame = None,
-                 dictionary_wrapper: "DictionaryWrapper" = None):
+                 dictionary_wrapper: "DictionaryWrapper" = None,
+                 pinned: bool = False):
         """Create a new ToDo
         
         Args:
@@ -28,6 +29,7 @@ class ToDo:
             part_of_sweep: This should only be `True` if this ToDo is part of a sweep
             sweep_parameters: If the `ToDo` is part of a sweep this argument mustn't be `None`
             dictionary_wrapper: If the `ToDo` is part of a sweep this argument mustn't be `None`
+            pinned: If `True`, the position of this ToDo in the queue is kept when the queue is reordered
         """
         assert (part_of_sweep and sweep_parameters is not None) or not part_of_sweep
         assert (part_of_sweep and dictionary_wrapper is not None) or not part_of_sweep
@@ -41,6 +43,8 @@ class ToDo:
         self.dictionary_wrapper = dictionary_wrapper
         """This reference is shared between all `ToDo`s which are part of the same sweep."""
 
+        self.pinned = pinned
+
     def __getitem__(self, item):
         """ make To-Do class compatible with old code which used (device,measurement) tuples as ToDos """
         if item == 0:
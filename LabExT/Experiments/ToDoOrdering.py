@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from LabExT.Experiments.ToDo import ToDo
+from LabExT.Wafer.Device import Device
+
+
+def travel_time(distance, speed: float, acceleration: float) -> np.ndarray:
+    """Returns the duration of point-to-point moves with a trapezoidal velocity profile.
+
+    Args:
+        distance: Travelled distance(s) in [um]
+        speed: Maximum speed in [um/s]
+        acceleration: Acceleration and deceleration in [um/s^2]
+    """
+    distance = np.abs(np.asarray(distance, dtype=float))
+    if acceleration <= 0:
+        return distance / speed
+    # below this distance, the stage decelerates before reaching the maximum speed
+    triangular = distance < speed ** 2 / acceleration
+    return np.where(triangular,
+                    2 * np.sqrt(distance / acceleration),
+                    distance / speed + speed / acceleration)
+
+
+class ToDoQueueOptimizer:
+    """Reorders ToDos such that the stages travel as short as possible between the devices.
+
+    All ToDos of a device are kept together in their original order. Pinned ToDos (`ToDo.pinned`) keep their place
+    in the queue, only the ToDos between two pinned ones are reordered.
+
+    The travel time between two devices is the time the input stage needs to move between the input positions plus
+    the time the output stage needs to move between the output positions, since the stages move one after the other.
+    The order of the devices is found with a nearest neighbour tour improved by 2-opt.
+    """
+
+    def __init__(self, speed_xy: float, acceleration_xy: float, max_improvement_passes: int = 100):
+        """Create a new queue optimizer
+
+        Args:
+            speed_xy: Speed of the stages in [um/s]
+            acceleration_xy: Acceleration of the stages in [um/s^2], 0 for no acceleration limit
+            max_improvement_passes: Maximum number of 2-opt passes over the tour
+        """
+        if speed_xy <= 0:
+            raise ValueError("The stage speed must be positive.")
+
+        self.speed_xy = speed_xy
+        self.acceleration_xy = acceleration_xy
+        self.max_improvement_passes = max_improvement_passes
+
+    @staticmethod
+    def device_positions(devices: Sequence[Device]) -> np.ndarray:
+        """Returns the xy input and output positions of the devices as an array of shape (N, 4)."""
+        positions = []
+        for device in devices:
+            if len(device.in_position) < 2 or len(device.out_position) < 2:
+                raise ValueError(f"Device {device.id} has no input or output position.")
+            positions.append(list(device.in_position[:2]) + list(device.out_position[:2]))
+        return np.array(positions, dtype=float).reshape(-1, 4)
+
+    def travel_times(self, from_positions: np.ndarray, to_positions: np.ndarray) -> np.ndarray:
+        """Returns the matrix of travel times between two sets of device positions, see `device_positions`."""
+        from_positions = np.asarray(from_positions, dtype=float).reshape(-1, 4)
+        to_positions = np.asarray(to_positions, dtype=float).reshape(-1, 4)
+        delta = from_positions[:, None, :] - to_positions[None, :, :]
+        input_distance = np.hypot(delta[..., 0], delta[..., 1])
+        output_distance = np.hypot(delta[..., 2], delta[..., 3])
+        return travel_time(input_distance, self.speed_xy, self.acceleration_xy) + \
+            travel_time(output_distance, self.speed_xy, self.acceleration_xy)
+
+    def total_travel_time(self, todos: Sequence[ToDo], start_device: Optional[Device] = None) -> float:
+        """Returns the travel time of the stages to run the ToDos in the given order.
+
+        Args:
+            todos: ToDos in execution order
+            start_device: Device the stages are currently at, or None to start at the first ToDo
+        """
+        devices = [todo.device for todo in todos]
+        if start_device is not None:
+            devices.insert(0, start_device)
+        if len(devices) < 2:
+            return 0.0
+        positions = self.device_positions(devices)
+        return float(np.sum(np.diag(self.travel_times(positions[:-1], positions[1:]))))
+
+    def optimize(self, todos: Sequence[ToDo], start_device: Optional[Device] = None) -> List[ToDo]:
+        """Returns the ToDos in the order with the shortest travel time found.
+
+        Args:
+            todos: ToDos in their current order
+            start_device: Device the stages are currently at, or None if unknown
+
+        Raises:
+            ValueError: If a device has no input or output position.
+        """
+        todos = list(todos)
+        self.device_positions([todo.device for todo in todos] + ([start_device] if start_device else []))
+
+        ordered = []
+        previous_device = start_device
+        # the pinned ToDos split the queue into sections, which are optimized separately
+        section = []
+        for todo in todos + [None]:
+            if todo is not None and not getattr(todo, 'pinned', False):
+                section.append(todo)
+                continue
+
+            next_device = todo.device if todo is not None else None
+            ordered += self._optimize_section(section, previous_device, next_device)
+            if todo is not None:
+                ordered.append(todo)
+                previous_device = todo.device
+            elif ordered:
+                previous_device = ordered[-1].device
+            section = []
+
+        return ordered
+
+    def _optimize_section(self, todos: List[ToDo], start_device: Optional[Device],
+                          end_device: Optional[Device]) -> List[ToDo]:
+        """Orders the device groups of a section between two fixed (or open) ends."""
+        groups = {}
+        for todo in todos:
+            groups.setdefault(todo.device.id, []).append(todo)
+        groups = list(groups.values())
+        if len(groups) < 2:
+            return todos
+
+        positions = self.device_positions([group[0].device for group in groups])
+        n = len(groups)
+
+        # nodes 0..n-1 are the device groups, node n the start and node n+1 the end of the section.
+        # An open end has no travel time to any device.
+        costs = np.zeros((n + 2, n + 2))
+        costs[:n, :n] = self.travel_times(positions, positions)
+        for node, device in ((n, start_device), (n + 1, end_device)):
+            if device is not None:
+                to_device = self.travel_times(self.device_positions([device]), positions)[0]
+                costs[node, :n] = to_device
+                costs[:n, node] = to_device
+
+        tour = self._nearest_neighbour_tour(costs, n)
+        tour = self._two_opt(costs, tour)
+
+        return [todo for node in tour[1:-1] for todo in groups[node]]
+
+    @staticmethod
+    def _nearest_neighbour_tour(costs: np.ndarray, n: int) -> List[int]:
+        tour = [n]
+        visited = np.zeros(n, dtype=bool)
+        for _ in range(n):
+            candidates = np.where(visited, np.inf, costs[tour[-1], :n])
+            node = int(np.argmin(candidates))
+            visited[node] = True
+            tour.append(node)
+        tour.append(n + 1)
+        return tour
+
+    def _two_opt(self, costs: np.ndarray, tour: List[int]) -> List[int]:
+        """Reverses sub-paths of the tour as long as this shortens it. Start and end of the tour stay fixed."""
+        tour = np.array(tour)
+        n_inner = len(tour) - 2
+        for _ in range(self.max_improvement_passes):
+            improved = False
+            for i in range(1, n_inner):
+                # reversing tour[i:j + 1] replaces the edges (i-1, i) and (j, j+1) by (i-1, j) and (i, j+1)
+                j = np.arange(i + 1, n_inner + 1)
+                before, first = tour[i - 1], tour[i]
+                last, after = tour[j], tour[j + 1]
+                delta = costs[before, last] + costs[first, after] - costs[before, first] - costs[last, after]
+                best = int(np.argmin(delta))
+                if delta[best] < -1e-9:
+                    tour[i:j[best] + 1] = tour[i:j[best] + 1][::-1]
+                    improved = True
+            if not improved:
+                break
+        return tour.tolist()
+
+
+def optimize_todo_order(todos: Sequence[ToDo], speed_xy: float, acceleration_xy: float,
+                        start_device: Optional[Device] = None) -> Tuple[List[ToDo], float, float]:
+    """Reorders ToDos for the shortest stage travel time, see `ToDoQueueOptimizer`.
+
+    Returns:
+        The reordered ToDos, the travel time before and after reordering in [s].
+    """
+    optimizer = ToDoQueueOptimizer(speed_xy, acceleration_xy)
+    ordered = optimizer.optimize(todos, start_device)
+    return (ordered,
+            optimizer.total_travel_time(todos, start_device),
+            optimizer.total_travel_time(ordered, start_device))
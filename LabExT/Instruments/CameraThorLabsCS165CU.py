@@ -6,14 +6,11 @@ This program is free software and comes with ABSOLUTELY NO WARRANTY; for details
 """
 
 from LabExT.Instruments.InstrumentAPI import Instrument, InstrumentException
-from LabExT.Instruments.LabJack import LabJack
 
 import threading
 
 import os
 import platform
-import sys
-import matplotlib.pyplot as plt
 import numpy as np
 
 absolute_path_to_dlls = "C://Program Files//Thorlabs//Scientific Imaging//ThorCam"
@@ -26,102 +23,190 @@ from thorlabs_tsi_sdk.tl_mono_to_color_processor import MonoToColorProcessorSDK
 from thorlabs_tsi_sdk.tl_mono_to_color_enums import COLOR_SPACE
 from thorlabs_tsi_sdk.tl_color_enums import FORMAT
 
+
 class CameraThorLabsCS165CU(Instrument):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    """
+    ## CameraThorLabsCS165CU
 
-    def open(self):
-        
-        camera_sdk = TLCameraSDK()
-        available_cameras = camera_sdk.discover_available_cameras()
-        if len(available_cameras) < 1:
-            raise ValueError("no cameras detected")
-            
-        self.cam = camera_sdk.open_camera(available_cameras[0])
+    Driver for the ThorLabs CS165CU color camera using the ThorLabs TSI SDK.
 
-    def snap_photo(self):
-        '''
-        Take photo and save
-        '''
+    On `open()`, the camera is armed once in continuous acquisition mode and a background thread keeps grabbing
+    frames. `snap_photo()` therefore does not re-arm the camera, it only waits for the next frame delivered by the
+    grab thread and returns it as a `(height, width, 3)` RGB array of type `uint8`.
 
-        with MonoToColorProcessorSDK() as mono_to_color_sdk:
+    The optional `sn` argument in the instrument configuration selects the camera by its serial number. If it is not
+    given, the first discovered camera is used.
+    """
 
-            self.cam.frames_per_trigger_zero_for_unlimited = 0  # start camera in continuous mode
-            self.cam.image_poll_timeout_ms = 2000  # 2 second timeout
-            self.cam.arm(2)
+    POLL_TIMEOUT_MS = 2000
 
-            """
-                In a real-world scenario, we want to save the image width and height before color processing so that we 
-                do not have to query it from the camera each time it is needed, which would slow down the process. It is 
-                safe to save these after arming since the image width and height cannot change while the camera is armed.
-            """
-            image_width = self.cam.image_width_pixels
-            image_height = self.cam.image_height_pixels
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._serial_number = self._kwargs.get("sn", None)
 
-            self.cam.issue_software_trigger()
+        self.cam = None
+        self.img = None
 
-            frame = self.cam.get_pending_frame_or_null()
-            if frame is not None:
-                print("frame received!")
-            else:
-                raise ValueError("No frame arrived within the timeout!")
+        self._camera_sdk = None
+        self._mono_to_color_sdk = None
+        self._mono_to_color_processor = None
+        self._image_width = None
+        self._image_height = None
 
-            self.cam.disarm()
+        # frame exchange between grab thread and callers of snap_photo
+        self._grab_thread = None
+        self._grab_stop = threading.Event()
+        self._frame_condition = threading.Condition()
+        self._frame_counter = 0
+        self._grab_error = None
+
+    @Instrument._open.getter  # weird way to override the parent's class property getter
+    def _open(self):
+        return self.cam is not None
+
+    def open(self):
+        """
+        Opens the camera, arms it in continuous mode and starts the background grab thread.
+        """
+        if self.cam is not None:
+            return
+
+        self._camera_sdk = TLCameraSDK()
+        available_cameras = self._camera_sdk.discover_available_cameras()
+        if len(available_cameras) < 1:
+            self._camera_sdk.dispose()
+            self._camera_sdk = None
+            raise InstrumentException("No ThorLabs cameras detected.")
+
+        if self._serial_number is not None and str(self._serial_number) in available_cameras:
+            camera_id = str(self._serial_number)
+        else:
+            camera_id = available_cameras[0]
+
+        self.cam = self._camera_sdk.open_camera(camera_id)
+
+        self.cam.frames_per_trigger_zero_for_unlimited = 0  # start camera in continuous mode
+        self.cam.image_poll_timeout_ms = self.POLL_TIMEOUT_MS
+        self.cam.arm(2)
+
+        # the image size cannot change while the camera is armed, so we only query it once
+        self._image_width = self.cam.image_width_pixels
+        self._image_height = self.cam.image_height_pixels
+
+        # the color processor only depends on camera constants, create it once per session
+        self._mono_to_color_sdk = MonoToColorProcessorSDK()
+        self._mono_to_color_processor = self._mono_to_color_sdk.create_mono_to_color_processor(
+            self.cam.camera_sensor_type,
+            self.cam.color_filter_array_phase,
+            self.cam.get_color_correction_matrix(),
+            self.cam.get_default_white_balance_matrix(),
+            self.cam.bit_depth
+        )
+        self._mono_to_color_processor.color_space = COLOR_SPACE.SRGB
+        self._mono_to_color_processor.output_format = FORMAT.RGB_PIXEL
+
+        self.cam.issue_software_trigger()
+
+        self._grab_stop.clear()
+        self._grab_error = None
+        self._grab_thread = threading.Thread(target=self._grab_frames,
+                                             name="CameraThorLabsCS165CU grab thread",
+                                             daemon=True)
+        self._grab_thread.start()
+
+        self.logger.debug(f"Camera {camera_id} armed with {self._image_width}x{self._image_height} pixels.")
+
+    def _grab_frames(self):
+        """
+        Runs in the grab thread: polls frames from the armed camera and converts them to RGB arrays.
+        """
+        while not self._grab_stop.is_set():
+            try:
+                frame = self.cam.get_pending_frame_or_null()
+                if frame is None:
+                    continue
+                color_image_24_bpp = self._mono_to_color_processor.transform_to_24(
+                    frame.image_buffer, self._image_width, self._image_height)
+            except Exception as exc:
+                with self._frame_condition:
+                    self._grab_error = exc
+                    self._frame_condition.notify_all()
+                return
+
+            # reshape returns a view on the processor's output buffer, no per-pixel copy is done
+            image = np.asarray(color_image_24_bpp, dtype=np.uint8).reshape(
+                (self._image_height, self._image_width, 3))
+
+            with self._frame_condition:
+                self.img = image
+                self._frame_counter += 1
+                self._frame_condition.notify_all()
+
+    def snap_photo(self, wait_for_new_frame=True, timeout=None):
+        """
+        Returns an RGB photo taken by the camera.
+
+        Parameters
+        ----------
+        wait_for_new_frame : bool
+            If True, blocks until a frame arrives which was exposed after this call, e.g. after a stage movement.
+            If False, returns the most recent frame immediately if one is available.
+        timeout : float
+            Maximum time to wait for a frame in [s]. Defaults to twice the poll timeout of the camera.
+
+        Returns
+        -------
+        np.ndarray
+            Image of shape (height, width, 3) and type uint8.
+        """
+        if self.cam is None:
+            raise RuntimeError("Camera connection is not open. Cannot snap photo.")
+
+        if timeout is None:
+            timeout = 2 * self.POLL_TIMEOUT_MS / 1000
+
+        with self._frame_condition:
+            # a frame whose exposure might have started before this call is not accepted
+            last_counter = self._frame_counter + 1 if wait_for_new_frame else 0
+            if not self._frame_condition.wait_for(
+                    lambda: self._frame_counter > last_counter or self._grab_error is not None,
+                    timeout=timeout):
+                raise InstrumentException("No frame arrived within the timeout!")
+            if self._grab_error is not None:
+                raise InstrumentException(f"Camera grab thread failed: {self._grab_error!r}")
+            return self.img
 
-            """
-                When creating a mono to color processor, we want to initialize it using parameters from the camera.
-            """
-            with mono_to_color_sdk.create_mono_to_color_processor(
-                self.cam.camera_sensor_type,
-                self.cam.color_filter_array_phase,
-                self.cam.get_color_correction_matrix(),
-                self.cam.get_default_white_balance_matrix(),
-                self.cam.bit_depth
-            ) as mono_to_color_processor:
-                """
-                    Once it is created, we can change the color space and output format properties. sRGB is the default 
-                    color space, and will usually give the best looking image. The output format will determine how the 
-                    transform image data will be structured.
-                """
-                mono_to_color_processor.color_space = COLOR_SPACE.SRGB  # sRGB color space
-                mono_to_color_processor.output_format = FORMAT.RGB_PIXEL  # data is returned as sequential RGB values
-                """
-                    We can also adjust the Red, Green, and Blue gains. These values amplify the intensity of their 
-                    corresponding colors in the transformed image. For example, if Blue and Green gains are set to 0 
-                    and the Red gain is 10, the resulting image will look entirely Red. The most common use case for these 
-                    properties will be for white balancing. By default they are set to model-specific values that gives 
-                    reasonably good white balance in typical lighting.
-                """
-                print("Red Gain = {red_gain}\nGreen Gain = {green_gain}\nBlue Gain = {blue_gain}\n".format(
-                    red_gain=mono_to_color_processor.red_gain,
-                    green_gain=mono_to_color_processor.green_gain,
-                    blue_gain=mono_to_color_processor.blue_gain
-                ))
-                """
-                    When we have all the settings we want for the mono to color processor, we call one of the transform_to 
-                    functions to get a color image. 
-                """
-                # this will give us a resulting image with 3 channels (RGB) and 16 bits per channel, resulting in 48 bpp
-                color_image_48_bpp = mono_to_color_processor.transform_to_48(frame.image_buffer, image_width, image_height)
-
-                # this will give us a resulting image with 4 channels (RGBA) and 8 bits per channel, resulting in 32 bpp
-                color_image_32_bpp = mono_to_color_processor.transform_to_32(frame.image_buffer, image_width, image_height)
-
-                # this will give us a resulting image with 3 channels (RGB) and 8 bits per channel, resulting in 24 bpp
-                color_image_24_bpp = mono_to_color_processor.transform_to_24(frame.image_buffer, image_width, image_height)
-
-                # from here, perform any actions you need to using the color image
-                img_array = np.int16(np.reshape(color_image_24_bpp, (image_height, image_width*3), order='C'))
-                self.img = [ [] for _ in range(image_height) ]
-                for i in range(image_height):
-                    for j in range(image_width):
-                        self.img[i].append((img_array[i][j*3], img_array[i][j*3+1], img_array[i][j*3 + 2]))
-
-                return self.img
-        #  Because we are using the 'with' statement context-manager, disposal has been taken care of.
-    
     def get_recent_photo(self):
         return self.img
-    
+
+    def get_instrument_parameter(self):
+        return {'idn': self.idn(),
+                'image width': self._image_width,
+                'image height': self._image_height}
+
+    def idn(self):
+        return f"ThorLabs CS165CU camera {self._serial_number}"
+
     def close(self):
-        return self.cam.dispose()
\ No newline at end of file
+        """
+        Stops the grab thread, disarms the camera and releases all SDK resources.
+        """
+        self._grab_stop.set()
+        if self._grab_thread is not None:
+            self._grab_thread.join(timeout=2 * self.POLL_TIMEOUT_MS / 1000)
+            self._grab_thread = None
+
+        if self._mono_to_color_processor is not None:
+            self._mono_to_color_processor.dispose()
+            self._mono_to_color_processor = None
+        if self._mono_to_color_sdk is not None:
+            self._mono_to_color_sdk.dispose()
+            self._mono_to_color_sdk = None
+
+        if self.cam is not None:
+            self.cam.disarm()
+            self.cam.dispose()
+            self.cam = None
+        if self._camera_sdk is not None:
+            self._camera_sdk.dispose()
+            self._camera_sdk = None
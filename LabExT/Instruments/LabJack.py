@@ -14,6 +14,8 @@ import numpy as np
 
 class LabJack:
     def __init__(self):
+        # ports read through this device by the instruments using it, see register_port
+        self._registered_ports = []
         self.open()
 
     def open(self):
@@ -23,9 +25,42 @@ class LabJack:
     def close(self):
         ljm.close(self.handle)
 
+    @property
+    def ports(self) -> list:
+        """Registered ports without duplicates, in the order of their registration."""
+        return list(dict.fromkeys(self._registered_ports))
+
+    def register_port(self, port):
+        """Registers a port read through this device. A port may be registered several times."""
+        self._registered_ports.append(port)
+
+    def unregister_port(self, port) -> int:
+        """Removes one registration of the port.
+
+        @return: number of registrations left on this device
+        @type: int
+        """
+        if port in self._registered_ports:
+            self._registered_ports.remove(port)
+        return len(self._registered_ports)
+
     def read_from_port(self, port):
         return ljm.eReadName(self.handle, port)
 
+    def read_from_ports(self, ports: list, n_samples: int = 1):
+        """Reads several ports in a single eReadNames transaction.
+
+        @para ports: names of the ports to read, e.g. ["AIN0", "AIN1"]
+        @type ports: list
+        @para n_samples: number of consecutive samples per port, all read in the same transaction
+        @type n_samples: int
+        @return: array of shape (n_samples, len(ports)) with the read values
+        @type: np.ndarray
+        """
+        names = list(ports) * n_samples
+        values = ljm.eReadNames(self.handle, len(names), names)
+        return np.reshape(values, (n_samples, len(ports)))
+
     def configure_device_for_triggered_stream(self):
         """Configure the device to wait for a trigger before beginning stream.
 
@@ -6,7 +6,6 @@ This program is free software and comes with ABSOLUTELY NO WARRANTY; for details
 """
 
 from LabExT.Instruments.InstrumentAPI import Instrument, InstrumentException
-import numpy as  np
 import win32com.client
 import os
 import numpy as np
@@ -21,16 +20,58 @@ class OpticalVectorAnalyzer(Instrument):
 
     The current implementation of the OVA class is based on the LabVIEW SDK provided by Luna Innovations. The SDK provides a set of LabVIEW VIs that can be used to control the OVA and acquire measurement data. The OVA class uses the win32com.client module to interact with the LabVIEW VIs and control the OVA.
 
-    
+    The LabVIEW VI references are loaded once per session and re-used for all following acquisitions.
 
     #### Methods
 
     * **grab_data()**: Acquire measurement data from the OVA.
+    * **grab_all_data()**: Acquire a single scan and return the data of several measurement types as arrays.
 
     
     """
+
+    WL_RANGES = {
+        '0.63': 0,
+        '1.27': 1,
+        '2.54': 2,
+        '5.09': 3,
+        '10.22': 4,
+        '20.58': 5,
+        '41.72': 6,
+        '85.78': 7
+    }
+
+    PLOT_DATA_TYPES = {
+        'INSERTION_LOSS' : 0,
+        'GROUP_DELAY' : 1,
+        'CHROMATIC_DISPERSION' : 2,
+        'POLARIZATION_DEPENDENT_LOSS' : 3,
+        'POLARIZATION_MODE_DISPERSION' : 4,
+        'LINEAR_PHASE_DEVIATION' : 5,
+        'QUADRATIC_PHASE_DEVIATION' : 6,
+        'JONES_MATRIX_ELEMENT_AMPLITUDES' : 7,
+        'JONES_MATRIX_ELEMENT_PHASES' : 8,
+        'TIME_DOMAIN_AMPLITUDE' : 9,
+        'TIME_DOMAIN_WAVELENGTH' : 10,
+        'MIN_MAX_LOSS' : 11,
+        'SECOND_ORDER_PMD' : 12,
+        'PHASE_RIPPLE_LINEAR' : 13,
+        'PHASE_RIPPLE_QUADRATIC' : 14
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.labview_app = None
+        self._vi_references = {}
+
+    def _get_vi(self, vi_name: str):
+        """
+        Returns the reference to the given VI, it is only loaded from LabVIEW on first use.
+        """
+        if vi_name not in self._vi_references:
+            vi_path = os.path.join(os.path.dirname(__file__), 'LabViewVIs', vi_name)
+            self._vi_references[vi_name] = self.labview_app.GetVIReference(vi_path)
+        return self._vi_references[vi_name]
 
     def open(self):
         """
@@ -38,11 +79,10 @@ class OpticalVectorAnalyzer(Instrument):
         """
         pythoncom.CoInitialize()
 
-        self.labview_app = win32com.client.Dispatch("LabVIEW.Application")
+        if self.labview_app is None:
+            self.labview_app = win32com.client.Dispatch("LabVIEW.Application")
 
-        # Construct the path to the file relative to the module directory
-        vi_path = os.path.join(os.path.dirname(__file__), 'LabViewVIs', 'ConfigureOVA.vi')
-        vi = self.labview_app.GetVIReference(vi_path)
+        vi = self._get_vi('ConfigureOVA.vi')
 
         vi.Run
 
@@ -57,72 +97,62 @@ class OpticalVectorAnalyzer(Instrument):
             self.logger.debug("Successfully connected to OVA")
             return 
 
-    def grab_data(self, find_dut_L: bool = True, plot_data_type: str = "INSERTION_LOSS", center_wavelength: float = 1550.00, wl_range: float = 2.54, save_all_data: bool = False, filepath: str = 'C:\\Users\\Luna\\Documents\\test.txt'):
-        """
-        Acquire measurement data from the OVA.
-
-        :param find_dut_L: bool Find DUT Length
-        :param plot_data_type: str Plot Measurement Type
-        :param center_wavelength: float Center Wavelength
-        :param wl_range: float Wavelength Range
-        :param save_all_data: bool flag to save all data
-        :param filepath: str filepath to temporarily save all data
-        """
-        
-        vi_path = os.path.join(os.path.dirname(__file__), 'LabViewVIs', 'AcquireSingleScan.vi')
-        vi = self.labview_app.GetVIReference(vi_path)
-
-        wl_range_dict = {
-            '0.63': 0,
-            '1.27': 1,
-            '2.54': 2,
-            '5.09': 3,
-            '10.22': 4,
-            '20.58': 5,
-            '41.72': 6,
-            '85.78': 7
-        }
-
-        plot_data_dict = {
-            'INSERTION_LOSS' : 0,
-            'GROUP_DELAY' : 1,
-            'CHROMATIC_DISPERSION' : 2,
-            'POLARIZATION_DEPENDENT_LOSS' : 3,
-            'POLARIZATION_MODE_DISPERSION' : 4,
-            'LINEAR_PHASE_DEVIATION' : 5,
-            'QUADRATIC_PHASE_DEVIATION' : 6,
-            'JONES_MATRIX_ELEMENT_AMPLITUDES' : 7,
-            'JONES_MATRIX_ELEMENT_PHASES' : 8,
-            'TIME_DOMAIN_AMPLITUDE' : 9,
-            'TIME_DOMAIN_WAVELENGTH' : 10,
-            'MIN_MAX_LOSS' : 11,
-            'SECOND_ORDER_PMD' : 12,
-            'PHASE_RIPPLE_LINEAR' : 13,
-            'PHASE_RIPPLE_QUADRATIC' : 14
-        }
+    def _run_acquisition(self, plot_data_type: str, new_scan: bool, find_dut_L: bool, center_wavelength: float,
+                         wl_range: str) -> np.ndarray:
+        vi = self._get_vi('AcquireSingleScan.vi')
 
         # Set control values if any
         vi.SetControlValue("Find DUT Length?", find_dut_L)
-        vi.SetControlValue("New Scan", True)
+        vi.SetControlValue("New Scan", new_scan)
         vi.SetControlValue("Plot Data", True)
-        vi.SetControlValue("Graph Sel", plot_data_dict[plot_data_type])
+        vi.SetControlValue("Graph Sel", self.PLOT_DATA_TYPES[plot_data_type])
         vi.SetControlValue("Center WL", center_wavelength)
-        vi.SetControlValue("WL Range", wl_range_dict[wl_range])
-        vi.SetControlValue("Save Data", save_all_data)
-        vi.SetControlValue("Output Spreadsheet File Path", filepath)
+        vi.SetControlValue("WL Range", self.WL_RANGES[wl_range])
+        vi.SetControlValue("Save Data", False)
         vi.SetControlValue("Graph Data to Output", [True] * 20)
         vi.SetControlValue("Filter?", False)
 
         vi.Run
 
         # Grab data in graph object
-        result = np.array(vi.GetControlValue("Graph"))
+        return np.array(vi.GetControlValue("Graph"))
 
-        # self.save_data()
+    def grab_data(self, find_dut_L: bool = True, plot_data_type: str = "INSERTION_LOSS", center_wavelength: float = 1550.00, wl_range: str = '2.54'):
+        """
+        Acquire measurement data from the OVA.
+
+        :param find_dut_L: bool Find DUT Length
+        :param plot_data_type: str Plot Measurement Type
+        :param center_wavelength: float Center Wavelength
+        :param wl_range: str Wavelength Range
+        :return: np.ndarray graph data of the selected measurement type
+        """
+        return self._run_acquisition(plot_data_type, True, find_dut_L, center_wavelength, wl_range)
+
+    def grab_all_data(self, plot_data_types: list = None, find_dut_L: bool = True, center_wavelength: float = 1550.00, wl_range: str = '2.54'):
+        """
+        Acquire a single scan and read out the graph data of several measurement types.
+
+        Only the first measurement type triggers a new scan, all others are computed by the OVA from the same scan.
+
+        :param plot_data_types: list of measurement types to read, defaults to all types
+        :param find_dut_L: bool Find DUT Length
+        :param center_wavelength: float Center Wavelength
+        :param wl_range: str Wavelength Range
+        :return: dict mapping each measurement type to its graph data array
+        """
+        if plot_data_types is None:
+            plot_data_types = list(self.PLOT_DATA_TYPES)
 
-        return result
+        results = {}
+        for idx, plot_data_type in enumerate(plot_data_types):
+            results[plot_data_type] = self._run_acquisition(
+                plot_data_type, idx == 0, find_dut_L, center_wavelength, wl_range)
+        return results
 
     def close(self):
+        self._vi_references = {}
+        self.labview_app = None
         pythoncom.CoUninitialize()
         return
 
@@ -130,4 +160,4 @@ class OpticalVectorAnalyzer(Instrument):
         return f"OVA"
 
     def get_instrument_parameter(self):
-        return {'idn': self.idn()}
\ No newline at end of file
+        return {'idn': self.idn()}
@@ -10,12 +10,30 @@ from LabExT.Instruments.LabJack import LabJack
 
 import threading
 
+import numpy as np
+
 
 class PowerMeterKoheronPD10R(Instrument):
+    """
+    ## PowerMeterKoheronPD10R
+
+    Koheron PD10R logarithmic photodetector read out through an analog input of a LabJack.
+
+    Every instance reads the LabJack port given by the `lj_port` argument. If `averaging_samples` is larger than one,
+    `power` and `fetch_power` return the average over a short burst of samples which are all read in a single
+    transaction. All opened instances share one LabJack connection, on which they register their ports.
+    `fetch_power_all` reads the ports of all opened PD10R instances at once.
+    """
+
+    # LabJack connection shared by all opened instances, closed with the last one
+    _shared_lj = None
+    _shared_lj_lock = threading.Lock()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.lj = None
         self.lj_port = self._kwargs.get("lj_port", None)
+        self.averaging_samples = int(self._kwargs.get("averaging_samples", 1))
 
 
     @Instrument._open.getter  # weird way to override the parent's class property getter
@@ -23,29 +41,68 @@ class PowerMeterKoheronPD10R(Instrument):
         return self.lj
 
     def open(self):
-        self.lj = LabJack()
-
-    def voltage_to_dBm(self, voltage):
+        if self.lj is not None:
+            return
+        with PowerMeterKoheronPD10R._shared_lj_lock:
+            if PowerMeterKoheronPD10R._shared_lj is None:
+                PowerMeterKoheronPD10R._shared_lj = LabJack()
+            self.lj = PowerMeterKoheronPD10R._shared_lj
+            self.lj.register_port(self.lj_port)
+
+    @staticmethod
+    def voltage_to_dBm(voltage):
         '''
-        Use this calibration for the Koheron detectors
+        Use this calibration for the Koheron detectors.
+        Accepts a single voltage or an array of voltages of any shape.
         '''
         zero_dbm = 2.11
         volts_per_decade = 0.3
-        power_dBm = (voltage - zero_dbm) / (volts_per_decade*0.1)
+        power_dBm = (np.asarray(voltage, dtype=float) - zero_dbm) / (volts_per_decade*0.1)
+        if power_dBm.ndim == 0:
+            return float(power_dBm)
         return power_dBm
-    
+
+    def _read_ports_dBm(self, ports, n_samples):
+        # the detector voltage is proportional to the log of the power, so the burst is averaged in dBm
+        voltages = self.lj.read_from_ports(ports, n_samples=n_samples)
+        return self.voltage_to_dBm(voltages).mean(axis=0)
+
     @property
     def power(self):
-        return self.voltage_to_dBm(self.lj.read_from_port(self.lj_port))
+        return self.fetch_power()
 
     def fetch_power(self):
-        return self.voltage_to_dBm(self.lj.read_from_port(self.lj_port))
+        if self.averaging_samples <= 1:
+            return self.voltage_to_dBm(self.lj.read_from_port(self.lj_port))
+        return float(self._read_ports_dBm([self.lj_port], self.averaging_samples)[0])
+
+    def fetch_power_all(self, ports=None):
+        """
+        Reads the power of several detectors in a single LabJack transaction.
+
+        :param ports: list of LabJack ports to read, defaults to the ports of all opened PD10R instances
+        :return: dict mapping each port to its power in dBm
+        """
+        if ports is None:
+            ports = self.lj.ports or [self.lj_port]
+        powers = self._read_ports_dBm(ports, max(self.averaging_samples, 1))
+        return dict(zip(ports, powers.tolist()))
     
     def get_instrument_parameter(self):
         return {'idn': self.idn()}
     
     def idn(self):
         return f"LabJack PD {self.lj}"
+
+    def close(self):
+        if self.lj is None:
+            return
+        with PowerMeterKoheronPD10R._shared_lj_lock:
+            if self.lj.unregister_port(self.lj_port) == 0:
+                self.lj.close()
+                if PowerMeterKoheronPD10R._shared_lj is self.lj:
+                    PowerMeterKoheronPD10R._shared_lj = None
+            self.lj = None
     
     def trigger(self, continuous=False):
         return
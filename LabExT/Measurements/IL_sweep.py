@@ -9,6 +9,7 @@ class IL_sweep(Measurement):
         self.name = 'IL_sweep'
         self.settings_path = 'IL_sweep_settings.json'
         self.instr_laser = None
+        self.instr_pms = []
         self.labjack = None
 
     @staticmethod
@@ -112,21 +113,26 @@ class IL_sweep(Measurement):
 
         lambda_data = np.linspace(start_lambda, end_lambda, vector_length)
 
-        # Calibrate data
-        for i, pm in enumerate(self.instr_pms):
-            power_data[i, :] = pm.voltage_to_dBm(power_data[i, :])
-        # power_data = self.instr_pm.voltage_to_dBm(power_data)
-
-        # convert numpy float32/float64 to python float
+        # store raw detector voltages, the calibration to dBm is done in the post-processing pipeline
         data['values']['wavelength [nm]'] = lambda_data.tolist()
         for i, pm in enumerate(self.instr_pms):
-            data['values'][f'transmission {pm.lj_port} [dBm]'] = power_data[i, :].tolist()
+            data['values'][f'detector voltage {pm.lj_port} [V]'] = power_data[i, :].tolist()
 
         # close connection
         self.instr_laser.close()
-        self.instr_pms[0].close()
+        for pm in self.instr_pms:
+            pm.close()
 
         # sanity check if data contains all necessary keys
         self._check_data(data)
 
-        return data
\ No newline at end of file
+        return data
+
+    def get_post_processing_pipeline(self):
+        # calibrate the detector voltages of every power meter used in the last run to dBm
+        return PostProcessingPipeline([
+            UnitConversion(keys=[f'detector voltage {pm.lj_port} [V]'],
+                           function=pm.voltage_to_dBm,
+                           new_keys=[f'transmission {pm.lj_port} [dBm]'])
+            for pm in self.instr_pms
+        ])
@@ -1,7 +1,29 @@
+import numpy as np
+
 from LabExT.Measurements.MeasAPI import *
-import pandas as pd
 
 class Luna_sweep(Measurement):
+    # labels of the traces in the OVA graph data for every measurement type
+    TRACE_LABELS = {
+        "INSERTION_LOSS": ['Insertion Loss (dB)'],
+        "GROUP_DELAY": ['Group Delay (dB)'],
+        "CHROMATIC_DISPERSION": ['Chromatic Dispersion (dB)'],
+        "POLARIZATION_DEPENDENT_LOSS": ['Polarization Dependent Loss (dB)'],
+        "POLARIZATION_MODE_DISPERSION": ['Polarization Mode Dispersion (dB)'],
+        "LINEAR_PHASE_DEVIATION": ['Linear Phase Deviation(dB)'],
+        "QUADRATIC_PHASE_DEVIATION": ['Quadratic Phase Deviation (dB)'],
+        "JONES_MATRIX_ELEMENT_AMPLITUDES": ['Jones Matrix Element Amplitudes A', 'Jones Matrix Element Amplitudes B',
+                                            'Jones Matrix Element Amplitudes C', 'Jones Matrix Element Amplitudes D'],
+        "JONES_MATRIX_ELEMENT_PHASES": ['Jones Matrix Element Phases A', 'Jones Matrix Element Phases B',
+                                        'Jones Matrix Element Phases C', 'Jones Matrix Element Phases D'],
+        "TIME_DOMAIN_AMPLITUDE": ['Time Domain Amplitude (dB)'],
+        "TIME_DOMAIN_WAVELENGTH": ['Time Domain Wavelength (nm)'],
+        "MIN_MAX_LOSS": ['Min Insertion Loss (dB)', 'Max Insertion Loss (dB)'],
+        "SECOND_ORDER_PMD": ['Second Order PMD'],
+        "PHASE_RIPPLE_LINEAR": ['Phase Ripple Linear'],
+        "PHASE_RIPPLE_QUADRATIC": ['Phase Ripple Quadratic'],
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)  # calling parent constructor
 
@@ -21,7 +43,6 @@ class Luna_sweep(Measurement):
                 options = ["INSERTION_LOSS", "GROUP_DELAY", 'CHROMATIC_DISPERSION', 'POLARIZATION_DEPENDENT_LOSS', 'POLARIZATION_MODE_DISPERSION', 'LINEAR_PHASE_DEVIATION', 'QUADRATIC_PHASE_DEVIATION', 'JONES_MATRIX_ELEMENT_AMPLITUDES', 'JONES_MATRIX_ELEMENT_PHASES', 'TIME_DOMAIN_AMPLITUDE', 'TIME_DOMAIN_WAVELENGTH', 'MIN_MAX_LOSS', 'SECOND_ORDER_PMD', 'PHASE_RIPPLE_LINEAR', 'PHASE_RIPPLE_QUADRATIC']
             ),
             'save_all_data': MeasParamBool(value=False),
-            'filepath': MeasParamString(value='C:\\Users\\Luna\\Documents\\test.txt')
         }
     
     @staticmethod
@@ -36,76 +57,43 @@ class Luna_sweep(Measurement):
         wl_range = parameters.get('wavelength range').value
         plot_data_type = parameters.get('Plot Measurement Type').value
         save_all_data = parameters.get('save_all_data').value
-        filepath = parameters.get('filepath').value
-
-        result = self.ova.grab_data(
-            find_dut_L = True,
-            center_wavelength = center_wavelength,
-            wl_range = wl_range,
-            plot_data_type = plot_data_type,
-            save_all_data = save_all_data,
-            filepath = filepath,
-        )
 
         if save_all_data:
-            df = pd.read_csv(filepath, delimiter="\t", skiprows=7, header=0)
-            for col in df.columns:
-                data['values'][col] = df[col].tolist()
+            # one scan, all measurement types are read from the OVA as arrays
+            results = self.ova.grab_all_data(
+                find_dut_L = True,
+                center_wavelength = center_wavelength,
+                wl_range = wl_range,
+            )
         else:
-            if plot_data_type == "INSERTION_LOSS":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Insertion Loss (dB)'] = result[0, 1, :].tolist()
-            elif plot_data_type == "GROUP_DELAY":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Group Delay (dB)'] = result[0, 1, :].tolist()
-            elif plot_data_type == "CHROMATIC_DISPERSION":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Chromatic Dispersion (dB)'] = result[0, 1, :].tolist()
-            elif plot_data_type == "POLARIZATION_DEPENDENT_LOSS":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Polarization Dependent Loss (dB)'] = result[0, 1, :].tolist()
-            elif plot_data_type == "POLARIZATION_MODE_DISPERSION":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Polarization Mode Dispersion (dB)'] = result[0, 1, :].tolist()
-            elif plot_data_type == "LINEAR_PHASE_DEVIATION":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Linear Phase Deviation(dB)'] = result[0, 1, :].tolist()
-            elif plot_data_type == "QUADRATIC_PHASE_DEVIATION":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Quadratic Phase Deviation (dB)'] = result[0, 1, :].tolist()
-            elif plot_data_type == "JONES_MATRIX_ELEMENT_AMPLITUDES":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Jones Matrix Element Amplitudes A'] = result[0, 1, :].tolist()
-                data['values']['Jones Matrix Element Amplitudes B'] = result[1, 1, :].tolist()
-                data['values']['Jones Matrix Element Amplitudes C'] = result[2, 1, :].tolist()
-                data['values']['Jones Matrix Element Amplitudes D'] = result[3, 1, :].tolist()
-            elif plot_data_type == "JONES_MATRIX_ELEMENT_PHASES":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Jones Matrix Element Phases A'] = result[0, 1, :].tolist()
-                data['values']['Jones Matrix Element Phases B'] = result[1, 1, :].tolist()
-                data['values']['Jones Matrix Element Phases C'] = result[2, 1, :].tolist()
-                data['values']['Jones Matrix Element Phases D'] = result[3, 1, :].tolist()
-            elif plot_data_type == "TIME_DOMAIN_AMPLITUDE":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Time Domain Amplitude (dB)'] = result[0, 1, :].tolist()
-            elif plot_data_type == "TIME_DOMAIN_WAVELENGTH":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Time Domain Wavelength (nm)'] = result[0, 1, :].tolist()
-            elif plot_data_type == "MIN_MAX_LOSS":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Min Insertion Loss (dB)'] = result[0, 1, :].tolist()
-                data['values']['Max Insertion Loss (dB)'] = result[1, 1, :].tolist()
-            elif plot_data_type == "SECOND_ORDER_PMD":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Second Order PMD'] = result[0, 1, :].tolist()
-            elif plot_data_type == "PHASE_RIPPLE_LINEAR":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Phase Ripple Linear'] = result[0, 1, :].tolist()
-            elif plot_data_type == "PHASE_RIPPLE_QUADRATIC":
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['Phase Ripple Quadratic'] = result[0, 1, :].tolist()
-            else:
-                data['values']['wavelength [nm]'] = result[0, 0, :].tolist()
-                data['values']['transmission (dB)'] = result[0, 1, :].tolist()
-        
-        return data
\ No newline at end of file
+            results = {
+                plot_data_type: self.ova.grab_data(
+                    find_dut_L = True,
+                    center_wavelength = center_wavelength,
+                    wl_range = wl_range,
+                    plot_data_type = plot_data_type,
+                )
+            }
+
+        data['values'].update(self.values_from_results(results, plot_data_type))
+
+        return data
+
+    @classmethod
+    def values_from_results(cls, results, plot_data_type):
+        """
+        Converts the OVA graph data of all measurement types into the values of the measurement data.
+
+        The x-axis of the plotted type is stored as 'wavelength [nm]'. Types whose x-axis differs from it, e.g. the
+        time domain types, get their own x-axis, stored as 'x-axis <measurement type>'.
+        """
+        values = {}
+        x_axis = results[plot_data_type][0, 0, :]
+        values['wavelength [nm]'] = x_axis.tolist()
+        for result_type, result in results.items():
+            type_x_axis = result[0, 0, :]
+            if type_x_axis.shape != x_axis.shape or not np.array_equal(type_x_axis, x_axis):
+                values[f'x-axis {result_type}'] = type_x_axis.tolist()
+            for trace_idx, label in enumerate(cls.TRACE_LABELS[result_type]):
+                values[label] = result[trace_idx, 1, :].tolist()
+        return values
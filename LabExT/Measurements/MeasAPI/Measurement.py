@@ -13,6 +13,7 @@ from typing import TYPE_CHECKING, List, Dict, Tuple, Optional
 import uuid
 
 from LabExT.Measurements.MeasAPI.Measparam import MeasParam
+from LabExT.Measurements.MeasAPI.PostProcessing import PostProcessingPipeline
 
 if TYPE_CHECKING:
     from LabExT.Experiments.StandardExperiment import StandardExperiment
@@ -340,6 +341,37 @@ class Measurement:
         """
         raise NotImplementedError
 
+    def get_post_processing_pipeline(self) -> PostProcessingPipeline:
+        """The post-processing stages to be applied to `data['values']` after the `algorithm` finished.
+
+        Override this method to declare unit conversions, decimation, smoothing etc. instead of doing them inside
+        `algorithm`. The LabExT GUI executes the pipeline on a worker thread, such that the next measurement can already
+        start while the data of the previous one is processed. The pipeline may depend on the parameters and
+        instruments used in the last `algorithm` call.
+
+        The default implementation returns an empty pipeline.
+
+        Returns:
+            PostProcessingPipeline: the chain of stages to be applied.
+        """
+        return PostProcessingPipeline()
+
+    def post_process(self, data: Dict) -> Dict:
+        """Applies the pipeline returned by `get_post_processing_pipeline` to `data['values']` in place.
+
+        This is called automatically by the LabExT GUI. For standalone use, call it after `measure()`.
+
+        Arguments:
+            data (dict): Dictionary filled by `algorithm`.
+
+        Returns:
+            dict: the same `data` dictionary with processed values.
+        """
+        pipeline = self.get_post_processing_pipeline()
+        if len(pipeline) > 0:
+            data['values'] = pipeline(data['values'])
+        return data
+
     @classmethod
     def setup_return_dict(cls) -> Dict[str, Dict]:
         """Gives the absolute bare minimum of keys which need to be filled in `data` dictionary in an `algorithm()` run.
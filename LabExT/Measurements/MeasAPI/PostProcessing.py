@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+VALUES_TYPE = Dict[str, np.ndarray]
+
+
+class PostProcessingStage:
+    """Super class for a single step of a post-processing pipeline.
+
+    A stage receives the `values` dictionary of a measurement with all numeric vectors converted to numpy arrays and
+    returns the modified dictionary. Stages should operate on whole arrays and not loop over data points.
+    """
+
+    def __call__(self, values: VALUES_TYPE) -> VALUES_TYPE:
+        raise NotImplementedError
+
+    @staticmethod
+    def _target_keys(keys: List[str], new_keys: Optional[List[str]]) -> List[str]:
+        if new_keys is None:
+            return list(keys)
+        if len(new_keys) != len(keys):
+            raise ValueError("new_keys must have the same length as keys.")
+        return list(new_keys)
+
+
+class UnitConversion(PostProcessingStage):
+    """Applies a vectorized function to the given values vectors.
+
+    If `new_keys` is given, the results are stored under the new keys and the original vectors are kept.
+    """
+
+    def __init__(self, keys: List[str], function: Callable[[np.ndarray], np.ndarray], new_keys: List[str] = None):
+        self.keys = list(keys)
+        self.function = function
+        self.new_keys = self._target_keys(self.keys, new_keys)
+
+    def __call__(self, values: VALUES_TYPE) -> VALUES_TYPE:
+        for key, new_key in zip(self.keys, self.new_keys):
+            values[new_key] = self.function(values[key])
+        return values
+
+
+class WattToDBm(UnitConversion):
+    """Converts power vectors in Watt to dBm."""
+
+    def __init__(self, keys: List[str], new_keys: List[str] = None):
+        super().__init__(keys, lambda p: 10 * np.log10(p * 1e3), new_keys)
+
+
+class Decimation(PostProcessingStage):
+    """Keeps only every `factor`-th sample of the given vectors, or of all vectors if no keys are given."""
+
+    def __init__(self, factor: int, keys: List[str] = None):
+        if factor < 1:
+            raise ValueError("Decimation factor must be at least 1.")
+        self.factor = int(factor)
+        self.keys = keys
+
+    def __call__(self, values: VALUES_TYPE) -> VALUES_TYPE:
+        keys = values.keys() if self.keys is None else self.keys
+        for key in list(keys):
+            if np.ndim(values[key]) > 0:
+                values[key] = values[key][::self.factor]
+        return values
+
+
+class MovingAverage(PostProcessingStage):
+    """Smooths the given vectors with a centered moving average over `window` samples.
+
+    The output has the same length as the input, the edges are averaged over the available samples only.
+    """
+
+    def __init__(self, window: int, keys: List[str], new_keys: List[str] = None):
+        if window < 1:
+            raise ValueError("Moving average window must be at least 1.")
+        self.window = int(window)
+        self.keys = list(keys)
+        self.new_keys = self._target_keys(self.keys, new_keys)
+
+    def __call__(self, values: VALUES_TYPE) -> VALUES_TYPE:
+        kernel = np.ones(self.window)
+        for key, new_key in zip(self.keys, self.new_keys):
+            y = values[key]
+            norm = np.convolve(np.ones_like(y), kernel, mode='same')
+            values[new_key] = np.convolve(y, kernel, mode='same') / norm
+        return values
+
+
+class BaselineSubtraction(PostProcessingStage):
+    """Subtracts a least-squares polynomial baseline of the given degree from the given vectors.
+
+    The baseline is fitted against the vector `x_key`, or against the sample index if no `x_key` is given.
+    """
+
+    def __init__(self, keys: List[str], degree: int = 0, x_key: str = None, new_keys: List[str] = None):
+        self.keys = list(keys)
+        self.degree = int(degree)
+        self.x_key = x_key
+        self.new_keys = self._target_keys(self.keys, new_keys)
+
+    def __call__(self, values: VALUES_TYPE) -> VALUES_TYPE:
+        for key, new_key in zip(self.keys, self.new_keys):
+            y = values[key]
+            x = values[self.x_key] if self.x_key is not None else np.arange(len(y))
+            coefficients = np.polynomial.polynomial.polyfit(x, y, self.degree)
+            values[new_key] = y - np.polynomial.polynomial.polyval(x, coefficients)
+        return values
+
+
+class PeakExtraction(PostProcessingStage):
+    """Stores the position and value of the maximum of `y_key` over `x_key`.
+
+    The results are stored as single-element vectors under `"<y_key> peak <x_key>"` and `"<y_key> peak value"`.
+    """
+
+    def __init__(self, x_key: str, y_key: str):
+        self.x_key = x_key
+        self.y_key = y_key
+
+    def __call__(self, values: VALUES_TYPE) -> VALUES_TYPE:
+        y = values[self.y_key]
+        peak_index = np.nanargmax(y)
+        values[f"{self.y_key} peak {self.x_key}"] = values[self.x_key][[peak_index]]
+        values[f"{self.y_key} peak value"] = y[[peak_index]]
+        return values
+
+
+class PostProcessingPipeline:
+    """Chain of post-processing stages applied to the `values` dictionary of a measurement.
+
+    The values vectors are converted to numpy arrays once, passed through all stages and converted back to lists
+    such that the result can be saved as JSON. Non-numeric entries are passed through unchanged.
+    """
+
+    def __init__(self, stages: List[PostProcessingStage] = None):
+        self.stages = list(stages) if stages is not None else []
+
+    def __len__(self) -> int:
+        return len(self.stages)
+
+    def __call__(self, values: dict) -> OrderedDict:
+        arrays = OrderedDict()
+        passthrough = OrderedDict()
+        for key, vector in values.items():
+            array = np.asarray(vector)
+            if array.dtype.kind in 'biuf':
+                arrays[key] = array.astype(float)
+            else:
+                passthrough[key] = vector
+
+        for stage in self.stages:
+            arrays = stage(arrays)
+
+        # keep the original key order, keys added by the stages are appended
+        result = OrderedDict()
+        for key in values:
+            if key in passthrough:
+                result[key] = passthrough[key]
+            elif key in arrays:
+                result[key] = arrays[key].tolist()
+        for key, array in arrays.items():
+            if key not in result:
+                result[key] = np.asarray(array).tolist()
+        return result
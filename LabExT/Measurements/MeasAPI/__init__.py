@@ -12,3 +12,11 @@ from .Measparam import MeasParamInt
 from .Measparam import MeasParamList
 from .Measparam import MeasParamString
 from .Measurement import Measurement
+from .PostProcessing import PostProcessingPipeline
+from .PostProcessing import PostProcessingStage
+from .PostProcessing import UnitConversion
+from .PostProcessing import WattToDBm
+from .PostProcessing import Decimation
+from .PostProcessing import MovingAverage
+from .PostProcessing import BaselineSubtraction
+from .PostProcessing import PeakExtraction
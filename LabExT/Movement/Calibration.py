@@ -395,6 +395,31 @@ class Calibration:
             self.determine_state(skip_connection=True)
             self.mover.update_main_model()
 
+    def refine_kabsch_rotation(self, pairing: Type[CoordinatePairing], weight: float = 1.0) -> bool:
+        """
+        Refines the kabsch transformation with an automatically measured pairing, e.g. an optimized coupling position.
+        Pairings are ignored until the kabsch transformation is defined by manually added pairings.
+        Pairings which disagree with the current transformation are rejected.
+        After the refinement, the state of the calibration is recalculated.
+
+        Parameters
+        ----------
+        pairing: CoordinatePairing
+            A coordinate pairing between a stage and chip coordinate
+        weight: float = 1.0
+            Weight of the pairing in the estimate
+
+        Returns
+        -------
+        bool
+            True if the pairing was accepted, False if it was rejected or ignored.
+        """
+        try:
+            return self._kabsch_rotation.refine(pairing, weight)
+        finally:
+            self.determine_state(skip_connection=True)
+            self.mover.update_main_model()
+
     def reset_single_point_offset(self) -> None:
         """
         Resets the single point offset transformation
@@ -514,6 +539,42 @@ class Calibration:
             raise CalibrationError(
                 "Insufficient calibration state to transform coordinate in chip coordinates.")
 
+    def transform_chip_to_stage_array(self, chip_coordinates: np.ndarray) -> np.ndarray:
+        """
+        Translates an array of chip coordinates with shape (N, 3) into stage coordinates at once.
+        The single-point transformation or the Kabsch transformation is used based on the calibration state.
+
+        Raises
+        ------
+        CalibrationError
+            If state is insufficient to translate the coordinates.
+        """
+        if self.state == State.FULLY_CALIBRATED:
+            return self._kabsch_rotation.chip_to_stage_array(chip_coordinates)
+        elif self.state == State.SINGLE_POINT_FIXED:
+            return self._single_point_offset.chip_to_stage_array(chip_coordinates)
+        else:
+            raise CalibrationError(
+                "Insufficient calibration state to transform coordinates in stage coordinates.")
+
+    def transform_stage_to_chip_array(self, stage_coordinates: np.ndarray) -> np.ndarray:
+        """
+        Translates an array of stage coordinates with shape (N, 3) into chip coordinates at once.
+        The single-point transformation or the Kabsch transformation is used based on the calibration state.
+
+        Raises
+        ------
+        CalibrationError
+            If state is insufficient to translate the coordinates.
+        """
+        if self.state == State.FULLY_CALIBRATED:
+            return self._kabsch_rotation.stage_to_chip_array(stage_coordinates)
+        elif self.state == State.SINGLE_POINT_FIXED:
+            return self._single_point_offset.stage_to_chip_array(stage_coordinates)
+        else:
+            raise CalibrationError(
+                "Insufficient calibration state to transform coordinates in chip coordinates.")
+
     #
     #   Position method
     #
@@ -540,7 +601,7 @@ class Calibration:
         RuntimeError
             If coordinate system is unsupported.
         """
-        stage_position = StageCoordinate.from_list(self.stage.get_position())
+        stage_position = StageCoordinate.from_list(self.stage.position_cache.position())
 
         if self.is_stage_coordinate_system_set:
             return stage_position
@@ -587,11 +648,14 @@ class Calibration:
             RuntimeError(
                 f"Unsupported coordinate system {self.coordinate_system} to move the stage relatively.")
 
+        self.stage.position_cache.commanded(offset=stage_offset.to_list())
         self.stage.move_relative(
             x=stage_offset.x,
             y=stage_offset.y,
             z=stage_offset.z,
             wait_for_stopping=wait_for_stopping)
+        if wait_for_stopping:
+            self.stage.position_cache.stopped()
 
     @assert_minimum_state_for_coordinate_system(
         stage_coordinate_system=State.CONNECTED,
@@ -626,11 +690,14 @@ class Calibration:
             RuntimeError(
                 f"Unsupported coordinate system {self.coordinate_system} to move the stage absolutely.")
 
+        self.stage.position_cache.commanded(target=stage_coordinate.to_list())
         self.stage.move_absolute(
             x=stage_coordinate.x,
             y=stage_coordinate.y,
             z=stage_coordinate.z,
             wait_for_stopping=wait_for_stopping)
+        if wait_for_stopping:
+            self.stage.position_cache.stopped()
 
     def lift_stage(self, z_lift: float) -> None:
         """
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2022  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+from time import time
+from typing import Dict, Hashable, List, Tuple
+
+import numpy as np
+
+
+class DriftModel:
+    """
+    Low-order spatial and temporal model of coupling position residuals.
+
+    A residual is the difference between the optimized coupling position of a device (e.g. after a Search for Peak)
+    and the position the calibration predicts for this device, both in chip coordinates. Thermal drift and chip tilt
+    cause residuals that vary smoothly over the chip and over time. The model fits, per stage, a weighted least-squares
+    model of the x and y residual, whose order grows with the number of samples:
+
+    - fewer than `min_samples_tilt` samples: constant offset
+    - fewer than `min_samples_drift` samples: offset and linear dependence on the chip position (tilt, rotation)
+    - otherwise: additionally a linear drift in time
+
+    Older samples are weighted down exponentially with the time constant `memory`, such that the model follows
+    slow drifts.
+    """
+
+    def __init__(
+        self,
+        memory: float = 3600.0,
+        min_samples_tilt: int = 3,
+        min_samples_drift: int = 6,
+        min_drift_time_span: float = 60.0,
+        max_correction: float = 50.0
+    ) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        memory : float = 3600.0
+            Time constant in [s] of the exponential weighting of samples.
+        min_samples_tilt : int = 3
+            Minimum number of samples to fit a dependence on the chip position.
+        min_samples_drift : int = 6
+            Minimum number of samples to fit a drift in time.
+        min_drift_time_span : float = 60.0
+            Minimum time span in [s] of the samples to fit a drift in time.
+        max_correction : float = 50.0
+            Upper bound of the length of a predicted correction in [um].
+        """
+        self.memory = memory
+        self.min_samples_tilt = min_samples_tilt
+        self.min_samples_drift = min_samples_drift
+        self.min_drift_time_span = min_drift_time_span
+        self.max_correction = max_correction
+
+        # per key: list of (chip x, chip y, timestamp, residual x, residual y)
+        self._samples: Dict[Hashable, List[Tuple[float, float, float, float, float]]] = {}
+        # per key: fitted (coefficients, feature center, feature scale), invalidated by new samples
+        self._fits: Dict[Hashable, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def n_samples(self, key: Hashable) -> int:
+        """
+        Returns the number of residual samples stored for the given key.
+        """
+        return len(self._samples.get(key, []))
+
+    def reset(self, key: Hashable = None) -> None:
+        """
+        Removes all samples, e.g. after the chip or the calibrations changed.
+
+        Parameters
+        ----------
+        key : Hashable = None
+            If given, only the samples of this key are removed, e.g. after its calibration changed.
+        """
+        if key is None:
+            self._samples.clear()
+            self._fits.clear()
+        else:
+            self._samples.pop(key, None)
+            self._fits.pop(key, None)
+
+    def add_residual(
+        self,
+        key: Hashable,
+        chip_position: List[float],
+        residual: List[float],
+        timestamp: float = None
+    ) -> None:
+        """
+        Adds a residual sample.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifies the stage, e.g. its orientation.
+        chip_position : List[float]
+            Predicted coupling position of the device in chip coordinates, only x and y are used.
+        residual : List[float]
+            Optimized minus predicted coupling position in chip coordinates, only x and y are used.
+        timestamp : float = None
+            Time of the sample, now if not given.
+        """
+        timestamp = time() if timestamp is None else timestamp
+        self._samples.setdefault(key, []).append(
+            (chip_position[0], chip_position[1], timestamp, residual[0], residual[1]))
+        self._fits.pop(key, None)
+
+    def _features(self, positions: np.ndarray, timestamps: np.ndarray, n_features: int) -> np.ndarray:
+        columns = [np.ones(len(positions)), positions[:, 0], positions[:, 1], timestamps]
+        return np.stack(columns[:n_features], axis=1)
+
+    def _fit(self, key: Hashable, now: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        samples = np.array(self._samples[key], dtype=float)
+        positions, timestamps, residuals = samples[:, :2], samples[:, 2], samples[:, 3:]
+
+        n_features = 1
+        if len(samples) >= self.min_samples_tilt:
+            n_features = 3
+        if len(samples) >= self.min_samples_drift and np.ptp(timestamps) >= self.min_drift_time_span:
+            n_features = 4
+
+        # normalize the features for a well-conditioned least-squares problem
+        raw = self._features(positions, timestamps, 4)
+        center = raw.mean(axis=0)
+        center[0] = 0
+        scale = np.maximum(raw.std(axis=0), 1e-9)
+        scale[0] = 1
+        features = ((raw - center) / scale)[:, :n_features]
+
+        weights = np.sqrt(np.exp(-(now - timestamps) / self.memory))
+        coefficients, _, _, _ = np.linalg.lstsq(features * weights[:, None], residuals * weights[:, None], rcond=None)
+        return coefficients, center[:n_features], scale[:n_features]
+
+    def predict(self, key: Hashable, chip_position: List[float], timestamp: float = None) -> np.ndarray:
+        """
+        Predicts the x and y residual at a chip position.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifies the stage, e.g. its orientation.
+        chip_position : List[float]
+            Predicted coupling position of the device in chip coordinates, only x and y are used.
+        timestamp : float = None
+            Time of the prediction, now if not given.
+
+        Returns
+        -------
+        residual : np.ndarray
+            Predicted x and y residual, zero if there are no samples for the key.
+        """
+        if not self._samples.get(key):
+            return np.zeros(2)
+
+        timestamp = time() if timestamp is None else timestamp
+        if key not in self._fits:
+            self._fits[key] = self._fit(key, timestamp)
+        coefficients, center, scale = self._fits[key]
+
+        n_features = len(center)
+        raw = self._features(np.array([chip_position[:2]], dtype=float), np.array([timestamp]), 4)[:, :n_features]
+        correction = (((raw - center) / scale) @ coefficients)[0]
+
+        length = np.linalg.norm(correction)
+        if length > self.max_correction:
+            correction *= self.max_correction / length
+        return correction
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2022  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+
+Benchmark of the detection of completed stage movements.
+
+Usage:
+    python -m LabExT.Movement.MotionCompletionBenchmark [--waypoints N] [--move-times S [S ...]] [--stages N]
+
+Every waypoint is a movement of a DummyStage, which reports to be moving for a fixed time. The sleep loop used
+before checks the status every 50ms, the status monitor of the stage reports the completion after at most one
+poll interval.
+"""
+
+import argparse
+import time
+from concurrent import futures
+
+from LabExT.Movement.Stages.DummyStage import DummyStage
+
+
+class _TimedDummyStage(DummyStage):
+    """DummyStage which needs a fixed time for every movement."""
+
+    def __init__(self, address, move_time):
+        super().__init__(address)
+        self.move_time = move_time
+        self._stops_at = 0.0
+
+    def get_status(self) -> tuple:
+        return ('STOP',) * 3 if time.monotonic() >= self._stops_at else ('MOVING',) * 3
+
+    def move_absolute(self, x=None, y=None, z=None, wait_for_stopping=True) -> None:
+        self._stops_at = time.monotonic() + self.move_time
+
+
+def legacy_wait(stages, delay=0.05):
+    """The completion detection as done before: sleep and check all stages until they are stopped."""
+    while True:
+        time.sleep(delay)
+        if all(s.is_stopped for s in stages):
+            break
+
+
+def monitor_wait(stages):
+    futures.wait([s.when_stopped() for s in stages])
+
+
+def run_benchmark(n_waypoints, move_time, n_stages):
+    stages = [_TimedDummyStage(f"dummy:{i}", move_time) for i in range(n_stages)]
+
+    def timed_waypoints(wait):
+        t_start = time.perf_counter()
+        for _ in range(n_waypoints):
+            for stage in stages:
+                stage.move_absolute(0, 0)
+            wait(stages)
+        # dead time is the time spent waiting after the stages stopped
+        return (time.perf_counter() - t_start) / n_waypoints - move_time
+
+    t_legacy = timed_waypoints(legacy_wait)
+    t_monitor = timed_waypoints(monitor_wait)
+    for stage in stages:
+        stage.status_monitor.shutdown()
+
+    print(f"{n_waypoints} waypoints of {move_time * 1e3:.0f}ms with {n_stages} stage(s)")
+    print(f"  sleep loop, dead time per waypoint:      {t_legacy * 1e3:8.2f} ms")
+    print(f"  status monitor, dead time per waypoint:  {t_monitor * 1e3:8.2f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the detection of completed stage movements.")
+    parser.add_argument('--waypoints', type=int, default=20, help="number of waypoints to move through")
+    parser.add_argument('--move-times', type=float, nargs='+', default=[0.01, 0.03, 0.12],
+                        help="duration of a single movement in s")
+    parser.add_argument('--stages', type=int, default=2, help="number of stages moving simultaneously")
+    args = parser.parse_args()
+
+    for move_time in args.move_times:
+        run_benchmark(args.waypoints, move_time, args.stages)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2022  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+from __future__ import annotations
+
+import logging
+import time
+
+from concurrent import futures
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Type
+
+from LabExT.Movement.config import CoordinateSystem, Orientation
+from LabExT.Movement.Transformations import ChipCoordinate
+
+if TYPE_CHECKING:
+    from LabExT.Movement.Calibration import Calibration
+    from LabExT.Movement.PathPlanning import GraphSearchPlanning
+
+
+class StageTiming(NamedTuple):
+    """
+    Durations of the phases of a single stage during a move in [s].
+    """
+    lift: float = 0.0
+    wait: float = 0.0
+    travel: float = 0.0
+    lower: float = 0.0
+
+    @property
+    def busy(self) -> float:
+        """
+        Time the stage was moving.
+        """
+        return self.lift + self.travel + self.lower
+
+
+class MoveTiming(NamedTuple):
+    """
+    Timing breakdown of a move of all stages in [s].
+
+    `total` is the wall-clock time of the move including the planning. `sequential` is the time the move would have
+    taken if the stages had moved one after the other.
+    """
+    planning: float
+    total: float
+    stages: Dict[Orientation, StageTiming]
+
+    @property
+    def sequential(self) -> float:
+        return self.planning + sum(t.busy for t in self.stages.values())
+
+    @property
+    def saved(self) -> float:
+        """
+        Time saved by moving stages simultaneously.
+        """
+        return self.sequential - self.total
+
+    def summary(self) -> str:
+        stage_summaries = ", ".join(
+            f"{orientation}: lift {t.lift:.3f}, wait {t.wait:.3f}, travel {t.travel:.3f}, lower {t.lower:.3f}"
+            for orientation, t in self.stages.items())
+        return f"Move took {self.total:.3f}s (planning {self.planning:.3f}s, saved {self.saved:.3f}s; " \
+               f"{stage_summaries})"
+
+
+class MotionExecutor:
+    """
+    Executes a planned move of several stages simultaneously.
+
+    Every stage runs in its own thread: it lifts, travels along its planned path and lowers. A stage only waits for
+    the stages it depends on (see `GraphSearchPlanning.motion_dependencies`) to complete their path before it travels.
+    Thus, independent stages move at the same time and the lift and lower of one stage overlap with the travel of an
+    other stage. Lifting and lowering only change the z position of a stage and never cause a collision in the plane.
+    """
+
+    def __init__(self, z_lift: Optional[float] = None, stop_timeout: Optional[float] = None) -> None:
+        """
+        Constructor for the motion executor.
+
+        Parameters
+        ----------
+        z_lift: float = None
+            Amount in um to lift the stages before and lower after the travel, None to move without lifting.
+        stop_timeout: float = None
+            Maximum time in s a stage may take to reach a waypoint of its path, None to wait forever.
+        """
+        self.z_lift = z_lift
+        self.stop_timeout = stop_timeout
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def execute(self, path_planning: Type[GraphSearchPlanning]) -> MoveTiming:
+        """
+        Plans and executes the move of all stages with a target in the path planning.
+
+        Parameters
+        ----------
+        path_planning: GraphSearchPlanning
+            Path planning with the targets of all stages set.
+
+        Returns
+        -------
+        MoveTiming
+            Timing breakdown of the move.
+
+        Raises
+        ------
+        PathPlanningError
+            If there is no collision-free path for the stages.
+        RuntimeError
+            If a stage did not reach a waypoint within the stop timeout.
+        """
+        t_start = time.perf_counter()
+        stage_paths = path_planning.plan()
+        dependencies = path_planning.motion_dependencies(stage_paths)
+        t_planning = time.perf_counter() - t_start
+
+        if not stage_paths:
+            return MoveTiming(planning=t_planning, total=t_planning, stages={})
+
+        travelled = {calibration: futures.Future() for calibration, _ in stage_paths}
+        with futures.ThreadPoolExecutor(max_workers=len(stage_paths), thread_name_prefix="MotionExecutor") as pool:
+            stage_futures = {
+                calibration: pool.submit(
+                    self._move_stage,
+                    calibration,
+                    coordinates,
+                    [travelled[c] for c in dependencies[calibration]],
+                    travelled[calibration])
+                for calibration, coordinates in stage_paths}
+            futures.wait(stage_futures.values())
+
+        stage_timings = {}
+        for calibration, future in stage_futures.items():
+            # raises the error of the first failed stage
+            stage_timings[calibration.orientation] = future.result()
+
+        timing = MoveTiming(planning=t_planning, total=time.perf_counter() - t_start, stages=stage_timings)
+        self.logger.debug(timing.summary())
+        return timing
+
+    def _move_stage(
+        self,
+        calibration: Type[Calibration],
+        coordinates: List[Type[ChipCoordinate]],
+        dependencies: List[futures.Future],
+        travelled: futures.Future
+    ) -> StageTiming:
+        """
+        Lifts the stage, waits for the dependencies, travels along the path and lowers the stage.
+        """
+        try:
+            t_start = time.perf_counter()
+            if self.z_lift is not None:
+                calibration.lift_stage(self.z_lift)
+            t_lifted = time.perf_counter()
+
+            for dependency in dependencies:
+                dependency.result()
+            t_cleared = time.perf_counter()
+
+            with calibration.perform_in_system(CoordinateSystem.CHIP):
+                # the path is planned in the plane, the stage travels at its current height
+                z = calibration.get_position().z
+                for coordinate in coordinates:
+                    self._move_to_waypoint(calibration, ChipCoordinate(coordinate.x, coordinate.y, z))
+            t_travelled = time.perf_counter()
+            travelled.set_result(None)
+        except BaseException as err:
+            # stages waiting for this one must not move
+            if not travelled.done():
+                travelled.set_exception(err)
+            raise
+
+        if self.z_lift is not None:
+            calibration.lower_stage(self.z_lift)
+        t_lowered = time.perf_counter()
+
+        return StageTiming(
+            lift=t_lifted - t_start,
+            wait=t_cleared - t_lifted,
+            travel=t_travelled - t_cleared,
+            lower=t_lowered - t_travelled)
+
+    def _move_to_waypoint(self, calibration: Type[Calibration], coordinate: Type[ChipCoordinate]) -> None:
+        """
+        Moves the stage to the waypoint and blocks until it stopped.
+        """
+        if self.stop_timeout is None:
+            calibration.move_absolute(coordinate=coordinate, wait_for_stopping=True)
+            return
+
+        calibration.move_absolute(coordinate=coordinate, wait_for_stopping=False)
+        if not calibration.stage.wait_for_stopping(timeout=self.stop_timeout):
+            raise RuntimeError(f"Stage did not stop after {self.stop_timeout} seconds. Abort.")
+        calibration.stage.position_cache.stopped()
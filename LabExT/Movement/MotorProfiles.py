@@ -5,6 +5,8 @@ LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
 This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
 """
 
+from functools import lru_cache
+
 import numpy as np
 from scipy.interpolate import interp1d
 
@@ -80,3 +82,91 @@ def trapezoidal_velocity_profile_by_integration(start_position_m,
         t_vec = sampling_times
 
     return t_vec, x_vec, xd_vec, xdd_vec
+
+
+def trapezoidal_velocity_profile(start_position_m,
+                                 stop_position_m,
+                                 max_speed_mps,
+                                 const_acceleration_mps2,
+                                 dt_sampling=1e-5,
+                                 n_output_points=None):
+    """
+    Closed-form version of `trapezoidal_velocity_profile_by_integration`.
+
+    Evaluates the piecewise quadratic position, piecewise linear velocity and piecewise constant acceleration directly
+    at the sampling times, instead of integrating numerically. The results of the 32 most recently used parameter
+    sets are kept in an LRU cache, as the same profile is typically requested for every axis of a measurement.
+
+    Parameters
+    ----------
+    start_position_m, stop_position_m: start and stop position of the movement in [m]
+    max_speed_mps: saturation speed of the motor (>0) in [m/s]
+    const_acceleration_mps2: constant acceleration for speeding up or slowing down (>0) in [m/s^2]
+    dt_sampling: interval of the sampling times in [s], ignored if n_output_points is given.
+    n_output_points: optional, if given, all output vectors include N_output_points samples.
+    The time vectors starts at 0 and includes the maximum time as its last sample.
+
+    Returns
+    -------
+    t_vec: the time vector in units of [s].
+    x_vec: the position vector, i.e. the position x at each time in t_vec [m].
+    xd_vec: the velocity vector, i.e. the velocity dx/dt at each time in t_vec [m/s].
+    xdd_vec: the acceleration vector, i.e. the acceleration d^2x/dt^2 at each time in t_vec [m/s^2].
+    """
+    assert max_speed_mps > 0, "saturation velocity must be positive"
+    assert const_acceleration_mps2 > 0, "constant acceleration must be positive"
+
+    vectors = _cached_trapezoidal_velocity_profile(float(start_position_m),
+                                                   float(stop_position_m),
+                                                   float(max_speed_mps),
+                                                   float(const_acceleration_mps2),
+                                                   float(dt_sampling),
+                                                   None if n_output_points is None else int(n_output_points))
+    # the cached vectors must not be modified by the caller
+    return tuple(v.copy() for v in vectors)
+
+
+@lru_cache(maxsize=32)
+def _cached_trapezoidal_velocity_profile(x, y, v, a, dt, n_output_points):
+    d = y - x  # total distance [m]
+    direction = np.sign(d)
+
+    if np.abs(d) / v - v / a > 0:
+        # case: long enough drive to get into saturation velocity
+        t = np.abs(d) / v + v / a  # time for total movement, trapecoidal profile
+        t_acc = v / a  # duration of speeding up and slowing down
+        v_peak = v
+    else:
+        # case: we never run into maximum velocity
+        t = np.sqrt(4 * np.abs(d) / a)  # time for total movement, triangular profile
+        t_acc = t / 2
+        v_peak = a * t_acc
+
+    if n_output_points is not None:
+        t_vec = np.linspace(0, t, num=n_output_points, endpoint=True)
+    else:
+        t_vec = np.arange(0, t, dt)
+
+    # time remaining until the end of the movement
+    t_rem = t - t_vec
+    accelerating = t_vec < t_acc
+    decelerating = t_rem < t_acc
+
+    # distance travelled at the end of the acceleration phase
+    d_acc = 0.5 * a * t_acc ** 2
+
+    s_vec = np.where(accelerating,
+                     0.5 * a * t_vec ** 2,
+                     np.where(decelerating,
+                              np.abs(d) - 0.5 * a * t_rem ** 2,
+                              d_acc + v_peak * (t_vec - t_acc)))
+    sd_vec = np.where(accelerating, a * t_vec, np.where(decelerating, a * t_rem, v_peak))
+    sdd_vec = np.where(accelerating, a, np.where(decelerating, -a, 0.0))
+
+    x_vec = x + direction * s_vec
+    xd_vec = direction * sd_vec
+    xdd_vec = direction * sdd_vec
+
+    for vec in (t_vec, x_vec, xd_vec, xdd_vec):
+        vec.flags.writeable = False
+    return t_vec, x_vec, xd_vec, xdd_vec
@@ -9,7 +9,8 @@ import json
 import os
 import logging
 
-from time import sleep, time
+from collections import deque
+from concurrent import futures
 from os.path import dirname, join
 from bidict import bidict, ValueDuplicationError, KeyDuplicationError, OnDup, RAISE
 from typing import Dict, Tuple, Type, List
@@ -17,11 +18,16 @@ from functools import wraps
 from datetime import datetime
 from contextlib import contextmanager
 
+import numpy as np
+
 from LabExT.Movement.config import CLOCKWISE_ORDERING, State, Orientation, DevicePort, CoordinateSystem
 from LabExT.Movement.Calibration import Calibration
+from LabExT.Movement.DriftModel import DriftModel
+from LabExT.Movement.MotionExecutor import MotionExecutor, MoveTiming
 from LabExT.Movement.Stage import Stage, StageError
-from LabExT.Movement.Transformations import ChipCoordinate, AxesRotation
-from LabExT.Movement.PathPlanning import PathPlanning, CollisionAvoidancePlanning, SingleStagePlanning, StagePolygon
+from LabExT.Movement.Transformations import ChipCoordinate, AxesRotation, CoordinatePairing
+from LabExT.Movement.PathPlanning import PathPlanning, ChipPlanningContext, GraphSearchPlanning, SingleStagePlanning, \
+    CollisionAvoidancePlanning, StagePolygon
 
 from LabExT.Utils import get_configuration_file_path
 from LabExT.PluginLoader import PluginLoader
@@ -70,6 +76,15 @@ class MoverNew:
     DEFAULT_ACCELERATION_XY = 0.0
     DEFAULT_Z_LIFT = 20.0
 
+    # Path planning strategies for moves with multiple stages
+    PATH_PLANNING_GRAPH_SEARCH = "graph search"
+    PATH_PLANNING_POTENTIAL_FIELD = "potential field"
+    PATH_PLANNING_STRATEGIES = (PATH_PLANNING_GRAPH_SEARCH, PATH_PLANNING_POTENTIAL_FIELD)
+    DEFAULT_PATH_PLANNING_STRATEGY = PATH_PLANNING_GRAPH_SEARCH
+
+    # Number of move timing breakdowns to keep
+    MOVE_TIMINGS_HISTORY = 100
+
     # Settings files
     MOVER_SETTINGS_FILE = get_configuration_file_path(
         config_file_path_in_settings_dir="mover_settings.json")
@@ -113,6 +128,20 @@ class MoverNew:
         self._speed_z = self.DEFAULT_SPEED_Z
         self._acceleration_xy = self.DEFAULT_ACCELERATION_XY
         self._z_lift = self.DEFAULT_Z_LIFT
+        self._path_planning_strategy = self.DEFAULT_PATH_PLANNING_STRATEGY
+
+        # Residuals between predicted and optimized coupling positions
+        self.drift_model = DriftModel()
+        self.drift_correction_enabled = True
+        # Refine the kabsch rotations with recorded coupling positions
+        self.kabsch_refinement_enabled = False
+
+        # Planning grid and trajectory cache of the current chip, created on first use
+        self._planning_context: Type[ChipPlanningContext] = None
+
+        # Move independent stages simultaneously and keep the timing breakdowns of the last moves
+        self.simultaneous_motion_enabled = True
+        self.move_timings = deque(maxlen=self.MOVE_TIMINGS_HISTORY)
 
     def reset(self):
         """
@@ -124,6 +153,7 @@ class MoverNew:
         self._speed_z = self.DEFAULT_SPEED_Z
         self._acceleration_xy = self.DEFAULT_ACCELERATION_XY
         self._z_lift = self.DEFAULT_Z_LIFT
+        self._path_planning_strategy = self.DEFAULT_PATH_PLANNING_STRATEGY
 
     def reset_calibrations(self):
         """
@@ -135,6 +165,9 @@ class MoverNew:
         self._calibrations = bidict()
         self._port_by_orientation = bidict()
 
+        self.drift_model.reset()
+        self.invalidate_planned_trajectories()
+
     #
     #   Set chip
     #
@@ -155,8 +188,31 @@ class MoverNew:
         # Store updates calibrations to disk
         self.dump_calibrations()
 
-        # Set new chip
+        # Residuals of the previous chip are meaningless for the new one
+        self.drift_model.reset()
+
+        # Set new chip and set up its planning grid once for all moves on it
         self._chip = chip
+        self._planning_context = None
+        if chip is not None:
+            self._planning_context = ChipPlanningContext(chip)
+
+    @property
+    def planning_context(self) -> Type[ChipPlanningContext]:
+        """
+        Returns the planning grid and trajectory cache of the current chip.
+        Returns None if no chip is set.
+        """
+        if self._planning_context is None and self._chip is not None:
+            self._planning_context = ChipPlanningContext(self._chip)
+        return self._planning_context
+
+    def invalidate_planned_trajectories(self) -> None:
+        """
+        Discards all trajectories planned on the current chip. Call this if the stages have changed.
+        """
+        if self._planning_context is not None:
+            self._planning_context.clear_trajectories()
 
     def update_main_model(self) -> None:
         """
@@ -397,6 +453,7 @@ class MoverNew:
 
         # Stage successfully as stage registered
         calibration.connect_to_stage()
+        self.invalidate_planned_trajectories()
         # Setting stage settings
         stage.set_speed_xy(self._speed_xy)
         stage.set_speed_z(self._speed_z)
@@ -432,6 +489,8 @@ class MoverNew:
             OnDup(
                 key=RAISE))
 
+        self.invalidate_planned_trajectories()
+
         return calibration
 
     #
@@ -578,22 +637,54 @@ class MoverNew:
 
         self._z_lift = lift
 
+    @property
+    def path_planning_strategy(self) -> str:
+        """
+        Returns the name of the path planning strategy used for moves with multiple stages.
+        """
+        return self._path_planning_strategy
+
+    @path_planning_strategy.setter
+    def path_planning_strategy(self, strategy: str) -> None:
+        """
+        Sets the path planning strategy used for moves with multiple stages.
+
+        Parameters
+        ----------
+        strategy : str
+            One of PATH_PLANNING_STRATEGIES
+
+        Raises
+        ------
+        ValueError
+            If strategy is unknown.
+        """
+        if strategy not in self.PATH_PLANNING_STRATEGIES:
+            raise ValueError(
+                f"Unknown path planning strategy {strategy}. Choose one of {self.PATH_PLANNING_STRATEGIES}.")
+
+        self._path_planning_strategy = strategy
+
     #
     #   Movement Methods
     #
 
     def get_path_planning_strategy(self) -> Type[PathPlanning]:
         """
-        Returns a PathPlanning based on number of stages
+        Returns a PathPlanning based on number of stages and the selected path planning strategy
         """
         if len(self.connected_stages) == 1:
             return SingleStagePlanning(
                 max_lift_correction=100,
                 correction_tolerance=10)
-        else:
+        elif self._path_planning_strategy == self.PATH_PLANNING_POTENTIAL_FIELD:
             return CollisionAvoidancePlanning(
                 chip=self._chip,
-                abort_local_minimum=3)
+                planning_context=self.planning_context)
+        else:
+            return GraphSearchPlanning(
+                chip=self._chip,
+                planning_context=self.planning_context)
 
     @assert_connected_stages
     def move_absolute(
@@ -607,17 +698,26 @@ class MoverNew:
         """
         Moves the stages absolutely in the chip coordinate system.
 
-        A collision-free trajectory is calculated.
+        A collision-free trajectory is calculated. The stages keep their current height, the z component of the
+        targets is set to it.
+        If several stages move and simultaneous motion is enabled, stages whose paths cannot collide move at the same
+        time and the lifting and lowering of each stage overlaps with the movement of the others, see MotionExecutor.
+        Each stage then always completes a waypoint before it moves on, independent of `wait_for_stopping`.
+        The timing breakdown of such a move is stored in `move_timings`.
 
         Parameters
         ----------
         movement_commands : Dict[Orientation, Type[ChipCoordinate]]
             A mapping between orientation and target chip coordinate.
             For example, if the mapping `Orientation.LEFT: ChipCoordinate(1,2,3)` exists, the left stage is moved to the chip co-ordinate x=1, y=2, z=3
-        wait_for_stopping: bool = True
-            Whether each stage should have completed its movement before the next one moves.
+        chip : Chip
+            Chip on which the stages move.
         with_lifted_stages: bool = False
             Indicates whether the stages should be lifted before movement.
+        wait_for_stopping: bool = True
+            Whether each stage should have completed its movement before the next one moves.
+        wait_timeout: float = 2.0
+            If not waiting for each stage, maximum time in s the stages may take to reach a waypoint.
 
         Raises
         ------
@@ -626,6 +726,8 @@ class MoverNew:
         LocalMinimumError
             If the path-finding algorithm makes no progress
              i.e. does not converge to the target coordinate.
+        RuntimeError
+            If the stages did not stop within the wait timeout.
         """
         if not movement_commands:
             return
@@ -633,15 +735,24 @@ class MoverNew:
         with self.set_stages_coordinate_system(CoordinateSystem.CHIP):
             path_planning = self.get_path_planning_strategy()
 
+            if self.simultaneous_motion_enabled and isinstance(path_planning, GraphSearchPlanning):
+                for orientation, target in movement_commands.items():
+                    calibration = self._resolve_calibration(orientation)
+                    target.z = calibration.get_position().z
+                    path_planning.set_stage_target(calibration, target)
+
+                executor = MotionExecutor(
+                    z_lift=self.z_lift if with_lifted_stages else None,
+                    stop_timeout=None if wait_for_stopping else wait_timeout)
+                self.move_timings.append(executor.execute(path_planning))
+                return
+
             # Resolves movement commands
             # Checks if for each orientation a calibration exits
             # Set ups Path Planning
             resolved_calibrations = {}
             for orientation, target in movement_commands.items():
-                calibration = self._get_calibration(orientation=orientation)
-                if calibration is None:
-                    raise MoverError(
-                        f"No {orientation} stage configured, but target coordinate for {orientation} passed.")
+                calibration = self._resolve_calibration(orientation)
 
                 if with_lifted_stages:
                     calibration.lift_stage(self.z_lift)
@@ -660,17 +771,7 @@ class MoverNew:
 
                 # Wait for all stages to stop if stages move simultaneously.
                 if not wait_for_stopping:
-                    busy_spinning_start = time()
-                    while True:
-                        sleep(0.05)
-
-                        if time() - busy_spinning_start >= wait_timeout:
-                            raise RuntimeError(
-                                f"Stages did not stop after {wait_timeout} seconds. Abort.")
-
-                        if all(c.stage.is_stopped
-                               for c in calibration_waypoints.keys()):
-                            break
+                    self.wait_for_stages_to_stop(calibration_waypoints.keys(), timeout=wait_timeout)
 
             # Movement complete and lower stages (if requested)
             # Lift stages if requested
@@ -678,6 +779,34 @@ class MoverNew:
                 for c in resolved_calibrations.values():
                     c.lower_stage(self.z_lift)
 
+    @property
+    def last_move_timing(self) -> MoveTiming:
+        """
+        Returns the timing breakdown of the last simultaneous move or None.
+        """
+        return self.move_timings[-1] if self.move_timings else None
+
+    @staticmethod
+    def wait_for_stages_to_stop(calibrations, timeout: float = None) -> None:
+        """
+        Blocks until the stages of all given calibrations report to be stopped.
+
+        The stages are watched by their status monitors in parallel, so this returns as soon as the last stage stops.
+
+        Raises
+        ------
+        RuntimeError
+            If the stages did not stop within the timeout.
+        """
+        calibrations = list(calibrations)
+        stopped_futures = [c.stage.when_stopped() for c in calibrations]
+        _, not_done = futures.wait(stopped_futures, timeout=timeout)
+        if not_done:
+            raise RuntimeError(f"Stages did not stop after {timeout} seconds. Abort.")
+        for calibration, future in zip(calibrations, stopped_futures):
+            future.result()
+            calibration.stage.position_cache.stopped()
+
     @assert_connected_stages
     def move_relative(
         self,
@@ -738,6 +867,7 @@ class MoverNew:
         Moves stages to device.
 
         Moves stages absolute to coordinate with path planning and lifted stages.
+        If drift correction is enabled, the coordinates are corrected by the residuals predicted by the drift model.
 
         Parameters
         ----------
@@ -747,23 +877,55 @@ class MoverNew:
             Device to which the stages should move.
         """
         movement_commands = {}
-
-        input_orientation = self._port_by_orientation.inverse.get(
-            DevicePort.INPUT)
-        output_orientation = self._port_by_orientation.inverse.get(
-            DevicePort.OUTPUT)
-
-        if input_orientation:
-            movement_commands[input_orientation] = device.input_coordinate
-
-        if output_orientation:
-            movement_commands[output_orientation] = device.output_coordinate
+        for orientation, target in self._device_targets(device).items():
+            if self.drift_correction_enabled:
+                correction = self.drift_model.predict(orientation, target.to_list())
+                target = target + ChipCoordinate(correction[0], correction[1], 0)
+            movement_commands[orientation] = target
 
         self.move_absolute(
             movement_commands,
             chip=chip,
             with_lifted_stages=True)
 
+    @assert_connected_stages
+    def record_coupling_position(self, device: Type[Device]) -> None:
+        """
+        Adds the current stage positions as optimized coupling position of the device to the drift model.
+        If the kabsch refinement is enabled, the positions first refine the kabsch rotations of the stages and the
+        drift model only records the residual left by the refined rotation, so the offset is not corrected twice.
+        If a rotation was refined, the residuals recorded for its stage before are discarded, since they are
+        relative to the previous rotation.
+
+        Call this after the coupling to the device was optimized, e.g. after a Search for Peak.
+
+        Parameters
+        ----------
+        device: Device
+            Device to which the stages are currently coupled.
+        """
+        for orientation, target in self._device_targets(device).items():
+            calibration = self._get_calibration(orientation=orientation)
+
+            if self.kabsch_refinement_enabled:
+                with calibration.perform_in_system(CoordinateSystem.STAGE):
+                    stage_position = calibration.get_position()
+                refined = calibration.refine_kabsch_rotation(CoordinatePairing(
+                    calibration=calibration,
+                    stage_coordinate=stage_position,
+                    device=device,
+                    chip_coordinate=target))
+                if refined:
+                    self.drift_model.reset(orientation)
+
+            with calibration.perform_in_system(CoordinateSystem.CHIP):
+                position = calibration.get_position()
+
+            residual = position - target
+            self.drift_model.add_residual(orientation, target.to_list(), [residual.x, residual.y])
+
+        self.logger.debug(f"Recorded coupling position of device {device.id} for drift correction.")
+
     #
     #   Load and store mover settings
     #
@@ -804,7 +966,8 @@ class MoverNew:
                 "speed_xy": self._speed_xy,
                 "speed_z": self._speed_z,
                 "acceleration_xy": self._acceleration_xy,
-                "z_lift": self._z_lift
+                "z_lift": self._z_lift,
+                "path_planning_strategy": self._path_planning_strategy
             }, fp)
 
     def load_settings(self) -> None:
@@ -830,10 +993,20 @@ class MoverNew:
         self._acceleration_xy = mover_settings.get(
             "acceleration_xy", self.DEFAULT_ACCELERATION_XY)
         self._z_lift = mover_settings.get("z_lift", self.DEFAULT_SPEED_Z)
+        strategy = mover_settings.get(
+            "path_planning_strategy", self.DEFAULT_PATH_PLANNING_STRATEGY)
+        if strategy in self.PATH_PLANNING_STRATEGIES:
+            self._path_planning_strategy = strategy
+        else:
+            self.logger.warning(
+                f"Unknown path planning strategy {strategy} in {self.MOVER_SETTINGS_FILE}. "
+                f"Using {self.DEFAULT_PATH_PLANNING_STRATEGY}.")
+            self._path_planning_strategy = self.DEFAULT_PATH_PLANNING_STRATEGY
 
         self.logger.debug(
             f"Restored mover settings: xy-speed = {self._speed_xy}; z-speed = {self._speed_z}; "
-            f"xy-acceleration = {self._acceleration_xy}; z-lift = {self.z_lift}")
+            f"xy-acceleration = {self._acceleration_xy}; z-lift = {self.z_lift}; "
+            f"path planning = {self._path_planning_strategy}")
 
     def load_stored_axes_rotation_for_stage(
         self,
@@ -904,6 +1077,56 @@ class MoverNew:
     #   Helpers
     #
 
+    def device_stage_targets(self, devices: List[Type[Device]]) -> Dict[Orientation, np.ndarray]:
+        """
+        Returns the stage coordinates of the ports of many devices, by orientation of the stage connected to the port.
+
+        All coordinates of a stage are transformed at once.
+
+        Parameters
+        ----------
+        devices: List[Device]
+            Devices to compute the targets for.
+
+        Returns
+        -------
+        Dict[Orientation, np.ndarray]
+            For each calibrated stage, an array of shape (N, 3) with the stage coordinate of the port of each device.
+        """
+        targets = {}
+        for port, attribute in ((DevicePort.INPUT, 'in_position'), (DevicePort.OUTPUT, 'out_position')):
+            orientation = self._port_by_orientation.inverse.get(port)
+            calibration = self._get_calibration(orientation=orientation)
+            if orientation is None or calibration is None:
+                continue
+
+            chip_coordinates = np.zeros((len(devices), 3))
+            for idx, device in enumerate(devices):
+                position = getattr(device, attribute)
+                chip_coordinates[idx, :len(position)] = position
+            targets[orientation] = calibration.transform_chip_to_stage_array(chip_coordinates)
+
+        return targets
+
+    def _device_targets(self, device: Type[Device]) -> Dict[Orientation, Type[ChipCoordinate]]:
+        """
+        Returns the chip coordinates of the device ports, by orientation of the stage connected to the port.
+        """
+        targets = {}
+
+        input_orientation = self._port_by_orientation.inverse.get(
+            DevicePort.INPUT)
+        output_orientation = self._port_by_orientation.inverse.get(
+            DevicePort.OUTPUT)
+
+        if input_orientation:
+            targets[input_orientation] = device.input_coordinate
+
+        if output_orientation:
+            targets[output_orientation] = device.output_coordinate
+
+        return targets
+
     def _get_calibration(
             self,
             port=None,
@@ -916,3 +1139,18 @@ class MoverNew:
             port)
         port = port or self._port_by_orientation.get(orientation)
         return self.calibrations.get((orientation, port), default)
+
+    def _resolve_calibration(self, orientation: Orientation) -> Type[Calibration]:
+        """
+        Returns the calibration of the stage with the given orientation.
+
+        Raises
+        ------
+        MoverError
+            If no stage exists for this orientation.
+        """
+        calibration = self._get_calibration(orientation=orientation)
+        if calibration is None:
+            raise MoverError(
+                f"No {orientation} stage configured, but target coordinate for {orientation} passed.")
+        return calibration
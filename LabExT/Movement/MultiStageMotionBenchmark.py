@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2022  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+
+Benchmark of device-to-device transitions with two stages.
+
+Usage:
+    python -m LabExT.Movement.MultiStageMotionBenchmark [--devices N] [--pitch UM] [--speed-xy UMPS] [--speed-z UMPS]
+
+Input and output stage are SimulatedStages running in real time, which move through a column of devices. The
+sequential transition used before lifts both stages, moves them one after the other and lowers both stages. The
+MotionExecutor moves both stages at the same time, if their paths cannot collide.
+"""
+
+import argparse
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from LabExT.Movement.MotionExecutor import MotionExecutor
+from LabExT.Movement.PathPlanning import ChipPlanningContext, GraphSearchPlanning, SingleModeFiber
+from LabExT.Movement.Stages.SimulatedStage import SimulatedStage
+from LabExT.Movement.Transformations import ChipCoordinate
+from LabExT.Movement.config import Orientation
+
+
+class _SimulatedCalibration:
+    """Minimal stand-in for a calibration, whose chip coordinates are the coordinates of a simulated stage."""
+
+    def __init__(self, orientation, speed_xy, speed_z):
+        self.orientation = orientation
+        self.stage_polygon = SingleModeFiber(orientation)
+        self.stage = SimulatedStage(f"sim:{orientation}", command_latency=0.002)
+        self.stage.connect()
+        self.stage.set_speed_xy(speed_xy)
+        self.stage.set_speed_z(speed_z)
+
+    @contextmanager
+    def perform_in_system(self, system):
+        yield
+
+    def get_position(self):
+        return ChipCoordinate(*self.stage.get_position())
+
+    def move_absolute(self, coordinate, wait_for_stopping=True):
+        self.stage.move_absolute(coordinate.x, coordinate.y, coordinate.z, wait_for_stopping=wait_for_stopping)
+
+    def lift_stage(self, z_lift):
+        self.stage.move_relative(z=z_lift)
+
+    def lower_stage(self, z_lift):
+        self.stage.move_relative(z=-z_lift)
+
+
+def sequential_move(path_planning, calibrations, z_lift):
+    """The transition as done before: lift all stages, move the stages one after the other, lower all stages."""
+    for calibration in calibrations:
+        calibration.lift_stage(z_lift)
+    for calibration, coordinates in path_planning.plan():
+        z = calibration.get_position().z
+        for coordinate in coordinates:
+            calibration.move_absolute(ChipCoordinate(coordinate.x, coordinate.y, z))
+    for calibration in calibrations:
+        calibration.lower_stage(z_lift)
+
+
+def run_benchmark(n_devices, pitch, speed_xy, speed_z, z_lift):
+    devices = [
+        SimpleNamespace(in_position=[-1000, idx * pitch], out_position=[1000, idx * pitch])
+        for idx in range(n_devices)]
+    chip = SimpleNamespace(devices=dict(enumerate(devices)))
+    planning_context = ChipPlanningContext(chip)
+
+    left = _SimulatedCalibration(Orientation.LEFT, speed_xy, speed_z)
+    right = _SimulatedCalibration(Orientation.RIGHT, speed_xy, speed_z)
+
+    def timed_transitions(move):
+        for calibration, position in ((left, devices[0].in_position), (right, devices[0].out_position)):
+            calibration.move_absolute(ChipCoordinate(position[0], position[1], 0))
+        durations = []
+        for device in devices[1:]:
+            path_planning = GraphSearchPlanning(chip, planning_context=planning_context)
+            path_planning.set_stage_target(left, ChipCoordinate(device.in_position[0], device.in_position[1], 0))
+            path_planning.set_stage_target(right, ChipCoordinate(device.out_position[0], device.out_position[1], 0))
+            t_start = time.perf_counter()
+            move(path_planning)
+            durations.append(time.perf_counter() - t_start)
+        return sum(durations) / len(durations)
+
+    t_sequential = timed_transitions(lambda p: sequential_move(p, [left, right], z_lift))
+    timings = []
+    t_simultaneous = timed_transitions(lambda p: timings.append(MotionExecutor(z_lift).execute(p)))
+
+    for calibration in (left, right):
+        calibration.stage.disconnect()
+
+    print(f"{n_devices - 1} transitions with {pitch:.0f}um pitch, {z_lift:.0f}um lift, "
+          f"{speed_xy:.0f}um/s xy and {speed_z:.0f}um/s z speed")
+    print(f"  sequential, time per transition:    {t_sequential * 1e3:8.1f} ms")
+    print(f"  simultaneous, time per transition:  {t_simultaneous * 1e3:8.1f} ms")
+    print(f"  last simultaneous transition: {timings[-1].summary()}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark device-to-device transitions with two stages.")
+    parser.add_argument('--devices', type=int, default=6, help="number of devices to move through")
+    parser.add_argument('--pitch', type=float, default=250.0, help="distance between the devices in um")
+    parser.add_argument('--speed-xy', type=float, default=2000.0, help="xy speed of the stages in um/s")
+    parser.add_argument('--speed-z', type=float, default=200.0, help="z speed of the stages in um/s")
+    parser.add_argument('--z-lift', type=float, default=20.0, help="lift of the stages in um")
+    args = parser.parse_args()
+
+    run_benchmark(args.devices, args.pitch, args.speed_xy, args.speed_z, args.z_lift)
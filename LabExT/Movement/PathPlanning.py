@@ -6,12 +6,17 @@ This program is free software and comes with ABSOLUTELY NO WARRANTY; for details
 """
 from __future__ import annotations
 
+import heapq
 import logging
 import numpy as np
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import permutations
 from typing import TYPE_CHECKING, List, Any, Dict, NamedTuple, Tuple, Type, Generator
 
+from scipy.signal import fftconvolve
 from scipy.spatial.distance import pdist
 
 from LabExT.Movement.Transformations import ChipCoordinate
@@ -260,6 +265,191 @@ class SingleModeFiber(StagePolygon):
         return x_min, x_max, y_min, y_max
 
 
+def chip_grid_properties(
+    chip: Type["Chip"],
+    padding: float = 0,
+    maximum_gird_size: float = 100
+) -> tuple:
+    """
+    Dynamically calculates the grid outline based on the points of the chip.
+
+    Dynamically calculates the grid size by calculating
+    the smallest distance between two points on the chip
+
+    Parameters
+    ----------
+    chip: Chip
+        Instance of a chip
+    padding: float = 0
+        Grid outline padding.
+    maximum_gird_size: float = 100
+        Grid size that must not be exceeded.
+    """
+    all_points = np.concatenate([
+        [d.in_position for d in chip.devices.values()],
+        [d.out_position for d in chip.devices.values()]
+    ], axis=0)
+
+    xs = all_points[:, 0]
+    ys = all_points[:, 1]
+
+    outline = (
+        (xs.min() - padding, xs.max() + padding),  # X-min, X-max
+        (ys.min() - padding, ys.max() + padding)  # Y-min, Y-max
+    )
+    grid_size = min(np.floor(np.min(pdist(all_points))), maximum_gird_size)
+
+    return grid_size, outline
+
+
+class ChipPlanningContext:
+    """
+    Planning grid and caches shared by all path plannings on one chip.
+
+    Build it once per chip, e.g. when the chip is set in the mover. It holds the planning grid, the attractive potential
+    fields per target, the footprints of the stage polygons and the trajectories planned so far. Trajectories are
+    stored per pair of start and target cells of the planning grid and are reused by later moves between the same cells.
+    Call `clear_trajectories` if the planned trajectories are no longer valid, e.g. because the stages changed.
+    """
+
+    def __init__(
+        self,
+        chip: Type["Chip"],
+        padding: float = 100,
+        max_trajectories: int = 1024,
+        max_attractive_fields: int = 16
+    ) -> None:
+        """
+        Constructor for the planning context.
+
+        Parameters
+        ----------
+        chip: Chip
+            Instance of the a chip
+        padding: float = 100
+            Padding of the grid around the device positions of the chip.
+        max_trajectories: int = 1024
+            Number of trajectories to keep, the least recently used are dropped first.
+        max_attractive_fields: int = 16
+            Number of attractive potential fields to keep, the least recently used are dropped first.
+        """
+        self.chip: Type[Chip] = chip
+        self.grid_size, self.grid_outline = chip_grid_properties(chip, padding=padding)
+
+        self.x_coords = np.arange(
+            self.grid_outline[0][0],
+            self.grid_outline[0][1] + self.grid_size,
+            self.grid_size)
+        self.y_coords = np.arange(
+            self.grid_outline[1][0],
+            self.grid_outline[1][1] + self.grid_size,
+            self.grid_size)
+        self.cx, self.cy = np.meshgrid(self.x_coords, self.y_coords)
+
+        self.max_trajectories = max_trajectories
+        self.max_attractive_fields = max_attractive_fields
+
+        self._attractive_fields = OrderedDict()
+        self._footprints = {}
+        self._trajectories = OrderedDict()
+
+        self.trajectory_hits = 0
+        self.trajectory_misses = 0
+
+    def nearest_cell(self, coordinate: Type[ChipCoordinate]) -> Tuple[int, int]:
+        """
+        Returns the (row, column) index of the grid cell closest to the coordinate.
+        """
+        return (
+            int(np.argmin(np.abs(self.y_coords - coordinate.y))),
+            int(np.argmin(np.abs(self.x_coords - coordinate.x))))
+
+    def attractive_field(
+        self,
+        target: Type[ChipCoordinate],
+        attractive_gain: float = 1.0
+    ) -> np.ndarray:
+        """
+        Returns the attractive potential of the target on the grid.
+
+        The returned array is cached and must not be modified.
+        """
+        key = (float(target.x), float(target.y), float(attractive_gain))
+        field = self._attractive_fields.get(key)
+        if field is None:
+            field = attractive_gain * np.hypot(self.cx - target.x, self.cy - target.y)
+            field.setflags(write=False)
+            self._attractive_fields[key] = field
+            if len(self._attractive_fields) > self.max_attractive_fields:
+                self._attractive_fields.popitem(last=False)
+        else:
+            self._attractive_fields.move_to_end(key)
+        return field
+
+    def footprint(self, stage_polygon: Type[StagePolygon]) -> np.ndarray:
+        """
+        Returns the cells covered by the stage polygon relative to its position.
+
+        The footprint has twice the extent of the grid with the stage in its center, such that it covers the whole grid
+        wherever the stage is placed on it. The returned array is cached and must not be modified.
+        """
+        key = self.polygon_key(stage_polygon)
+        footprint = self._footprints.get(key)
+        if footprint is None:
+            offsets_x = np.arange(-(len(self.x_coords) - 1), len(self.x_coords)) * self.grid_size
+            offsets_y = np.arange(-(len(self.y_coords) - 1), len(self.y_coords)) * self.grid_size
+            mesh_x, mesh_y = np.meshgrid(offsets_x, offsets_y)
+            footprint = stage_polygon.stage_in_meshgrid(
+                ChipCoordinate(0, 0, 0), mesh_x, mesh_y, self.grid_size)
+            footprint.setflags(write=False)
+            self._footprints[key] = footprint
+        return footprint
+
+    @staticmethod
+    def polygon_key(stage_polygon: Type[StagePolygon]) -> tuple:
+        """
+        Returns a hashable key, which is equal for stage polygons of the same class, orientation and parameters.
+        """
+        return (
+            stage_polygon.__class__.__name__,
+            stage_polygon.orientation,
+            tuple(sorted((k, str(v)) for k, v in stage_polygon.parameters.items())))
+
+    def cached_trajectory(self, key: tuple) -> Any:
+        """
+        Returns the trajectory stored for the key or None.
+        """
+        trajectory = self._trajectories.get(key)
+        if trajectory is None:
+            self.trajectory_misses += 1
+        else:
+            self.trajectory_hits += 1
+            self._trajectories.move_to_end(key)
+        return trajectory
+
+    def store_trajectory(self, key: tuple, trajectory: Any) -> None:
+        """
+        Stores a collision-free trajectory for the key.
+        """
+        self._trajectories[key] = trajectory
+        self._trajectories.move_to_end(key)
+        if len(self._trajectories) > self.max_trajectories:
+            self._trajectories.popitem(last=False)
+
+    def clear_trajectories(self) -> None:
+        """
+        Removes all stored trajectories.
+        """
+        self._trajectories.clear()
+
+    @property
+    def n_trajectories(self) -> int:
+        """
+        Number of stored trajectories.
+        """
+        return len(self._trajectories)
+
+
 class PathPlanning(ABC):
     """
     Abstract base class for path planning.
@@ -300,6 +490,42 @@ class PathPlanning(ABC):
         pass
 
 
+@lru_cache(maxsize=16)
+def repulsive_kernel(
+    grid_size: float,
+    influence_radius: float,
+    repulsive_gain: float
+) -> np.ndarray:
+    """
+    Returns the repulsive potential of a single obstacle cell on the surrounding grid cells.
+
+    The kernel is square with the obstacle cell in its center. A cell at distance d from the obstacle gets the
+    potential repulsive_gain / d**2 if d is smaller than the influence radius, otherwise 0.
+    The center itself is set to 0, the obstacle cells are handled separately.
+
+    The returned array is cached and must not be modified.
+
+    Parameters
+    ----------
+    grid_size: float
+        Distance between two grid cells
+    influence_radius: float
+        Distance from the obstacle beyond which the repulsive potential vanishes
+    repulsive_gain: float
+        Repulsive gain in the potential field
+    """
+    radius_cells = int(np.ceil(influence_radius / grid_size))
+    offsets = np.arange(-radius_cells, radius_cells + 1) * grid_size
+    distances = np.hypot(*np.meshgrid(offsets, offsets))
+
+    kernel = np.zeros_like(distances)
+    in_range = np.logical_and(distances > 0, distances < influence_radius)
+    kernel[in_range] = repulsive_gain / distances[in_range] ** 2
+
+    kernel.setflags(write=False)
+    return kernel
+
+
 class PotentialField:
     """
     Waypoint calculation with potential field algorithm.
@@ -329,7 +555,8 @@ class PotentialField:
         grid_size: float = 50.0,
         grid_outline: tuple = ((-5000, 5000), (-5000, 5000)),
         repulsive_gain: float = 10000.0,
-        attractive_gain: float = 1.0
+        attractive_gain: float = 1.0,
+        planning_context: ChipPlanningContext = None
     ) -> None:
         """
         Constructor for new Potential Field
@@ -348,11 +575,16 @@ class PotentialField:
             Repulsive gain in the potential field
         attractive_gain: tuple
             Attractive gain in the potential field
+        planning_context: ChipPlanningContext = None
+            If given, the grid and attractive field of the context are used instead of grid_size and grid_outline.
         """
         # Stage calibration for this potential field
         self.calibration = calibration
 
         # Fields settings
+        if planning_context is not None:
+            grid_size = planning_context.grid_size
+            grid_outline = planning_context.grid_outline
         self.grid_size = grid_size
         self.grid_outline = grid_outline
         self.repulsive_gain = repulsive_gain
@@ -363,17 +595,22 @@ class PotentialField:
             self.start_coordinate = self.calibration.get_position()
 
         # Set up field tiles
-        self.x_coords = np.arange(
-            self.grid_outline[0][0],
-            self.grid_outline[0][1] +
-            self.grid_size,
-            self.grid_size)
-        self.y_coords = np.arange(
-            self.grid_outline[1][0],
-            self.grid_outline[1][1] +
-            self.grid_size,
-            self.grid_size)
-        self.cx, self.cy = np.meshgrid(self.x_coords, self.y_coords)
+        if planning_context is not None:
+            self.x_coords = planning_context.x_coords
+            self.y_coords = planning_context.y_coords
+            self.cx, self.cy = planning_context.cx, planning_context.cy
+        else:
+            self.x_coords = np.arange(
+                self.grid_outline[0][0],
+                self.grid_outline[0][1] +
+                self.grid_size,
+                self.grid_size)
+            self.y_coords = np.arange(
+                self.grid_outline[1][0],
+                self.grid_outline[1][1] +
+                self.grid_size,
+                self.grid_size)
+            self.cx, self.cy = np.meshgrid(self.x_coords, self.y_coords)
 
         # Get current Idx of field tile
         self.current_idx = np.array(
@@ -399,11 +636,18 @@ class PotentialField:
                 "The Path Planning algorithm assumes that start and target are on the same z level.")
 
         # Calculate potential field
-        self.attractive_potential_field = self.attractive_gain * \
-            np.hypot(self.cx - self.target_coordinate.x, self.cy - self.target_coordinate.y)
+        if planning_context is not None:
+            self.attractive_potential_field = planning_context.attractive_field(
+                self.target_coordinate, self.attractive_gain)
+        else:
+            self.attractive_potential_field = self.attractive_gain * \
+                np.hypot(self.cx - self.target_coordinate.x, self.cy - self.target_coordinate.y)
         self.potential_field = np.zeros_like(
             self.cx) + self.attractive_potential_field
 
+        # Per obstacle calibration: last stage mask and its repulsive field, updated incrementally as the stages move
+        self._obstacles = {}
+
     def next_waypoint(self) -> Waypoint:
         """
         Generates iterativly the next waypoint in the given potential field.
@@ -441,6 +685,11 @@ class PotentialField:
         """
         Creates an obstacle in the potential field for each passed calibration.
 
+        Every cell covered by a stage repels with repulsive_gain / distance**2 all cells closer than
+        safety_multiplier times the fiber radius, the covered cells themselves get an infinite potential.
+        The repulsive field of a stage is obtained by convolving its mask with a precomputed kernel. If a stage
+        has moved since the last call, only the cells it entered or left are convolved.
+
         Parameters
         ----------
         calibrations : List[Calibration]
@@ -448,8 +697,19 @@ class PotentialField:
         safety_multiplier: int
             Multiplier of the fiber radius to calculate the field mask
         """
-        self.potential_field = np.zeros_like(
-            self.cx) + self.attractive_potential_field
+        kernel = repulsive_kernel(
+            float(self.grid_size),
+            float(safety_multiplier * self.FIBER_RADIUS),
+            float(self.repulsive_gain))
+
+        # the same stage can not be an obstacle twice
+        calibrations = list(dict.fromkeys(calibrations))
+        for calibration in list(self._obstacles):
+            if calibration not in calibrations:
+                del self._obstacles[calibration]
+
+        self.potential_field = self.attractive_potential_field.copy()
+        obstacle_mask = np.zeros(self.cx.shape, dtype=bool)
 
         for calibration in calibrations:
             with calibration.perform_in_system(CoordinateSystem.CHIP):
@@ -459,12 +719,64 @@ class PotentialField:
                     self.cy,
                     self.grid_size)
 
-            for ox, oy in zip(self.cx[stage_mask], self.cy[stage_mask]):
-                o_dist = np.hypot(self.cx - ox, self.cy - oy)
-                field_mask = o_dist < safety_multiplier * self.FIBER_RADIUS
-                rep_field = self.repulsive_gain * (1.0 / o_dist) ** 2
+            last_mask, last_kernel, rep_field = self._obstacles.get(
+                calibration, (None, None, None))
+            if last_mask is None or last_kernel is not kernel:
+                rep_field = np.zeros_like(self.potential_field)
+                last_mask = None
+            self._update_obstacle_cells(rep_field, stage_mask, last_mask, kernel)
+            self._obstacles[calibration] = (stage_mask, kernel, rep_field)
+
+            self.potential_field += rep_field
+            obstacle_mask |= stage_mask
+
+        self.potential_field[obstacle_mask] = np.inf
+
+    @staticmethod
+    def _update_obstacle_cells(
+        rep_field: np.ndarray,
+        stage_mask: np.ndarray,
+        last_mask: np.ndarray,
+        kernel: np.ndarray
+    ) -> None:
+        """
+        Updates the repulsive field of a stage in place after it moved from last_mask to stage_mask.
+
+        Only the bounding box of all cells the stage entered or left, enlarged by the kernel radius, is convolved.
+
+        Parameters
+        ----------
+        rep_field: np.ndarray
+            Repulsive field of the stage at last_mask, zero if last_mask is None
+        stage_mask: np.ndarray
+            Cells currently covered by the stage
+        last_mask: np.ndarray
+            Cells covered by the stage when rep_field was computed, or None
+        kernel: np.ndarray
+            Repulsive kernel of a single obstacle cell, see repulsive_kernel
+        """
+        changed = stage_mask if last_mask is None else stage_mask ^ last_mask
+        rows = np.flatnonzero(changed.any(axis=1))
+        if len(rows) == 0:
+            return
+        cols = np.flatnonzero(changed.any(axis=0))
+
+        radius = kernel.shape[0] // 2
+        row_slice = slice(max(rows[0] - radius, 0), min(rows[-1] + radius + 1, rep_field.shape[0]))
+        col_slice = slice(max(cols[0] - radius, 0), min(cols[-1] + radius + 1, rep_field.shape[1]))
+
+        # +1 for every cell the stage entered, -1 for every cell it left
+        cell_weights = stage_mask[row_slice, col_slice].astype(float)
+        if last_mask is not None:
+            cell_weights -= last_mask[row_slice, col_slice]
 
-                self.potential_field[field_mask] += rep_field[field_mask]
+        region = rep_field[row_slice, col_slice]
+        region += fftconvolve(cell_weights, kernel, mode='same')
+
+        # The exact field is either 0 or at least the smallest kernel value. Clearing values below half of it
+        # removes the round-off of the FFT and of left cells, such that cells without obstacles nearby stay at 0.
+        smallest_potential = kernel[kernel > 0].min() if np.any(kernel > 0) else np.inf
+        region[np.abs(region) < smallest_potential / 2] = 0.0
 
     def _find_lowest_potential(self) -> np.ndarray:
         """
@@ -498,7 +810,8 @@ class CollisionAvoidancePlanning(PathPlanning):
     def __init__(
         self,
         chip,
-        abort_local_minimum: int = 3
+        abort_local_minimum: int = 3,
+        planning_context: ChipPlanningContext = None
     ) -> None:
         """
         Constructor for the Path Planning.
@@ -508,10 +821,17 @@ class CollisionAvoidancePlanning(PathPlanning):
             Instance of the a chip
         abort_local_minimum: int = 3
             Number of identical movements before an error is raised.
+        planning_context: ChipPlanningContext = None
+            Grid and attractive fields of the chip to reuse. If None, they are calculated for this planning only.
         """
         self.chip: Type[Chip] = chip
-        self.grid_size, self.grid_outline = self._get_grid_properties(
-            padding=100)
+        self.planning_context = planning_context
+        if self.planning_context is not None:
+            self.grid_size = self.planning_context.grid_size
+            self.grid_outline = self.planning_context.grid_outline
+        else:
+            self.grid_size, self.grid_outline = self._get_grid_properties(
+                padding=100)
 
         self.abort_local_minimum = abort_local_minimum
 
@@ -537,7 +857,8 @@ class CollisionAvoidancePlanning(PathPlanning):
             calibration,
             target,
             self.grid_size,
-            self.grid_outline)
+            self.grid_outline,
+            planning_context=self.planning_context)
 
     def trajectory(self) -> Generator[WaypointCommand, None, None]:
         """
@@ -577,33 +898,11 @@ class CollisionAvoidancePlanning(PathPlanning):
         maximum_gird_size: float = 100
     ) -> tuple:
         """
-        Dynamically calculates the grid outline based on the points of the chip.
+        Dynamically calculates the grid outline and grid size based on the points of the chip.
 
-        Dynamically calculates the grid size by calculating
-        the smallest distance between two points on the chip
-
-        Parameters
-        ----------
-        padding: float = 0
-            Grid outline padding.
-        maximum_gird_size: float = 100
-            Grid size that must not be exceeded.
+        See chip_grid_properties.
         """
-        all_points = np.concatenate([
-            [d.in_position for d in self.chip.devices.values()],
-            [d.out_position for d in self.chip.devices.values()]
-        ], axis=0)
-
-        xs = all_points[:, 0]
-        ys = all_points[:, 1]
-
-        outline = (
-            (xs.min() - padding, xs.max() + padding),  # X-min, X-max
-            (ys.min() - padding, ys.max() + padding)  # Y-min, Y-max
-        )
-        grid_size = min(np.floor(np.min(pdist(all_points))), maximum_gird_size)
-
-        return grid_size, outline
+        return chip_grid_properties(self.chip, padding, maximum_gird_size)
 
     def _last_waypoints_equal(self, next_command: WaypointCommand) -> bool:
         """
@@ -625,6 +924,345 @@ class CollisionAvoidancePlanning(PathPlanning):
         return True
 
 
+class GraphSearchPlanning(PathPlanning):
+    """
+    Collision avoidance path planning using A* graph search.
+
+    The stages move one after the other. For each stage, A* searches the shortest path between 8-connected grid cells
+    in configuration space: a cell is free if the stage polygon placed there does not overlap any other stage. Stages
+    which already moved are at their target, all others at their current position. If the targets cannot be reached
+    in the given order of the stages, other orders are tried.
+
+    The path is reduced to the corners between straight collision-free segments,
+    such that every stage typically needs only one to three moves.
+
+    Planned paths are stored in the planning context and reused if the same stages move again between the same grid
+    cells, see ChipPlanningContext.
+    """
+
+    # row offset, column offset, step length in cells
+    MOTIONS = [(0, 1, 1.0),
+               (1, 0, 1.0),
+               (0, -1, 1.0),
+               (-1, 0, 1.0),
+               (1, 1, np.sqrt(2)),
+               (1, -1, np.sqrt(2)),
+               (-1, 1, np.sqrt(2)),
+               (-1, -1, np.sqrt(2))]
+
+    def __init__(
+        self,
+        chip: Type["Chip"],
+        padding: float = 100,
+        planning_context: ChipPlanningContext = None
+    ) -> None:
+        """
+        Constructor for the graph search path planning.
+
+        Parameters
+        ----------
+        chip: Chip
+            Instance of the a chip
+        padding: float = 100
+            Padding of the grid around the device positions of the chip.
+            Ignored if a planning context is given.
+        planning_context: ChipPlanningContext = None
+            Grid and caches of the chip to reuse. If None, a context is created for this planning only.
+        """
+        super().__init__()
+        self.chip: Type[Chip] = chip
+        self.planning_context = planning_context
+        if self.planning_context is None:
+            self.planning_context = ChipPlanningContext(chip, padding=padding)
+
+        self.grid_size = self.planning_context.grid_size
+        self.grid_outline = self.planning_context.grid_outline
+        self.x_coords = self.planning_context.x_coords
+        self.y_coords = self.planning_context.y_coords
+        self.cx, self.cy = self.planning_context.cx, self.planning_context.cy
+
+        self.targets = {}
+        self.start_coordinates = {}
+
+    def set_stage_target(
+        self,
+        calibration: Type["Calibration"],
+        target: Type[ChipCoordinate]
+    ) -> None:
+        """
+        Registers a target for the given calibration.
+
+        Parameters
+        ----------
+        calibration : Calibration
+            Instance of a calibrated stage, such that the stage can move in chip coordinates.
+        target : ChipCoordinate
+            Target of the stage in chip coordinates.
+        """
+        self.targets[calibration] = target
+
+    def motion_dependencies(
+        self,
+        stage_paths: List[Tuple[Type["Calibration"], List[Type[ChipCoordinate]]]]
+    ) -> Dict[Type["Calibration"], List[Type["Calibration"]]]:
+        """
+        Returns for each stage the stages which must complete their path before it may start to move.
+
+        A stage depends on all stages planned to move before it, whose swept area, i.e. the cells covered by the stage
+        polygon anywhere along its path, overlaps its own swept area. Stages without a dependency between them cannot
+        collide, no matter how their movements overlap in time, and may move simultaneously.
+
+        Parameters
+        ----------
+        stage_paths : List[Tuple[Calibration, List[ChipCoordinate]]]
+            Paths of the stages in the order they move, as returned by `plan`.
+        """
+        swept_areas = [
+            self._swept_cells(calibration, [self.start_coordinates[calibration]] + coordinates)
+            for calibration, coordinates in stage_paths]
+
+        dependencies = {}
+        for idx, (calibration, _) in enumerate(stage_paths):
+            dependencies[calibration] = [
+                other_calibration for other_idx, (other_calibration, _) in enumerate(stage_paths[:idx])
+                if np.any(swept_areas[idx] & swept_areas[other_idx])]
+        return dependencies
+
+    def trajectory(self) -> Generator[WaypointCommand, None, None]:
+        """
+        Generator to calculate a trajectory for all stages.
+
+        The complete path is planned before the first waypoint is returned. Each waypoint command moves one stage
+        along a straight segment and waits until it stopped.
+
+        Raises
+        ------
+        PathPlanningError
+            If there is no collision-free path for the stages.
+        """
+        for calibration, coordinates in self.plan():
+            for coordinate in coordinates:
+                yield {calibration: Waypoint(
+                    calibration=calibration,
+                    coordinate=coordinate,
+                    wait_for_stopping=True)}
+
+    def plan(self) -> List[Tuple[Type["Calibration"], List[Type[ChipCoordinate]]]]:
+        """
+        Plans the paths of all stages.
+
+        Returns
+        -------
+        A list of stages in the order they move, each with the corners of its path.
+        The last corner is the target of the stage.
+
+        Raises
+        ------
+        PathPlanningError
+            If there is no collision-free path for the stages.
+        """
+        start_coordinates = {}
+        for calibration in self.targets:
+            with calibration.perform_in_system(CoordinateSystem.CHIP):
+                start_coordinates[calibration] = calibration.get_position()
+        self.start_coordinates = start_coordinates
+
+        cache_key = tuple(
+            (calibration,
+             self.planning_context.polygon_key(calibration.stage_polygon),
+             self.planning_context.nearest_cell(start_coordinates[calibration]),
+             self.planning_context.nearest_cell(target))
+            for calibration, target in self.targets.items())
+
+        stage_corners = self.planning_context.cached_trajectory(cache_key)
+        if stage_corners is None:
+            stage_corners = self._plan_corners(start_coordinates)
+            self.planning_context.store_trajectory(cache_key, stage_corners)
+        else:
+            self.logger.debug("Reusing stored trajectory.")
+
+        stage_paths = []
+        for calibration, corners in stage_corners:
+            start = start_coordinates[calibration]
+            target = self.targets[calibration]
+            coordinates = [
+                ChipCoordinate(x=self.x_coords[col], y=self.y_coords[row], z=start.z) for row, col in corners]
+            if coordinates or target != start:
+                coordinates.append(target)
+            stage_paths.append((calibration, coordinates))
+
+        return stage_paths
+
+    def _plan_corners(self, start_coordinates):
+        """
+        Returns the stages in the order they move, each with the grid cells of the corners between start and target.
+        """
+        errors = []
+        for order in permutations(self.targets):
+            try:
+                return self._plan_in_order(order, start_coordinates)
+            except PathPlanningError as err:
+                errors.append(str(err))
+
+        raise PathPlanningError(
+            f"No collision-free path found for the stages: {'; '.join(dict.fromkeys(errors))}")
+
+    def _plan_in_order(self, order, start_coordinates):
+        positions = dict(start_coordinates)
+        stage_corners = []
+
+        for calibration in order:
+            target = self.targets[calibration]
+
+            occupancy = np.zeros(self.cx.shape, dtype=bool)
+            for other_calibration, position in positions.items():
+                if other_calibration is not calibration:
+                    occupancy |= other_calibration.stage_polygon.stage_in_meshgrid(
+                        position, self.cx, self.cy, self.grid_size)
+
+            free_cells = self._free_cells(occupancy, self.planning_context.footprint(calibration.stage_polygon))
+            start_cell = self.planning_context.nearest_cell(start_coordinates[calibration])
+            target_cell = self.planning_context.nearest_cell(target)
+            # the stage must be able to leave its current position, even if it is closer to an other stage than allowed
+            free_cells[start_cell] = True
+            if not free_cells[target_cell]:
+                raise PathPlanningError(f"Target {target} of {calibration} is blocked by an other stage.")
+
+            corners = self._simplify_path(free_cells, self._find_path(free_cells, start_cell, target_cell))
+            stage_corners.append((calibration, corners[1:-1]))
+            positions[calibration] = target
+
+        return stage_corners
+
+    def _swept_cells(
+        self,
+        calibration: Type["Calibration"],
+        coordinates: List[Type[ChipCoordinate]]
+    ) -> np.ndarray:
+        """
+        Returns a mask of all cells covered by the stage polygon while it moves along the straight segments between
+        the coordinates.
+        """
+        path_cells = np.zeros(self.cx.shape, dtype=bool)
+        cells = [self.planning_context.nearest_cell(c) for c in coordinates]
+        path_cells[cells[0]] = True
+        for start_cell, end_cell in zip(cells[:-1], cells[1:]):
+            n_samples = 2 * max(abs(end_cell[0] - start_cell[0]), abs(end_cell[1] - start_cell[1])) + 1
+            rows = np.rint(np.linspace(start_cell[0], end_cell[0], n_samples)).astype(int)
+            cols = np.rint(np.linspace(start_cell[1], end_cell[1], n_samples)).astype(int)
+            path_cells[rows, cols] = True
+
+        swept = fftconvolve(
+            path_cells.astype(float),
+            self.planning_context.footprint(calibration.stage_polygon).astype(float),
+            mode='same')
+        return swept > 0.5
+
+    @staticmethod
+    def _free_cells(occupancy: np.ndarray, footprint: np.ndarray) -> np.ndarray:
+        """
+        Returns a mask of all cells where the stage with the given footprint does not overlap with the occupied cells.
+        """
+        if not occupancy.any():
+            return np.ones_like(occupancy)
+        overlap = fftconvolve(
+            occupancy.astype(float),
+            footprint[::-1, ::-1].astype(float),
+            mode='same')
+        return overlap < 0.5
+
+    def _find_path(
+        self,
+        free_cells: np.ndarray,
+        start_cell: Tuple[int, int],
+        target_cell: Tuple[int, int]
+    ) -> List[Tuple[int, int]]:
+        """
+        Returns the shortest path of grid cells from start to target, using A* with the octile distance as heuristic.
+
+        Raises
+        ------
+        PathPlanningError
+            If the target cannot be reached.
+        """
+        n_rows, n_cols = free_cells.shape
+
+        def heuristic(cell):
+            d_row, d_col = abs(cell[0] - target_cell[0]), abs(cell[1] - target_cell[1])
+            return max(d_row, d_col) + (np.sqrt(2) - 1) * min(d_row, d_col)
+
+        costs = {start_cell: 0.0}
+        parents = {start_cell: None}
+        closed = np.zeros_like(free_cells, dtype=bool)
+        queue = [(heuristic(start_cell), 0.0, start_cell)]
+
+        while queue:
+            _, cost, cell = heapq.heappop(queue)
+            if cell == target_cell:
+                path = []
+                while cell is not None:
+                    path.append(cell)
+                    cell = parents[cell]
+                return path[::-1]
+
+            if closed[cell]:
+                continue
+            closed[cell] = True
+
+            for d_row, d_col, step in self.MOTIONS:
+                row, col = cell[0] + d_row, cell[1] + d_col
+                if not (0 <= row < n_rows and 0 <= col < n_cols) or closed[row, col] or not free_cells[row, col]:
+                    continue
+                # diagonal steps must not cut the corner of an obstacle
+                if d_row and d_col and not (free_cells[cell[0], col] and free_cells[row, cell[1]]):
+                    continue
+
+                new_cost = cost + step
+                if new_cost < costs.get((row, col), np.inf):
+                    costs[(row, col)] = new_cost
+                    parents[(row, col)] = cell
+                    heapq.heappush(queue, (new_cost + heuristic((row, col)), new_cost, (row, col)))
+
+        raise PathPlanningError(f"No collision-free path found from grid cell {start_cell} to {target_cell}.")
+
+    @staticmethod
+    def _segment_is_free(
+        free_cells: np.ndarray,
+        start_cell: Tuple[int, int],
+        end_cell: Tuple[int, int]
+    ) -> bool:
+        """
+        Returns True if all cells along the straight line between both cells are free.
+        """
+        n_samples = 2 * max(abs(end_cell[0] - start_cell[0]), abs(end_cell[1] - start_cell[1])) + 1
+        rows = np.rint(np.linspace(start_cell[0], end_cell[0], n_samples)).astype(int)
+        cols = np.rint(np.linspace(start_cell[1], end_cell[1], n_samples)).astype(int)
+        return bool(np.all(free_cells[rows, cols]))
+
+    def _simplify_path(
+        self,
+        free_cells: np.ndarray,
+        path: List[Tuple[int, int]]
+    ) -> List[Tuple[int, int]]:
+        """
+        Reduces the path to its start, target and the cells where it must change direction.
+
+        Starting from a corner, the path is followed as long as the straight line from the corner is collision-free.
+        The last cell reached in this way becomes the next corner.
+        """
+        corners = [path[0]]
+        last_free = 0
+        for idx in range(1, len(path)):
+            if not self._segment_is_free(free_cells, corners[-1], path[idx]):
+                corners.append(path[last_free])
+            last_free = idx
+
+        if len(path) > 1:
+            corners.append(path[-1])
+
+        return corners
+
+
 class SingleStagePlanning(PathPlanning):
     """
     Path planning for single stage movements.
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2022  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+
+Benchmark of the obstacle construction of the potential field path planning.
+
+Usage:
+    python -m LabExT.Movement.PathPlanningBenchmark [--chip-size UM] [--grid-sizes UM [UM ...]] [--steps N]
+
+A stage moves on a square chip, while the field of a second stage is updated after every grid step, as done by
+CollisionAvoidancePlanning.trajectory. The cell-by-cell construction used before is only timed for coarse grids.
+"""
+
+import argparse
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from LabExT.Movement.PathPlanning import PotentialField, SingleModeFiber
+from LabExT.Movement.Transformations import ChipCoordinate
+from LabExT.Movement.config import Orientation
+
+
+class _BenchmarkStage:
+    """Minimal stand-in for a calibration, placed at a fixed chip coordinate."""
+
+    def __init__(self, position, orientation):
+        self.position = position
+        self.stage_polygon = SingleModeFiber(orientation)
+
+    @contextmanager
+    def perform_in_system(self, system):
+        yield
+
+    def get_position(self):
+        return self.position
+
+
+def legacy_stage_obstacles(field, *calibrations, safety_multiplier=5):
+    """The obstacle construction as done before: one full-grid distance computation per obstacle cell."""
+    potential_field = np.zeros_like(field.cx) + field.attractive_potential_field
+    for calibration in calibrations:
+        stage_mask = calibration.stage_polygon.stage_in_meshgrid(
+            calibration.get_position(), field.cx, field.cy, field.grid_size)
+        for ox, oy in zip(field.cx[stage_mask], field.cy[stage_mask]):
+            o_dist = np.hypot(field.cx - ox, field.cy - oy)
+            field_mask = o_dist < safety_multiplier * field.FIBER_RADIUS
+            with np.errstate(divide='ignore'):
+                rep_field = field.repulsive_gain * (1.0 / o_dist) ** 2
+            potential_field[field_mask] += rep_field[field_mask]
+    return potential_field
+
+
+def run_benchmark(chip_size, grid_size, n_steps, with_legacy):
+    half = chip_size / 2
+    moving = _BenchmarkStage(ChipCoordinate(-half / 2, 0, 0), Orientation.LEFT)
+    obstacle = _BenchmarkStage(ChipCoordinate(half / 2, -half / 2, 0), Orientation.RIGHT)
+    field = PotentialField(
+        moving,
+        ChipCoordinate(-half / 2, half / 2, 0),
+        grid_size=grid_size,
+        grid_outline=((-half, half), (-half, half)))
+
+    def timed_steps(fctn):
+        obstacle.position = ChipCoordinate(half / 2, -half / 2, 0)
+        t_start = time.perf_counter()
+        for _ in range(n_steps):
+            fctn()
+            obstacle.position = obstacle.position + ChipCoordinate(0, grid_size, 0)
+        return (time.perf_counter() - t_start) / n_steps
+
+    t_first = time.perf_counter()
+    field.set_stage_obstacles(obstacle)
+    t_first = time.perf_counter() - t_first
+    field._obstacles.clear()
+    t_vectorized = timed_steps(lambda: field.set_stage_obstacles(obstacle))
+
+    print(f"{field.cx.shape[1]} x {field.cx.shape[0]} cells ({grid_size:g}um grid, {chip_size:g}um chip)")
+    print(f"  convolution, first call:  {t_first * 1e3:10.2f} ms")
+    print(f"  convolution, per step:    {t_vectorized * 1e3:10.2f} ms")
+    if with_legacy:
+        t_legacy = timed_steps(lambda: legacy_stage_obstacles(field, obstacle))
+        reference = legacy_stage_obstacles(field, obstacle)
+        field.set_stage_obstacles(obstacle)
+        finite = np.isfinite(reference)
+        deviation = np.max(np.abs(reference[finite] - field.potential_field[finite]))
+        print(f"  cell by cell, per step:   {t_legacy * 1e3:10.2f} ms, max deviation {deviation:.2e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the obstacle construction of the potential field.")
+    parser.add_argument('--chip-size', type=float, default=20000.0, help="edge length of the square chip in um")
+    parser.add_argument('--grid-sizes', type=float, nargs='+', default=[100.0, 50.0, 20.0, 10.0],
+                        help="grid sizes in um")
+    parser.add_argument('--steps', type=int, default=5, help="number of obstacle updates to time")
+    parser.add_argument('--legacy-max-cells', type=int, default=50000,
+                        help="largest grid for which the cell-by-cell construction is timed")
+    args = parser.parse_args()
+
+    for grid_size in args.grid_sizes:
+        n_cells = (args.chip_size / grid_size + 1) ** 2
+        run_benchmark(args.chip_size, grid_size, args.steps, with_legacy=n_cells <= args.legacy_max_cells)
@@ -7,10 +7,14 @@ This program is free software and comes with ABSOLUTELY NO WARRANTY; for details
 from __future__ import annotations
 
 import logging
+import threading
+import time
 
+from collections import namedtuple
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeoutError
 from functools import wraps
 from abc import ABC, abstractmethod
-from typing import List, Tuple, Any
+from typing import List, Tuple, Any, Optional
 
 
 class StageError(RuntimeError):
@@ -51,6 +55,288 @@ def assert_driver_loaded(func):
     return wrapper
 
 
+StageState = namedtuple('StageState', ['position', 'status', 'stopped'])
+StageState.__doc__ = """Position, status and stop indication of a stage, read at once with `Stage.read_state`."""
+
+
+class StagePositionCache:
+    """
+    Last verified position of a stage, to avoid reading the position from the controller over and over again.
+
+    Movements register their target with `commanded` and their completion with `stopped`. The first position
+    request after a completed movement reads the stage once and compares the position with the commanded target.
+    Until the next movement, or at most `max_age` seconds, the position is then returned without asking the
+    controller. Positions read while the stage moves or before any movement was registered are never cached.
+    """
+
+    def __init__(self, stage: "Stage", max_age: float = 5.0, tolerance: float = 1.0) -> None:
+        """
+        Constructs a new position cache.
+
+        Parameters
+        ----------
+        stage: Stage
+            Stage whose position is cached.
+        max_age: float = 5.0
+            Time after which a cached position is read again [s], e.g. to notice manual movements.
+        tolerance: float = 1.0
+            Deviation between commanded and read position above which a warning is logged [um].
+        """
+        self.stage = stage
+        self.max_age = max_age
+        self.tolerance = tolerance
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._target: Optional[List[float]] = None
+        self._stopped = False
+        self._position: Optional[List[float]] = None
+        self._read_at = 0.0
+
+    @property
+    def target(self) -> Optional[List[float]]:
+        """
+        Returns the target of the last commanded movement, if known.
+        """
+        return None if self._target is None else list(self._target)
+
+    def commanded(self, target: List[Optional[float]] = None, offset: List[float] = None) -> None:
+        """
+        Registers a new movement of the stage. The cached position is invalid until the movement has stopped.
+
+        Parameters
+        ----------
+        target: List[Optional[float]] = None
+            Absolute target of the movement, None for axes which do not move.
+        offset: List[float] = None
+            Relative offset of the movement.
+        """
+        with self._lock:
+            start = self._position if self._position is not None else self._target
+            if target is not None:
+                if start is not None:
+                    target = [s if t is None else t for s, t in zip(start, target)]
+                self._target = None if any(t is None for t in target) else list(target)
+            elif offset is not None and start is not None:
+                self._target = [s + o for s, o in zip(start, offset)]
+            else:
+                self._target = None
+            self._stopped = False
+            self._position = None
+
+    def stopped(self) -> None:
+        """
+        Registers that the last commanded movement is complete. The position is verified with the next request.
+        """
+        with self._lock:
+            self._stopped = True
+
+    def invalidate(self) -> None:
+        """
+        Forgets the cached position, e.g. if the stage was moved by other means than the registered movements.
+        """
+        with self._lock:
+            self._target = None
+            self._stopped = False
+            self._position = None
+
+    def position(self) -> List[float]:
+        """
+        Returns the position of the stage, from the cache if possible.
+        """
+        with self._lock:
+            if self._position is not None and time.monotonic() - self._read_at < self.max_age:
+                self.hits += 1
+                return list(self._position)
+            self.misses += 1
+            stopped = self._stopped
+
+        if not stopped:
+            return self.stage.get_position()
+
+        state = self.stage.read_state()
+        position = list(state.position)
+        with self._lock:
+            # a movement commanded in the meantime invalidates this read
+            if self._stopped and state.stopped:
+                self._verify(position)
+                self._position = position
+                self._read_at = time.monotonic()
+        return position
+
+    def _verify(self, position: List[float]) -> None:
+        if self._target is None:
+            return
+        deviation = max(abs(p - t) for p, t in zip(position, self._target))
+        if deviation > self.tolerance:
+            self.stage._logger.warning(
+                f"{self.stage} stopped {deviation:.2f}um away from the commanded target {self._target}.")
+
+
+class StageStatusMonitor:
+    """
+    Watches the status of a single stage in a background thread and reports the completion of movements.
+
+    Instead of every caller polling the stage with its own sleep loop, callers request a completion and wait on it.
+    The monitor thread then reads the stage status until the stage reports to be stopped and resolves all requests
+    made before this read at once. The first read for a request is delayed by `settle_time`, since a controller
+    may still report the stopped status of the previous move directly after a new one was commanded.
+    The thread only reads the stage while completions are requested and exits after being idle for `idle_timeout`;
+    it is restarted with the next request.
+    """
+
+    def __init__(
+        self,
+        stage: "Stage",
+        poll_interval: float = 0.005,
+        settle_time: float = 0.02,
+        idle_timeout: float = 5.0
+    ) -> None:
+        """
+        Constructs a new status monitor.
+
+        Parameters
+        ----------
+        stage: Stage
+            Stage to be monitored.
+        poll_interval: float = 0.005
+            Time between two status reads of a moving stage [s].
+        settle_time: float = 0.02
+            Minimum time between a request and the status read resolving it [s].
+        idle_timeout: float = 5.0
+            Time without requests after which the monitor thread exits [s].
+        """
+        self.stage = stage
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.idle_timeout = idle_timeout
+
+        self._condition = threading.Condition()
+        self._requested = 0
+        self._completed = 0
+        self._futures: List[Tuple[int, Future]] = []
+        self._last_request_at = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._shutdown = False
+
+    @property
+    def running(self) -> bool:
+        """
+        Indicates whether the monitor thread is running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def when_stopped(self) -> Future:
+        """
+        Returns a future, which is resolved as soon as the stage reports to be stopped.
+
+        Only status reads made at least `settle_time` after this call count, so the future can be requested directly
+        after a movement was commanded. If reading the status fails, the exception is set on the future.
+        The future is cancelled if the monitor is shut down before the stage stopped.
+        """
+        future = Future()
+        with self._condition:
+            self._requested += 1
+            self._last_request_at = time.monotonic()
+            self._futures.append((self._requested, future))
+            self._start()
+            self._condition.notify_all()
+        return future
+
+    def wait_until_stopped(self, timeout: float = None) -> bool:
+        """
+        Blocks until the stage reports to be stopped.
+
+        Parameters
+        ----------
+        timeout: float = None
+            Maximum time to wait [s], None to wait forever.
+
+        Returns
+        -------
+        bool
+            False if the stage did not stop within the timeout or the monitor was shut down while waiting.
+        """
+        try:
+            self.when_stopped().result(timeout=timeout)
+        except (FutureTimeoutError, CancelledError):
+            return False
+        return True
+
+    def shutdown(self) -> None:
+        """
+        Stops the monitor thread. Pending completions are cancelled.
+        """
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+            thread = self._thread
+
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+        with self._condition:
+            for _, future in self._futures:
+                future.cancel()
+            self._futures.clear()
+            self._completed = self._requested
+            self._shutdown = False
+
+    def _start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name=f"StatusMonitor-{self.stage}", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                has_work = self._condition.wait_for(
+                    lambda: self._shutdown or self._completed < self._requested, timeout=self.idle_timeout)
+                if self._shutdown or not has_work:
+                    self._thread = None
+                    return
+                # let the controller pick up the latest commanded movement before reading its status
+                settled = self._condition.wait_for(
+                    lambda: self._shutdown or time.monotonic() >= self._last_request_at + self.settle_time,
+                    timeout=self.settle_time)
+                if not settled:
+                    continue
+                if self._shutdown:
+                    self._thread = None
+                    return
+                # requests made after this point need a later status read
+                pending = self._requested
+
+            try:
+                stopped = self.stage.is_stopped
+            except Exception as err:
+                self._resolve(pending, exception=err)
+                continue
+
+            if stopped:
+                self._resolve(pending)
+            else:
+                with self._condition:
+                    self._condition.wait(self.poll_interval)
+
+    def _resolve(self, pending: int, exception: Exception = None) -> None:
+        with self._condition:
+            self._completed = max(self._completed, pending)
+            resolved = [f for request, f in self._futures if request <= pending]
+            self._futures = [(r, f) for r, f in self._futures if r > pending]
+
+        for future in resolved:
+            if not future.set_running_or_notify_cancel():
+                continue
+            if exception is None:
+                future.set_result(None)
+            else:
+                future.set_exception(exception)
+
+
 class Stage(ABC):
     """
     Abstract Interface for Stages in LabExT. 
@@ -155,6 +441,60 @@ class Stage(ABC):
         """
         pass
 
+    @property
+    def status_monitor(self) -> StageStatusMonitor:
+        """
+        Returns the status monitor of the stage, which is created on first use.
+        """
+        monitor = self.__dict__.get('_status_monitor')
+        if monitor is None:
+            monitor = self.__dict__.setdefault('_status_monitor', StageStatusMonitor(self))
+        return monitor
+
+    @property
+    def position_cache(self) -> StagePositionCache:
+        """
+        Returns the position cache of the stage, which is created on first use.
+        """
+        cache = self.__dict__.get('_position_cache')
+        if cache is None:
+            cache = self.__dict__.setdefault('_position_cache', StagePositionCache(self))
+        return cache
+
+    def read_state(self) -> StageState:
+        """
+        Reads position and status of all axes at once.
+
+        Stages should overwrite this method if the controller allows to read all channels in fewer requests
+        than `get_position`, `get_status` and `is_stopped` together.
+        """
+        status = self.get_status()
+        return StageState(position=self.get_position(), status=status, stopped=self.is_stopped)
+
+    def when_stopped(self) -> Future:
+        """
+        Returns a future, which is resolved as soon as the stage reports to be stopped after a commanded movement.
+
+        Use `concurrent.futures.wait` to wait for several stages at once.
+        """
+        return self.status_monitor.when_stopped()
+
+    def wait_for_stopping(self, timeout: float = None) -> bool:
+        """
+        Blocks until the stage reports to be stopped.
+
+        Parameters
+        ----------
+        timeout: float = None
+            Maximum time to wait [s], None to wait forever.
+
+        Returns
+        -------
+        bool
+            False if the stage did not stop within the timeout.
+        """
+        return self.status_monitor.wait_until_stopped(timeout=timeout)
+
     @abstractmethod
     def connect(self) -> bool:
         """
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2022  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from math import sqrt
+
+from LabExT.Movement.Stage import Stage, StageState
+
+
+class SimulatedClock:
+    """
+    Virtual clock for simulated stages, which only advances when a stage sleeps.
+
+    Simulations with a virtual clock take no real time and are deterministic, independent of the CPU load.
+    Stages sharing a clock wait in parallel: waiting until a point in time which already passed returns immediately.
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self._now = start
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        with self._lock:
+            self._now += max(seconds, 0.0)
+
+    def sleep_until(self, timestamp: float) -> None:
+        with self._lock:
+            self._now = max(self._now, timestamp)
+
+
+class _RealTimeClock:
+    """Clock of a simulated stage running in real time."""
+
+    @staticmethod
+    def time() -> float:
+        return time.monotonic()
+
+    @staticmethod
+    def sleep(seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def sleep_until(self, timestamp: float) -> None:
+        self.sleep(timestamp - self.time())
+
+
+class _AxisMotion:
+    """
+    Movement of a single axis from rest to rest with a trapezoidal velocity profile.
+
+    If the acceleration is not positive, the axis moves with constant speed.
+    """
+
+    def __init__(self, start: float, target: float, t_start: float, speed: float, acceleration: float) -> None:
+        self.start = start
+        self.target = target
+        self.t_start = t_start
+
+        distance = abs(target - start)
+        self.direction = 1.0 if target >= start else -1.0
+        self.acceleration = acceleration if acceleration and acceleration > 0 else float('inf')
+
+        if distance == 0:
+            self.t_acc, self.v_peak, self.duration = 0.0, 0.0, 0.0
+        elif distance >= speed ** 2 / self.acceleration:
+            # the axis reaches the maximum speed
+            self.t_acc = speed / self.acceleration
+            self.v_peak = speed
+            self.duration = distance / speed + self.t_acc
+        else:
+            self.t_acc = sqrt(distance / self.acceleration)
+            self.v_peak = self.acceleration * self.t_acc
+            self.duration = 2 * self.t_acc
+
+    @property
+    def t_stop(self) -> float:
+        return self.t_start + self.duration
+
+    def is_moving(self, t: float) -> bool:
+        return self.t_start <= t < self.t_stop
+
+    def position(self, t: float) -> float:
+        if t <= self.t_start:
+            return self.start
+        if t >= self.t_stop:
+            return self.target
+
+        t_elapsed = t - self.t_start
+        t_remaining = self.t_stop - t
+        distance = abs(self.target - self.start)
+        if t_elapsed < self.t_acc:
+            travelled = 0.5 * self.acceleration * t_elapsed ** 2
+        elif t_remaining < self.t_acc:
+            travelled = distance - 0.5 * self.acceleration * t_remaining ** 2
+        else:
+            travelled = 0.5 * self.v_peak * self.t_acc + self.v_peak * (t_elapsed - self.t_acc)
+        return self.start + self.direction * travelled
+
+
+class SimulatedStage(Stage):
+    """
+    Stage simulating the movements of a real stage, for testing and benchmarking without hardware.
+
+    Every axis moves with a trapezoidal velocity profile, using the speed and acceleration set on the stage.
+    During a movement, position and status are reported consistently with the profile. Every command sent to the
+    stage takes `command_latency` seconds, like the round-trip to a real controller.
+
+    A new movement always starts at rest from the current position of the axis, even if the axis is still moving.
+
+    With a `SimulatedClock`, the simulation runs in virtual time and is deterministic.
+    """
+
+    #
+    #   Class description and properties
+    #
+
+    driver_loaded = True
+    driver_specifiable = False
+    description = "Simulated Stage with Kinematics"
+
+    DEFAULT_SPEED = 200.0
+    DEFAULT_ACCELERATION = 0.0
+
+    @classmethod
+    def find_stage_addresses(cls):
+        return [
+            'sim:stage:1',
+            'sim:stage:2'
+        ]
+
+    @classmethod
+    def load_driver(cls):
+        pass
+
+    def __init__(
+            self,
+            address,
+            command_latency: float = 0.0,
+            clock: SimulatedClock = None,
+            acceleration_z: float = 0.0) -> None:
+        """
+        Constructs a new simulated stage.
+
+        Parameters
+        ----------
+        address: Any
+            Address of the stage
+        command_latency: float = 0.0
+            Duration of every command sent to the stage [s]
+        clock: SimulatedClock = None
+            Virtual clock to run the simulation with, None to run in real time
+        acceleration_z: float = 0.0
+            Acceleration of the Z axis [um/s^2], 0 for no acceleration limit
+        """
+        super().__init__(address)
+
+        self.command_latency = command_latency
+        self.clock = clock if clock is not None else _RealTimeClock()
+        self.n_commands = 0
+
+        self._speed_xy = self.DEFAULT_SPEED
+        self._speed_z = self.DEFAULT_SPEED
+        self._acceleration_xy = self.DEFAULT_ACCELERATION
+        self._acceleration_z = acceleration_z
+        self._motions = [_AxisMotion(0.0, 0.0, self.clock.time(), 1.0, 0.0) for _ in range(3)]
+        self._lock = threading.RLock()
+
+    def __str__(self) -> str:
+        return "Simulated Stage at {}".format(self.address_string)
+
+    @property
+    def address_string(self) -> str:
+        return self.address
+
+    @property
+    def identifier(self) -> str:
+        return self.address_string
+
+    @property
+    def virtual_time(self) -> bool:
+        """
+        Indicates whether the simulation runs with a virtual clock.
+        """
+        return isinstance(self.clock, SimulatedClock)
+
+    @property
+    def stops_at(self) -> float:
+        """
+        Returns the time at which all axes are stopped.
+        """
+        with self._lock:
+            return max(m.t_stop for m in self._motions)
+
+    def connect(self) -> bool:
+        self._command()
+        self.connected = True
+        return True
+
+    def disconnect(self) -> bool:
+        self.status_monitor.shutdown()
+        self.connected = False
+        return True
+
+    def set_speed_xy(self, umps: float):
+        self._command()
+        self._speed_xy = umps
+
+    def set_speed_z(self, umps: float):
+        self._command()
+        self._speed_z = umps
+
+    def get_speed_xy(self) -> float:
+        self._command()
+        return self._speed_xy
+
+    def get_speed_z(self) -> float:
+        self._command()
+        return self._speed_z
+
+    def set_acceleration_xy(self, umps2):
+        self._command()
+        self._acceleration_xy = umps2
+
+    def get_acceleration_xy(self) -> float:
+        self._command()
+        return self._acceleration_xy
+
+    def get_status(self) -> tuple:
+        self._command()
+        now = self.clock.time()
+        with self._lock:
+            return tuple('MOVING' if m.is_moving(now) else 'STOP' for m in self._motions)
+
+    @property
+    def is_stopped(self) -> bool:
+        return all(s == 'STOP' for s in self.get_status())
+
+    def get_position(self) -> list:
+        self._command()
+        now = self.clock.time()
+        with self._lock:
+            return [m.position(now) for m in self._motions]
+
+    def read_state(self) -> StageState:
+        self._command()
+        now = self.clock.time()
+        with self._lock:
+            status = tuple('MOVING' if m.is_moving(now) else 'STOP' for m in self._motions)
+            position = [m.position(now) for m in self._motions]
+        return StageState(position=position, status=status, stopped=all(s == 'STOP' for s in status))
+
+    def move_relative(
+            self,
+            x: float = 0,
+            y: float = 0,
+            z: float = 0,
+            wait_for_stopping: bool = True) -> None:
+        self._command()
+        now = self.clock.time()
+        with self._lock:
+            current = [m.position(now) for m in self._motions]
+        self._start_motion([p + d for p, d in zip(current, (x, y, z))], now)
+
+        if wait_for_stopping:
+            self.wait_for_stopping()
+
+    def move_absolute(
+            self,
+            x: float = None,
+            y: float = None,
+            z: float = None,
+            wait_for_stopping: bool = True) -> None:
+        self._command()
+        self._start_motion([x, y, z], self.clock.time())
+
+        if wait_for_stopping:
+            self.wait_for_stopping()
+
+    def when_stopped(self) -> Future:
+        """
+        Returns a future, which is resolved as soon as all axes are stopped.
+
+        With a virtual clock, the clock is advanced to the end of the movement and the future is already resolved.
+        """
+        if not self.virtual_time:
+            return super().when_stopped()
+
+        self.clock.sleep_until(self.stops_at)
+        future = Future()
+        future.set_result(None)
+        return future
+
+    def wait_for_stopping(self, timeout: float = None) -> bool:
+        if not self.virtual_time:
+            return super().wait_for_stopping(timeout=timeout)
+
+        stops_at = self.stops_at
+        if timeout is not None and stops_at - self.clock.time() > timeout:
+            self.clock.sleep(timeout)
+            return False
+        self.clock.sleep_until(stops_at)
+        return True
+
+    # Helper methods
+
+    def _command(self) -> None:
+        """Simulates the round-trip of a command to the controller."""
+        self.n_commands += 1
+        self.clock.sleep(self.command_latency)
+
+    def _start_motion(self, targets: list, now: float) -> None:
+        speeds = (self._speed_xy, self._speed_xy, self._speed_z)
+        accelerations = (self._acceleration_xy, self._acceleration_xy, self._acceleration_z)
+        with self._lock:
+            for axis, target in enumerate(targets):
+                if target is None:
+                    continue
+                self._motions[axis] = _AxisMotion(
+                    self._motions[axis].position(now), target, now, speeds[axis], accelerations[axis])
@@ -6,14 +6,13 @@ This program is free software and comes with ABSOLUTELY NO WARRANTY; for details
 """
 import sys
 import json
-import time
 import ctypes as ct
 
 from enum import Enum
 from typing import List
 
 from LabExT.Movement.config import Axis
-from LabExT.Movement.Stage import Stage, StageError, assert_stage_connected, assert_driver_loaded
+from LabExT.Movement.Stage import Stage, StageError, StageState, assert_stage_connected, assert_driver_loaded
 from LabExT.Utils import get_configuration_file_path, try_to_lift_window
 from LabExT.View.Controls.DriverPathDialog import DriverPathDialog
 
@@ -424,6 +423,7 @@ class Stage3DSmarAct(Stage):
     @assert_stage_connected
     def disconnect(self):
         """Disconnects stage by calling SA_CloseSystem"""
+        self.status_monitor.shutdown()
         if self._exit_if_error(MCSC.SA_CloseSystem(self.handle)):
             self.connected = False
             self.handle = None
@@ -538,6 +538,27 @@ class Stage3DSmarAct(Stage):
             self.channels[Axis.Z].position
         ]
 
+    @assert_driver_loaded
+    @assert_stage_connected
+    def read_state(self) -> StageState:
+        """
+        Reads status and position of all channels in a single pass.
+
+        Returns
+        -------
+        StageState
+            Position in [x,y,z] format in units of um, channel status codes as strings and whether all axes are stopped.
+        """
+        status = []
+        position = []
+        for channel in self.channels.values():
+            status.append(channel.humanized_status)
+            position.append(channel.position)
+        return StageState(
+            position=position,
+            status=tuple(status),
+            stopped=all(s == 'SA_STOPPED_STATUS' for s in status))
+
     @assert_driver_loaded
     @assert_stage_connected
     def move_relative(
@@ -635,12 +656,8 @@ class Stage3DSmarAct(Stage):
                         index.name, self.address))
         self._logger.debug("Linear x, y and z sensor present")
 
-    def _wait_for_stopping(self, delay=0.05):
+    def _wait_for_stopping(self):
         """
         Blocks until all channels have 'SA_STOPPED_STATUS' status.
         """
-        while True:
-            time.sleep(delay)
-
-            if self.is_stopped:
-                break
+        self.wait_for_stopping()
@@ -263,6 +263,28 @@ class Transformation(ABC):
         """
         pass
 
+    def chip_to_stage_array(self, chip_coordinates: np.ndarray) -> np.ndarray:
+        """
+        Transforms an array of chip coordinates with shape (N, 3) to stage space.
+
+        Transformations should overwrite this with a single matrix operation,
+        the default transforms the coordinates one by one.
+        """
+        return np.array([
+            self.chip_to_stage(ChipCoordinate.from_numpy(c)).to_numpy()
+            for c in coordinate_array(chip_coordinates)], dtype=float).reshape(-1, 3)
+
+    def stage_to_chip_array(self, stage_coordinates: np.ndarray) -> np.ndarray:
+        """
+        Transforms an array of stage coordinates with shape (N, 3) to chip space.
+
+        Transformations should overwrite this with a single matrix operation,
+        the default transforms the coordinates one by one.
+        """
+        return np.array([
+            self.stage_to_chip(StageCoordinate.from_numpy(c)).to_numpy()
+            for c in coordinate_array(stage_coordinates)], dtype=float).reshape(-1, 3)
+
     def dump(self, *args, **kwargs) -> Any:
         """
         Dumps transformation into storable format.
@@ -274,6 +296,28 @@ class TransformationError(RuntimeError):
     pass
 
 
+def coordinate_array(coordinates) -> np.ndarray:
+    """
+    Returns coordinates as float array of shape (N, 3).
+
+    Accepts arrays or nested lists of shape (N, 3) or (3,) and lists of Coordinate objects.
+
+    Raises
+    ------
+    ValueError
+        If the coordinates do not have three components.
+    """
+    if len(coordinates) > 0 and isinstance(coordinates[0], Coordinate):
+        coordinates = [c.to_list() for c in coordinates]
+
+    array = np.atleast_2d(np.asarray(coordinates, dtype=float))
+    if array.size == 0:
+        return array.reshape(0, 3)
+    if array.ndim != 2 or array.shape[1] != 3:
+        raise ValueError(f"Expected coordinates of shape (N, 3), got {array.shape}.")
+    return array
+
+
 def assert_valid_transformation(func):
     """
     Decorator to assert that a transformation is valid.
@@ -463,6 +507,20 @@ class AxesRotation(Transformation):
         return ChipCoordinate.from_numpy(
             np.linalg.inv(self.matrix).dot(stage_coordinate.to_numpy()))
 
+    @assert_valid_transformation
+    def chip_to_stage_array(self, chip_coordinates: np.ndarray) -> np.ndarray:
+        """
+        Rotates an array of chip coordinates with shape (N, 3) according to the axes rotation.
+        """
+        return coordinate_array(chip_coordinates) @ self.matrix.T
+
+    @assert_valid_transformation
+    def stage_to_chip_array(self, stage_coordinates: np.ndarray) -> np.ndarray:
+        """
+        Rotates an array of stage coordinates with shape (N, 3) according to the inverse axes rotation.
+        """
+        return coordinate_array(stage_coordinates) @ np.linalg.inv(self.matrix).T
+
     def dump(self) -> dict:
         """
         Returns the axes rotation as an axis mapping in a dict
@@ -636,6 +694,21 @@ class SinglePointOffset(Transformation):
         return self.axes_rotation.stage_to_chip(
             stage_coordinate + self.stage_offset)
 
+    @assert_valid_transformation
+    def chip_to_stage_array(self, chip_coordinates: np.ndarray) -> np.ndarray:
+        """
+        Transforms an array of chip coordinates with shape (N, 3) into stage coordinates.
+        """
+        return self.axes_rotation.chip_to_stage_array(chip_coordinates) - self.stage_offset.to_numpy()
+
+    @assert_valid_transformation
+    def stage_to_chip_array(self, stage_coordinates: np.ndarray) -> np.ndarray:
+        """
+        Transforms an array of stage coordinates with shape (N, 3) into chip coordinates.
+        """
+        return self.axes_rotation.stage_to_chip_array(
+            coordinate_array(stage_coordinates) + self.stage_offset.to_numpy())
+
     def dump(self) -> dict:
         """
         Returns the single point transformation as pairing.
@@ -653,10 +726,26 @@ class KabschRotation(Transformation):
     For more information see Kabsch Algorithm.
     We require 3 points for a 3D transformation.
     More points are possible and may increase the accuracy.
+
+    The estimate is updated incrementally and pairings can be weighted. Pairings measured automatically,
+    e.g. the optimized coupling positions after a Search for Peak, are added with `refine` once the manual pairings
+    define a valid rotation. Refinement rejects pairings that disagree with the current estimate and down-weights
+    outliers with the Huber loss. Only the `MAX_REFINED_PAIRINGS` most recent refined pairings are kept and they
+    are not stored with `dump`.
     """
 
     MIN_POINTS = 3
 
+    # Number of most recent refined (and of rejected) pairings kept
+    MAX_REFINED_PAIRINGS = 50
+
+    # Pairings with a residual below this value are never rejected [um]
+    MIN_REJECTION_THRESHOLD = 10.0
+    # Pairings are rejected if the residual exceeds the median residual by this multiple of the robust residual scale
+    REJECTION_FACTOR = 3.0
+    # Pairings are down-weighted if the residual exceeds the median residual by this multiple of the robust scale
+    HUBER_FACTOR = 1.345
+
     @classmethod
     def load(
         cls,
@@ -721,10 +810,16 @@ class KabschRotation(Transformation):
         Initalises the transformation by unsetting all coordinates and offsets.
         """
         self.pairings = []
+        self.weights = []
+        self.robust_weights = []
+        self.rejected_pairings = []
+        self._estimator = IncrementalRigidTransform()
 
-        # Both will be 3xN matrices
-        self.chip_coordinates = np.empty((3, 0), float)
-        self.stage_coordinates = np.empty((3, 0), float)
+        # True for pairings added by refine, in the order of self.pairings
+        self._refined = []
+        # chip and stage coordinates of the pairings as rows, grown on demand
+        self._chip_buffer = np.empty((8, 3))
+        self._stage_buffer = np.empty((8, 3))
 
         self.rotation_to_chip = None
         self.translation_to_chip = None
@@ -746,7 +841,28 @@ class KabschRotation(Transformation):
         """
         return len(self.pairings) >= self.MIN_POINTS
 
-    def update(self, pairing: Type[CoordinatePairing]) -> None:
+    @property
+    def chip_coordinates(self) -> np.ndarray:
+        """
+        Returns the chip coordinates of all pairings as 3xN matrix.
+        """
+        return self._chip_buffer[:len(self.pairings)].T.copy()
+
+    @property
+    def stage_coordinates(self) -> np.ndarray:
+        """
+        Returns the stage coordinates of all pairings as 3xN matrix.
+        """
+        return self._stage_buffer[:len(self.pairings)].T.copy()
+
+    @property
+    def refined_pairings(self) -> list:
+        """
+        Returns the pairings added with `refine`.
+        """
+        return [p for p, refined in zip(self.pairings, self._refined) if refined]
+
+    def update(self, pairing: Type[CoordinatePairing], weight: float = 1.0) -> None:
         """
         Updates the transformation by adding a new pairing.
         Add the stage coordinate and chip coordinates to a matrix and recalculates the rotation.
@@ -755,45 +871,193 @@ class KabschRotation(Transformation):
         ----------
         pairing: CoordinatePairing
             A coordinate pairing between a stage and chip coordinate
+        weight: float = 1.0
+            Weight of the pairing in the least-squares estimate
 
         Raises
         ------
         ValueError
            If the pairing is not well defined or a pairing for the chip has already been set.
         """
-        if not isinstance(pairing, CoordinatePairing) or (
-                pairing.device is None or pairing.chip_coordinate is None or pairing.stage_coordinate is None):
-            raise ValueError(
-                "Use a complete CoordinatePairing object to update the rotation. ")
+        self._assert_complete_pairing(pairing)
 
         if any(p.device == pairing.device for p in self.pairings):
             raise ValueError(
                 "A pairing with this device has already been saved.")
 
-        self.pairings.append(pairing)
+        self._add_pairing(pairing, weight)
 
-        self.chip_coordinates = np.append(
-            self.chip_coordinates,
-            np.array([pairing.chip_coordinate.to_numpy()]).T,
-            axis=1)
-        self.stage_coordinates = np.append(
-            self.stage_coordinates,
-            np.array([pairing.stage_coordinate.to_numpy()]).T,
-            axis=1)
+    def refine(self, pairing: Type[CoordinatePairing], weight: float = 1.0) -> bool:
+        """
+        Refines the transformation with an automatically measured pairing.
+
+        Unlike `update`, several pairings of the same device are allowed. The pairing is ignored unless the pairings
+        added with `update` define a valid rotation, so automatically measured pairings never create a rotation.
+        The pairing is rejected if its residual exceeds the `rejection_threshold`. Rejected pairings are kept in
+        `rejected_pairings`. If more than `MAX_REFINED_PAIRINGS` refined pairings are accepted, the oldest one is
+        removed. After an accepted pairing, all pairings are reweighted with `reweight_huber`.
+
+        Parameters
+        ----------
+        pairing: CoordinatePairing
+            A coordinate pairing between a stage and chip coordinate
+        weight: float = 1.0
+            Weight of the pairing in the least-squares estimate
+
+        Returns
+        -------
+        bool
+            True if the pairing was accepted, False if it was rejected or the rotation is not yet defined.
 
+        Raises
+        ------
+        ValueError
+           If the pairing is not well defined.
+        """
+        self._assert_complete_pairing(pairing)
+
+        if len(self.pairings) - sum(self._refined) < self.MIN_POINTS:
+            logger.debug(f"Ignored pairing {pairing.dump()}, the rotation is not yet defined by manual pairings.")
+            return False
+
+        residual = np.linalg.norm(
+            self.chip_to_stage_array(pairing.chip_coordinate.to_numpy())[0] - pairing.stage_coordinate.to_numpy())
+        if residual > self.rejection_threshold():
+            logger.info(f"Rejected pairing {pairing.dump()} with residual {residual:.2f}um.")
+            self.rejected_pairings.append(pairing)
+            del self.rejected_pairings[:-self.MAX_REFINED_PAIRINGS]
+            return False
+
+        self._add_pairing(pairing, weight, refined=True)
+        if sum(self._refined) > self.MAX_REFINED_PAIRINGS:
+            self._remove_pairing(self._refined.index(True))
+        self.reweight_huber()
+        return True
+
+    def residuals(self) -> np.ndarray:
+        """
+        Returns the distance between the transformed chip coordinate and the stage coordinate of each pairing in [um].
+        """
+        if not self.is_valid:
+            return np.full(len(self.pairings), np.nan)
+
+        n_pairings = len(self.pairings)
+        return np.linalg.norm(
+            self.chip_to_stage_array(self._chip_buffer[:n_pairings]) - self._stage_buffer[:n_pairings], axis=1)
+
+    @property
+    def rms_residual(self) -> float:
+        """
+        Returns the weighted root mean square of the residuals in [um].
+        """
+        weights = np.multiply(self.weights, self.robust_weights)
+        if not self.is_valid or weights.sum() <= 0:
+            return np.nan
+        return float(np.sqrt(np.sum(weights * self.residuals() ** 2) / weights.sum()))
+
+    def rejection_threshold(self) -> float:
+        """
+        Returns the residual above which `refine` rejects a pairing in [um].
+
+        This is the median residual plus `REJECTION_FACTOR` times the robust scale of the residuals,
+        but at least `MIN_REJECTION_THRESHOLD`.
+        """
+        return self._robust_cutoff(self.REJECTION_FACTOR)
+
+    def reweight_huber(self, delta: float = None, iterations: int = 10) -> None:
+        """
+        Down-weights pairings with large residuals by iteratively reweighted least squares with the Huber loss.
+
+        Parameters
+        ----------
+        delta: float = None
+            Residual in [um] above which pairings are down-weighted, by default the median residual plus
+            `HUBER_FACTOR` times the robust scale of the residuals, but at least `MIN_REJECTION_THRESHOLD`.
+        iterations: int = 10
+            Maximum number of reweighting iterations.
+        """
+        if not self.is_valid:
+            return
+
+        for _ in range(iterations):
+            residuals = self.residuals()
+            huber_delta = self._robust_cutoff(self.HUBER_FACTOR) if delta is None else delta
+            robust_weights = np.minimum(1.0, huber_delta / np.maximum(residuals, 1e-12))
+
+            converged = np.allclose(robust_weights, self.robust_weights, atol=1e-6)
+            self.robust_weights = robust_weights.tolist()
+            self._rebuild_estimate()
+            if converged:
+                break
+
+    def _robust_cutoff(self, factor: float) -> float:
+        residuals = self.residuals()
+        if not len(residuals):
+            return self.MIN_REJECTION_THRESHOLD
+
+        # the residuals are distances, so their spread is measured around the median and not around zero:
+        # normalized median absolute deviation, which equals the standard deviation for normal residuals
+        median = np.median(residuals)
+        robust_scale = 1.4826 * np.median(np.abs(residuals - median))
+        return max(self.MIN_REJECTION_THRESHOLD, median + factor * robust_scale)
+
+    def _assert_complete_pairing(self, pairing: Type[CoordinatePairing]) -> None:
+        if not isinstance(pairing, CoordinatePairing) or (
+                pairing.device is None or pairing.chip_coordinate is None or pairing.stage_coordinate is None):
+            raise ValueError(
+                "Use a complete CoordinatePairing object to update the rotation. ")
+
+    def _add_pairing(self, pairing: Type[CoordinatePairing], weight: float, refined: bool = False) -> None:
+        if weight <= 0:
+            raise ValueError("The weight of a pairing must be positive.")
+
+        n_pairings = len(self.pairings)
+        if n_pairings == len(self._chip_buffer):
+            self._chip_buffer = np.concatenate([self._chip_buffer, np.empty_like(self._chip_buffer)])
+            self._stage_buffer = np.concatenate([self._stage_buffer, np.empty_like(self._stage_buffer)])
+        self._chip_buffer[n_pairings] = pairing.chip_coordinate.to_numpy()
+        self._stage_buffer[n_pairings] = pairing.stage_coordinate.to_numpy()
+
+        self.pairings.append(pairing)
+        self.weights.append(weight)
+        self.robust_weights.append(1.0)
+        self._refined.append(refined)
+        self._estimator.add(self._chip_buffer[n_pairings], self._stage_buffer[n_pairings], weight)
+
+        self._solve()
+
+    def _remove_pairing(self, index: int) -> None:
+        n_pairings = len(self.pairings)
+        self._estimator.remove(
+            self._chip_buffer[index], self._stage_buffer[index], self.weights[index] * self.robust_weights[index])
+        self._chip_buffer[index:n_pairings - 1] = self._chip_buffer[index + 1:n_pairings]
+        self._stage_buffer[index:n_pairings - 1] = self._stage_buffer[index + 1:n_pairings]
+
+        del self.pairings[index]
+        del self.weights[index]
+        del self.robust_weights[index]
+        del self._refined[index]
+
+    def _rebuild_estimate(self) -> None:
+        self._estimator.reset()
+        for chip_coordinate, stage_coordinate, weight, robust_weight in zip(
+                self._chip_buffer, self._stage_buffer, self.weights, self.robust_weights):
+            self._estimator.add(chip_coordinate, stage_coordinate, weight * robust_weight)
+        self._solve()
+
+    def _solve(self) -> None:
         if not self.is_valid:
             return
 
-        # Calculate the rotation. Note: The first argument is the start set,
-        # the second argument is the target set.
+        # Calculate the rotation. Note: The chip coordinates are the start set,
+        # the stage coordinates are the target set.
         #
-        # INPUT: chip coordinates as start set and stage coordinate as target set
         # OUTPUT: R, t, R^-1, t' s.t.
         # -> R * Chip-Coordinates + t = Stage-Coordinates
         # -> R^-1 * Stage-Coordinates + t' = Chip-Coordinates
 
-        self.rotation_to_stage, self.translation_to_stage, self.rotation_to_chip, self.translation_to_chip = rigid_transform_with_orientation_preservation(
-            S=self.chip_coordinates, T=self.stage_coordinates, axes_rotation=self.axes_rotation.matrix)
+        self.rotation_to_stage, self.translation_to_stage, self.rotation_to_chip, self.translation_to_chip = \
+            self._estimator.solve(axes_rotation=self.axes_rotation.matrix)
 
     def get_z_plane_angles(self) -> Tuple[float, float, float]:
         """
@@ -868,12 +1132,26 @@ class KabschRotation(Transformation):
             self.rotation_to_chip.dot(stage_coordinate.to_numpy()) +
             self.translation_to_chip.T).flatten())
 
+    @assert_valid_transformation
+    def chip_to_stage_array(self, chip_coordinates: np.ndarray) -> np.ndarray:
+        """
+        Transforms an array of chip coordinates with shape (N, 3) into stage coordinates.
+        """
+        return coordinate_array(chip_coordinates) @ self.rotation_to_stage.T + self.translation_to_stage.T
+
+    @assert_valid_transformation
+    def stage_to_chip_array(self, stage_coordinates: np.ndarray) -> np.ndarray:
+        """
+        Transforms an array of stage coordinates with shape (N, 3) into chip coordinates.
+        """
+        return coordinate_array(stage_coordinates) @ self.rotation_to_chip.T + self.translation_to_chip.T
+
     def dump(self) -> Any:
         """
-        Returns a list of pairings defining the rotation.
+        Returns a list of pairings defining the rotation. Refined pairings are not included.
         """
         return [
-            p.dump(include_device_id=True) for p in self.pairings]
+            p.dump(include_device_id=True) for p, refined in zip(self.pairings, self._refined) if not refined]
 
 
 def rigid_transform_with_orientation_preservation(
@@ -933,6 +1211,19 @@ def rigid_transform_with_orientation_preservation(
     # Calculate accumulating matrix H = ST^T
     H = S_c @ np.transpose(T_c)
 
+    return _rigid_transform_from_cross_covariance(H, s_centroid, t_centroid, axes_rotation)
+
+
+def _rigid_transform_from_cross_covariance(
+    H: np.ndarray,
+    s_centroid: np.ndarray,
+    t_centroid: np.ndarray,
+    axes_rotation: np.ndarray = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes R, t, R^-1 and t' from the 3x3 cross-covariance H of the centered datasets and their 3x1 centroids.
+    See `rigid_transform_with_orientation_preservation`.
+    """
     # Calculate SVD: [U, S, V] = SVD(H)
     U, _, V = np.linalg.svd(H)
 
@@ -965,3 +1256,76 @@ def rigid_transform_with_orientation_preservation(
     t_target_to_start = s_centroid - R_inv @ t_centroid
 
     return R, t_start_to_target, R_inv, t_target_to_start
+
+
+class IncrementalRigidTransform:
+    """
+    Weighted least-squares estimate of a rigid transformation RS + t = T, which is updated in O(1) per point pair.
+
+    Only the weighted sums of the start points, the target points and their outer products are stored.
+    Solving requires the SVD of a 3x3 matrix, independent of the number of point pairs.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Removes all point pairs.
+        """
+        self.n_points = 0
+        self.weight_sum = 0.0
+        self._s_sum = np.zeros(3)
+        self._t_sum = np.zeros(3)
+        self._st_sum = np.zeros((3, 3))
+
+    def add(self, s: np.ndarray, t: np.ndarray, weight: float = 1.0) -> None:
+        """
+        Adds the start point s and target point t with the given weight.
+        """
+        if weight < 0:
+            raise ValueError("Weights must not be negative.")
+        s = np.asarray(s, dtype=float).reshape(3)
+        t = np.asarray(t, dtype=float).reshape(3)
+        self.n_points += 1
+        self.weight_sum += weight
+        self._s_sum += weight * s
+        self._t_sum += weight * t
+        self._st_sum += weight * np.outer(s, t)
+
+    def remove(self, s: np.ndarray, t: np.ndarray, weight: float = 1.0) -> None:
+        """
+        Removes a point pair previously added with the same weight.
+        """
+        s = np.asarray(s, dtype=float).reshape(3)
+        t = np.asarray(t, dtype=float).reshape(3)
+        self.n_points -= 1
+        self.weight_sum -= weight
+        self._s_sum -= weight * s
+        self._t_sum -= weight * t
+        self._st_sum -= weight * np.outer(s, t)
+
+    @property
+    def centroids(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the weighted centroids of the start and target points as 3x1 matrices.
+        """
+        if self.weight_sum <= 0:
+            raise ValueError("Cannot compute centroids without weighted points.")
+        return (self._s_sum / self.weight_sum).reshape(3, 1), (self._t_sum / self.weight_sum).reshape(3, 1)
+
+    @property
+    def cross_covariance(self) -> np.ndarray:
+        """
+        Returns the weighted cross-covariance H = sum w (s - s_c)(t - t_c)^T.
+        """
+        s_centroid, t_centroid = self.centroids
+        return self._st_sum - self.weight_sum * (s_centroid @ t_centroid.T)
+
+    def solve(self, axes_rotation: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns R, t, R^-1 and t' as `rigid_transform_with_orientation_preservation` does for the weighted points.
+        """
+        s_centroid, t_centroid = self.centroids
+        return _rigid_transform_from_cross_covariance(
+            self.cross_covariance, s_centroid, t_centroid, axes_rotation)
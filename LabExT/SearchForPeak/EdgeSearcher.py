@@ -8,7 +8,9 @@ This program is free software and comes with ABSOLUTELY NO WARRANTY; for details
 import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from os.path import dirname, join
+import threading
 import time
 from typing import Type
 import datetime
@@ -25,8 +27,74 @@ from LabExT.Movement.Transformations import StageCoordinate
 from LabExT.Utils import get_configuration_file_path
 from LabExT.Utils import make_filename_compliant
 from LabExT.View.Controls.PlotControl import PlotData
-from LabExT.ViewModel.Utilities.ObservableList import ObservableList
+from LabExT.ViewModel.Utilities.SnapshotChannel import SnapshotChannel
 from LabExT.Experiments.AutosaveDict import AutosaveDict
+from LabExT.SearchForPeak.ImageStack import ImageStackWriter
+
+
+class ContactDetector:
+    """
+    Detects the contact of a fiber with the chip edge from consecutive steps of an edge approach.
+
+    Contact is assumed when the power changes abruptly between two steps or when the camera image changes noticeably.
+    A threshold of 0 disables the respective criterion.
+    """
+
+    def __init__(self, max_power_gradient: float = 0.0, max_image_change: float = 0.0):
+        """Constructor
+
+        Parameters
+        ----------
+        max_power_gradient : float
+            Absolute power change per travelled distance in [dB/um] above which contact is assumed.
+        max_image_change : float
+            Mean absolute difference between two images, relative to the mean brightness of the first, above which
+            contact is assumed.
+        """
+        self.max_power_gradient = max_power_gradient
+        self.max_image_change = max_image_change
+
+        self._last_power = None
+        self._last_image = None
+
+    @staticmethod
+    def image_change(previous: np.ndarray, current: np.ndarray) -> float:
+        """Returns the mean absolute difference of two images relative to the mean brightness of the first one."""
+        previous = np.asarray(previous, dtype=float)
+        current = np.asarray(current, dtype=float)
+        return float(np.mean(np.abs(current - previous)) / max(np.mean(np.abs(previous)), np.finfo(float).eps))
+
+    def update(self, step_distance: float, power: float, image: np.ndarray = None):
+        """Adds the next step and checks for contact.
+
+        Parameters
+        ----------
+        step_distance : float
+            Distance travelled since the previous step in [um].
+        power : float
+            Power measured at this step in [dBm].
+        image : np.ndarray, optional
+            Camera image captured at this step.
+
+        Returns
+        -------
+        str
+            A description of the criterion which detected the contact, or None if there is no contact.
+        """
+        last_power, last_image = self._last_power, self._last_image
+        self._last_power, self._last_image = power, image
+
+        if self.max_power_gradient > 0 and last_power is not None and step_distance > 0:
+            gradient = abs(power - last_power) / step_distance
+            if gradient > self.max_power_gradient:
+                return f"power gradient of {gradient:.3f}dB/um"
+
+        if self.max_image_change > 0 and last_image is not None and image is not None:
+            change = self.image_change(last_image, image)
+            if change > self.max_image_change:
+                return f"image change of {change:.3f}"
+
+        return None
 
 
 class EdgeSearcher(Measurement):
@@ -80,6 +148,13 @@ class EdgeSearcher(Measurement):
     - **(swept SfP only) Number of points**: Number of points to collect at the power meter for each separate sweep.
 
     All parameters labelled `stepped SfP only` are ignored when choosing the swept SfP, all parameters labelled `swept SfP only` are ignored when choosing the stepped SfP.
+
+    #### Edge Approach Parameters
+    - **Motor X/Y/Z increment**: Relative movement of the stages per step in [um].
+    - **Edge approach steps**: Maximum number of steps of the automatic edge approach.
+    - **Stop power gradient**: The approach stops when the power changes by more than this between two steps, in [dB/um]. Set to 0 to disable.
+    - **Stop image change**: The approach stops when the mean absolute difference between two consecutive camera images, relative to the mean
+    brightness of the first one, exceeds this value. Set to 0 to disable.
     """
 
     DIMENSION_NAMES_TWO_STAGES = ['Left X', 'Left Y', 'Left Z', 'Right X', 'Right Y', 'Right Z']
@@ -108,15 +183,28 @@ class EdgeSearcher(Measurement):
 
         self.logger = logging.getLogger()
 
-        # gather all plots for the plotting GUIs
-        self.plots_left = ObservableList()
-        self.plots_right = ObservableList()
+        # fixed set of plot traces, the plotting GUI polls copies of them from plot_snapshots
+        self.plots_left = []
+        self.plots_right = []
+        self.plot_snapshots = SnapshotChannel()
+
+        # set to abort a running edge approach after the current step
+        self.stop_requested = threading.Event()
+        # held while the edge approach runs, manual captures must not move the stages at the same time
+        self._approach_lock = threading.Lock()
+
+        # worker threads capturing camera images and writing them to disk in parallel to power reads and motion
+        self._capture_pool = None
+        self._store_pool = None
 
         # chosen instruments for IL measurement
         self.instr_laser = None
         self.instr_powermeter = None
         self.initialized = False
 
+        # on-disk storage of the captured camera images
+        self.image_stack = None
+
         self.logger.info(
             'Initialized Search for Peak with method: ' + str(self.name))
 
@@ -140,6 +228,9 @@ class EdgeSearcher(Measurement):
             'Motor X increment': MeasParamFloat(value=0.0, unit="um"),
             'Motor Y increment': MeasParamFloat(value=0.0, unit="um"),
             'Motor Z increment': MeasParamFloat(value=0.0, unit="um"),
+            'Edge approach steps': MeasParamInt(value=10),
+            'Stop power gradient': MeasParamFloat(value=0.0, unit="dB/um"),
+            'Stop image change': MeasParamFloat(value=0.0),
         }
 
     @staticmethod
@@ -171,8 +262,7 @@ class EdgeSearcher(Measurement):
             raise RuntimeError('Search for Peak Laser not yet defined!')
 
         # initialize plotting
-        self.plots_left.clear()
-        self.plots_right.clear()
+        self._setup_plots()
 
         # open connection to instruments
         self.instr_laser.open()
@@ -200,7 +290,12 @@ class EdgeSearcher(Measurement):
         self.results['measured location'] = []
         self.results['measured power'] = []
         self.results['measurement time'] = []
-        self.captured_img = []
+
+        self.image_stack = ImageStackWriter(
+            file_path=os.path.join(self.save_file_path, "imgs.h5"),
+            thumbnail_dir=self.save_file_path)
+        self._capture_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="EdgeSearcherCapture")
+        self._store_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="EdgeSearcherStore")
 
         for param_name, cfg_param in self.parameters.items():
             self.results['parameter'][param_name] = str(cfg_param.value) + str(cfg_param.unit)
@@ -222,108 +317,200 @@ class EdgeSearcher(Measurement):
         return
 
     def capture_data(self):
-        """Main Search For Peak routine
-        Uses a 2D gaussian fit for all four dimensions.
+        """Captures a single step of the edge approach.
+
+        Moves the stages by the configured increments and records the stage location, the power and a camera image.
 
         Returns
         -------
         dict
-            A dict containing the parameters used for the SFP, the estimated through power,
-            and gaussian fitting information.
-        """
+            The results dictionary containing all steps captured so far.
 
+        Raises
+        ------
+        RuntimeError
+            If the edge approach is running.
+        """
+        if not self._approach_lock.acquire(blocking=False):
+            raise RuntimeError("Cannot capture data while the edge approach is running.")
+        try:
+            return self._capture_step()
+        finally:
+            self._approach_lock.release()
+
+    def _capture_step(self):
+        """Moves by one step and captures it, see `capture_data`."""
         # switch on laser
         self.instr_laser.wavelength = self.parameters.get('Laser wavelength').value
         self.instr_laser.power = self.parameters.get('Laser power').value
 
         with self.instr_laser:
             with self.mover.set_stages_coordinate_system(CoordinateSystem.STAGE):
-                # read parameters for SFP
-                move__motor_x = self.parameters.get('Motor X increment').value
-                move__motor_y = self.parameters.get('Motor Y increment').value
-                move__motor_z = self.parameters.get('Motor Z increment').value
-
-                # ADD SAFETY CHECKS for movement
-
-                # find the current positions of the stages as starting point for
-                # SFP
-                _left_start_coordinates = []
-                _right_start_coordinates = []
-                if self.mover.left_calibration:
-                    _left_start_coordinates = self.mover.left_calibration.get_position().to_list()
-                if self.mover.right_calibration:
-                    _right_start_coordinates = self.mover.right_calibration.get_position().to_list()
-                start_coordinates = _left_start_coordinates + _right_start_coordinates
-                self.current_coordinates = start_coordinates.copy()
-
-                self.logger.debug(f"Start Position: {start_coordinates}")
-
-                # get start statistics
-                self.results['start location'] = start_coordinates.copy()
-                self.results['start through power'] = self.instr_powermeter.power
+                self._record_start()
 
                 # move motors
-                self._move_stages_relative([move__motor_x, move__motor_y, move__motor_z])
-                self.logger.info(f"Move by: {[move__motor_x, move__motor_y, move__motor_z]}.")
-
-                # Save location
-                if self.mover.left_calibration:
-                    self.results['measured location'].append(self.mover.left_calibration.get_position().to_list())
-                if self.mover.right_calibration:
-                    self.results['measured location'].append(self.mover.right_calibration.get_position().to_list())
-
-                # Save power
-                self.results['measured power'].append(self.instr_powermeter.fetch_power())
-
-                # Save picture
-                # self.results['captured image'].append(self.camera.snap_photo())
-                self.captured_img.append(np.uint8(self.camera.snap_photo()))
-                # plt.imshow(self.captured_img[-1])
-                # plt.axis('off')
-                # plt.savefig(f"{self.save_file_path}\\img_{np.size(self.results['measured power']):03}.png")
-                # plt.show()
-                now = datetime.datetime.now()
-                ts = str('{date:%Y-%m-%d_%H%M%S}'.format(date=now))
-                self.results['measurement time'].append(ts)
+                increments = self._motor_increments()
+                self._move_stages_relative(increments)
+                self.logger.info(f"Move by: {increments}.")
+
+                location, power, image = self._acquire_step()
+                self._record_step(location, power, image)
+                self.image_stack.append(image)
                 self.results.save()
-                
-                plt.imsave(f"{self.save_file_path}\\img_{np.size(self.results['measured power']):03}.png", self.captured_img[-1], dpi=300)
-                np.savez(f"{self.save_file_path}\\imgs.npz", images = self.captured_img)
-
-                # Plot Power
-                # color_strings = ['C' + str(i) for i in range(10)]
-                meas_plot_left_x = PlotData(ObservableList(), ObservableList(), color = 'blue', marker='o', label="x")
-                meas_plot_left_z = PlotData(ObservableList(), ObservableList(), color = 'red', marker='o', label="z")
-                self.plots_left.append(meas_plot_left_x)
-                self.plots_left.append(meas_plot_left_z)
-
-                if len(self.results['measured power']) == 1:
-                    meas_plot_left_x.x = [0.0]
-                    meas_plot_left_x.y = self.results['measured power']
-                    meas_plot_left_z.x = [0.0]
-                    meas_plot_left_z.y = self.results['measured power']
-                else:
-                    meas_plot_left_x.x = [0.0] + [coord[0] - self.results['measured location'][0][0] for coord in self.results['measured location'][1:]]
-                    meas_plot_left_x.y = self.results['measured power']
-                    meas_plot_left_z.x = [0.0] + [coord[2] - self.results['measured location'][0][2] for coord in self.results['measured location'][1:]]
-                    meas_plot_left_z.y = self.results['measured power']
-                # print()
-                # print('HELP')
-                # print(type(meas_plot_left.plot_data))
-
-                meas_plot_right = PlotData(x=None, y=None, plot_type='image', image = ObservableList())
-                self.plots_right.append(meas_plot_right)
-                # meas_plot_right.x = [coord[2] for coord in self.results['measured location']]
-                # meas_plot_right.y = self.results['measured power']
-                meas_plot_right.image = self.captured_img[-1]
-                # print(type(meas_plot_right.image))
-                # plt.imshow(self.captured_img[-1])
-                # plt.show()
-                # print(type(meas_plot_right.plot_data))
-
-                
+
         return self.results
-    
+
+    def run_edge_approach(self):
+        """Runs the edge approach autonomously.
+
+        Steps the stages by the configured increments up to `Edge approach steps` times. At every step, the power is
+        read while the camera image is captured in parallel, and the image is written to disk while the stages move to
+        the next step. The approach stops early if the contact detector fires or `stop_requested` is set.
+
+        Returns
+        -------
+        dict
+            The results dictionary containing all captured steps and the reason why the approach stopped.
+
+        Raises
+        ------
+        RuntimeError
+            If the edge approach or a manual capture is already running.
+        """
+        n_steps = int(self.parameters.get('Edge approach steps').value)
+        if n_steps < 1:
+            raise ValueError("The edge approach needs at least one step.")
+
+        if not self._approach_lock.acquire(blocking=False):
+            raise RuntimeError("The edge approach or a manual capture is already running.")
+        try:
+            return self._run_edge_approach(n_steps)
+        finally:
+            self._approach_lock.release()
+
+    def _run_edge_approach(self, n_steps):
+        """Runs the edge approach with at most n_steps steps, see `run_edge_approach`."""
+
+        self.stop_requested.clear()
+        detector = ContactDetector(
+            max_power_gradient=self.parameters.get('Stop power gradient').value,
+            max_image_change=self.parameters.get('Stop image change').value)
+
+        # switch on laser
+        self.instr_laser.wavelength = self.parameters.get('Laser wavelength').value
+        self.instr_laser.power = self.parameters.get('Laser power').value
+
+        stop_reason = 'number of steps reached'
+        n_done = 0
+        pending_store = None
+        with self.instr_laser:
+            with self.mover.set_stages_coordinate_system(CoordinateSystem.STAGE):
+                self._record_start()
+                increments = self._motor_increments()
+                step_distance = float(np.linalg.norm(increments))
+
+                for step in range(n_steps):
+                    if self.stop_requested.is_set():
+                        stop_reason = 'stopped by user'
+                        break
+
+                    # the previous image is written to disk while the stages move
+                    self._move_stages_relative(increments)
+                    location, power, image = self._acquire_step()
+                    if pending_store is not None:
+                        pending_store.result()
+                    pending_store = self._store_pool.submit(self.image_stack.append, image)
+
+                    self._record_step(location, power, image)
+                    n_done = step + 1
+                    self.logger.debug(f"Edge approach step {n_done}/{n_steps}: {power:.2f}dBm at {location}.")
+
+                    contact = detector.update(step_distance, power, image)
+                    if contact is not None:
+                        stop_reason = contact
+                        break
+
+                if pending_store is not None:
+                    pending_store.result()
+
+        self.logger.info(f"Edge approach finished after {n_done} steps: {stop_reason}.")
+        self.results['edge approach'] = {'steps': n_done, 'stop reason': stop_reason}
+        self.results.save()
+
+        return self.results
+
+    def publish_plots(self):
+        """Publishes a copy of the current plots to `plot_snapshots`, never blocks."""
+        self.plot_snapshots.publish({
+            'left': [plot_data.snapshot() for plot_data in self.plots_left],
+            'right': [plot_data.snapshot() for plot_data in self.plots_right]
+        })
+
+    def _setup_plots(self):
+        """Creates the fixed set of traces, which every captured step updates in place."""
+        self._plot_x = PlotData([], [], color='blue', marker='o', label="x")
+        self._plot_z = PlotData([], [], color='red', marker='o', label="z")
+        self._plot_image = PlotData(x=None, y=None, plot_type='image', image=[])
+        self._reference_location = None
+
+        self.plots_left.clear()
+        self.plots_left.extend([self._plot_x, self._plot_z])
+        self.plots_right.clear()
+        self.plots_right.append(self._plot_image)
+        self.publish_plots()
+
+    def _motor_increments(self):
+        return [self.parameters.get('Motor X increment').value,
+                self.parameters.get('Motor Y increment').value,
+                self.parameters.get('Motor Z increment').value]
+
+    def _stage_locations(self):
+        locations = []
+        if self.mover.left_calibration:
+            locations.append(self.mover.left_calibration.get_position().to_list())
+        if self.mover.right_calibration:
+            locations.append(self.mover.right_calibration.get_position().to_list())
+        return locations
+
+    def _record_start(self):
+        # find the current positions of the stages as starting point
+        start_coordinates = [coord for location in self._stage_locations() for coord in location]
+        self.current_coordinates = start_coordinates.copy()
+        self.logger.debug(f"Start Position: {start_coordinates}")
+
+        # get start statistics
+        self.results['start location'] = start_coordinates.copy()
+        self.results['start through power'] = self.instr_powermeter.power
+
+    def _acquire_step(self):
+        """Reads the stage locations and the power while the camera captures an image."""
+        image_future = self._capture_pool.submit(self.camera.snap_photo)
+        try:
+            locations = self._stage_locations()
+            power = self.instr_powermeter.fetch_power()
+        finally:
+            image = image_future.result()
+        return locations, power, image
+
+    def _record_step(self, locations, power, image):
+        """Adds a captured step to the results and the plot traces and publishes the plots."""
+        self.results['measured location'].extend(locations)
+        self.results['measured power'].append(power)
+        now = datetime.datetime.now()
+        self.results['measurement time'].append(str('{date:%Y-%m-%d_%H%M%S}'.format(date=now)))
+        self.current_coordinates = [coord for location in locations for coord in location]
+
+        # plot the deviation of the first stage from the first captured step
+        location = locations[0]
+        if self._reference_location is None:
+            self._reference_location = location
+        self._plot_x.x.append(location[0] - self._reference_location[0])
+        self._plot_x.y.append(power)
+        self._plot_z.x.append(location[2] - self._reference_location[2])
+        self._plot_z.y.append(power)
+        self._plot_image.image = image
+        self.publish_plots()
+
     def close_instruments(self):
         # turn laser off
         self.instr_laser.enable = False
@@ -333,6 +520,16 @@ class EdgeSearcher(Measurement):
         self.instr_powermeter.close()
         self.camera.close()
 
+        # wait for pending image captures and writes, then close image file
+        for pool in (self._capture_pool, self._store_pool):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        self._capture_pool = None
+        self._store_pool = None
+        if self.image_stack is not None:
+            self.image_stack.close()
+            self.image_stack = None
+
         # save final result to log
         loc_str = " x ".join(["{:.3f}um".format(p)
                              for p in self.current_coordinates])
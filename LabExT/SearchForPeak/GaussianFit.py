@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.optimize import curve_fit
+
+
+# parameter order of all functions in this module: a (amplitude), mu (mean), sigma (std dev), offset (baseline)
+LOWER_BOUNDS = (0, -np.inf, 0, -np.inf)
+UPPER_BOUNDS = (np.inf, np.inf, np.inf, np.inf)
+
+
+def gaussian(x, a, mu, sigma, offset):
+    return a * np.exp(-(x - mu) ** 2 / (2 * sigma ** 2)) + offset
+
+
+def gaussian_jacobian(x, a, mu, sigma, offset):
+    """
+    Analytic derivatives of `gaussian` w.r.t. its four parameters, shape (len(x), 4).
+    """
+    dx = np.asarray(x) - mu
+    e = np.exp(-dx ** 2 / (2 * sigma ** 2))
+    return np.stack([e,
+                     a * e * dx / sigma ** 2,
+                     a * e * dx ** 2 / sigma ** 3,
+                     np.ones_like(e)], axis=-1)
+
+
+def crude_initial_guess(x, y, sigma_hint: float = None) -> List[float]:
+    """
+    Crude estimate: peak at the maximum sample, sigma spanning the sampled interval if no hint is given.
+    """
+    sigma_init = sigma_hint if sigma_hint is not None else x.max() - x.min()
+    return [y.max() - y.min(), x[np.argmax(y)], sigma_init, y.min()]
+
+
+def log_parabola_initial_guess(x, y, sigma_hint: float = None) -> List[float]:
+    """
+    Closed-form estimate of the gaussian parameters.
+
+    The logarithm of a gaussian without offset is a parabola. The offset is estimated from the lowest samples, then a
+    parabola is fitted to the logarithm of the upper part of the offset-corrected data by linear least squares. Falls
+    back to `crude_initial_guess` if the data does not look like a hill.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    offset = y.min()
+    a_span = y.max() - offset
+    if len(x) < 3 or a_span <= 0:
+        return crude_initial_guess(x, y, sigma_hint)
+
+    # only use the upper part of the hill, where the noise does not dominate the logarithm
+    mask = (y - offset) > 0.2 * a_span
+    if np.count_nonzero(mask) < 3:
+        return crude_initial_guess(x, y, sigma_hint)
+
+    x_m = x[mask]
+    z = np.log(y[mask] - offset)
+    # weight by the signal to reduce the influence of samples close to the baseline
+    w = np.sqrt(y[mask] - offset)
+    c2, c1, c0 = np.polyfit(x_m, z, 2, w=w)
+    if c2 >= 0:
+        return crude_initial_guess(x, y, sigma_hint)
+
+    sigma = np.sqrt(-1 / (2 * c2))
+    mu = -c1 / (2 * c2)
+    a = np.exp(c0 - c1 ** 2 / (4 * c2))
+    if not np.all(np.isfinite([a, mu, sigma])) or not (x.min() <= mu <= x.max()):
+        return crude_initial_guess(x, y, sigma_hint)
+
+    return [a, mu, sigma, offset]
+
+
+def warm_start_initial_guess(x, y, sigma_hint: float = None) -> List[float]:
+    """
+    Estimate of the gaussian parameters, which uses the width of a previous fit.
+
+    Besides the closed-form estimate (see `log_parabola_initial_guess`), gaussians with the hinted width are placed at
+    the closed-form center and on a grid over the sampled interval. With width and center fixed, amplitude and offset
+    follow exactly from linear least squares. The candidate with the lowest sum of squared residuals is returned. If
+    the closed-form estimate is spoiled by noise or too few samples on the hill, the fit thus starts at the width of
+    the previous device.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    closed_form = log_parabola_initial_guess(x, y, sigma_hint)
+    if sigma_hint is None or not sigma_hint > 0 or len(x) < 2:
+        return closed_form
+
+    # centers: the closed-form center and a grid over the sampled interval, at half the hinted width
+    n_grid = int(min(np.ceil(2 * (x.max() - x.min()) / sigma_hint), 200)) + 1
+    mus = np.append(np.linspace(x.min(), x.max(), n_grid), closed_form[1])
+
+    # amplitude and offset of each center by linear least squares, vectorized over all centers
+    e = np.exp(-(x[None, :] - mus[:, None]) ** 2 / (2 * sigma_hint ** 2))
+    e_mean, y_mean = e.mean(axis=1), y.mean()
+    e_var = np.sum((e - e_mean[:, None]) ** 2, axis=1)
+    a = np.sum((e - e_mean[:, None]) * (y - y_mean), axis=1) / np.maximum(e_var, 1e-300)
+    offset = y_mean - a * e_mean
+    costs = np.sum((a[:, None] * e + offset[:, None] - y) ** 2, axis=1)
+    # only hills are valid
+    costs[~(a > 0)] = np.inf
+
+    best = int(np.argmin(costs))
+    closed_form_cost = np.sum((gaussian(x, *closed_form) - y) ** 2)
+    if not costs[best] < closed_form_cost:
+        return closed_form
+    return [a[best], mus[best], sigma_hint, offset[best]]
+
+
+def fit_gaussian(x, y, sigma_hint: float = None, initial_guess: Sequence[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Fits a gaussian to the given data with the analytic Jacobian.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        the set of independent data points
+    y : np.ndarray
+        the set of dependent data points
+    sigma_hint : float, optional
+        width of a previously fitted gaussian, e.g. of the previous device, see `warm_start_initial_guess`
+    initial_guess : 4-sequence, optional
+        start parameters, skips the closed-form estimate (warm start)
+
+    Returns
+    -------
+    popt: np.ndarray
+        a, mu, sigma, offset
+    perr_std_dev: np.ndarray
+        estimated std deviations of the parameters
+
+    Raises
+    ------
+    RuntimeError: when the fitting fails to converge.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    if initial_guess is None:
+        initial_guess = warm_start_initial_guess(x, y, sigma_hint)
+    # the start point must lie within the bounds
+    p0 = np.clip(initial_guess, np.add(LOWER_BOUNDS, 1e-12), UPPER_BOUNDS)
+
+    popt, cov = curve_fit(gaussian, x, y,
+                          p0=p0,
+                          jac=lambda xd, *p: gaussian_jacobian(xd, *p),
+                          bounds=(LOWER_BOUNDS, UPPER_BOUNDS),
+                          ftol=1e-8,
+                          maxfev=1000)
+    return popt, np.sqrt(np.diag(cov))
+
+
+def fit_gaussians_batch(x_list: Sequence[np.ndarray],
+                        y_list: Sequence[np.ndarray],
+                        sigma_hints: Optional[Sequence[float]] = None,
+                        max_iterations: int = 100,
+                        tolerance: float = 1e-10) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fits gaussians to several datasets at once, e.g. to all axes of a Search for Peak.
+
+    Runs a Levenberg-Marquardt iteration on all datasets simultaneously: the residuals and Jacobians of all datasets
+    are stacked into padded arrays and the 4x4 normal equations are solved as one batch. Datasets may have different
+    lengths.
+
+    Parameters
+    ----------
+    x_list, y_list : sequence of np.ndarray
+        one x and y vector per dataset
+    sigma_hints : sequence of float, optional
+        one width hint per dataset, see `fit_gaussian`
+    max_iterations : int
+        maximum number of iterations
+    tolerance : float
+        stop once the relative change of the sum of squared residuals of all datasets is below this value
+
+    Returns
+    -------
+    popt: np.ndarray
+        shape (number of datasets, 4), the fitted a, mu, sigma, offset
+    perr_std_dev: np.ndarray
+        shape (number of datasets, 4), estimated std deviations of the parameters
+    converged: np.ndarray
+        boolean per dataset
+    """
+    n_sets = len(x_list)
+    if sigma_hints is None:
+        sigma_hints = [None] * n_sets
+
+    n_max = max(len(x) for x in x_list)
+    X = np.zeros((n_sets, n_max))
+    Y = np.zeros((n_sets, n_max))
+    M = np.zeros((n_sets, n_max))
+    for i, (x, y) in enumerate(zip(x_list, y_list)):
+        X[i, :len(x)] = x
+        Y[i, :len(y)] = y
+        M[i, :len(x)] = 1.0
+
+    P = np.array([warm_start_initial_guess(np.asarray(x, dtype=float), np.asarray(y, dtype=float), h)
+                  for x, y, h in zip(x_list, y_list, sigma_hints)], dtype=float)
+    P[:, 2] = np.maximum(np.abs(P[:, 2]), 1e-12)
+
+    R = M * (gaussian(X, *P.T[:, :, None]) - Y)
+    cost = np.sum(R ** 2, axis=1)
+    damping = np.full(n_sets, 1e-3)
+    converged = np.zeros(n_sets, dtype=bool)
+    stalled = np.zeros(n_sets, dtype=bool)
+
+    for _ in range(max_iterations):
+        # only iterate on the datasets which are still being optimized
+        active = np.flatnonzero(~converged & ~stalled)
+        if len(active) == 0:
+            break
+        Xa, Ma, Ra, Pa = X[active], M[active], R[active], P[active]
+
+        J = Ma[:, :, None] * gaussian_jacobian(Xa, *Pa.T[:, :, None])
+        JTJ = np.einsum('bni,bnj->bij', J, J)
+        JTr = np.einsum('bni,bn->bi', J, Ra)
+
+        diag = np.einsum('bii->bi', JTJ)
+        A = JTJ + (damping[active, None] * np.maximum(diag, 1e-12))[:, :, None] * np.eye(4)
+        step = np.linalg.solve(A, -JTr[:, :, None])[:, :, 0]
+
+        P_new = Pa + step
+        P_new[:, 0] = np.maximum(P_new[:, 0], 0)  # allow only hills
+        P_new[:, 2] = np.maximum(np.abs(P_new[:, 2]), 1e-12)
+        R_new = Ma * (gaussian(Xa, *P_new.T[:, :, None]) - Y[active])
+        cost_new = np.sum(R_new ** 2, axis=1)
+
+        # accept improving steps per dataset, adapt damping like Levenberg-Marquardt
+        improved = cost_new < cost[active]
+        rel_change = (cost[active] - cost_new) / np.maximum(cost[active], 1e-300)
+        accepted = active[improved]
+        P[accepted] = P_new[improved]
+        R[accepted] = R_new[improved]
+        cost[accepted] = cost_new[improved]
+        converged[accepted[rel_change[improved] < tolerance]] = True
+        damping[active] = np.where(improved, damping[active] / 3, damping[active] * 2)
+        # datasets whose damping explodes cannot improve anymore
+        stalled[active] |= damping[active] > 1e10
+
+    J = M[:, :, None] * gaussian_jacobian(X, *P.T[:, :, None])
+    JTJ = np.einsum('bni,bnj->bij', J, J)
+    dof = np.maximum(M.sum(axis=1) - 4, 1)
+    cov = np.linalg.pinv(JTJ) * (cost / dof)[:, None, None]
+    perr = np.sqrt(np.abs(np.einsum('bii->bi', cov)))
+
+    # if even heavily damped steps do not reduce the cost, the gradient vanishes, i.e. a minimum is reached
+    converged |= stalled
+
+    return P, perr, converged
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+
+Benchmark of the gaussian fitting backends used by the Search for Peak.
+
+Usage:
+    python -m LabExT.SearchForPeak.GaussianFitBenchmark [measurement JSON files ...]
+
+The sampled SfP data is read from the "search for peak" entry of the given measurement files. Without files, or if the
+files do not contain sampled SfP data, synthetic datasets are used.
+"""
+
+import argparse
+import json
+import time
+import warnings
+
+import numpy as np
+from scipy.optimize import curve_fit, OptimizeWarning
+
+from LabExT.SearchForPeak import GaussianFit
+
+
+def load_recorded_datasets(file_paths):
+    """Extracts (positions, power) pairs of every SfP dimension stored in the given measurement files."""
+    datasets = []
+    for file_path in file_paths:
+        with open(file_path, 'r') as fp:
+            data = json.load(fp)
+        sfp = data.get('search for peak') or {}
+        for dim_info in (sfp.get('fitting information') or {}).values():
+            if 'sampled positions' in dim_info and 'sampled power' in dim_info:
+                x, y = np.array(dim_info['sampled positions']), np.array(dim_info['sampled power'])
+                if len(x) > 4 and np.all(np.isfinite(y)):
+                    datasets.append((x, y))
+    return datasets
+
+
+def synthetic_datasets(n_datasets=200, seed=0):
+    """Stepped (21 points) and swept (500 points) SfP-like datasets with noise, in dBm over um."""
+    rng = np.random.default_rng(seed)
+    datasets = []
+    for idx in range(n_datasets):
+        n_points = 21 if idx % 2 == 0 else 500
+        x = np.linspace(-5, 5, n_points)
+        y = GaussianFit.gaussian(x, rng.uniform(5, 25), rng.uniform(-2.5, 2.5), rng.uniform(0.7, 3), -45)
+        datasets.append((x, y + rng.normal(0, 0.2, n_points)))
+    return datasets
+
+
+def legacy_fit(x, y):
+    """The fitting as done before: crude initial guess, numerical Jacobian."""
+    p0 = GaussianFit.crude_initial_guess(x, y)
+    popt, _ = curve_fit(GaussianFit.gaussian, x, y, p0=p0,
+                        bounds=(GaussianFit.LOWER_BOUNDS, GaussianFit.UPPER_BOUNDS),
+                        ftol=1e-8, maxfev=10000)
+    return popt
+
+
+def run_benchmark(datasets, repetitions=3):
+    def timed(fctn):
+        best = np.inf
+        for _ in range(repetitions):
+            t_start = time.perf_counter()
+            result = fctn()
+            best = min(best, time.perf_counter() - t_start)
+        return best, result
+
+    def fit_all(fit_fctn):
+        mus = []
+        for x, y in datasets:
+            try:
+                mus.append(fit_fctn(x, y)[1])
+            except RuntimeError:
+                mus.append(np.nan)
+        return np.array(mus)
+
+    t_legacy, mu_legacy = timed(lambda: fit_all(legacy_fit))
+    t_single, mu_single = timed(lambda: fit_all(lambda x, y: GaussianFit.fit_gaussian(x, y)[0]))
+    t_batch, (popt_batch, _, converged) = timed(
+        lambda: GaussianFit.fit_gaussians_batch([d[0] for d in datasets], [d[1] for d in datasets]))
+
+    print(f"{len(datasets)} datasets, best of {repetitions} runs")
+    print(f"  legacy curve_fit:         {t_legacy * 1e3:8.1f} ms, {np.sum(np.isnan(mu_legacy))} failed")
+    print(f"  analytic Jacobian:        {t_single * 1e3:8.1f} ms, {np.sum(np.isnan(mu_single))} failed, "
+          f"max peak deviation to legacy {np.nanmax(np.abs(mu_single - mu_legacy)):.2e} um")
+    print(f"  batch Levenberg-Marquardt:{t_batch * 1e3:8.1f} ms, {np.sum(~converged)} not converged, "
+          f"max peak deviation to legacy {np.nanmax(np.abs(popt_batch[:, 1] - mu_legacy)):.2e} um")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the Search for Peak gaussian fitting.")
+    parser.add_argument('files', nargs='*', help="measurement JSON files containing sampled SfP data")
+    args = parser.parse_args()
+
+    recorded = load_recorded_datasets(args.files)
+    if recorded:
+        print("Using recorded SfP datasets.")
+    else:
+        print("No recorded SfP datasets given, using synthetic datasets.")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', OptimizeWarning)
+        run_benchmark(recorded or synthetic_datasets())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import h5py
+import matplotlib.pyplot as plt
+import numpy as np
+
+
+def _save_thumbnail(file_path: str, image: np.ndarray, dpi: int) -> None:
+    plt.imsave(file_path, image, dpi=dpi)
+
+
+class ImageStackWriter:
+    """
+    Appendable on-disk storage for a stack of camera images.
+
+    Images are appended to a chunked HDF5 dataset whose first axis is resizable, so every call to `append` only writes
+    the new frame instead of rewriting the whole stack. PNG thumbnails are optionally encoded in a background thread
+    pool so that the acquisition thread does not wait for the image encoding.
+
+    Use as context manager or call `close()` when done, which waits for all pending thumbnails.
+    """
+
+    DATASET_NAME = "images"
+
+    def __init__(self, file_path: str, thumbnail_dir: str = None, thumbnail_dpi: int = 300, max_workers: int = 2):
+        """Constructor
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the HDF5 file to be created.
+        thumbnail_dir : str, optional
+            Directory where PNG thumbnails are written. No thumbnails are written if None.
+        thumbnail_dpi : int
+            Resolution of the PNG thumbnails.
+        max_workers : int
+            Number of threads used to encode thumbnails.
+        """
+        self.logger = logging.getLogger()
+
+        self.file_path = file_path
+        self.thumbnail_dir = thumbnail_dir
+        self.thumbnail_dpi = thumbnail_dpi
+
+        self._file = h5py.File(file_path, "w")
+        self._dataset = None
+        self._thumbnail_pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="ImageStackThumbnail") if thumbnail_dir is not None else None
+        self._thumbnail_futures = []
+
+    def __len__(self) -> int:
+        return 0 if self._dataset is None else self._dataset.shape[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append(self, image: np.ndarray) -> int:
+        """
+        Appends a single image to the stack and schedules its thumbnail.
+
+        All images of a stack must have the same shape and dtype as the first one.
+
+        Returns
+        -------
+        int
+            Index of the appended image in the stack.
+        """
+        if self._file is None:
+            raise RuntimeError("Image stack is already closed.")
+
+        image = np.asarray(image)
+
+        if self._dataset is None:
+            # one image per chunk keeps appends and single-frame reads cheap
+            self._dataset = self._file.create_dataset(
+                self.DATASET_NAME,
+                shape=(0,) + image.shape,
+                maxshape=(None,) + image.shape,
+                chunks=(1,) + image.shape,
+                dtype=image.dtype)
+        elif image.shape != self._dataset.shape[1:]:
+            raise ValueError(
+                f"Image of shape {image.shape} does not match the stack shape {self._dataset.shape[1:]}.")
+
+        index = self._dataset.shape[0]
+        self._dataset.resize(index + 1, axis=0)
+        self._dataset[index] = image
+        self._file.flush()
+
+        if self._thumbnail_pool is not None:
+            # the pool holds its own reference to the frame, so the caller may reuse its buffer
+            thumbnail_path = os.path.join(self.thumbnail_dir, f"img_{index + 1:03}.png")
+            self._thumbnail_futures.append(
+                self._thumbnail_pool.submit(_save_thumbnail, thumbnail_path, image.copy(), self.thumbnail_dpi))
+            self._collect_finished_thumbnails()
+
+        return index
+
+    def _collect_finished_thumbnails(self):
+        pending = []
+        for future in self._thumbnail_futures:
+            if not future.done():
+                pending.append(future)
+            elif future.exception() is not None:
+                self.logger.warning(f"Could not write image thumbnail: {future.exception()!r}")
+        self._thumbnail_futures = pending
+
+    def close(self):
+        """
+        Waits for all pending thumbnails and closes the HDF5 file.
+        """
+        if self._thumbnail_pool is not None:
+            self._thumbnail_pool.shutdown(wait=True)
+            self._collect_finished_thumbnails()
+            self._thumbnail_pool = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -12,16 +12,18 @@ import time
 from typing import Type
 
 import numpy as np
-from scipy.optimize import curve_fit
+from scipy.optimize import least_squares
 
 from LabExT.Measurements.MeasAPI import *
-from LabExT.Movement.MotorProfiles import trapezoidal_velocity_profile_by_integration
 from LabExT.Movement.MoverNew import MoverNew
 from LabExT.Movement.config import CoordinateSystem
 from LabExT.Movement.Transformations import StageCoordinate
+from LabExT.SearchForPeak import GaussianFit
+from LabExT.SearchForPeak.ResultCache import SfPResult, SfPResultCache
+from LabExT.SearchForPeak.SweepSampler import SweepSampler
 from LabExT.Utils import get_configuration_file_path
 from LabExT.View.Controls.PlotControl import PlotData
-from LabExT.ViewModel.Utilities.ObservableList import ObservableList
+from LabExT.ViewModel.Utilities.SnapshotChannel import SnapshotChannel
 
 
 class PeakSearcher(Measurement):
@@ -39,14 +41,22 @@ class PeakSearcher(Measurement):
     The Search for Peak measurement routine relies on the assumption that around the transmission maximum of a grating coupler, the transmission forms a 2D gaussian (w.r.t x and y position).
     Thus after having collected data for each axis, a 1D gaussian is fitted to the data and the stages are moved to the maximum of the gaussian.
 
-    There are two types of Search for Peak available:
+    There are four types of Search for Peak available:
     - **stepped SfP**: suitable for all types of fibers/fiber arrays and all power meter models. The given range is mechanically stepped over, the measurement
     stops at each point given by the `search step size` parameter, waits the time given by the `search fiber stabilization time` parameter to let fiber vibrations
     dissipate and then records a data point. This type is universally applicable but also very slow.
-    - **fast SfP**: suitable only for fiber arrays and the Keysight N7744a power meter models. The given range is mechanically continuously sweeped over, the power meter
-    collects regular data points (amount is given by `Number of points`). Those data points are then related to a physical position taking into account the acceleration
-    of the stages. This type of Search for Peak is significantly faster than the stepped SfP and provides the user with a massively increased amount of data.
-    At the moment, this type only works with the Keysight N7744a power meter. Usage with single mode fibers is possible, but untested.
+    - **swept SfP**: suitable for all types of fibers/fiber arrays and all power meter models. The given range is mechanically continuously sweeped over.
+    During the movement, the stage position and the power are read out concurrently in the background (amount of power samples is given by `Number of points`,
+    limited by the read-out speed of the power meter), each sample with a timestamp. The measured stage position at the time of each power sample is then
+    interpolated between the position samples, i.e. no model of the stage acceleration is required. This type of Search for Peak is significantly faster
+    than the stepped SfP and provides the user with a massively increased amount of data.
+    - **adaptive SfP**: suitable for all types of fibers/fiber arrays and all power meter models. Like the stepped SfP, the stages stop at every sample point,
+    but the sample points are chosen adaptively: after a coarse scan with few points, a gaussian is fitted after every new point and the next point is placed
+    where it reduces the uncertainty of the peak position most. The search of a dimension stops as soon as the estimated standard deviation of the peak position
+    falls below `Target peak uncertainty`, or when `Max number of points` is reached. This typically needs much fewer stage moves than the stepped SfP.
+    - **joint SfP**: suitable for all types of fibers/fiber arrays and all power meter models. Instead of optimizing every dimension separately, the stages
+    step along a space-filling pattern through all dimensions at once (a spiral for a single stage, a Lissajous curve for two stages). A single multivariate
+    gaussian with full covariance is fitted to all samples, such that coupled axes (e.g. tilted fibers) are optimized in one pass instead of repeated SfP runs.
 
 
     #### Example Setup
@@ -65,21 +75,52 @@ class PeakSearcher(Measurement):
 
     #### Power Meter Parameters
     - **Power Meter range**: range of the power in [dBm].
+    - **Number of power meter channels**: Number of power meters read at every sample, e.g. all output channels of a fiber array. The instrument roles
+    `Power Meter`, `Power Meter 2`, ... are used in this order.
+    - **Multi-channel objective**: How the channel powers are combined into the power maximized by the search, if several channels are read: `sum` maximizes
+    the total power, `min` the power of the weakest channel and `weighted` the weighted mean of the channel powers.
+    - **Multi-channel weights**: Comma separated weights of the channels for the `weighted` objective.
 
     #### Stage Parameters
     - **Search radius**: Radius arond the current position the algorithm sweeps over in [um].
-    - **SfP type**: Type of Search for Peak to use. Options are `stepped SfP` and `swept SfP`, see above for more detail.
+    - **SfP type**: Type of Search for Peak to use. Options are `stepped SfP`, `swept SfP`, `adaptive SfP` and `joint SfP`, see above for more detail.
     - **(stepped SfP only) Search step size**: Distance between every data point in [um].
     - **(stepped SfP only) Search fiber stabilization time**: Idle time between the stage having reached the target position and the measurement start. Meant to allow fiber oscillations to dissipate.
     - **(swept SfP only) Search time**: Time the mechanical movement across the set measurement range should take in [s].
-    - **(swept SfP only) Number of points**: Number of points to collect at the power meter for each separate sweep.
-
+    - **(swept SfP only) Number of points**: Number of points to collect at the power meter for each separate sweep. Fewer points are collected if the power meter cannot be read out fast enough.
+    - **(adaptive SfP only) Target peak uncertainty**: Standard deviation of the fitted peak position in [um] below which the search of a dimension stops.
+    - **(adaptive SfP only) Max number of points**: Maximum number of sample points per dimension.
+    - **(joint SfP only) Number of points**: Number of sample points along the space-filling pattern.
+
+    #### Result Cache Parameters
+    In automated sweeps, the results of previous searches are cached per device, see `search_for_peak_on_device`.
+    - **Result cache enabled**: Whether to use the cache in automated sweeps.
+    - **Result cache max age**: Time in [min] after which a cached result is discarded.
+    - **Result cache power tolerance**: If the power at the cached optimum is at most this much below the cached power in [dB], the search is skipped.
+    - **Result cache search radius**: Search radius in [um] when starting from a cached or predicted optimum.
+    - **Result cache temperature tolerance**: Temperature change in [K] after which a cached result is discarded. Only checked if a `Temperature Controller` is selected among the instruments (its driver must provide a `temperature` property) or a temperature source is set with `set_temperature_source`.
+
+    The swept, the adaptive and the joint SfP also use the `Search fiber stabilization time` of the stepped SfP.
     All parameters labelled `stepped SfP only` are ignored when choosing the swept SfP, all parameters labelled `swept SfP only` are ignored when choosing the stepped SfP.
     """
 
     DIMENSION_NAMES_TWO_STAGES = ['Left X', 'Left Y', 'Right X', 'Right Y']
     DIMENSION_NAMES_SINGLE_STAGE = ['X', 'Y']
 
+    SFP_DECISION_OPTIMIZED = 'Moving to optimized fiber location.'
+
+    # instrument roles of the power meter channels, e.g. of the outputs of a fiber array
+    POWER_METER_ROLES = ['Power Meter', 'Power Meter 2', 'Power Meter 3', 'Power Meter 4']
+
+    # optional instrument role reading the chip temperature for the result cache, only offered if configured
+    TEMPERATURE_ROLE = 'Temperature Controller'
+
+    # name of the swept SfP type in settings files saved by older versions
+    LEGACY_SWEPT_SFP_NAME = 'swept SfP (FA & N7744a PM models only)'
+
+    # maximum number of points used to plot a fitted gaussian
+    FIT_PLOT_POINTS = 200
+
     def __init__(
         self,
         *args,
@@ -103,15 +144,27 @@ class PeakSearcher(Measurement):
 
         self.logger = logging.getLogger()
 
-        # gather all plots for the plotting GUIs
-        self.plots_left = ObservableList()
-        self.plots_right = ObservableList()
+        # gather all plots for the plotting GUIs, these are only accessed from the thread executing the search. The
+        # GUI receives copies through the snapshot channel, such that the search never waits for the GUI thread.
+        self.plots_left = []
+        self.plots_right = []
+        self.plot_snapshots = SnapshotChannel()
 
         # chosen instruments for IL measurement
         self.instr_laser = None
         self.instr_powermeter = None
+        # all power meter channels read during the search, the first one is instr_powermeter
+        self.instr_powermeters = []
+        # channel powers read by _measure_objective since the last reset, for the results
+        self._channel_log = []
         self.initialized = False
 
+        # fitted gaussian widths of the last search per dimension, used to warm start the next fit
+        self._last_fitted_sigma = {}
+
+        # results of previous searches per device, used in automated sweeps
+        self.result_cache = SfPResultCache()
+
         self.logger.info(
             'Initialized Search for Peak with method: ' + str(self.name))
 
@@ -125,6 +178,37 @@ class PeakSearcher(Measurement):
         """
         self._experiment = experiment
 
+    def set_temperature_source(self, temperature_source):
+        """Sets the callable returning the current chip temperature, e.g. the reading of a TEC controller.
+
+        Cached Search for Peak results are discarded if the temperature changed by more than the
+        `Result cache temperature tolerance`. Set to None to ignore the temperature. `init_instruments` sets the
+        temperature controller as source if one is selected.
+        """
+        self.result_cache.temperature_source = temperature_source
+
+    def init_instruments(self):
+        """Instantiates the selected instruments, including the optional temperature controller."""
+        super().init_instruments()
+
+        if self.selected_instruments.get(self.TEMPERATURE_ROLE):
+            self._experiment_manager.instrument_api.create_instrument_obj(self.TEMPERATURE_ROLE,
+                                                                          self.selected_instruments,
+                                                                          self.instruments)
+            self.set_temperature_source(self._read_temperature)
+        elif self.result_cache.temperature_source == self._read_temperature:
+            # the temperature controller is no longer selected
+            self.set_temperature_source(None)
+
+        if not all(inst is not None for inst in self.instruments.values()):
+            raise RuntimeError('Instruments were not initialized correctly.')
+
+    def _read_temperature(self) -> float:
+        """Reads the `temperature` property of the temperature controller."""
+        temperature_controller = self.get_instrument(self.TEMPERATURE_ROLE)
+        temperature_controller.open()
+        return float(temperature_controller.temperature)
+
     @staticmethod
     def _gaussian(xdata, a, mu, sigma, offset):
         return a * np.exp(-(xdata - mu) ** 2 / (2 * sigma ** 2)) + offset
@@ -144,15 +228,20 @@ class PeakSearcher(Measurement):
 
         return [a_init, mu_init, sigma_init, offset_init]
 
-    def fit_gaussian(self, x_data, y_data):
+    def fit_gaussian(self, x_data, y_data, sigma_hint=None):
         """Fits a gaussian function of four parameters to the given x and y data.
 
+        Uses a closed-form log-parabola estimate as starting point and the analytic Jacobian, see `GaussianFit`.
+
         Parameters
         ----------
         x_data : np.ndarray
             the set of independent data points
         y_data : np.ndarray
             the set of dependent data points
+        sigma_hint : float, optional
+            width of a previous fit, the fit starts at this width if it explains the data better than the
+            closed-form estimate
 
         Returns
         -------
@@ -174,32 +263,12 @@ class PeakSearcher(Measurement):
         assert len(x_data) > 0
         assert len(y_data) > 0
 
-        pinit = PeakSearcher._gaussian_param_initial_guess(x_data, y_data)
-
-        # define bounds for the fitting parameters
-        a_bounds = (0, np.inf)  # allow only positive gaussians, i.e. hills, not valleys
-        mu_bounds = (-np.inf, np.inf)
-        sigma_bounds = (0, np.inf)
-        offset_bounds = (-np.inf, np.inf)
-
-        lower_bounds = (a_bounds[0], mu_bounds[0], sigma_bounds[0], offset_bounds[0])
-        upper_bounds = (a_bounds[1], mu_bounds[1], sigma_bounds[1], offset_bounds[1])
-
-        # fit a gaussian to the data
-        popt, cov = curve_fit(PeakSearcher._gaussian,
-                              x_data,
-                              y_data,
-                              p0=pinit,
-                              bounds=(lower_bounds, upper_bounds),
-                              ftol=1e-8,
-                              maxfev=10000)
+        popt, perr_std_dev = GaussianFit.fit_gaussian(x_data, y_data, sigma_hint=sigma_hint)
 
         self.logger.debug('Gaussian Fit:')
         self.logger.debug('a -- mu -- sigma -- offset')
         self.logger.debug(str(popt))
 
-        perr_std_dev = np.sqrt(np.diag(cov))
-
         return popt, perr_std_dev
 
     @staticmethod
@@ -208,55 +277,50 @@ class PeakSearcher(Measurement):
             'Laser wavelength': MeasParamInt(value=1550, unit='nm'),
             'Laser power': MeasParamFloat(value=0.0, unit='dBm'),
             'Power Meter range': MeasParamFloat(value=0.0, unit='dBm'),
+            'Number of power meter channels': MeasParamInt(value=1),
+            'Multi-channel objective': MeasParamList(options=['sum', 'min', 'weighted']),
+            'Multi-channel weights': MeasParamString(value='1,1,1,1'),
             'Search radius': MeasParamFloat(value=5.0, unit='um'),
-            'SfP type': MeasParamList(options=['stepped SfP', 'swept SfP (FA & N7744a PM models only)']),
+            'SfP type': MeasParamList(options=['stepped SfP', 'swept SfP', 'adaptive SfP', 'joint SfP']),
             '(stepped SfP only) Search step size': MeasParamFloat(value=0.5, unit='um'),
             '(stepped SfP only) Search fiber stabilization time': MeasParamInt(value=200, unit='ms'),
             '(swept SfP only) Search time': MeasParamFloat(value=2.0, unit='s'),
-            '(swept SfP only) Number of points': MeasParamInt(value=500)
+            '(swept SfP only) Number of points': MeasParamInt(value=500),
+            '(adaptive SfP only) Target peak uncertainty': MeasParamFloat(value=0.05, unit='um'),
+            '(adaptive SfP only) Max number of points': MeasParamInt(value=15),
+            '(joint SfP only) Number of points': MeasParamInt(value=60),
+            'Result cache enabled': MeasParamBool(value=False),
+            'Result cache max age': MeasParamFloat(value=30.0, unit='min'),
+            'Result cache power tolerance': MeasParamFloat(value=0.5, unit='dB'),
+            'Result cache search radius': MeasParamFloat(value=2.0, unit='um'),
+            'Result cache temperature tolerance': MeasParamFloat(value=0.5, unit='K')
         }
 
     @staticmethod
     def get_wanted_instrument():
-        return ['Laser', 'Power Meter']
+        return ['Laser'] + PeakSearcher.POWER_METER_ROLES
 
-    def search_for_peak(self):
+    def search_for_peak(self, radius: float = None):
         """Main Search For Peak routine
         Uses a 2D gaussian fit for all four dimensions.
 
+        Parameters
+        ----------
+        radius : float, optional
+            search radius in [um], overrides the `Search radius` parameter
+
         Returns
         -------
         dict
             A dict containing the parameters used for the SFP, the estimated through power,
             and gaussian fitting information.
         """
-        # double check if mover is actually enabled
-        if self.mover.left_calibration is None and self.mover.right_calibration is None:
-            raise RuntimeError(
-                "The Search for Peak requires at least one left or right stage configured.")
-
-        if self.mover.left_calibration and self.mover.right_calibration:
-            self._dimension_names = self.DIMENSION_NAMES_TWO_STAGES
-        else:
-            self._dimension_names = self.DIMENSION_NAMES_SINGLE_STAGE
-
-        # load laser and powermeter
-        self.instr_powermeter = self.get_instrument('Power Meter')
-        self.instr_laser = self.get_instrument('Laser')
-
-        # double check if instruments are initialized, otherwise throw error
-        if self.instr_powermeter is None:
-            raise RuntimeError('Search for Peak Power Meter not yet defined!')
-        if self.instr_laser is None:
-            raise RuntimeError('Search for Peak Laser not yet defined!')
+        self._prepare_stages_and_instruments()
 
         # initialize plotting
         self.plots_left.clear()
         self.plots_right.clear()
-
-        # open connection to instruments
-        self.instr_laser.open()
-        self.instr_powermeter.open()
+        self.publish_plots()
 
         self.logger.debug('Executing Search for Peak with the following parameters: {:s}'.format(
             "\n".join([str(name) + " = " + str(param.value) + " " + str(param.unit) for name, param in
@@ -275,27 +339,23 @@ class PeakSearcher(Measurement):
         }
         for param_name, cfg_param in self.parameters.items():
             results['parameter'][param_name] = str(cfg_param.value) + str(cfg_param.unit)
-
-        # send user specified parameters to instruments
-        self.instr_laser.wavelength = self.parameters['Laser wavelength'].value
-        self.instr_laser.power = self.parameters['Laser power'].value
-        self.instr_powermeter.unit = 'dBm'
-        self.instr_powermeter.wavelength = self.parameters['Laser wavelength'].value
-        self.instr_powermeter.range = self.parameters['Power Meter range'].value
+        if radius is not None:
+            results['parameter']['Search radius'] = str(radius) + str(self.parameters['Search radius'].unit)
 
         # get stage speed for later reference
         v0 = self.mover.speed_xy
         acc0 = self.mover.acceleration_xy
 
         # stop all previous logging
-        self.instr_powermeter.logging_stop()
+        for pm in self.instr_powermeters:
+            pm.logging_stop()
 
         # switch on laser
         with self.instr_laser:
             with self.mover.set_stages_coordinate_system(CoordinateSystem.STAGE):
                 # read parameters for SFP
                 sfp_type = self.parameters.get('SfP type').value
-                radius_us = self.parameters.get('Search radius').value
+                radius_us = radius if radius is not None else self.parameters.get('Search radius').value
 
                 # parameters specifically for stepped sfp
                 stepsize_us = self.parameters['(stepped SfP only) Search step size'].value
@@ -305,24 +365,22 @@ class PeakSearcher(Measurement):
                 t_sweep = self.parameters.get('(swept SfP only) Search time').value
                 no_points = int(self.parameters.get('(swept SfP only) Number of points').value)
 
+                # parameters specifically for adaptive SfP
+                target_uncertainty_um = self.parameters['(adaptive SfP only) Target peak uncertainty'].value
+                max_adaptive_points = int(self.parameters['(adaptive SfP only) Max number of points'].value)
+
+                # parameters specifically for joint SfP
+                joint_points = int(self.parameters['(joint SfP only) Number of points'].value)
+
                 # define parameters
                 # the sweep velocity is the distance passed (twice the search
                 # radius) divided by the sweep time
                 v_sweep_ums = 2 * radius_us / t_sweep
-                avg_time = t_sweep / float(no_points)
-                unit = 'dBm'
+                sample_interval = t_sweep / float(no_points)
 
                 # find the current positions of the stages as starting point for
                 # SFP
-                _left_start_coordinates = []
-                _right_start_coordinates = []
-                if self.mover.left_calibration:
-                    _left_start_coordinates = self.mover.left_calibration.get_position().to_list()[
-                        :2]
-                if self.mover.right_calibration:
-                    _right_start_coordinates = self.mover.right_calibration.get_position().to_list()[
-                        :2]
-                start_coordinates = _left_start_coordinates + _right_start_coordinates
+                start_coordinates = self.get_stage_coordinates()
                 current_coordinates = start_coordinates.copy()
 
                 self.logger.debug(f"Start Position: {start_coordinates}")
@@ -331,22 +389,31 @@ class PeakSearcher(Measurement):
 
                 # get start statistics
                 results['start location'] = start_coordinates.copy()
-                results['start through power'] = self.instr_powermeter.power
+                results['start through power'] = self._measure_objective()
+                if len(self.instr_powermeters) > 1:
+                    results['start channel powers'] = list(self._channel_log[-1])
 
-                # do sweep for every dimension
                 # color cycle strings for matplotlib
                 color_strings = ['C' + str(i) for i in range(10)]
-                for dimidx, p_start in enumerate(start_coordinates):
+
+                if sfp_type == 'joint SfP':
+                    # all dimensions are optimized at once, no per-dimension sweeps
+                    current_coordinates, estimated_through_power = self._joint_search(
+                        start_coordinates, radius_us, joint_points, pause_time_ms, color_strings, results)
+                    sweep_coordinates = []
+                else:
+                    sweep_coordinates = start_coordinates
+
+                # do sweep for every dimension
+                for dimidx, p_start in enumerate(sweep_coordinates):
 
                     dimension_name = self._dimension_names[dimidx]
+                    self._channel_log = []
 
                     # create new plotting dataset for measurement
-                    meas_plot = PlotData(ObservableList(), ObservableList(),
-                                        'scatter', color=color_strings[dimidx])
-                    fit_plot = PlotData(ObservableList(), ObservableList(),
-                                        color=color_strings[dimidx], label=dimension_name)
-                    opt_pos_plot = PlotData(ObservableList(), ObservableList(),
-                                            marker='x', markersize=10, color=color_strings[dimidx])
+                    meas_plot = PlotData([], [], 'scatter', color=color_strings[dimidx])
+                    fit_plot = PlotData([], [], color=color_strings[dimidx], label=dimension_name)
+                    opt_pos_plot = PlotData([], [], marker='x', markersize=10, color=color_strings[dimidx])
                     if dimidx < len(start_coordinates) / 2:
                         self.plots_left.append(meas_plot)
                         self.plots_left.append(fit_plot)
@@ -357,63 +424,32 @@ class PeakSearcher(Measurement):
                         self.plots_right.append(opt_pos_plot)
 
                     # differentiate between the two types of SfP
-                    if sfp_type == 'swept SfP (FA & N7744a PM models only)':
-                        allowed_pm_classes = ['PowerMeterN7744A', 'PowerMeterSimulator']
-                        # complain if user selects a Power Meter that is not
-                        # compatible with new Search for Peak
-                        if self.instr_powermeter.__class__.__name__ not in allowed_pm_classes:
-                            raise RuntimeError(
-                                'swept SfP is only compatible with Keysight N7744A PM models, not {}'.format(
-                                self.instr_powermeter.__class__.__name__))
-                        # move stage to initial position and setup
+                    if sfp_type in ('swept SfP', self.LEGACY_SWEPT_SFP_NAME):
+                        # move stage to initial position and let fiber-vibration die off
                         current_coordinates[dimidx] = p_start - radius_us
                         self._move_stages_absolute(current_coordinates)
+                        time.sleep(pause_time_ms / 1000)
 
-                        # setup power meter logging feature
-                        # autogain attribute exists only for N7744A, no effect on
-                        # other
-                        self.instr_powermeter.autogain = False
-                        self.instr_powermeter.range = self.parameters['Power Meter range'].value
-                        self.instr_powermeter.unit = unit
-                        self.instr_powermeter.averagetime = avg_time
-                        self.instr_powermeter.logging_setup(
-                            n_measurement_points=no_points,
-                            triggered=True,
-                            trigger_each_meas_separately=False)
-                        self.instr_powermeter.logging_start()
-
-                        # take a tiny break
-                        time.sleep(0.1)
+                        # sample the position of the swept axis and the power concurrently during the movement
+                        swept_stage, axis_idx = self._stage_and_axis_of_dimension(dimidx)
+                        sampler = SweepSampler(position_fctn=lambda: swept_stage.get_position()[axis_idx],
+                                               power_fctn=self._read_channel_powers,
+                                               sample_interval=sample_interval)
 
                         current_coordinates[dimidx] = p_start + radius_us
-                        # empirically determined acceleration
-                        acc_umps2 = 50
                         self.mover.speed_xy = v_sweep_ums
-                        self.mover.acceleration_xy = acc_umps2
-                        # start logging at powermeter
-                        self.instr_powermeter.trigger()
-                        # mover_time_lower = time.time()
-                        self._move_stages_absolute(current_coordinates)
-                        # mover_time_upper = time.time()
-
-                        while self.instr_powermeter.logging_busy():
-                            time.sleep(0.1)
-                        pm_data = self.instr_powermeter.logging_get_data()
-
-                        # pay attention to unit here
-                        IL_meas = pm_data
+                        with sampler:
+                            self._move_stages_absolute(current_coordinates)
 
-                        # calculate the estimated movement profile, given constant
-                        # acceleration of the stages
-                        _, d_range, _, _ = trapezoidal_velocity_profile_by_integration(start_position_m=-radius_us,
-                                                                                    stop_position_m=radius_us,
-                                                                                    max_speed_mps=v_sweep_ums,
-                                                                                    const_acceleration_mps2=acc_umps2,
-                                                                                    n_output_points=len(IL_meas))
+                        positions, channel_powers = sampler.aligned_samples()
+                        d_range = positions - p_start
+                        IL_meas = self.combine_channel_powers(channel_powers)
+                        self._channel_log = list(channel_powers)
 
                         # plot it
                         meas_plot.x = d_range
                         meas_plot.y = IL_meas
+                        self.publish_plots()
 
                     elif sfp_type == 'stepped SfP':
                         # create range of N measurement points from x-Delta to
@@ -434,18 +470,35 @@ class PeakSearcher(Measurement):
                             time.sleep(pause_time_ms / 1000)
 
                             # take IL measurement
-                            loss = self.instr_powermeter.power
+                            loss = self._measure_objective()
 
                             # save data
-                            # do not trigger plot update just yet
-                            meas_plot.x.extend([d_current])
+                            meas_plot.x.append(d_current)
                             meas_plot.y.append(loss)
+                            self.publish_plots()
 
                             IL_meas[measidx] = loss
 
+                    elif sfp_type == 'adaptive SfP':
+                        def measure_at(d_current):
+                            # move stages to currently probed coordinate and let fiber-vibration die off
+                            current_coordinates[dimidx] = d_current + p_start
+                            self._move_stages_absolute(current_coordinates)
+                            time.sleep(pause_time_ms / 1000)
+                            loss = self._measure_objective()
+                            meas_plot.x.append(d_current)
+                            meas_plot.y.append(loss)
+                            self.publish_plots()
+                            return loss
+
+                        d_range, IL_meas = self._adaptive_search(measure_at,
+                                                                 radius_us,
+                                                                 target_uncertainty_um,
+                                                                 max_adaptive_points)
+
                     else:
                         raise ValueError(
-                            'invalid SfP type given! Options are `stepped SfP` or `swept SfP`.')
+                            'invalid SfP type given! Options are `stepped SfP`, `swept SfP`, `adaptive SfP` or `joint SfP`.')
 
                     self.logger.debug('SFP results:')
                     self.logger.debug('coordinates:' + str(d_range))
@@ -467,7 +520,8 @@ class PeakSearcher(Measurement):
                         # 2nd decision: fit the gauss and see if it works
                         try:
                             popt, perr_std_dev = self.fit_gaussian(
-                                d_range, IL_meas)
+                                d_range, IL_meas, sigma_hint=self._last_fitted_sigma.get(dimension_name))
+                            self._last_fitted_sigma[dimension_name] = popt[2]
                             fit_msg = "Gauss fitting successful."
                         except RuntimeError:  # thrown from scipy optimizer if algorithm did not converge
                             # if convergence fails, we estimate the parameters crudly, i.e. just get the point with
@@ -484,29 +538,27 @@ class PeakSearcher(Measurement):
                             self.logger.warning(sfp_msg)
                         else:
                             optimized_target = d_best
-                            sfp_msg = f'Moving to optimized fiber location.'
+                            sfp_msg = self.SFP_DECISION_OPTIMIZED
 
                         # plot the gaussian, if gaussian was successfully fitted
                         if perr_std_dev is not None:
                             # interpolate between the fitted values to get a nice
                             # smooth line
                             d_range_highres = np.linspace(
-                                d_range.min(), d_range.max(), num=len(
-                                    meas_plot.x) * 5)
+                                d_range.min(), d_range.max(), num=min(len(
+                                    meas_plot.x) * 5, self.FIT_PLOT_POINTS))
                             IL_fit_fctn = PeakSearcher._gaussian(
                                 d_range_highres, *popt)
                             # plot fit data
                             fit_plot.x.extend(d_range_highres)
-                            fit_plot.y.extend(IL_fit_fctn[0:-1])
-                            # trigger plot update
-                            fit_plot.y.append(IL_fit_fctn[-1])
+                            fit_plot.y.extend(IL_fit_fctn)
 
                         # mark the point where we move to in any case
                         estimated_through_power = self._gaussian(
                             optimized_target, *popt)
-                        # do not trigger plot update just yet
-                        opt_pos_plot.x.extend([optimized_target])
+                        opt_pos_plot.x.append(optimized_target)
                         opt_pos_plot.y.append(estimated_through_power)
+                        self.publish_plots()
 
                     # inform user and store the fitting information
                     self.logger.debug(
@@ -519,7 +571,12 @@ class PeakSearcher(Measurement):
                         'optimized parameters': list(popt) if popt is not None else None,
                         'parameter estimation error std dev': list(perr_std_dev) if perr_std_dev is not None else None,
                         'fitter message': str(fit_msg),
-                        'sfp decision': str(sfp_msg)}
+                        'sfp decision': str(sfp_msg),
+                        'sampled positions': np.asarray(d_range).tolist(),
+                        'sampled power': np.asarray(IL_meas).tolist()}
+                    if len(self.instr_powermeters) > 1:
+                        results['fitting information'][dimension_name]['sampled channel power'] = \
+                            np.asarray(self._channel_log).tolist()
 
                     # reset speed and acceleration to original
                     self.mover.speed_xy = v0
@@ -531,7 +588,8 @@ class PeakSearcher(Measurement):
 
         # close instruments
         self.instr_laser.close()
-        self.instr_powermeter.close()
+        for pm in self.instr_powermeters:
+            pm.close()
 
         # save final result to log
         loc_str = " x ".join(["{:.3f}um".format(p)
@@ -546,6 +604,543 @@ class PeakSearcher(Measurement):
 
         return results
 
+    @staticmethod
+    def _multivariate_gaussian_unpack(params, n_dims):
+        a, offset = params[0], params[-1]
+        mu = params[1:1 + n_dims]
+        A = np.zeros((n_dims, n_dims))
+        A[np.triu_indices(n_dims)] = params[1 + n_dims:-1]
+        A = A + np.triu(A, 1).T
+        return a, mu, A, offset
+
+    @staticmethod
+    def _multivariate_gaussian(x_data, params):
+        """
+        Evaluates a * exp(-1/2 (x - mu)^T A (x - mu)) + offset for all rows of x_data, A being the precision matrix.
+        """
+        n_dims = x_data.shape[1]
+        a, mu, A, offset = PeakSearcher._multivariate_gaussian_unpack(params, n_dims)
+        dx = x_data - mu
+        q = np.einsum('ni,ij,nj->n', dx, A, dx)
+        return a * np.exp(-0.5 * q) + offset
+
+    @staticmethod
+    def _multivariate_gaussian_jacobian(x_data, params):
+        n_samples, n_dims = x_data.shape
+        a, mu, A, offset = PeakSearcher._multivariate_gaussian_unpack(params, n_dims)
+        dx = x_data - mu
+        Adx = dx @ A
+        e = np.exp(-0.5 * np.einsum('ni,ni->n', dx, Adx))
+        iu, ju = np.triu_indices(n_dims)
+        # off-diagonal elements of A appear twice in the quadratic form
+        weight = np.where(iu == ju, 0.5, 1.0)
+
+        jac = np.empty((n_samples, len(params)))
+        jac[:, 0] = e
+        jac[:, 1:1 + n_dims] = (a * e)[:, None] * Adx
+        jac[:, 1 + n_dims:-1] = -(a * e)[:, None] * weight * dx[:, iu] * dx[:, ju]
+        jac[:, -1] = 1.0
+        return jac
+
+    def fit_multivariate_gaussian(self, x_data, y_data, sigma_init):
+        """Fits a multivariate gaussian with full covariance to samples taken in several dimensions at once.
+
+        Parameters
+        ----------
+        x_data : np.ndarray
+            sample positions, shape (number of samples, number of dimensions)
+        y_data : np.ndarray
+            measured values at the sample positions
+        sigma_init : float
+            initial guess for the width of the gaussian in every dimension
+
+        Returns
+        -------
+        a: float
+            amplitude of gauss peak
+        mu: np.ndarray
+            position of the peak
+        A: np.ndarray
+            precision matrix, i.e. the inverse covariance matrix of the gaussian
+        offset: float
+            y-axis offset baseline
+        mu_std_dev: np.ndarray
+            estimated std deviations of the peak position
+
+        Raises
+        ------
+        RuntimeError: when the fit does not converge or the result is not a peak.
+        """
+        x_data = np.asarray(x_data, dtype=float)
+        y_data = np.asarray(y_data, dtype=float)
+        n_dims = x_data.shape[1]
+
+        best = np.argmax(y_data)
+        A_init = np.eye(n_dims) / sigma_init ** 2
+        p0 = np.concatenate([[y_data.max() - y_data.min()],
+                             x_data[best],
+                             A_init[np.triu_indices(n_dims)],
+                             [y_data.min()]])
+
+        sol = least_squares(lambda p: PeakSearcher._multivariate_gaussian(x_data, p) - y_data,
+                            p0,
+                            jac=lambda p: PeakSearcher._multivariate_gaussian_jacobian(x_data, p),
+                            ftol=1e-8,
+                            max_nfev=1000)
+        if not sol.success:
+            raise RuntimeError(f"Multivariate gauss fit did not converge: {sol.message}")
+
+        a, mu, A, offset = PeakSearcher._multivariate_gaussian_unpack(sol.x, n_dims)
+        if a <= 0 or np.any(np.linalg.eigvalsh(A) <= 0):
+            raise RuntimeError("Multivariate gauss fit did not result in a peak.")
+
+        # parameter covariance from the jacobian at the solution
+        dof = max(len(y_data) - len(sol.x), 1)
+        residual_variance = np.sum(sol.fun ** 2) / dof
+        cov = np.linalg.pinv(sol.jac.T @ sol.jac) * residual_variance
+        mu_std_dev = np.sqrt(np.abs(np.diag(cov)[1:1 + n_dims]))
+
+        return a, mu, A, offset, mu_std_dev
+
+    @staticmethod
+    def _space_filling_curve(n_dims, radius, n_points, oversampling=20):
+        """Returns the curve along which `_space_filling_pattern` samples, as oversampling * n_points points."""
+        t = np.linspace(0, 1, oversampling * n_points)
+        if n_dims == 2:
+            turns = max(np.sqrt(n_points / np.pi), 1)
+            theta = 2 * np.pi * turns * t
+            curve = np.stack([radius * t * np.cos(theta), radius * t * np.sin(theta)], axis=1)
+        else:
+            frequencies = 4 * np.array([3, 4, 5, 7, 8, 11][:n_dims])
+            phases = np.linspace(0, np.pi / 2, n_dims)
+            curve = radius * t[:, None] * np.sin(2 * np.pi * t[:, None] * frequencies + phases)
+        return curve
+
+    @staticmethod
+    def _space_filling_pattern(n_dims, radius, n_points):
+        """Returns n_points sample offsets, shape (n_points, n_dims), equally spaced along a continuous curve.
+
+        For two dimensions this is an archimedean spiral going outwards from the start point, for more dimensions a
+        Lissajous curve with pairwise different frequencies whose amplitude grows linearly from the start point to the
+        search radius. Both sample the region around the start point densely, where the peak is expected.
+        The samples are equally spaced in arc length along the curve, every coordinate stays within the radius.
+        """
+        curve = PeakSearcher._space_filling_curve(n_dims, radius, n_points)
+
+        # resample the curve at equal arc length distances
+        arc_length = np.concatenate([[0], np.cumsum(np.linalg.norm(np.diff(curve, axis=0), axis=1))])
+        targets = np.linspace(0, arc_length[-1], n_points)
+        return np.stack([np.interp(targets, arc_length, curve[:, i]) for i in range(n_dims)], axis=1)
+
+    def _joint_search(self, start_coordinates, radius, n_points, pause_time_ms, color_strings, results):
+        """Samples all dimensions along a space-filling pattern and moves to the peak of a joint gaussian fit.
+
+        Returns
+        -------
+        current_coordinates: list
+            final coordinates of the stages
+        estimated_through_power: float
+            power predicted by the fit at the final coordinates
+        """
+        n_dims = len(start_coordinates)
+        p_start = np.array(start_coordinates)
+        offsets = self._space_filling_pattern(n_dims, radius, n_points)
+
+        # one scatter plot per dimension of the power over the offset in this dimension
+        meas_plots, opt_pos_plots = [], []
+        for dimidx, dimension_name in enumerate(self._dimension_names):
+            meas_plot = PlotData([], [], 'scatter', color=color_strings[dimidx], label=dimension_name)
+            opt_pos_plot = PlotData([], [], marker='x', markersize=10, color=color_strings[dimidx])
+            target_plots = self.plots_left if dimidx < n_dims / 2 else self.plots_right
+            target_plots.append(meas_plot)
+            target_plots.append(opt_pos_plot)
+            meas_plots.append(meas_plot)
+            opt_pos_plots.append(opt_pos_plot)
+
+        self._channel_log = []
+        IL_meas = np.empty(n_points)
+        for measidx, offset in enumerate(offsets):
+            self._move_stages_absolute(list(p_start + offset))
+            time.sleep(pause_time_ms / 1000)
+            IL_meas[measidx] = self._measure_objective()
+            for dimidx, meas_plot in enumerate(meas_plots):
+                meas_plot.x.append(offset[dimidx])
+                meas_plot.y.append(IL_meas[measidx])
+            self.publish_plots()
+
+        self.logger.debug('Joint SFP results:')
+        self.logger.debug('coordinates:' + str(offsets))
+        self.logger.debug('IL: ' + str(IL_meas))
+
+        optimized_target = np.zeros(n_dims)
+        estimated_through_power = -99.0
+        fit_info = None
+        mu_std_dev = None
+        fit_msg = None
+
+        if not np.all(np.isfinite(IL_meas)):
+            sfp_msg = 'Joint SFP failed because not all measured IL values are finite.' + \
+                      ' Change of power meter range required. Moving back to start point.'
+            self.logger.warning(sfp_msg)
+        else:
+            try:
+                a, mu, A, offset, mu_std_dev = self.fit_multivariate_gaussian(offsets, IL_meas, radius / 2)
+                fit_info = [a, mu, A, offset]
+                fit_msg = "Multivariate gauss fitting successful."
+                d_best = mu
+            except (RuntimeError, np.linalg.LinAlgError) as exc:
+                fit_msg = f"{exc} Using point with maximum transmission."
+                self.logger.warning(fit_msg)
+                d_best = offsets[np.argmax(IL_meas)]
+
+            if np.max(np.abs(d_best)) > 1.5 * radius:
+                sfp_msg = 'Movement would be more than 1.5x search radius. Moving back to start point.'
+                self.logger.warning(sfp_msg)
+                estimated_through_power = results['start through power']
+            else:
+                optimized_target = d_best
+                sfp_msg = self.SFP_DECISION_OPTIMIZED
+                if fit_info is not None:
+                    estimated_through_power = float(self._multivariate_gaussian(
+                        optimized_target[None, :],
+                        np.concatenate([[a], mu, A[np.triu_indices(n_dims)], [offset]]))[0])
+                else:
+                    estimated_through_power = float(IL_meas.max())
+
+            for dimidx, opt_pos_plot in enumerate(opt_pos_plots):
+                opt_pos_plot.x.append(optimized_target[dimidx])
+                opt_pos_plot.y.append(estimated_through_power)
+            self.publish_plots()
+
+        self.logger.debug(
+            f"Joint search for peak finished. Fitter message: {fit_msg} -- SFP decision: {sfp_msg} "
+            f"Moving to location: {optimized_target}um with estimated through power"
+            f" of {estimated_through_power:.1f}dBm.")
+
+        results['fitting information']['joint'] = {
+            'optimized parameters': {
+                'a': fit_info[0],
+                'mu': list(fit_info[1]),
+                'precision matrix': fit_info[2].tolist(),
+                'offset': fit_info[3]
+            } if fit_info is not None else None,
+            'parameter estimation error std dev': list(mu_std_dev) if mu_std_dev is not None else None,
+            'fitter message': str(fit_msg),
+            'sfp decision': str(sfp_msg)}
+        if len(self.instr_powermeters) > 1:
+            results['fitting information']['joint']['sampled channel power'] = np.asarray(self._channel_log).tolist()
+
+        current_coordinates = list(p_start + optimized_target)
+        self._move_stages_absolute(current_coordinates)
+
+        return current_coordinates, estimated_through_power
+
+    ADAPTIVE_COARSE_POINTS = 5
+
+    def _adaptive_search(self, measure_at, radius, target_uncertainty, max_points):
+        """Samples one dimension adaptively until the peak position is known with the requested uncertainty.
+
+        Parameters
+        ----------
+        measure_at : callable
+            Moves to the given relative position in [um] and returns the measured power.
+        radius : float
+            Search radius in [um], all samples lie within [-radius, radius].
+        target_uncertainty : float
+            Stops as soon as the std deviation of the fitted peak position is below this value in [um].
+        max_points : int
+            Maximum number of samples.
+
+        Returns
+        -------
+        d_range: np.ndarray
+            sorted sample positions
+        IL_meas: np.ndarray
+            measured power at the sample positions
+        """
+        n_coarse = min(self.ADAPTIVE_COARSE_POINTS, max_points)
+        d_samples = list(np.linspace(-radius, radius, n_coarse))
+        il_samples = [measure_at(d) for d in d_samples]
+
+        while len(d_samples) < max_points and np.all(np.isfinite(il_samples)):
+            d_arr = np.array(d_samples)
+            il_arr = np.array(il_samples)
+            try:
+                popt, perr_std_dev = self.fit_gaussian(d_arr, il_arr)
+            except RuntimeError:
+                popt, perr_std_dev = None, None
+
+            fit_usable = popt is not None and abs(popt[1]) <= radius and np.isfinite(perr_std_dev[1])
+            if fit_usable and perr_std_dev[1] < target_uncertainty:
+                break
+
+            d_next = self._next_adaptive_sample(d_arr, il_arr, popt if fit_usable else None, radius,
+                                                target_uncertainty)
+            if d_next is None:
+                break
+            d_samples.append(d_next)
+            il_samples.append(measure_at(d_next))
+
+        order = np.argsort(d_samples)
+        return np.array(d_samples)[order], np.array(il_samples)[order]
+
+    @staticmethod
+    def _next_adaptive_sample(d_samples, il_samples, popt, radius, resolution):
+        """Returns the next position to sample or None if no useful position is left.
+
+        With a usable gaussian fit, the candidates are the fitted peak and its flanks at one sigma, where a sample
+        constrains the peak position most. Without one, the interval around the best sample is bisected, similar to
+        a golden-section search. Candidates closer than `resolution` to an existing sample are skipped.
+        """
+        if popt is not None:
+            mu, sigma = popt[1], popt[2]
+            candidates = [mu, mu - sigma, mu + sigma, mu - sigma / 2, mu + sigma / 2]
+        else:
+            order = np.argsort(d_samples)
+            d_sorted = d_samples[order]
+            best = int(np.argmax(il_samples[order]))
+            candidates = []
+            if best + 1 < len(d_sorted):
+                candidates.append((d_sorted[best] + d_sorted[best + 1]) / 2)
+            if best > 0:
+                candidates.append((d_sorted[best] + d_sorted[best - 1]) / 2)
+
+        for candidate in candidates:
+            candidate = float(np.clip(candidate, -radius, radius))
+            if np.min(np.abs(d_samples - candidate)) >= resolution:
+                return candidate
+        return None
+
+    def publish_plots(self):
+        """Publishes a copy of the current plots to `plot_snapshots`, never blocks."""
+        self.plot_snapshots.publish({
+            'left': [plot_data.snapshot() for plot_data in self.plots_left],
+            'right': [plot_data.snapshot() for plot_data in self.plots_right]
+        })
+
+    def _prepare_stages_and_instruments(self):
+        """Checks the stages, loads and opens laser and power meter and sends the user specified parameters."""
+        # double check if mover is actually enabled
+        if self.mover.left_calibration is None and self.mover.right_calibration is None:
+            raise RuntimeError(
+                "The Search for Peak requires at least one left or right stage configured.")
+
+        if self.mover.left_calibration and self.mover.right_calibration:
+            self._dimension_names = self.DIMENSION_NAMES_TWO_STAGES
+        else:
+            self._dimension_names = self.DIMENSION_NAMES_SINGLE_STAGE
+
+        # load laser and powermeters
+        n_channels = int(self.parameters['Number of power meter channels'].value)
+        if not 1 <= n_channels <= len(self.POWER_METER_ROLES):
+            raise ValueError(f'Number of power meter channels must be between 1 and {len(self.POWER_METER_ROLES)}.')
+        self.instr_powermeters = [self.get_instrument(role) for role in self.POWER_METER_ROLES[:n_channels]]
+        self.instr_powermeter = self.instr_powermeters[0]
+        self.instr_laser = self.get_instrument('Laser')
+
+        # double check if instruments are initialized, otherwise throw error
+        if any(pm is None for pm in self.instr_powermeters):
+            raise RuntimeError('Search for Peak Power Meter not yet defined!')
+        if self.instr_laser is None:
+            raise RuntimeError('Search for Peak Laser not yet defined!')
+
+        # open connection to instruments
+        self.instr_laser.open()
+        for pm in self.instr_powermeters:
+            pm.open()
+
+        # send user specified parameters to instruments
+        self.instr_laser.wavelength = self.parameters['Laser wavelength'].value
+        self.instr_laser.power = self.parameters['Laser power'].value
+        for pm in self.instr_powermeters:
+            pm.unit = 'dBm'
+            pm.wavelength = self.parameters['Laser wavelength'].value
+            pm.range = self.parameters['Power Meter range'].value
+
+    def _read_channel_powers(self) -> np.ndarray:
+        """Reads all power meter channels, in [dBm].
+
+        Power meters which read several detectors in a single transaction (`fetch_power_all`, e.g. PD10R detectors
+        sharing a LabJack) are read together, all others back-to-back.
+        """
+        powers = np.empty(len(self.instr_powermeters))
+        batches = {}
+        for idx, pm in enumerate(self.instr_powermeters):
+            if getattr(type(pm), 'fetch_power_all', None) is not None:
+                batches.setdefault(id(pm.lj), []).append(idx)
+            else:
+                powers[idx] = pm.power
+
+        for indices in batches.values():
+            pms = [self.instr_powermeters[idx] for idx in indices]
+            batch_powers = pms[0].fetch_power_all([pm.lj_port for pm in pms])
+            for idx, pm in zip(indices, pms):
+                powers[idx] = batch_powers[pm.lj_port]
+        return powers
+
+    def _measure_objective(self) -> float:
+        """Reads all power meter channels and returns the combined objective, see `combine_channel_powers`."""
+        channel_powers = self._read_channel_powers()
+        self._channel_log.append(channel_powers)
+        return float(self.combine_channel_powers(channel_powers))
+
+    def combine_channel_powers(self, channel_powers):
+        """Combines the powers of all channels to the objective maximized by the Search for Peak.
+
+        Parameters
+        ----------
+        channel_powers : array_like
+            powers in [dBm], the last axis iterates over the channels
+
+        Returns
+        -------
+        np.ndarray or float
+            `sum`: total power of all channels, `min`: power of the weakest channel, `weighted`: weighted mean of the
+            channel powers with the `Multi-channel weights`, all in [dBm]. For a single channel, this is its power.
+        """
+        channel_powers = np.asarray(channel_powers, dtype=float)
+        objective = self.parameters['Multi-channel objective'].value
+        if channel_powers.shape[-1] == 1:
+            return channel_powers[..., 0]
+        if objective == 'min':
+            return channel_powers.min(axis=-1)
+
+        linear_mW = 10 ** (channel_powers / 10)
+        if objective == 'sum':
+            return 10 * np.log10(linear_mW.sum(axis=-1))
+        if objective == 'weighted':
+            weights = np.array([float(w) for w in str(self.parameters['Multi-channel weights'].value).split(',')])
+            if len(weights) != channel_powers.shape[-1] or np.any(weights < 0) or weights.sum() <= 0:
+                raise ValueError('Multi-channel weights must be one non-negative number per power meter channel.')
+            return 10 * np.log10(linear_mW @ (weights / weights.sum()))
+        raise ValueError(f'invalid multi-channel objective {objective}! Options are `sum`, `min` or `weighted`.')
+
+    def get_stage_coordinates(self) -> list:
+        """Returns the x and y stage coordinates of all SfP dimensions, i.e. of the left and then the right stage."""
+        coordinates = []
+        with self.mover.set_stages_coordinate_system(CoordinateSystem.STAGE):
+            if self.mover.left_calibration:
+                coordinates += self.mover.left_calibration.get_position().to_list()[:2]
+            if self.mover.right_calibration:
+                coordinates += self.mover.right_calibration.get_position().to_list()[:2]
+        return coordinates
+
+    def measure_through_power(self) -> float:
+        """Switches on the laser and reads the power meter once at the current position of the stages."""
+        self._prepare_stages_and_instruments()
+        with self.instr_laser:
+            power = self._measure_objective()
+        self.instr_laser.close()
+        for pm in self.instr_powermeters:
+            pm.close()
+        return power
+
+    def search_for_peak_on_device(self, chip, device):
+        """Search for Peak on a device, reusing and updating the result cache.
+
+        Must be called right after the stages moved to the device. If the device has a valid cached result, the stages
+        move to the cached optimum and the Search for Peak is skipped if the power there is still within the
+        `Result cache power tolerance` of the cached power. Otherwise, the search starts from the cached optimum, from
+        the position the mover arrived at if it corrects device positions with its drift model, or from the offset
+        predicted from neighbouring devices, with the `Result cache search radius`. If this reduced
+        search does not find a peak within its radius, a search with the full radius follows.
+
+        Returns
+        -------
+        dict
+            The results dict of `search_for_peak`, or of the cached search if the search was skipped. The entry
+            'result cache' describes how the cache was used.
+        """
+        if not self.parameters['Result cache enabled'].value:
+            return self.search_for_peak()
+
+        self.result_cache.max_age = 60 * self.parameters['Result cache max age'].value
+        self.result_cache.max_temperature_change = self.parameters['Result cache temperature tolerance'].value
+        power_tolerance = self.parameters['Result cache power tolerance'].value
+        reduced_radius = self.parameters['Result cache search radius'].value
+
+        start_location = self.get_stage_coordinates()
+        cached = self.result_cache.lookup(chip, device, start_location)
+
+        if cached is not None:
+            warm_start = np.array(cached.optimized_location)
+            cache_usage = 'cached result'
+        elif self._drift_corrected_arrival():
+            # the mover already moved to the predicted optimum
+            warm_start = np.array(start_location)
+            cache_usage = 'drift corrected position'
+        else:
+            predicted_offset = self.result_cache.predict_offset(chip, device, len(start_location))
+            warm_start = None if predicted_offset is None else np.add(start_location, predicted_offset)
+            cache_usage = 'predicted offset' if warm_start is not None else 'not used'
+
+        if warm_start is not None and not np.array_equal(warm_start, start_location):
+            self._move_stages_absolute(warm_start.tolist())
+
+        if cached is not None:
+            power = self.measure_through_power()
+            if power >= cached.through_power - power_tolerance:
+                self.logger.info(f"Search for peak skipped: power of {power:.1f}dBm at cached optimum of "
+                                 f"device {device.id} is within tolerance of {cached.through_power:.1f}dBm.")
+                results = self._cached_results(cached, start_location, power)
+                results['result cache'] = 'cached result, search skipped'
+                return results
+
+        if warm_start is not None:
+            results = self.search_for_peak(radius=reduced_radius)
+            if not self.all_dimensions_optimized(results):
+                self.logger.info("Search for peak with reduced radius did not find the peak, searching again with "
+                                 "the full radius.")
+                results = self.search_for_peak()
+                cache_usage += ', full radius search required'
+        else:
+            results = self.search_for_peak()
+
+        if self.all_dimensions_optimized(results):
+            self.result_cache.store(chip, device, SfPResult(
+                start_location=start_location,
+                optimized_location=list(results['optimized location']),
+                through_power=float(results['optimized through power'])))
+        else:
+            self.result_cache.invalidate(chip, device)
+
+        results['result cache'] = cache_usage
+        return results
+
+    def _cached_results(self, cached: SfPResult, start_location: list, power: float) -> dict:
+        """Results dict of a skipped Search for Peak, in the same format as returned by `search_for_peak`."""
+        return {
+            'name': self.name,
+            'parameter': {n: str(p.value) + str(p.unit) for n, p in self.parameters.items()},
+            'start location': list(start_location),
+            'start through power': power,
+            'optimized location': list(cached.optimized_location),
+            'optimized through power': power,
+            'fitting information': {}
+        }
+
+    def _drift_corrected_arrival(self) -> bool:
+        """True if the mover corrects its device positions with a drift model fitted to previous searches."""
+        if not self.mover.drift_correction_enabled:
+            return False
+        calibrations = [c for c in (self.mover.left_calibration, self.mover.right_calibration) if c]
+        return any(self.mover.drift_model.n_samples(c.orientation) > 0 for c in calibrations)
+
+    @staticmethod
+    def all_dimensions_optimized(results: dict) -> bool:
+        """True if the Search for Peak moved to a fitted optimum in every dimension."""
+        infos = results['fitting information'].values()
+        return len(infos) > 0 and all(
+            info['sfp decision'] == PeakSearcher.SFP_DECISION_OPTIMIZED for info in infos)
+
+    def _stage_and_axis_of_dimension(self, dimidx: int):
+        """Returns the stage and the stage axis index (0: x, 1: y) which is moved in the given SfP dimension."""
+        if self.mover.left_calibration and self.mover.right_calibration:
+            calibration = self.mover.left_calibration if dimidx < 2 else self.mover.right_calibration
+        else:
+            calibration = self.mover.left_calibration or self.mover.right_calibration
+        return calibration.stage, dimidx % 2
+
     def _move_stages_absolute(self, coordinates: list):
         with self.mover.set_stages_coordinate_system(CoordinateSystem.STAGE):
             if self.mover.left_calibration and self.mover.right_calibration:
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class SfPResult:
+    """
+    Outcome of a Search for Peak on a single device.
+
+    Attributes
+    ----------
+    start_location: List[float]
+        stage coordinates of all SfP dimensions after the stages moved to the device
+    optimized_location: List[float]
+        stage coordinates of all SfP dimensions after the Search for Peak
+    through_power: float
+        power at the optimized location in [dBm]
+    device_position: List[float]
+        position of the device on the chip, used to find neighbouring devices
+    timestamp: float
+        time of the Search for Peak, as returned by time.time()
+    temperature: float, optional
+        temperature at the time of the Search for Peak, if a temperature source is configured
+    """
+
+    start_location: List[float]
+    optimized_location: List[float]
+    through_power: float
+    device_position: List[float] = field(default_factory=list)
+    timestamp: float = field(default_factory=time.time)
+    temperature: Optional[float] = None
+
+    @property
+    def offset(self) -> np.ndarray:
+        """Offset between the position the stages were moved to and the optimized position."""
+        return np.subtract(self.optimized_location, self.start_location)
+
+
+class SfPResultCache:
+    """
+    Cache of Search for Peak results, keyed by chip name and device id.
+
+    An entry is considered outdated if it is older than `max_age`, if the stages arrive at a position deviating more
+    than `max_start_deviation` from the position they arrived at when the entry was stored (e.g. after a
+    re-calibration or if the chip moved), or if the temperature changed by more than `max_temperature_change`. The
+    temperature is only checked if a `temperature_source` is set.
+
+    Devices of the same chip usually have similar offsets between the position the stages are moved to and the
+    optimal coupling position. `predict_offset` estimates this offset for devices without a valid entry from the
+    nearest devices with valid entries.
+    """
+
+    def __init__(self,
+                 max_age: float = 1800.0,
+                 max_start_deviation: float = 5.0,
+                 max_temperature_change: float = 0.5,
+                 temperature_source: Callable[[], float] = None,
+                 n_neighbours: int = 3) -> None:
+        """Constructor
+
+        Parameters
+        ----------
+        max_age : float
+            maximum age of a valid entry in [s]
+        max_start_deviation : float
+            maximum deviation of the arrival position in [um]
+        max_temperature_change : float
+            maximum temperature change in [K]
+        temperature_source : callable, optional
+            returns the current temperature
+        n_neighbours : int
+            number of devices used to predict the offset of a new device
+        """
+        self.max_age = max_age
+        self.max_start_deviation = max_start_deviation
+        self.max_temperature_change = max_temperature_change
+        self.temperature_source = temperature_source
+        self.n_neighbours = n_neighbours
+
+        self._entries: Dict[Tuple[str, str], SfPResult] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._entries
+
+    @staticmethod
+    def key(chip, device) -> Tuple[str, str]:
+        """Cache key of a device, chip may be None."""
+        return (chip.name if chip is not None else "", str(device.id))
+
+    def current_temperature(self) -> Optional[float]:
+        return self.temperature_source() if self.temperature_source is not None else None
+
+    def store(self, chip, device, result: SfPResult) -> None:
+        """Stores the result of a Search for Peak, replacing previous entries of the same device."""
+        if not result.device_position:
+            result.device_position = list(device.in_position)
+        if result.temperature is None:
+            result.temperature = self.current_temperature()
+        self._entries[self.key(chip, device)] = result
+
+    def is_valid(self, entry: SfPResult, start_location: List[float] = None, temperature: float = None) -> bool:
+        """Checks the invalidation policy for a single entry."""
+        if time.time() - entry.timestamp > self.max_age:
+            return False
+        if start_location is not None:
+            if len(start_location) != len(entry.start_location):
+                return False
+            if np.max(np.abs(np.subtract(start_location, entry.start_location))) > self.max_start_deviation:
+                return False
+        if temperature is not None and entry.temperature is not None:
+            if abs(temperature - entry.temperature) > self.max_temperature_change:
+                return False
+        return True
+
+    def lookup(self, chip, device, start_location: List[float] = None) -> Optional[SfPResult]:
+        """Returns the valid entry of the device, or None. Outdated entries are removed."""
+        key = self.key(chip, device)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not self.is_valid(entry, start_location, self.current_temperature()):
+            del self._entries[key]
+            return None
+        return entry
+
+    def predict_offset(self, chip, device, n_dimensions: int) -> Optional[np.ndarray]:
+        """Estimates the SfP offset of a device as inverse-distance weighted mean of its nearest cached neighbours.
+
+        Only valid entries on the same chip with the same number of SfP dimensions are considered. Returns None if
+        there are no such entries.
+        """
+        chip_name, _ = self.key(chip, device)
+        temperature = self.current_temperature()
+        neighbours = [e for (c, _), e in self._entries.items()
+                      if c == chip_name
+                      and len(e.start_location) == n_dimensions
+                      and self.is_valid(e, temperature=temperature)]
+        if not neighbours:
+            return None
+
+        position = np.asarray(device.in_position, dtype=float)
+        distances = np.array([np.linalg.norm(np.subtract(e.device_position, position))
+                              if len(e.device_position) == len(position) else np.inf for e in neighbours])
+        if np.all(np.isinf(distances)):
+            distances = np.ones(len(neighbours))
+        nearest = np.argsort(distances)[:self.n_neighbours]
+        weights = 1 / np.maximum(distances[nearest], 1.0)
+        offsets = np.array([neighbours[i].offset for i in nearest])
+        return np.average(offsets, axis=0, weights=weights)
+
+    def invalidate(self, chip=None, device=None) -> None:
+        """Removes the entry of a device, all entries of a chip if no device is given, or all entries."""
+        if device is not None:
+            self._entries.pop(self.key(chip, device), None)
+        elif chip is not None:
+            for key in [k for k in self._entries if k[0] == chip.name]:
+                del self._entries[key]
+        else:
+            self._entries.clear()
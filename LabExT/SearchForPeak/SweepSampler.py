@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import threading
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+
+class SweepSampler:
+    """
+    Samples a stage position and a power reading concurrently while the stage moves.
+
+    Two background threads call `position_fctn` and `power_fctn` in regular intervals and store every sample with the
+    time at the middle of the call. After the movement, `aligned_samples` interpolates the position at the time of
+    every power sample. This works with every stage and power meter, as only their plain read-out methods are used and
+    no hardware triggering or assumed motion profile is required.
+
+    Use as context manager around the movement:
+
+        sampler = SweepSampler(lambda: stage.get_position()[0], lambda: power_meter.power, 0.01)
+        with sampler:
+            stage.move_absolute(...)
+        positions, power = sampler.aligned_samples()
+    """
+
+    def __init__(self,
+                 position_fctn: Callable[[], float],
+                 power_fctn: Callable[[], float],
+                 sample_interval: float = 0.0) -> None:
+        """Constructor
+
+        Parameters
+        ----------
+        position_fctn : callable
+            returns the current position of the swept axis
+        power_fctn : callable
+            returns the current power reading, a float or an array of the powers of several channels
+        sample_interval : float
+            minimum time between two samples of the same quantity in [s], 0 to sample as fast as possible
+        """
+        self.position_fctn = position_fctn
+        self.power_fctn = power_fctn
+        self.sample_interval = sample_interval
+
+        self._position_samples: List[Tuple[float, np.ndarray]] = []
+        self._power_samples: List[Tuple[float, np.ndarray]] = []
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._errors: List[Exception] = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop(raise_errors=exc_type is None)
+
+    @staticmethod
+    def _timed_call(fctn: Callable[[], float]) -> Tuple[float, np.ndarray]:
+        t_before = time.perf_counter()
+        value = fctn()
+        t_after = time.perf_counter()
+        return 0.5 * (t_before + t_after), np.asarray(value, dtype=float)
+
+    def _sampling_loop(self, fctn: Callable[[], float], samples: List[Tuple[float, np.ndarray]]) -> None:
+        next_sample_time = time.perf_counter()
+        try:
+            while not self._stop_event.is_set():
+                samples.append(self._timed_call(fctn))
+                next_sample_time += self.sample_interval
+                delay = next_sample_time - time.perf_counter()
+                if delay > 0:
+                    self._stop_event.wait(delay)
+                else:
+                    # do not try to catch up if the read-out is slower than the sample interval
+                    next_sample_time = time.perf_counter()
+        except Exception as exc:
+            self._errors.append(exc)
+
+    def start(self) -> None:
+        """Clears previous samples and starts the sampling threads."""
+        if self._threads:
+            raise RuntimeError("Sampler is already running.")
+
+        self._position_samples = []
+        self._power_samples = []
+        self._errors = []
+        self._stop_event.clear()
+
+        # the position samples must enclose all power samples in time, hence sample the position once before
+        self._position_samples.append(self._timed_call(self.position_fctn))
+
+        self._threads = [
+            threading.Thread(target=self._sampling_loop, args=(self.position_fctn, self._position_samples),
+                             name="SweepSampler position", daemon=True),
+            threading.Thread(target=self._sampling_loop, args=(self.power_fctn, self._power_samples),
+                             name="SweepSampler power", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, raise_errors: bool = True) -> None:
+        """Stops the sampling threads and waits for them to finish.
+
+        Raises the first error which occurred in a sampling thread if `raise_errors` is set.
+        """
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+        if self._errors and raise_errors:
+            raise self._errors[0]
+
+        # and once after the last power sample
+        self._position_samples.append(self._timed_call(self.position_fctn))
+
+    def raw_samples(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the time stamps and values of the position and power samples separately.
+
+        The power values have an additional second axis if `power_fctn` returns arrays.
+        """
+        t_pos = np.array([t for t, _ in self._position_samples], dtype=float)
+        pos = np.array([v for _, v in self._position_samples], dtype=float)
+        t_pow = np.array([t for t, _ in self._power_samples], dtype=float)
+        power = np.array([v for _, v in self._power_samples], dtype=float)
+        return t_pos, pos, t_pow, power
+
+    def aligned_samples(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the power samples with the position of the stage at the time of each power sample.
+
+        Returns
+        -------
+        positions: np.ndarray
+            position linearly interpolated between the closest position samples
+        power: np.ndarray
+            power samples in the order they were taken
+        """
+        t_pos, pos, t_pow, power = self.raw_samples()
+        if len(t_pos) < 2:
+            raise RuntimeError("At least two position samples are required to align the power samples.")
+
+        inside = (t_pow >= t_pos[0]) & (t_pow <= t_pos[-1])
+        return np.interp(t_pow[inside], t_pos, pos), power[inside]
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import unittest
+from concurrent.futures import Future
+from unittest.mock import Mock, patch
+
+from LabExT.Experiments.StandardExperiment import StandardExperiment
+from LabExT.Experiments.ToDo import ToDo
+from LabExT.Wafer.Device import Device
+
+
+class CollectPostProcessingResultsTest(unittest.TestCase):
+    """
+    Tests for the registration of ToDos processed by the post-processing worker of an experiment.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        self.experiment = Mock(spec=StandardExperiment)
+        self.experiment._post_processing_futures = []
+        self.experiment.logger = Mock()
+        self.experiment._experiment_manager = Mock()
+        self.next_todo = self.make_todo(2)
+        self.experiment.to_do_list = [self.next_todo]
+
+        messagebox_patcher = patch("LabExT.Experiments.StandardExperiment.messagebox")
+        self.messagebox = messagebox_patcher.start()
+        self.addCleanup(messagebox_patcher.stop)
+
+    @staticmethod
+    def make_todo(idx):
+        device = Device(id=str(idx), type="test", in_position=[0, 0], out_position=[100, 0])
+        return ToDo(device, Mock(get_name_with_id=Mock(return_value=f"Measurement {idx}")))
+
+    def add_result(self, todo, processed, done=True):
+        future = Future()
+        if done:
+            future.set_result((todo, {}, "path", "path.json", processed))
+        self.experiment._post_processing_futures.append(future)
+        return future
+
+    def collect(self, wait=False):
+        return StandardExperiment.collect_post_processing_results(self.experiment, wait=wait)
+
+    def test_processed_todos_are_loaded_in_order(self):
+        todos = [self.make_todo(0), self.make_todo(1)]
+        for todo in todos:
+            self.add_result(todo, processed=True)
+
+        self.assertTrue(self.collect())
+
+        registered = [c[0][0] for c in self.experiment._register_saved_measurement.call_args_list]
+        self.assertEqual(registered, todos)
+        self.assertEqual(self.experiment.to_do_list, [self.next_todo])
+        self.experiment.update.assert_called_once_with(plot_new_meas=True)
+
+    def test_unfinished_results_are_left_for_later(self):
+        self.add_result(self.make_todo(0), processed=True, done=False)
+
+        self.assertTrue(self.collect())
+
+        self.experiment._register_saved_measurement.assert_not_called()
+        self.assertEqual(len(self.experiment._post_processing_futures), 1)
+
+    def test_failed_post_processing_requeues_todo_and_pauses(self):
+        failed_todo = self.make_todo(0)
+        self.add_result(failed_todo, processed=False)
+
+        self.assertFalse(self.collect())
+
+        self.experiment._register_saved_measurement.assert_called_once_with(
+            failed_todo, {}, "path", "path.json", load_dataset=False)
+        self.assertEqual(self.experiment.to_do_list, [failed_todo, self.next_todo])
+        self.experiment._experiment_manager.main_window.model.var_mm_pause.set.assert_called_once_with(True)
+        self.messagebox.showinfo.assert_called_once()
+
+    def test_run_registers_results_after_error(self):
+        self.experiment._run_to_do_list.side_effect = RuntimeError("stage error")
+
+        with self.assertRaises(RuntimeError):
+            StandardExperiment.run(self.experiment)
+
+        self.experiment.wait_for_post_processing.assert_called_once()
+        self.assertFalse(self.experiment.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import unittest
+from itertools import permutations
+from unittest.mock import Mock
+
+import numpy as np
+from parameterized import parameterized
+
+from LabExT.Experiments.StandardExperiment import StandardExperiment
+from LabExT.Experiments.ToDo import ToDo
+from LabExT.Experiments.ToDoOrdering import ToDoQueueOptimizer, travel_time
+from LabExT.Wafer.Device import Device
+
+
+def make_device(idx, x, y):
+    return Device(id=str(idx), type="test", in_position=[x, y], out_position=[x + 1000, y])
+
+
+def make_todo(device, pinned=False):
+    return ToDo(device, Mock(), pinned=pinned)
+
+
+class TravelTimeTest(unittest.TestCase):
+    """
+    Tests for the travel time of the trapezoidal velocity profile.
+
+    Required lab setup: none, only SW testing
+    """
+
+    @parameterized.expand([
+        (0.0, 0.0),
+        # triangular profile, the maximum speed is not reached
+        (25.0, 1.0),
+        # trapezoidal profile, 1s each for accelerating and decelerating over 50um, 1s for 100um at full speed
+        (200.0, 3.0),
+    ])
+    def test_travel_time(self, distance, expected):
+        self.assertAlmostEqual(float(travel_time(distance, speed=100.0, acceleration=100.0)), expected)
+
+    def test_without_acceleration_limit(self):
+        np.testing.assert_allclose(travel_time([0, 50, 200], speed=100.0, acceleration=0), [0, 0.5, 2.0])
+
+
+class ToDoQueueOptimizerTest(unittest.TestCase):
+    """
+    Tests for the reordering of the ToDo queue.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        self.optimizer = ToDoQueueOptimizer(speed_xy=200.0, acceleration_xy=50.0)
+
+    def test_zig_zag_row_is_sorted(self):
+        devices = [make_device(i, x, 0) for i, x in enumerate([0, 4000, 1000, 3000, 2000])]
+        todos = [make_todo(d) for d in devices]
+
+        ordered = self.optimizer.optimize(todos, start_device=devices[0])
+
+        self.assertEqual([t.device.id for t in ordered], ['0', '2', '4', '3', '1'])
+        self.assertLess(self.optimizer.total_travel_time(ordered), self.optimizer.total_travel_time(todos))
+
+    def test_finds_optimal_order_of_small_queue(self):
+        rng = np.random.default_rng(3)
+        devices = [make_device(i, *rng.uniform(0, 10000, 2)) for i in range(7)]
+        todos = [make_todo(d) for d in devices]
+
+        ordered = self.optimizer.optimize(todos, start_device=devices[0])
+
+        optimum = min(self.optimizer.total_travel_time(list(order), start_device=devices[0])
+                      for order in permutations(todos))
+        self.assertLessEqual(self.optimizer.total_travel_time(ordered, start_device=devices[0]), optimum * 1.05)
+
+    def test_todos_of_a_device_stay_together_in_order(self):
+        far, near = make_device(0, 5000, 0), make_device(1, 0, 0)
+        todos = [make_todo(far), make_todo(near), make_todo(far), make_todo(near)]
+
+        ordered = self.optimizer.optimize(todos, start_device=near)
+
+        self.assertEqual(ordered, [todos[1], todos[3], todos[0], todos[2]])
+
+    def test_pinned_todos_keep_their_place(self):
+        devices = [make_device(i, x, 0) for i, x in enumerate([3000, 0, 2000, 1000, 5000, 4000])]
+        todos = [make_todo(d) for d in devices]
+        todos[2].pinned = True
+
+        ordered = self.optimizer.optimize(todos)
+
+        self.assertIs(ordered[2], todos[2])
+        self.assertCountEqual(ordered[:2], todos[:2])
+        self.assertCountEqual(ordered[3:], todos[3:])
+        self.assertEqual([t.device.id for t in ordered[3:]], ['3', '5', '4'])
+
+    def test_device_without_position_raises(self):
+        todos = [make_todo(make_device(0, 0, 0)), make_todo(Device(id="1", type="test"))]
+
+        with self.assertRaises(ValueError):
+            self.optimizer.optimize(todos)
+
+
+class OptimizeToDoListTest(unittest.TestCase):
+    """
+    Tests for the reordering of the ToDo queue of an experiment.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        devices = [make_device(i, x, 0) for i, x in enumerate([0, 4000, 1000, 3000, 2000])]
+        self.todos = [make_todo(d) for d in devices]
+        self.experiment = Mock(spec=StandardExperiment)
+        self.experiment.to_do_list = list(self.todos)
+        self.experiment.last_executed_todos = []
+        self.experiment._mover = Mock(speed_xy=200.0, acceleration_xy=50.0)
+        self.experiment.logger = Mock()
+
+    def test_reorders_to_do_list_in_place(self):
+        to_do_list = self.experiment.to_do_list
+        self.experiment.running = False
+
+        StandardExperiment.optimize_to_do_list(self.experiment)
+
+        self.assertIs(self.experiment.to_do_list, to_do_list)
+        self.assertEqual([t.device.id for t in to_do_list], ['0', '2', '4', '3', '1'])
+
+    def test_running_to_do_keeps_its_place(self):
+        # the experiment is measuring the ToDo of the far device
+        self.experiment.to_do_list.insert(0, self.experiment.to_do_list.pop(1))
+        self.experiment.running = True
+
+        StandardExperiment.optimize_to_do_list(self.experiment)
+
+        self.assertIs(self.experiment.to_do_list[0], self.todos[1])
+        self.assertEqual([t.device.id for t in self.experiment.to_do_list], ['1', '3', '4', '2', '0'])
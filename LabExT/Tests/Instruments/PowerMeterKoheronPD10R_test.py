@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import importlib
+import sys
+import unittest
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+
+class PowerMeterKoheronPD10RTest(unittest.TestCase):
+    """
+    Tests for the PD10R detectors read out through a LabJack, with the LabJack library mocked.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        self.ljm = Mock()
+        self.ljm.openS.side_effect = [1, 2, 3]
+        modules_patcher = patch.dict(sys.modules, {'labjack': Mock(ljm=self.ljm), 'labjack.ljm': self.ljm})
+        modules_patcher.start()
+        self.addCleanup(modules_patcher.stop)
+
+        # import the drivers against the mocked library, patch.dict drops them again after the test
+        sys.modules.pop('LabExT.Instruments.LabJack', None)
+        sys.modules.pop('LabExT.Instruments.PowerMeterKoheronPD10R', None)
+        self.LabJack = importlib.import_module('LabExT.Instruments.LabJack').LabJack
+        self.PD10R = importlib.import_module('LabExT.Instruments.PowerMeterKoheronPD10R').PowerMeterKoheronPD10R
+
+    def make_pm(self, port, **kwargs):
+        pm = self.PD10R(visa_address=None, lj_port=port, **kwargs)
+        pm.open()
+        self.addCleanup(pm.close)
+        return pm
+
+    def test_read_from_ports_reshapes_samples(self):
+        self.ljm.eReadNames.return_value = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+        lj = self.LabJack()
+
+        values = lj.read_from_ports(["AIN0", "AIN1"], n_samples=3)
+
+        self.ljm.eReadNames.assert_called_once_with(1, 6, ["AIN0", "AIN1"] * 3)
+        np.testing.assert_array_equal(values, [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+
+    def test_read_from_ports_single_sample(self):
+        self.ljm.eReadNames.return_value = [0.5, 0.7, 0.9]
+        lj = self.LabJack()
+
+        values = lj.read_from_ports(["AIN0", "AIN1", "AIN2"])
+
+        self.assertEqual(values.shape, (1, 3))
+        np.testing.assert_array_equal(values[0], [0.5, 0.7, 0.9])
+
+    def test_voltage_to_dBm_scalar(self):
+        self.assertEqual(self.PD10R.voltage_to_dBm(2.11), 0.0)
+        self.assertIsInstance(self.PD10R.voltage_to_dBm(2.11), float)
+        self.assertAlmostEqual(self.PD10R.voltage_to_dBm(1.81), -10.0)
+
+    def test_voltage_to_dBm_array(self):
+        voltages = np.array([[2.11, 1.81], [1.51, 2.41]])
+        np.testing.assert_allclose(self.PD10R.voltage_to_dBm(voltages), [[0.0, -10.0], [-20.0, 10.0]])
+        np.testing.assert_allclose(self.PD10R.voltage_to_dBm([2.11, 1.81]), [0.0, -10.0])
+
+    def test_fetch_power_averages_burst_in_dBm(self):
+        pm = self.make_pm("AIN0", averaging_samples=2)
+        self.ljm.eReadNames.return_value = [1.81, 2.41]
+
+        self.assertAlmostEqual(pm.fetch_power(), 0.0)
+        self.ljm.eReadNames.assert_called_once_with(1, 2, ["AIN0", "AIN0"])
+
+    def test_instances_share_one_handle(self):
+        pm_1 = self.make_pm("AIN0")
+        pm_2 = self.make_pm("AIN1")
+
+        self.assertIs(pm_1.lj, pm_2.lj)
+        self.ljm.openS.assert_called_once()
+        self.assertEqual(pm_1.lj.ports, ["AIN0", "AIN1"])
+
+    def test_fetch_power_all_reads_registered_ports_at_once(self):
+        pm_1 = self.make_pm("AIN0")
+        self.make_pm("AIN1")
+        self.ljm.eReadNames.return_value = [2.11, 1.81]
+
+        powers = pm_1.fetch_power_all()
+        self.assertEqual(list(powers), ["AIN0", "AIN1"])
+        np.testing.assert_allclose(list(powers.values()), [0.0, -10.0], atol=1e-12)
+        self.ljm.eReadNames.assert_called_once_with(1, 2, ["AIN0", "AIN1"])
+
+    def test_closing_one_instance_keeps_the_others_port(self):
+        pm_1 = self.make_pm("AIN0")
+        pm_2 = self.make_pm("AIN1")
+        lj = pm_1.lj
+
+        pm_1.close()
+
+        self.assertIsNone(pm_1.lj)
+        self.assertEqual(lj.ports, ["AIN1"])
+        self.ljm.close.assert_not_called()
+        self.ljm.eReadNames.return_value = [1.81]
+        self.assertAlmostEqual(pm_2.fetch_power_all()["AIN1"], -10.0)
+        self.ljm.eReadNames.assert_called_once_with(1, 1, ["AIN1"])
+
+    def test_last_close_releases_the_handle(self):
+        pm_1 = self.make_pm("AIN0")
+        pm_2 = self.make_pm("AIN1")
+
+        pm_1.close()
+        pm_2.close()
+        self.ljm.close.assert_called_once_with(1)
+
+        # reopening connects anew instead of using the closed handle
+        pm_1.open()
+        self.assertEqual(pm_1.lj.handle, 2)
+        self.assertEqual(self.ljm.openS.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
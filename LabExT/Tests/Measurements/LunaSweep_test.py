@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import unittest
+
+import numpy as np
+
+from LabExT.Measurements.Luna_sweep import Luna_sweep
+
+
+def graph_data(x_axis, *traces):
+    """OVA graph data with shape (number of traces, 2, number of points)."""
+    return np.array([[x_axis, trace] for trace in traces])
+
+
+class LunaSweepValuesTest(unittest.TestCase):
+    """
+    Tests for the conversion of the OVA graph data into measurement values.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        self.wavelength = np.linspace(1549, 1551, 5)
+        self.time = np.linspace(0, 8, 5)
+
+    def test_single_type(self):
+        values = Luna_sweep.values_from_results(
+            {"INSERTION_LOSS": graph_data(self.wavelength, -np.ones(5))}, "INSERTION_LOSS")
+
+        self.assertEqual(list(values), ['wavelength [nm]', 'Insertion Loss (dB)'])
+        np.testing.assert_array_equal(values['wavelength [nm]'], self.wavelength)
+
+    def test_types_with_own_x_axis_keep_it(self):
+        results = {
+            "INSERTION_LOSS": graph_data(self.wavelength, -np.ones(5)),
+            "MIN_MAX_LOSS": graph_data(self.wavelength, -np.ones(5), -2 * np.ones(5)),
+            "TIME_DOMAIN_AMPLITUDE": graph_data(self.time, np.arange(5)),
+            "TIME_DOMAIN_WAVELENGTH": graph_data(self.time[:3], np.arange(3)),
+        }
+
+        values = Luna_sweep.values_from_results(results, "INSERTION_LOSS")
+
+        np.testing.assert_array_equal(values['wavelength [nm]'], self.wavelength)
+        np.testing.assert_array_equal(values['x-axis TIME_DOMAIN_AMPLITUDE'], self.time)
+        np.testing.assert_array_equal(values['x-axis TIME_DOMAIN_WAVELENGTH'], self.time[:3])
+        self.assertNotIn('x-axis MIN_MAX_LOSS', values)
+        self.assertNotIn('x-axis INSERTION_LOSS', values)
+        np.testing.assert_array_equal(values['Max Insertion Loss (dB)'], -2 * np.ones(5))
+        np.testing.assert_array_equal(values['Time Domain Wavelength (nm)'], np.arange(3))
+
+    def test_plotted_type_defines_wavelength_axis(self):
+        results = {
+            "INSERTION_LOSS": graph_data(self.wavelength, -np.ones(5)),
+            "TIME_DOMAIN_AMPLITUDE": graph_data(self.time, np.arange(5)),
+        }
+
+        values = Luna_sweep.values_from_results(results, "TIME_DOMAIN_AMPLITUDE")
+
+        np.testing.assert_array_equal(values['wavelength [nm]'], self.time)
+        np.testing.assert_array_equal(values['x-axis INSERTION_LOSS'], self.wavelength)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+
+from LabExT.Measurements.MeasAPI import Measurement, PostProcessingPipeline, UnitConversion, WattToDBm, \
+    Decimation, MovingAverage, BaselineSubtraction, PeakExtraction
+
+
+class PostProcessingPipelineTest(unittest.TestCase):
+    """
+    Tests for the post-processing pipeline of the measurement API.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        self.values = OrderedDict()
+        self.values['wavelength [nm]'] = np.linspace(1500, 1600, 101).tolist()
+        self.values['power [W]'] = (1e-3 * np.exp(-(np.linspace(-5, 5, 101) ** 2))).tolist()
+        self.values['comment'] = ['not', 'numeric']
+
+    def test_empty_pipeline_returns_unchanged_values(self):
+        result = PostProcessingPipeline()(self.values)
+
+        self.assertEqual(list(result.keys()), list(self.values.keys()))
+        self.assertEqual(result['power [W]'], self.values['power [W]'])
+        self.assertEqual(result['comment'], ['not', 'numeric'])
+
+    def test_result_is_json_compatible(self):
+        result = PostProcessingPipeline([WattToDBm(['power [W]'])])(self.values)
+
+        self.assertIsInstance(result['power [W]'], list)
+        self.assertIsInstance(result['power [W]'][0], float)
+
+    def test_unit_conversion_keeps_original_with_new_keys(self):
+        pipeline = PostProcessingPipeline([
+            UnitConversion(['power [W]'], lambda p: p * 1e3, new_keys=['power [mW]'])
+        ])
+        result = pipeline(self.values)
+
+        self.assertEqual(list(result.keys())[-1], 'power [mW]')
+        np.testing.assert_allclose(result['power [mW]'], np.array(self.values['power [W]']) * 1e3)
+        self.assertEqual(result['power [W]'], self.values['power [W]'])
+
+    def test_watt_to_dbm(self):
+        result = PostProcessingPipeline([WattToDBm(['power [W]'])])(self.values)
+
+        self.assertAlmostEqual(max(result['power [W]']), 0.0)
+
+    def test_decimation_of_all_vectors(self):
+        result = PostProcessingPipeline([Decimation(10)])(self.values)
+
+        self.assertEqual(len(result['wavelength [nm]']), 11)
+        self.assertEqual(len(result['power [W]']), 11)
+        self.assertEqual(result['wavelength [nm]'][1], self.values['wavelength [nm]'][10])
+
+    def test_moving_average_preserves_length_and_constants(self):
+        values = {'y': [2.0] * 20}
+        result = PostProcessingPipeline([MovingAverage(5, ['y'])])(values)
+
+        np.testing.assert_allclose(result['y'], [2.0] * 20)
+
+    def test_baseline_subtraction_removes_linear_trend(self):
+        x = np.linspace(0, 1, 50)
+        values = {'x': x.tolist(), 'y': (3 * x + 1).tolist()}
+        result = PostProcessingPipeline([BaselineSubtraction(['y'], degree=1, x_key='x')])(values)
+
+        np.testing.assert_allclose(result['y'], np.zeros(50), atol=1e-12)
+
+    def test_stages_are_chained_in_order(self):
+        pipeline = PostProcessingPipeline([
+            WattToDBm(['power [W]'], new_keys=['power [dBm]']),
+            PeakExtraction('wavelength [nm]', 'power [dBm]')
+        ])
+        result = pipeline(self.values)
+
+        self.assertEqual(result['power [dBm] peak wavelength [nm]'], [1550.0])
+        self.assertAlmostEqual(result['power [dBm] peak value'][0], 0.0)
+
+    def test_measurement_post_process_default_is_noop(self):
+        data = Measurement.setup_return_dict()
+        data['values']['y'] = [1, 2, 3]
+
+        Measurement().post_process(data)
+
+        self.assertEqual(data['values']['y'], [1, 2, 3])
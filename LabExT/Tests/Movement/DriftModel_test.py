@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2022  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import unittest
+
+import numpy as np
+
+from LabExT.Movement.config import Orientation
+from LabExT.Movement.DriftModel import DriftModel
+
+
+class DriftModelTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = DriftModel(memory=1e9, min_samples_tilt=3, min_samples_drift=6, min_drift_time_span=60)
+        self.positions = [[0, 0], [1000, 0], [0, 1000], [1000, 1000], [500, 500], [200, 800]]
+
+    def test_prediction_without_samples_is_zero(self):
+        np.testing.assert_array_equal(self.model.predict(Orientation.LEFT, [0, 0]), [0, 0])
+
+    def test_single_sample_gives_constant_offset(self):
+        self.model.add_residual(Orientation.LEFT, [0, 0], [1.5, -2], timestamp=0)
+
+        np.testing.assert_allclose(self.model.predict(Orientation.LEFT, [3000, 3000], timestamp=0), [1.5, -2])
+        np.testing.assert_array_equal(self.model.predict(Orientation.RIGHT, [0, 0], timestamp=0), [0, 0])
+
+    def test_tilt_is_extrapolated(self):
+        for x, y in self.positions[:4]:
+            self.model.add_residual(Orientation.LEFT, [x, y], [0.001 * x, 1 - 0.002 * y], timestamp=0)
+
+        np.testing.assert_allclose(self.model.predict(Orientation.LEFT, [2000, 1500], timestamp=0),
+                                   [2, -2], atol=1e-9)
+
+    def test_drift_in_time_is_extrapolated(self):
+        for idx, (x, y) in enumerate(self.positions):
+            t = 100 * idx
+            self.model.add_residual(Orientation.LEFT, [x, y], [0.01 * t, 0.001 * x], timestamp=t)
+
+        np.testing.assert_allclose(self.model.predict(Orientation.LEFT, [100, 0], timestamp=1000),
+                                   [10, 0.1], atol=1e-9)
+
+    def test_drift_is_not_fitted_for_short_time_span(self):
+        for idx, (x, y) in enumerate(self.positions):
+            self.model.add_residual(Orientation.LEFT, [x, y], [1, 1], timestamp=idx)
+
+        np.testing.assert_allclose(self.model.predict(Orientation.LEFT, [0, 0], timestamp=1e6), [1, 1])
+
+    def test_correction_is_bounded(self):
+        self.model.max_correction = 5
+        self.model.add_residual(Orientation.LEFT, [0, 0], [30, 40], timestamp=0)
+
+        np.testing.assert_allclose(self.model.predict(Orientation.LEFT, [0, 0], timestamp=0), [3, 4])
+
+    def test_reset_removes_samples(self):
+        self.model.add_residual(Orientation.LEFT, [0, 0], [1, 1])
+        self.model.reset()
+
+        self.assertEqual(self.model.n_samples(Orientation.LEFT), 0)
+        np.testing.assert_array_equal(self.model.predict(Orientation.LEFT, [0, 0]), [0, 0])
+
+    def test_reset_of_key_keeps_other_samples(self):
+        self.model.add_residual(Orientation.LEFT, [0, 0], [1, 1])
+        self.model.add_residual(Orientation.RIGHT, [0, 0], [2, 2])
+        self.model.reset(Orientation.LEFT)
+
+        self.assertEqual(self.model.n_samples(Orientation.LEFT), 0)
+        self.assertEqual(self.model.n_samples(Orientation.RIGHT), 1)
+        np.testing.assert_array_equal(self.model.predict(Orientation.LEFT, [0, 0]), [0, 0])
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2022  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import threading
+import unittest
+from contextlib import nullcontext
+from unittest.mock import ANY, MagicMock
+
+from LabExT.Movement.config import Orientation
+from LabExT.Movement.MotionExecutor import MotionExecutor, MoveTiming, StageTiming
+from LabExT.Movement.Transformations import ChipCoordinate
+
+
+class MotionExecutorTest(unittest.TestCase):
+    """
+    Tests for the simultaneous execution of planned stage movements.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        self.events = []
+        self.events_lock = threading.Lock()
+        self.left_calibration = self._calibration(Orientation.LEFT)
+        self.right_calibration = self._calibration(Orientation.RIGHT)
+        self.path_planning = MagicMock()
+
+    def _calibration(self, orientation):
+        calibration = MagicMock()
+        calibration.orientation = orientation
+        calibration.get_position.return_value = ChipCoordinate(0, 0, 20)
+        calibration.perform_in_system.return_value = nullcontext()
+        calibration.lift_stage.side_effect = lambda z_lift: self._record(orientation, 'lift')
+        calibration.lower_stage.side_effect = lambda z_lift: self._record(orientation, 'lower')
+        calibration.move_absolute.side_effect = lambda coordinate, wait_for_stopping: self._record(
+            orientation, 'travel')
+        return calibration
+
+    def _record(self, orientation, action):
+        with self.events_lock:
+            self.events.append((orientation, action))
+
+    def _plan(self, dependencies):
+        self.path_planning.plan.return_value = [
+            (self.left_calibration, [ChipCoordinate(100, 200, 0), ChipCoordinate(300, 400, 0)]),
+            (self.right_calibration, [ChipCoordinate(500, 600, 0)])]
+        self.path_planning.motion_dependencies.return_value = dependencies
+
+    def test_travel_keeps_current_height(self):
+        self._plan({self.left_calibration: [], self.right_calibration: []})
+
+        MotionExecutor(z_lift=20).execute(self.path_planning)
+
+        self.left_calibration.move_absolute.assert_any_call(
+            coordinate=ChipCoordinate(300, 400, 20), wait_for_stopping=True)
+        self.right_calibration.move_absolute.assert_called_once_with(
+            coordinate=ChipCoordinate(500, 600, 20), wait_for_stopping=True)
+
+    def test_independent_stages_travel_simultaneously(self):
+        self._plan({self.left_calibration: [], self.right_calibration: []})
+        # fails with a BrokenBarrierError unless both stages travel at the same time
+        barrier = threading.Barrier(2, timeout=5)
+        for calibration in (self.left_calibration, self.right_calibration):
+            calibration.move_absolute.side_effect = lambda coordinate, wait_for_stopping: \
+                barrier.wait() if coordinate.x in (100, 500) else None
+
+        timing = MotionExecutor(z_lift=20).execute(self.path_planning)
+
+        self.assertIsInstance(timing, MoveTiming)
+        self.assertEqual(set(timing.stages), {Orientation.LEFT, Orientation.RIGHT})
+
+    def test_dependent_stage_travels_after_dependency_but_lifts_in_parallel(self):
+        self._plan({self.left_calibration: [], self.right_calibration: [self.left_calibration]})
+        right_lifted = threading.Event()
+        self.right_calibration.lift_stage.side_effect = lambda z_lift: (
+            self._record(Orientation.RIGHT, 'lift'), right_lifted.set())
+
+        def left_travel(coordinate, wait_for_stopping):
+            # the right stage lifts while the left stage travels
+            self.assertTrue(right_lifted.wait(timeout=5))
+            self._record(Orientation.LEFT, 'travel')
+        self.left_calibration.move_absolute.side_effect = left_travel
+
+        MotionExecutor(z_lift=20).execute(self.path_planning)
+
+        last_left_travel = max(i for i, e in enumerate(self.events) if e == (Orientation.LEFT, 'travel'))
+        first_right_travel = self.events.index((Orientation.RIGHT, 'travel'))
+        self.assertLess(last_left_travel, first_right_travel)
+
+    def test_stages_are_not_lifted_without_z_lift(self):
+        self._plan({self.left_calibration: [], self.right_calibration: []})
+
+        MotionExecutor().execute(self.path_planning)
+
+        for calibration in (self.left_calibration, self.right_calibration):
+            calibration.lift_stage.assert_not_called()
+            calibration.lower_stage.assert_not_called()
+
+    def test_failure_stops_dependent_stages(self):
+        self._plan({self.left_calibration: [], self.right_calibration: [self.left_calibration]})
+        self.left_calibration.move_absolute.side_effect = RuntimeError("Stage error")
+
+        with self.assertRaises(RuntimeError):
+            MotionExecutor(z_lift=20).execute(self.path_planning)
+
+        self.right_calibration.move_absolute.assert_not_called()
+        # both stages stay lifted
+        self.left_calibration.lower_stage.assert_not_called()
+        self.right_calibration.lower_stage.assert_not_called()
+
+    def test_stop_timeout_waits_for_each_waypoint(self):
+        self._plan({self.left_calibration: [], self.right_calibration: []})
+
+        MotionExecutor(stop_timeout=1.5).execute(self.path_planning)
+
+        for calibration, n_waypoints in ((self.left_calibration, 2), (self.right_calibration, 1)):
+            calibration.move_absolute.assert_called_with(coordinate=ANY, wait_for_stopping=False)
+            self.assertEqual(calibration.stage.wait_for_stopping.call_count, n_waypoints)
+            calibration.stage.wait_for_stopping.assert_called_with(timeout=1.5)
+
+    def test_stop_timeout_exceeded_stops_dependent_stages(self):
+        self._plan({self.left_calibration: [], self.right_calibration: [self.left_calibration]})
+        self.left_calibration.stage.wait_for_stopping.return_value = False
+
+        with self.assertRaises(RuntimeError):
+            MotionExecutor(stop_timeout=1.5).execute(self.path_planning)
+
+        self.left_calibration.move_absolute.assert_called_once()
+        self.right_calibration.move_absolute.assert_not_called()
+
+    def test_move_timing(self):
+        timing = MoveTiming(
+            planning=0.1,
+            total=1.0,
+            stages={
+                Orientation.LEFT: StageTiming(lift=0.1, wait=0.0, travel=0.5, lower=0.1),
+                Orientation.RIGHT: StageTiming(lift=0.1, wait=0.5, travel=0.2, lower=0.1)})
+
+        self.assertAlmostEqual(timing.sequential, 1.2)
+        self.assertAlmostEqual(timing.saved, 0.2)
+        self.assertIn("saved 0.200s", timing.summary())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2022  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from LabExT.Movement.MotorProfiles import trapezoidal_velocity_profile, \
+    trapezoidal_velocity_profile_by_integration
+
+
+PROFILES = [
+    # start, stop, max speed, acceleration
+    (-5.0, 5.0, 5.0, 50.0),  # trapezoidal profile
+    (-5.0, 5.0, 50.0, 50.0),  # triangular profile, saturation speed not reached
+    (3.0, -2.0, 1.0, 10.0),  # negative direction
+]
+
+
+class TrapezoidalVelocityProfileTest(unittest.TestCase):
+    DT = 1e-5
+
+    @parameterized.expand(PROFILES)
+    def test_matches_numeric_integration(self, start, stop, speed, acceleration):
+        t_num, x_num, xd_num, xdd_num = trapezoidal_velocity_profile_by_integration(
+            start, stop, speed, acceleration, dt_integration=self.DT)
+        t_vec, x_vec, xd_vec, xdd_vec = trapezoidal_velocity_profile(
+            start, stop, speed, acceleration, dt_sampling=self.DT)
+
+        np.testing.assert_allclose(t_vec, t_num)
+        # the numeric integration lags by one integration step
+        np.testing.assert_allclose(x_vec, x_num, atol=10 * speed * self.DT)
+        np.testing.assert_allclose(xd_vec, xd_num, atol=2 * acceleration * self.DT)
+        # samples exactly at the phase borders may be assigned to either phase due to rounding
+        self.assertLessEqual(np.count_nonzero(~np.isclose(xdd_vec, xdd_num)), 2)
+
+    @parameterized.expand(PROFILES)
+    def test_matches_numeric_integration_resampled(self, start, stop, speed, acceleration):
+        n_points = 500
+        t_num, x_num, xd_num, xdd_num = trapezoidal_velocity_profile_by_integration(
+            start, stop, speed, acceleration, n_output_points=n_points)
+        t_vec, x_vec, xd_vec, xdd_vec = trapezoidal_velocity_profile(
+            start, stop, speed, acceleration, n_output_points=n_points)
+
+        self.assertEqual(len(t_vec), n_points)
+        np.testing.assert_allclose(t_vec, t_num)
+        np.testing.assert_allclose(x_vec, x_num, atol=10 * speed * self.DT)
+        np.testing.assert_allclose(xd_vec, xd_num, atol=2 * acceleration * self.DT)
+        # the interpolated acceleration of the numeric version differs at the discontinuities only
+        self.assertLessEqual(np.count_nonzero(~np.isclose(xdd_vec, xdd_num)), 3)
+
+    def test_start_and_stop_position_are_exact(self):
+        _, x_vec, xd_vec, _ = trapezoidal_velocity_profile(-5.0, 5.0, 5.0, 50.0, n_output_points=10)
+
+        self.assertEqual(x_vec[0], -5.0)
+        self.assertAlmostEqual(x_vec[-1], 5.0)
+        self.assertAlmostEqual(xd_vec[-1], 0.0)
+
+    def test_cached_results_cannot_be_modified_by_caller(self):
+        _, x_vec, _, _ = trapezoidal_velocity_profile(0.0, 1.0, 1.0, 10.0, n_output_points=10)
+        x_vec[:] = 0
+
+        _, x_vec_again, _, _ = trapezoidal_velocity_profile(0.0, 1.0, 1.0, 10.0, n_output_points=10)
+
+        self.assertEqual(x_vec_again[-1], 1.0)
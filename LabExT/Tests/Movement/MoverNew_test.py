@@ -14,7 +14,10 @@ from LabExT.Movement.Stages.DummyStage import DummyStage
 from LabExT.Movement.Calibration import DevicePort, Orientation
 
 from LabExT.Movement.MoverNew import MoverError, MoverNew, assert_connected_stages
-from LabExT.Movement.Transformations import ChipCoordinate
+from LabExT.Movement.Transformations import ChipCoordinate, CoordinatePairing, StageCoordinate
+from LabExT.Movement.PathPlanning import CollisionAvoidancePlanning, GraphSearchPlanning, SingleStagePlanning
+from LabExT.Wafer.Chip import Chip
+from LabExT.Wafer.Device import Device
 from LabExT.Movement.config import Axis, Direction, CoordinateSystem
 
 
@@ -349,6 +352,49 @@ class MoverStageSettingsTest(unittest.TestCase):
         self.mover.z_lift = 50
 
         self.assertEqual(self.mover.z_lift, 50)
+        self.assertEqual(self.mover.path_planning_strategy, MoverNew.PATH_PLANNING_GRAPH_SEARCH)
+
+    @patch.object(MoverNew, "MOVER_SETTINGS_FILE",
+                  "/mocked/mover_settings.json")
+    @patch('os.path.exists')
+    def test_load_settings_restores_path_planning_strategy(self, mock_exists):
+        mock_exists.return_value = True
+
+        settings = json.dumps({"path_planning_strategy": "potential field"})
+        with patch("builtins.open", mock_open(read_data=settings)):
+            self.mover.load_settings()
+        self.assertEqual(self.mover.path_planning_strategy, MoverNew.PATH_PLANNING_POTENTIAL_FIELD)
+
+        settings = json.dumps({"path_planning_strategy": "unknown"})
+        with patch("builtins.open", mock_open(read_data=settings)):
+            self.mover.load_settings()
+        self.assertEqual(self.mover.path_planning_strategy, MoverNew.DEFAULT_PATH_PLANNING_STRATEGY)
+
+    def test_set_path_planning_strategy_does_not_accept_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            self.mover.path_planning_strategy = "unknown"
+
+        self.assertEqual(self.mover.path_planning_strategy, MoverNew.DEFAULT_PATH_PLANNING_STRATEGY)
+
+    @parameterized.expand([
+        (MoverNew.PATH_PLANNING_GRAPH_SEARCH, GraphSearchPlanning),
+        (MoverNew.PATH_PLANNING_POTENTIAL_FIELD, CollisionAvoidancePlanning)
+    ])
+    @patch.object(MoverNew, "dump_calibrations")
+    def test_path_planning_strategy_selects_planner(self, strategy, planner_class, _):
+        self.mover.set_chip(Chip("Test Chip", devices=[
+            Device(id="1", type="test", in_position=[0, 0], out_position=[500, 0])
+        ], path="/example/path", _serialize_to_disk=False))
+
+        self.mover.path_planning_strategy = strategy
+
+        self.assertIsInstance(self.mover.get_path_planning_strategy(), planner_class)
+
+    def test_single_stage_ignores_path_planning_strategy(self):
+        self.stage2.disconnect()
+        self.mover.path_planning_strategy = MoverNew.PATH_PLANNING_POTENTIAL_FIELD
+
+        self.assertIsInstance(self.mover.get_path_planning_strategy(), SingleStagePlanning)
 
     @patch.object(MoverNew, "MOVER_SETTINGS_FILE",
                   "/mocked/mover_settings.json")
@@ -382,6 +428,10 @@ class MoverStageSettingsTest(unittest.TestCase):
                 call('"z_lift"'),
                 call(': '),
                 call('24.5'),
+                call(', '),
+                call('"path_planning_strategy"'),
+                call(': '),
+                call('"graph search"'),
                 call('}')])
 
     @patch.object(MoverNew, "MOVER_SETTINGS_FILE",
@@ -549,6 +599,129 @@ class RelativeMovementTest(unittest.TestCase):
             any_order=False)
 
 
+class DeviceStageTargetsTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.mover = MoverNew(None)
+        self.left_calibration = self.mover.add_stage_calibration(
+            DummyStage('usb:123456789'), Orientation.LEFT, DevicePort.INPUT)
+        self.right_calibration = self.mover.add_stage_calibration(
+            DummyStage('usb:9887654321'), Orientation.RIGHT, DevicePort.OUTPUT)
+
+        for calibration, stage_offset in ((self.left_calibration, 100), (self.right_calibration, -100)):
+            calibration.connect_to_stage()
+            calibration.update_single_point_offset(CoordinatePairing(
+                calibration=calibration,
+                stage_coordinate=StageCoordinate(stage_offset, stage_offset, 0),
+                device=Mock(),
+                chip_coordinate=ChipCoordinate(0, 0, 0)))
+
+        self.devices = [
+            Device(id=str(i), type="test", in_position=[i, 2 * i], out_position=[i + 500, 2 * i])
+            for i in range(5)]
+
+    def test_targets_match_single_transformations(self):
+        targets = self.mover.device_stage_targets(self.devices)
+
+        self.assertEqual(set(targets.keys()), {Orientation.LEFT, Orientation.RIGHT})
+        for idx, device in enumerate(self.devices):
+            self.assertEqual(
+                StageCoordinate.from_numpy(targets[Orientation.LEFT][idx]),
+                self.left_calibration.transform_chip_to_stage_coordinate(device.input_coordinate))
+            self.assertEqual(
+                StageCoordinate.from_numpy(targets[Orientation.RIGHT][idx]),
+                self.right_calibration.transform_chip_to_stage_coordinate(device.output_coordinate))
+
+
+class RecordCouplingPositionTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.mover = MoverNew(None)
+        self.calibration = self.mover.add_stage_calibration(
+            DummyStage('usb:123456789'), Orientation.LEFT, DevicePort.INPUT)
+        self.calibration.connect_to_stage()
+        self.calibration.update_single_point_offset(CoordinatePairing(
+            calibration=self.calibration,
+            stage_coordinate=StageCoordinate(100, 100, 0),
+            device=Mock(),
+            chip_coordinate=ChipCoordinate(0, 0, 0)))
+
+        self.device = Device(id="1", type="test", in_position=[10, 20], out_position=[510, 20])
+
+    def test_records_residual_to_drift_model(self):
+        with patch.object(self.calibration, "get_position", return_value=ChipCoordinate(11, 22, 0)), \
+                patch.object(self.mover.drift_model, "add_residual") as add_residual_mock:
+            self.mover.record_coupling_position(self.device)
+
+        add_residual_mock.assert_called_once_with(Orientation.LEFT, [10, 20, 0], [1, 2])
+
+    def test_kabsch_refinement_precedes_residual(self):
+        self.mover.kabsch_refinement_enabled = True
+        calls = Mock()
+        # the stage position before and the chip position after the refinement
+        calls.get_position.side_effect = [StageCoordinate(111, 122, 0), ChipCoordinate(10.5, 20, 0)]
+
+        with patch.object(self.calibration, "get_position", calls.get_position), \
+                patch.object(self.calibration, "refine_kabsch_rotation", calls.refine_kabsch_rotation), \
+                patch.object(self.mover.drift_model, "add_residual", calls.add_residual):
+            self.mover.record_coupling_position(self.device)
+
+        self.assertEqual(
+            [c[0] for c in calls.mock_calls],
+            ["get_position", "refine_kabsch_rotation", "get_position", "add_residual"])
+        pairing = calls.refine_kabsch_rotation.call_args[0][0]
+        self.assertEqual(pairing.stage_coordinate, StageCoordinate(111, 122, 0))
+        self.assertEqual(pairing.chip_coordinate, ChipCoordinate(10, 20, 0))
+        calls.add_residual.assert_called_once_with(Orientation.LEFT, [10, 20, 0], [0.5, 0])
+
+    @parameterized.expand([(True, 0), (False, 1)])
+    def test_accepted_refinement_discards_previous_residuals(self, accepted, previous_samples):
+        self.mover.kabsch_refinement_enabled = True
+        self.mover.drift_model.add_residual(Orientation.LEFT, [0, 0], [1, 1])
+        self.mover.drift_model.add_residual(Orientation.RIGHT, [0, 0], [1, 1])
+
+        with patch.object(self.calibration, "get_position", return_value=ChipCoordinate(11, 22, 0)), \
+                patch.object(self.calibration, "refine_kabsch_rotation", return_value=accepted):
+            self.mover.record_coupling_position(self.device)
+
+        # the new residual is kept, residuals of other stages are not affected
+        self.assertEqual(self.mover.drift_model.n_samples(Orientation.LEFT), previous_samples + 1)
+        self.assertEqual(self.mover.drift_model.n_samples(Orientation.RIGHT), 1)
+
+
+class SimultaneousMoveAbsoluteTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.mover = MoverNew(None)
+        self.left_calibration = self.mover.add_stage_calibration(
+            DummyStage('usb:123456789'), Orientation.LEFT, DevicePort.INPUT)
+        self.right_calibration = self.mover.add_stage_calibration(
+            DummyStage('usb:9887654321'), Orientation.RIGHT, DevicePort.OUTPUT)
+        self.left_calibration.connect_to_stage()
+        self.right_calibration.connect_to_stage()
+
+        self.path_planning = Mock(spec=GraphSearchPlanning)
+        planning_patcher = patch.object(MoverNew, "get_path_planning_strategy", return_value=self.path_planning)
+        planning_patcher.start()
+        self.addCleanup(planning_patcher.stop)
+
+    @parameterized.expand([(True, None), (False, 5.0)])
+    @patch("LabExT.Movement.MoverNew.MotionExecutor")
+    def test_simultaneous_move(self, wait_for_stopping, stop_timeout, executor_mock):
+        target = ChipCoordinate(10, 20, 100)
+
+        with patch.object(self.left_calibration, "get_position", return_value=ChipCoordinate(0, 0, 30)):
+            self.mover.move_absolute(
+                {Orientation.LEFT: target}, chip=None, with_lifted_stages=True,
+                wait_for_stopping=wait_for_stopping, wait_timeout=5.0)
+
+        # the stage keeps its height as in a sequential move
+        self.assertEqual(target, ChipCoordinate(10, 20, 30))
+        self.path_planning.set_stage_target.assert_called_once_with(self.left_calibration, target)
+        executor_mock.assert_called_once_with(z_lift=self.mover.z_lift, stop_timeout=stop_timeout)
+        executor_mock.return_value.execute.assert_called_once_with(self.path_planning)
+
+
 class CoordinateSystemControlTest(unittest.TestCase):
     def setUp(self) -> None:
         self.stage = DummyStage('usb:123456789')
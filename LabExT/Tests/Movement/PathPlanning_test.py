@@ -7,12 +7,15 @@ This program is free software and comes with ABSOLUTELY NO WARRANTY; for details
 import numpy as np
 
 from unittest import TestCase
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 
 from parameterized import parameterized
 
 from LabExT.Movement.config import Orientation
 from LabExT.Movement.Transformations import ChipCoordinate
-from LabExT.Movement.PathPlanning import SingleModeFiber, StagePolygon
+from LabExT.Movement.PathPlanning import ChipPlanningContext, GraphSearchPlanning, PathPlanningError, PotentialField, \
+    SingleModeFiber, StagePolygon, repulsive_kernel
 
 
 class SingleModeFiberTest(TestCase):
@@ -173,3 +176,252 @@ class SingleModeFiberTest(TestCase):
             polygon_org.parameters, polygon_reconstructed.parameters)
         self.assertEqual(
             polygon_org.orientation, polygon_org.orientation)
+
+
+class PotentialFieldTest(TestCase):
+    GRID_SIZE = 45.0
+
+    def setUp(self) -> None:
+        self.moving_calibration = self._calibration(ChipCoordinate(1000, 0, 0), Orientation.RIGHT)
+        self.obstacle_calibration = self._calibration(ChipCoordinate(-1000, 300, 0), Orientation.LEFT)
+
+        self.field = PotentialField(
+            self.moving_calibration,
+            ChipCoordinate(-1000, 1000, 0),
+            grid_size=self.GRID_SIZE,
+            grid_outline=((-3000, 3000), (-2000, 2000)))
+
+    def _calibration(self, position, orientation):
+        calibration = MagicMock()
+        calibration.position = position
+        calibration.get_position.side_effect = lambda: calibration.position
+        calibration.stage_polygon = SingleModeFiber(orientation)
+        return calibration
+
+    def _reference_field(self, safety_multiplier=5):
+        # the potential computed cell by cell
+        potential_field = self.field.attractive_potential_field.copy()
+        stage_mask = self.obstacle_calibration.stage_polygon.stage_in_meshgrid(
+            self.obstacle_calibration.position, self.field.cx, self.field.cy, self.GRID_SIZE)
+        for ox, oy in zip(self.field.cx[stage_mask], self.field.cy[stage_mask]):
+            o_dist = np.hypot(self.field.cx - ox, self.field.cy - oy)
+            field_mask = o_dist < safety_multiplier * self.field.FIBER_RADIUS
+            with np.errstate(divide='ignore'):
+                potential_field[field_mask] += self.field.repulsive_gain / o_dist[field_mask] ** 2
+        return potential_field
+
+    def assert_field_equals_reference(self):
+        reference = self._reference_field()
+        np.testing.assert_array_equal(np.isinf(self.field.potential_field), np.isinf(reference))
+
+        finite = np.isfinite(reference)
+        np.testing.assert_allclose(self.field.potential_field[finite], reference[finite], rtol=1e-9)
+        # cells without obstacles nearby keep exactly the attractive potential
+        np.testing.assert_array_equal(
+            self.field.potential_field == self.field.attractive_potential_field,
+            reference == self.field.attractive_potential_field)
+
+    def test_repulsive_kernel(self):
+        kernel = repulsive_kernel(10.0, 25.0, 100.0)
+
+        self.assertEqual(kernel.shape, (7, 7))
+        self.assertEqual(kernel[3, 3], 0)
+        self.assertEqual(kernel[3, 4], 1.0)
+        self.assertAlmostEqual(kernel[4, 5], 100.0 / 500)
+        self.assertEqual(kernel[5, 5], 0)
+        self.assertEqual(kernel[3, 6], 0)
+        self.assertFalse(kernel.flags.writeable)
+
+    def test_obstacles_match_cell_by_cell_construction(self):
+        self.field.set_stage_obstacles(self.obstacle_calibration)
+
+        self.assert_field_equals_reference()
+
+    @parameterized.expand([
+        ((1, 0),),
+        ((0, 1),),
+        ((-1, -1),),
+        ((10, -7),)
+    ])
+    def test_incremental_update_matches_cell_by_cell_construction(self, cells):
+        self.field.set_stage_obstacles(self.obstacle_calibration)
+
+        for _ in range(3):
+            self.obstacle_calibration.position = self.obstacle_calibration.position + ChipCoordinate(
+                cells[0] * self.GRID_SIZE, cells[1] * self.GRID_SIZE, 0)
+            self.field.set_stage_obstacles(self.obstacle_calibration)
+
+            self.assert_field_equals_reference()
+
+    def test_removed_obstacles_are_cleared(self):
+        self.field.set_stage_obstacles(self.obstacle_calibration)
+        self.field.set_stage_obstacles()
+
+        np.testing.assert_array_equal(self.field.potential_field, self.field.attractive_potential_field)
+
+
+class GraphSearchPlanningTest(TestCase):
+    def setUp(self) -> None:
+        devices = [
+            SimpleNamespace(in_position=[-1000, -1000], out_position=[1000, -1000]),
+            SimpleNamespace(in_position=[-1000, 1000], out_position=[1000, 1000]),
+            SimpleNamespace(in_position=[-1500, 0], out_position=[1500, 0])]
+        self.chip = SimpleNamespace(devices={idx: device for idx, device in enumerate(devices)})
+
+        self.left_calibration = self._calibration(ChipCoordinate(-1000, -1000, 0), Orientation.LEFT)
+        self.right_calibration = self._calibration(ChipCoordinate(1000, -1000, 0), Orientation.RIGHT)
+
+        self.path_planning = GraphSearchPlanning(self.chip)
+
+    def _calibration(self, position, orientation):
+        calibration = MagicMock()
+        calibration.get_position.return_value = position
+        calibration.stage_polygon = SingleModeFiber(orientation)
+        return calibration
+
+    def _execute(self):
+        positions = {
+            self.left_calibration: self.left_calibration.get_position(),
+            self.right_calibration: self.right_calibration.get_position()}
+        n_commands = 0
+        for waypoint_command in self.path_planning.trajectory():
+            n_commands += 1
+            (calibration, waypoint), = waypoint_command.items()
+            self.assertTrue(waypoint.wait_for_stopping)
+            self._assert_segment_collision_free(calibration, positions, waypoint.coordinate)
+            positions[calibration] = waypoint.coordinate
+        return positions, n_commands
+
+    def _assert_segment_collision_free(self, calibration, positions, end):
+        start = positions[calibration]
+        other = next(c for c in positions if c is not calibration)
+        cx, cy, grid_size = self.path_planning.cx, self.path_planning.cy, self.path_planning.grid_size
+        other_mask = other.stage_polygon.stage_in_meshgrid(positions[other], cx, cy, grid_size)
+        for fraction in np.linspace(0, 1, 50)[1:]:
+            point = ChipCoordinate(
+                start.x + fraction * (end.x - start.x), start.y + fraction * (end.y - start.y), start.z)
+            stage_mask = calibration.stage_polygon.stage_in_meshgrid(point, cx, cy, grid_size)
+            self.assertFalse(np.any(stage_mask & other_mask), f"Collision at {point}")
+
+    def test_free_move_is_a_single_segment(self):
+        self.path_planning.set_stage_target(self.left_calibration, ChipCoordinate(-1000, 1000, 0))
+
+        positions, n_commands = self._execute()
+
+        self.assertEqual(n_commands, 1)
+        self.assertEqual(positions[self.left_calibration], ChipCoordinate(-1000, 1000, 0))
+
+    def test_stages_move_around_each_other(self):
+        # the right fiber blocks the direct way of the left stage
+        self.right_calibration.get_position.return_value = ChipCoordinate(-800, 0, 0)
+        self.path_planning.set_stage_target(self.left_calibration, ChipCoordinate(-1000, 1000, 0))
+        self.path_planning.set_stage_target(self.right_calibration, ChipCoordinate(-800, 0, 0))
+
+        positions, n_commands = self._execute()
+
+        self.assertLessEqual(n_commands, 4)
+        self.assertEqual(positions[self.left_calibration], ChipCoordinate(-1000, 1000, 0))
+
+    def test_stage_order_is_chosen_to_free_the_targets(self):
+        # the left target is occupied by the right stage until it moved away
+        self.right_calibration.get_position.return_value = ChipCoordinate(-800, 1000, 0)
+        self.path_planning.set_stage_target(self.left_calibration, ChipCoordinate(-1000, 1000, 0))
+        self.path_planning.set_stage_target(self.right_calibration, ChipCoordinate(1000, -1000, 0))
+
+        plan = self.path_planning.plan()
+
+        self.assertEqual([calibration for calibration, _ in plan], [self.right_calibration, self.left_calibration])
+        positions, n_commands = self._execute()
+        self.assertEqual(positions[self.left_calibration], ChipCoordinate(-1000, 1000, 0))
+        self.assertEqual(positions[self.right_calibration], ChipCoordinate(1000, -1000, 0))
+        self.assertLessEqual(n_commands, 6)
+
+    def test_stages_on_separate_sides_are_independent(self):
+        self.path_planning.set_stage_target(self.left_calibration, ChipCoordinate(-1000, 1000, 0))
+        self.path_planning.set_stage_target(self.right_calibration, ChipCoordinate(1000, 1000, 0))
+
+        dependencies = self.path_planning.motion_dependencies(self.path_planning.plan())
+
+        self.assertEqual(dependencies, {self.left_calibration: [], self.right_calibration: []})
+
+    def test_stage_depends_on_stage_freeing_its_target(self):
+        self.right_calibration.get_position.return_value = ChipCoordinate(-800, 1000, 0)
+        self.path_planning.set_stage_target(self.left_calibration, ChipCoordinate(-1000, 1000, 0))
+        self.path_planning.set_stage_target(self.right_calibration, ChipCoordinate(1000, -1000, 0))
+
+        dependencies = self.path_planning.motion_dependencies(self.path_planning.plan())
+
+        self.assertEqual(dependencies, {self.right_calibration: [], self.left_calibration: [self.right_calibration]})
+
+    def test_raises_error_if_target_is_blocked(self):
+        self.right_calibration.get_position.return_value = ChipCoordinate(-800, 1000, 0)
+        self.path_planning.set_stage_target(self.left_calibration, ChipCoordinate(-1000, 1000, 0))
+        self.path_planning.set_stage_target(self.right_calibration, ChipCoordinate(-800, 1000, 0))
+
+        with self.assertRaises(PathPlanningError):
+            self.path_planning.plan()
+
+
+class ChipPlanningContextTest(TestCase):
+    def setUp(self) -> None:
+        devices = [
+            SimpleNamespace(in_position=[-1000, -1000], out_position=[1000, -1000]),
+            SimpleNamespace(in_position=[-1000, 1000], out_position=[1000, 1000])]
+        self.chip = SimpleNamespace(devices={idx: device for idx, device in enumerate(devices)})
+        self.context = ChipPlanningContext(self.chip, max_trajectories=2)
+
+        self.left_calibration = MagicMock()
+        self.left_calibration.get_position.return_value = ChipCoordinate(-1000, -1000, 0)
+        self.left_calibration.stage_polygon = SingleModeFiber(Orientation.LEFT)
+
+    def test_grid_covers_chip(self):
+        self.assertEqual(self.context.grid_size, 100)
+        self.assertEqual(self.context.grid_outline, ((-1100, 1100), (-1100, 1100)))
+        self.assertEqual(self.context.cx.shape, (23, 23))
+
+    def test_attractive_field_is_shared_with_potential_field(self):
+        target = ChipCoordinate(1000, 1000, 0)
+        field = PotentialField(self.left_calibration, target, planning_context=self.context)
+
+        self.assertIs(field.attractive_potential_field, self.context.attractive_field(target))
+        np.testing.assert_array_equal(
+            field.attractive_potential_field,
+            np.hypot(self.context.cx - 1000, self.context.cy - 1000))
+
+    def test_footprints_are_shared_by_equal_polygons(self):
+        footprint = self.context.footprint(SingleModeFiber(Orientation.LEFT))
+
+        self.assertIs(self.context.footprint(SingleModeFiber(Orientation.LEFT)), footprint)
+        self.assertIsNot(self.context.footprint(SingleModeFiber(Orientation.RIGHT)), footprint)
+
+    def test_least_recently_used_trajectory_is_dropped(self):
+        self.context.store_trajectory('a', [1])
+        self.context.store_trajectory('b', [2])
+        self.context.cached_trajectory('a')
+        self.context.store_trajectory('c', [3])
+
+        self.assertEqual(self.context.cached_trajectory('a'), [1])
+        self.assertIsNone(self.context.cached_trajectory('b'))
+        self.assertEqual(self.context.n_trajectories, 2)
+
+    def test_graph_search_reuses_trajectories_between_same_cells(self):
+        def plan(start, target):
+            self.left_calibration.get_position.return_value = start
+            path_planning = GraphSearchPlanning(self.chip, planning_context=self.context)
+            path_planning.set_stage_target(self.left_calibration, target)
+            return path_planning.plan()
+
+        plan(ChipCoordinate(-1000, -1000, 0), ChipCoordinate(-1000, 1000, 0))
+
+        with patch.object(GraphSearchPlanning, '_plan_corners') as plan_corners_mock:
+            (_, coordinates), = plan(ChipCoordinate(-1010, -995, 5), ChipCoordinate(-998, 1003, 5))
+
+        plan_corners_mock.assert_not_called()
+        self.assertEqual(self.context.trajectory_hits, 1)
+        self.assertEqual(coordinates, [ChipCoordinate(-998, 1003, 5)])
+
+    def test_clear_trajectories(self):
+        self.context.store_trajectory('a', [1])
+        self.context.clear_trajectories()
+
+        self.assertIsNone(self.context.cached_trajectory('a'))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2022  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import unittest
+
+from parameterized import parameterized
+
+from LabExT.Movement.Stages.SimulatedStage import SimulatedClock, SimulatedStage
+
+
+class SimulatedStageTest(unittest.TestCase):
+    """
+    Tests for the kinematics of the simulated stage.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        self.clock = SimulatedClock()
+        self.stage = SimulatedStage('sim:test', clock=self.clock)
+        self.stage.connect()
+        self.stage.set_speed_xy(100.0)
+        self.stage.set_acceleration_xy(100.0)
+
+    @parameterized.expand([
+        # trapezoidal profile: 1s accelerating over 50um, 9s at full speed, 1s decelerating
+        (1000.0, 11.0),
+        # triangular profile: 0.5s accelerating over 12.5um and 0.5s decelerating
+        (25.0, 1.0),
+    ])
+    def test_move_duration(self, distance, duration):
+        self.stage.move_absolute(x=distance)
+
+        self.assertAlmostEqual(self.clock.time(), duration)
+        self.assertEqual(self.stage.get_position(), [distance, 0, 0])
+        self.assertTrue(self.stage.is_stopped)
+
+    def test_position_and_status_during_motion(self):
+        self.stage.move_absolute(x=1000.0, y=-1000.0, wait_for_stopping=False)
+
+        self.clock.sleep(0.5)
+        self.assertEqual(self.stage.get_status(), ('MOVING', 'MOVING', 'STOP'))
+        x, y, _ = self.stage.get_position()
+        self.assertAlmostEqual(x, 12.5)
+        self.assertAlmostEqual(y, -12.5)
+
+        self.clock.sleep(5.5)
+        self.assertAlmostEqual(self.stage.get_position()[0], 50 + 500)
+        self.assertFalse(self.stage.is_stopped)
+
+        self.clock.sleep(5.0)
+        self.assertEqual(self.stage.get_status(), ('STOP', 'STOP', 'STOP'))
+
+    def test_relative_move_starts_at_current_position(self):
+        self.stage.move_absolute(x=1000.0, wait_for_stopping=False)
+        self.clock.sleep(6.0)
+
+        # the new movement also stops the x axis at its current position
+        self.stage.move_relative(y=100.0, z=10.0)
+
+        self.assertEqual(self.stage.get_position(), [550.0, 100.0, 10.0])
+
+    def test_z_moves_without_acceleration_limit(self):
+        self.stage.set_speed_z(10.0)
+        self.stage.move_absolute(z=25.0)
+
+        self.assertAlmostEqual(self.clock.time(), 2.5)
+
+    def test_command_latency(self):
+        stage = SimulatedStage('sim:test', command_latency=0.01, clock=self.clock)
+        t_start = self.clock.time()
+
+        stage.move_absolute(x=0.0)
+        stage.get_position()
+
+        self.assertEqual(stage.n_commands, 2)
+        self.assertAlmostEqual(self.clock.time() - t_start, 0.02)
+
+    def test_wait_for_stopping_with_timeout(self):
+        self.stage.move_absolute(x=1000.0, wait_for_stopping=False)
+
+        self.assertFalse(self.stage.wait_for_stopping(timeout=2.0))
+        self.assertAlmostEqual(self.clock.time(), 2.0)
+        self.assertTrue(self.stage.wait_for_stopping(timeout=20.0))
+        self.assertAlmostEqual(self.clock.time(), 11.0)
+
+    def test_stages_sharing_a_clock_move_in_parallel(self):
+        other_stage = SimulatedStage('sim:other', clock=self.clock)
+        other_stage.set_speed_xy(100.0)
+
+        self.stage.move_absolute(x=1000.0, wait_for_stopping=False)
+        other_stage.move_absolute(x=500.0, wait_for_stopping=False)
+        for stage in (self.stage, other_stage):
+            stage.when_stopped().result()
+
+        self.assertAlmostEqual(self.clock.time(), 11.0)
+
+    def test_real_time_simulation(self):
+        stage = SimulatedStage('sim:real')
+        stage.connect()
+        stage.set_speed_xy(1000.0)
+
+        stage.move_absolute(x=50.0, wait_for_stopping=False)
+        self.assertFalse(stage.is_stopped)
+
+        self.assertTrue(stage.wait_for_stopping(timeout=2.0))
+        self.assertEqual(stage.get_position(), [50.0, 0.0, 0.0])
+        stage.disconnect()
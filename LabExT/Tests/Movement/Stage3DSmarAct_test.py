@@ -384,13 +384,12 @@ class BaseTest(SmarActTestCase):
             True if z is not None else False)
 
     @with_MCSControl_driver_patch
-    @patch("LabExT.Movement.Stages.Stage3DSmarAct.time.sleep")
     @patch.object(SmarActModule.Stage3DSmarAct._Channel, 'STATUS_CODES',
                   {MCSControlInterface.SA_STOPPED_STATUS: 'SA_STOPPED_STATUS'})
     def test_move_relative_with_waiting(
-            self, sleep_mock, mcsc_mock: MCSControlInterface):
+            self, mcsc_mock: MCSControlInterface):
         """
-        Simple test, if sleep gets triggered when status is not stopped
+        Simple test, if the status monitor reads the status once, when the stage is already stopped
         """
         mcsc_mock.SA_GotoPositionRelative_S.return_value = MCSC_STATUS_OK
         mcsc_mock.SA_GetStatus_S.return_value = MCSC_STATUS_OK
@@ -403,17 +402,15 @@ class BaseTest(SmarActTestCase):
             with self.assert_exit_without_error(mcsc_mock):
                 self.stage.move_relative(-100, -200, wait_for_stopping=True)
 
-        sleep_mock.assert_called_once()
         self.assertEqual(3, mcsc_mock.SA_GetStatus_S.call_count)
 
     @with_MCSControl_driver_patch
-    @patch("LabExT.Movement.Stages.Stage3DSmarAct.time.sleep")
     @patch.object(SmarActModule.Stage3DSmarAct._Channel, 'STATUS_CODES',
                   {MCSControlInterface.SA_STOPPED_STATUS: 'SA_STOPPED_STATUS'})
     def test_move_absolute_v2_with_waiting(
-            self, sleep_mock, mcsc_mock: MCSControlInterface):
+            self, mcsc_mock: MCSControlInterface):
         """
-        Simple test, if sleep gets triggered when status is not stopped
+        Simple test, if the status monitor reads the status once, when the stage is already stopped
         """
         mcsc_mock.SA_GotoPositionAbsolute_S.return_value = MCSC_STATUS_OK
         mcsc_mock.SA_GetStatus_S.return_value = MCSC_STATUS_OK
@@ -427,10 +424,33 @@ class BaseTest(SmarActTestCase):
                 self.stage.move_absolute(-1000, 200,
                                          2000, wait_for_stopping=True)
 
-        sleep_mock.assert_called_once()
         self.assertEqual(3, mcsc_mock.SA_GetStatus_S.call_count)
 
 
+    @with_MCSControl_driver_patch
+    @patch.object(SmarActModule.Stage3DSmarAct._Channel, 'STATUS_CODES',
+                  {MCSControlInterface.SA_STOPPED_STATUS: 'SA_STOPPED_STATUS'})
+    def test_read_state_reads_each_channel_once(self, mcsc_mock: MCSControlInterface):
+        mcsc_mock.SA_GetStatus_S.return_value = MCSC_STATUS_OK
+        mcsc_mock.SA_GetStatus_S.side_effect = update_by_reference({
+            2: ct.c_ulong(MCSControlInterface.SA_STOPPED_STATUS)
+        })
+        mcsc_mock.SA_GetPosition_S.return_value = MCSC_STATUS_OK
+        mcsc_mock.SA_GetPosition_S.side_effect = update_by_reference({
+            2: ct.c_int(int(to_nanometer(100)))
+        })
+
+        with self.successful_stage_connection(self.stage, mcsc_mock):
+            with self.assert_exit_without_error(mcsc_mock):
+                state = self.stage.read_state()
+
+        self.assertEqual(state.position, [100, 100, 100])
+        self.assertEqual(state.status, ('SA_STOPPED_STATUS',) * 3)
+        self.assertTrue(state.stopped)
+        self.assertEqual(3, mcsc_mock.SA_GetStatus_S.call_count)
+        self.assertEqual(3, mcsc_mock.SA_GetPosition_S.call_count)
+
+
 class ChannelTest(SmarActTestCase):
     """
     Testing of a Stage3DSmarAct channel. A channel represents one axis.
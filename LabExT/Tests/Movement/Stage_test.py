@@ -5,11 +5,14 @@ LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
 This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
 """
 
-from unittest.mock import Mock
+import time
+from concurrent import futures
+from unittest.mock import Mock, PropertyMock, patch
 from unittest import TestCase
 
-from LabExT.Movement.Stage import Stage, StageError, assert_stage_connected, assert_driver_loaded
+from LabExT.Movement.Stage import Stage, StageError, StageStatusMonitor, assert_stage_connected, assert_driver_loaded
 from LabExT.Movement.Stages.DummyStage import DummyStage
+from LabExT.Movement.Stages.SimulatedStage import SimulatedClock, SimulatedStage
 
 
 class StageTest(TestCase):
@@ -38,3 +41,134 @@ class StageTest(TestCase):
             assert_stage_connected(func)(self.stage)
 
         func.assert_not_called()
+
+
+class StageStatusMonitorTest(TestCase):
+    def setUp(self) -> None:
+        self.stage = DummyStage('tcp:192.168.0.42:1234')
+        self.stop_at = time.monotonic() + 0.1
+        self.is_stopped = patch.object(
+            DummyStage, 'is_stopped', new_callable=PropertyMock, side_effect=lambda: time.monotonic() >= self.stop_at)
+        self.is_stopped_mock = self.is_stopped.start()
+
+    def tearDown(self) -> None:
+        self.stage.status_monitor.shutdown()
+        self.is_stopped.stop()
+
+    def test_wait_returns_when_stage_stops(self):
+        self.assertTrue(self.stage.wait_for_stopping(timeout=2))
+        self.assertGreaterEqual(time.monotonic(), self.stop_at)
+        self.assertLess(time.monotonic() - self.stop_at, 0.05)
+
+    def test_wait_times_out(self):
+        self.stop_at += 10
+        self.assertFalse(self.stage.wait_for_stopping(timeout=0.05))
+
+    def test_waiters_share_status_reads(self):
+        pending = [self.stage.when_stopped() for _ in range(10)]
+        _, not_done = futures.wait(pending, timeout=2)
+
+        self.assertFalse(not_done)
+        # at most one read per poll interval, independent of the number of waiters
+        self.assertLess(self.is_stopped_mock.call_count, 0.1 / self.stage.status_monitor.poll_interval + 5)
+
+    def test_status_is_read_after_settle_time(self):
+        self.stop_at = 0
+        requested_at = time.monotonic()
+
+        self.assertTrue(self.stage.wait_for_stopping(timeout=2))
+
+        self.assertGreaterEqual(time.monotonic() - requested_at, self.stage.status_monitor.settle_time)
+        self.assertEqual(self.is_stopped_mock.call_count, 1)
+
+    def test_wait_returns_false_on_shutdown(self):
+        self.stop_at += 10
+        waiter = futures.ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(waiter.shutdown)
+
+        result = waiter.submit(self.stage.wait_for_stopping)
+        time.sleep(0.05)
+        self.stage.status_monitor.shutdown()
+
+        self.assertFalse(result.result(timeout=2))
+
+    def test_status_error_is_set_on_future(self):
+        self.is_stopped_mock.side_effect = StageError("Connection lost")
+
+        with self.assertRaises(StageError):
+            self.stage.when_stopped().result(timeout=2)
+
+    def test_thread_exits_when_idle(self):
+        monitor = StageStatusMonitor(self.stage, idle_timeout=0.01)
+        self.stop_at = 0
+
+        monitor.wait_until_stopped(timeout=2)
+        time.sleep(0.1)
+
+        self.assertFalse(monitor.running)
+        self.assertTrue(monitor.wait_until_stopped(timeout=2))
+
+
+class StagePositionCacheTest(TestCase):
+    def setUp(self) -> None:
+        self.stage = SimulatedStage('sim:test', clock=SimulatedClock())
+        self.stage.connect()
+        self.cache = self.stage.position_cache
+
+    def move_absolute(self, x=None, y=None, z=None):
+        self.cache.commanded(target=[x, y, z])
+        self.stage.move_absolute(x, y, z)
+        self.cache.stopped()
+
+    def test_position_is_read_once_after_movement(self):
+        self.move_absolute(100, 200, 10)
+        n_commands = self.stage.n_commands
+
+        for _ in range(10):
+            self.assertEqual(self.cache.position(), [100, 200, 10])
+
+        self.assertEqual(self.stage.n_commands - n_commands, 1)
+        self.assertEqual(self.cache.hits, 9)
+
+    def test_position_is_not_cached_without_movement(self):
+        n_commands = self.stage.n_commands
+
+        self.cache.position()
+        self.cache.position()
+
+        self.assertEqual(self.stage.n_commands - n_commands, 2)
+
+    def test_position_is_not_cached_during_movement(self):
+        self.cache.commanded(target=[1000, None, None])
+        self.stage.move_absolute(x=1000, wait_for_stopping=False)
+        self.stage.clock.sleep(1.0)
+
+        self.assertEqual(self.cache.position(), [200.0, 0.0, 0.0])
+        self.stage.clock.sleep(1.0)
+        self.assertEqual(self.cache.position(), [400.0, 0.0, 0.0])
+
+    def test_relative_target_is_derived_from_cached_position(self):
+        self.move_absolute(100, 200, 10)
+        self.cache.position()
+
+        self.cache.commanded(offset=[10, 0, -10])
+
+        self.assertEqual(self.cache.target, [110, 200, 0])
+
+    def test_cached_position_expires(self):
+        self.move_absolute(100, 200, 10)
+        self.cache.position()
+        self.cache.max_age = 0
+
+        n_commands = self.stage.n_commands
+        self.cache.position()
+
+        self.assertEqual(self.stage.n_commands - n_commands, 1)
+
+    def test_deviation_from_target_is_logged(self):
+        self.cache.commanded(target=[100, 0, 0])
+        self.stage.move_absolute(x=90)
+        self.cache.stopped()
+
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(self.cache.position(), [90, 0, 0])
@@ -8,7 +8,7 @@ for details see LICENSE file.
 
 from typing import List, Type
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 import numpy as np
 from numpy.testing import assert_array_equal
 from random import seed, uniform
@@ -20,7 +20,7 @@ from LabExT.Movement.Calibration import Calibration
 from LabExT.Movement.config import Direction, Axis
 from LabExT.Movement.Transformations import Coordinate, ChipCoordinate, KabschRotation,\
     StageCoordinate, CoordinatePairing, SinglePointOffset, AxesRotation, Transformation, TransformationError,\
-    assert_valid_transformation, rigid_transform_with_orientation_preservation
+    assert_valid_transformation, coordinate_array, rigid_transform_with_orientation_preservation
 from LabExT.Tests.Utils import get_calibrations_from_file
 from ...Wafer.Chip import Chip
 from LabExT.Wafer.Device import Device
@@ -867,3 +867,217 @@ class KabschOrientationPerservationRandomTest(unittest.TestCase):
         kabsch_transformed_vector = kabsch_rotation.rotation_to_stage @ z_unit_vector
         self.assertGreater(ground_truth.dot(kabsch_transformed_vector), 0, 
             "Z-Unit Vector orientation not perserved!")
+
+
+class BatchTransformationTest(unittest.TestCase):
+    """
+    Tests that the array transformations match the transformation of single coordinates.
+    """
+
+    def setUp(self) -> None:
+        self.chip_coordinates = np.random.default_rng(0).uniform(-5000, 5000, (20, 3))
+
+    def create_transformations(self, stage_axes, directions):
+        axes_rotation = AxesRotation()
+        for chip_axis, stage_axis, direction in zip(Axis, stage_axes, directions):
+            axes_rotation.update(chip_axis, direction, stage_axis)
+
+        single_point_offset = SinglePointOffset(axes_rotation)
+        single_point_offset.update(CoordinatePairing(
+            calibration=Mock(), stage_coordinate=StageCoordinate(100, -200, 50), device=Mock(),
+            chip_coordinate=ChipCoordinate(10, 20, 0)))
+
+        kabsch_rotation = KabschRotation(axes_rotation)
+        for stage_coord, chip_coord in zip(VACHERIN_STAGE_COORDS, VACHERIN_CHIP_COORDS):
+            kabsch_rotation.update(CoordinatePairing(
+                calibration=Mock(), stage_coordinate=StageCoordinate.from_numpy(stage_coord), device=Mock(),
+                chip_coordinate=ChipCoordinate.from_numpy(chip_coord)))
+
+        return axes_rotation, single_point_offset, kabsch_rotation
+
+    @parameterized.expand(POSSIBLE_AXIS_ROTATIONS[::7])
+    def test_array_transformation_matches_single_coordinates(self, stage_axes, directions):
+        for transformation in self.create_transformations(stage_axes, directions):
+            stage_coordinates = transformation.chip_to_stage_array(self.chip_coordinates)
+            expected = [
+                transformation.chip_to_stage(ChipCoordinate.from_numpy(c)).to_numpy() for c in self.chip_coordinates]
+            np.testing.assert_allclose(stage_coordinates, expected)
+
+            chip_coordinates = transformation.stage_to_chip_array(stage_coordinates)
+            expected = [
+                transformation.stage_to_chip(StageCoordinate.from_numpy(c)).to_numpy() for c in stage_coordinates]
+            np.testing.assert_allclose(chip_coordinates, expected)
+            np.testing.assert_allclose(chip_coordinates, self.chip_coordinates, atol=1e-6)
+
+    def test_base_class_transforms_one_by_one(self):
+        transformation = Mock(spec=Transformation)
+        transformation.chip_to_stage.side_effect = lambda c: StageCoordinate.from_numpy(2 * c.to_numpy())
+
+        stage_coordinates = Transformation.chip_to_stage_array(transformation, [[1, 2, 3], [4, 5, 6]])
+
+        np.testing.assert_array_equal(stage_coordinates, [[2, 4, 6], [8, 10, 12]])
+
+    @parameterized.expand([
+        ([1, 2, 3], (1, 3)),
+        ([ChipCoordinate(1, 2, 3), ChipCoordinate(4, 5, 6)], (2, 3)),
+        (np.empty((0, 3)), (0, 3)),
+    ])
+    def test_coordinate_array_shapes(self, coordinates, shape):
+        self.assertEqual(coordinate_array(coordinates).shape, shape)
+
+    def test_coordinate_array_rejects_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            coordinate_array(np.zeros((4, 2)))
+
+    def test_invalid_transformation_raises(self):
+        with self.assertRaises(TransformationError):
+            SinglePointOffset(AxesRotation()).chip_to_stage_array(self.chip_coordinates)
+
+
+class KabschRefinementTest(unittest.TestCase):
+    """
+    Tests for the incremental, weighted and robust estimation of the kabsch rotation.
+    """
+
+    def setUp(self) -> None:
+        self.rng = np.random.default_rng(7)
+        self.rotation = Rotation.from_euler('z', 1.5, degrees=True).as_matrix()
+        self.translation = np.array([120.0, -340.0, 25.0])
+        self.transformation = KabschRotation(AxesRotation())
+
+    def make_pairing(self, chip_coordinate, offset=(0, 0, 0)):
+        stage_coordinate = self.rotation @ chip_coordinate + self.translation + np.asarray(offset)
+        return CoordinatePairing(
+            calibration=Mock(),
+            stage_coordinate=StageCoordinate.from_numpy(stage_coordinate),
+            device=Mock(),
+            chip_coordinate=ChipCoordinate.from_numpy(chip_coordinate))
+
+    def random_chip_coordinates(self, n):
+        return np.column_stack([self.rng.uniform(0, 8000, (n, 2)), np.zeros(n)])
+
+    def test_incremental_estimate_matches_batch_estimate(self):
+        chip_coordinates = self.random_chip_coordinates(8)
+        for chip_coordinate in chip_coordinates:
+            self.transformation.update(self.make_pairing(chip_coordinate, self.rng.normal(0, 0.5, 3)))
+
+        R, t, R_inv, t_inv = rigid_transform_with_orientation_preservation(
+            S=self.transformation.chip_coordinates, T=self.transformation.stage_coordinates)
+
+        np.testing.assert_allclose(self.transformation.rotation_to_stage, R, atol=1e-9)
+        np.testing.assert_allclose(self.transformation.translation_to_stage, t, atol=1e-6)
+        np.testing.assert_allclose(self.transformation.rotation_to_chip, R_inv, atol=1e-9)
+        np.testing.assert_allclose(self.transformation.translation_to_chip, t_inv, atol=1e-6)
+
+    def test_weights_pull_estimate_towards_heavy_pairings(self):
+        for chip_coordinate in self.random_chip_coordinates(4):
+            self.transformation.update(self.make_pairing(chip_coordinate), weight=100.0)
+        chip_coordinate = np.array([4000.0, 4000.0, 0.0])
+        self.transformation.update(self.make_pairing(chip_coordinate, offset=(50, 0, 0)), weight=0.01)
+
+        self.assertLess(self.transformation.residuals()[:4].max(), 0.1)
+
+    def test_update_rejects_non_positive_weight(self):
+        with self.assertRaises(ValueError):
+            self.transformation.update(self.make_pairing(np.zeros(3)), weight=0)
+
+        self.assertEqual(self.transformation.pairings, [])
+
+    def test_refine_rejects_outlier(self):
+        for chip_coordinate in self.random_chip_coordinates(5):
+            self.transformation.update(self.make_pairing(chip_coordinate, self.rng.normal(0, 0.5, 3)))
+
+        self.assertTrue(self.transformation.refine(self.make_pairing(np.array([1000.0, 2000.0, 0.0]), (1, 1, 0))))
+        outlier = self.make_pairing(np.array([3000.0, 500.0, 0.0]), offset=(200, 0, 0))
+        self.assertFalse(self.transformation.refine(outlier))
+
+        self.assertEqual(len(self.transformation.pairings), 6)
+        self.assertEqual(self.transformation.rejected_pairings, [outlier])
+        self.assertLess(self.transformation.rms_residual, 2.0)
+
+    def test_refine_ignores_pairings_until_valid(self):
+        for chip_coordinate in self.random_chip_coordinates(3):
+            self.assertFalse(self.transformation.refine(self.make_pairing(chip_coordinate)))
+
+        self.assertFalse(self.transformation.is_valid)
+        self.assertEqual(self.transformation.pairings, [])
+        self.assertEqual(self.transformation.rejected_pairings, [])
+
+    def test_refine_reweights_after_accepted_pairing(self):
+        for chip_coordinate in self.random_chip_coordinates(4):
+            self.transformation.update(self.make_pairing(chip_coordinate))
+
+        with patch.object(self.transformation, "reweight_huber") as reweight_huber_mock:
+            self.assertFalse(self.transformation.refine(
+                self.make_pairing(np.array([3000.0, 500.0, 0.0]), offset=(200, 0, 0))))
+            reweight_huber_mock.assert_not_called()
+
+            self.assertTrue(self.transformation.refine(self.make_pairing(np.array([1000.0, 2000.0, 0.0]))))
+            reweight_huber_mock.assert_called_once_with()
+
+    def test_rejection_threshold_uses_median_absolute_deviation(self):
+        with patch.object(self.transformation, "residuals", return_value=np.array([10.0, 20.0, 30.0, 40.0, 1000.0])):
+            # median 30um, median absolute deviation 10um
+            self.assertAlmostEqual(self.transformation.rejection_threshold(), 30.0 + 3.0 * 1.4826 * 10.0)
+
+        with patch.object(self.transformation, "residuals", return_value=np.array([1.0, 1.0, 1.0])):
+            self.assertEqual(self.transformation.rejection_threshold(), KabschRotation.MIN_REJECTION_THRESHOLD)
+
+    def test_huber_reweighting_downweights_outlier(self):
+        for chip_coordinate in self.random_chip_coordinates(10):
+            self.transformation.update(self.make_pairing(chip_coordinate, self.rng.normal(0, 0.5, 3)))
+        self.transformation.update(self.make_pairing(np.array([4000.0, 4000.0, 0.0]), offset=(300, 0, 0)))
+        residuals_before = self.transformation.residuals()
+
+        self.transformation.reweight_huber()
+
+        residuals_after = self.transformation.residuals()
+        self.assertLess(self.transformation.robust_weights[-1], 0.1)
+        self.assertLess(np.median(residuals_after[:-1]), np.median(residuals_before[:-1]))
+        self.assertGreater(residuals_after[-1], 250)
+
+    def test_residuals_of_invalid_transformation(self):
+        self.transformation.update(self.make_pairing(np.zeros(3)))
+
+        self.assertTrue(np.isnan(self.transformation.residuals()).all())
+        self.assertTrue(np.isnan(self.transformation.rms_residual))
+
+    def test_refined_pairings_are_bounded(self):
+        self.transformation.MAX_REFINED_PAIRINGS = 5
+        manual_pairings = [self.make_pairing(c) for c in self.random_chip_coordinates(3)]
+        for pairing in manual_pairings:
+            self.transformation.update(pairing)
+        refined_pairings = [self.make_pairing(c, self.rng.normal(0, 0.5, 3)) for c in self.random_chip_coordinates(10)]
+        for pairing in refined_pairings:
+            self.assertTrue(self.transformation.refine(pairing))
+
+        self.assertEqual(self.transformation.pairings, manual_pairings + refined_pairings[-5:])
+        self.assertEqual(self.transformation.refined_pairings, refined_pairings[-5:])
+        np.testing.assert_array_equal(
+            self.transformation.chip_coordinates,
+            np.array([p.chip_coordinate.to_numpy() for p in self.transformation.pairings]).T)
+
+        # the removed pairings no longer contribute to the estimate
+        R, t, _, _ = rigid_transform_with_orientation_preservation(
+            S=self.transformation.chip_coordinates, T=self.transformation.stage_coordinates)
+        np.testing.assert_allclose(self.transformation.rotation_to_stage, R, atol=1e-9)
+        np.testing.assert_allclose(self.transformation.translation_to_stage, t, atol=1e-6)
+
+    def test_rejected_pairings_are_bounded(self):
+        self.transformation.MAX_REFINED_PAIRINGS = 2
+        for chip_coordinate in self.random_chip_coordinates(4):
+            self.transformation.update(self.make_pairing(chip_coordinate))
+        outliers = [self.make_pairing(c, offset=(200, 0, 0)) for c in self.random_chip_coordinates(4)]
+        for outlier in outliers:
+            self.assertFalse(self.transformation.refine(outlier))
+
+        self.assertEqual(self.transformation.rejected_pairings, outliers[-2:])
+
+    def test_dump_excludes_refined_pairings(self):
+        for chip_coordinate in self.random_chip_coordinates(3):
+            self.transformation.update(self.make_pairing(chip_coordinate))
+        self.transformation.refine(self.make_pairing(np.array([1000.0, 2000.0, 0.0])))
+
+        self.assertEqual(len(self.transformation.pairings), 4)
+        self.assertEqual(len(self.transformation.dump()), 3)
+
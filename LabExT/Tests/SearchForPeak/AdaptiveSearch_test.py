@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+
+import numpy as np
+from parameterized import parameterized
+
+from LabExT.SearchForPeak.GaussianFit import gaussian
+from LabExT.SearchForPeak.PeakSearcher import PeakSearcher
+
+
+class AdaptiveSearchTest(unittest.TestCase):
+    """
+    Tests for the adaptive sampling of the adaptive SfP type.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        self.peak_searcher = PeakSearcher(mover=Mock())
+        self.rng = np.random.default_rng(11)
+        self.measured = []
+
+    def measure_gaussian(self, mu, sigma=3.0, noise=0.02):
+        def measure_at(d):
+            self.measured.append(d)
+            return gaussian(d, 10.0, mu, sigma, -40.0) + self.rng.normal(0, noise)
+        return measure_at
+
+    def test_stops_once_uncertainty_is_reached(self):
+        d_range, il_meas = self.peak_searcher._adaptive_search(
+            self.measure_gaussian(mu=2.0), radius=10.0, target_uncertainty=0.2, max_points=40)
+
+        self.assertLess(len(d_range), 40)
+        self.assertEqual(len(d_range), len(self.measured))
+        popt, perr = self.peak_searcher.fit_gaussian(d_range, il_meas)
+        self.assertAlmostEqual(popt[1], 2.0, delta=0.5)
+        self.assertLess(perr[1], 0.2)
+
+    def test_stops_at_max_points(self):
+        d_range, _ = self.peak_searcher._adaptive_search(
+            self.measure_gaussian(mu=2.0, noise=0.5), radius=10.0, target_uncertainty=1e-6, max_points=8)
+
+        self.assertLessEqual(len(d_range), 8)
+        self.assertTrue(np.all(np.diff(d_range) > 0))
+
+    def test_bisects_around_best_sample_if_fit_fails(self):
+        with patch.object(self.peak_searcher, 'fit_gaussian', side_effect=RuntimeError):
+            d_range, _ = self.peak_searcher._adaptive_search(
+                self.measure_gaussian(mu=4.0, noise=0.0), radius=10.0, target_uncertainty=1.0, max_points=12)
+
+        # coarse grid, then the intervals next to the best sample at 5 are bisected down to the resolution of 1um
+        np.testing.assert_allclose(self.measured[:5], [-10, -5, 0, 5, 10])
+        self.assertEqual(self.measured[5:], [7.5, 6.25, 2.5, 3.75])
+        self.assertEqual(len(d_range), 9)
+
+    def test_fallback_stops_below_resolution(self):
+        d_samples = np.array([-1.0, 0.0, 1.0])
+        il_samples = np.array([0.0, 1.0, 0.0])
+
+        self.assertEqual(PeakSearcher._next_adaptive_sample(d_samples, il_samples, None, 1.0, 0.4), 0.5)
+        self.assertIsNone(PeakSearcher._next_adaptive_sample(d_samples, il_samples, None, 1.0, 0.6))
+
+    @parameterized.expand([
+        (13.0,),
+        (-25.0,),
+        (9.5,),
+    ])
+    def test_samples_stay_within_radius(self, mu):
+        d_range, _ = self.peak_searcher._adaptive_search(
+            self.measure_gaussian(mu=mu, noise=0.2), radius=10.0, target_uncertainty=0.05, max_points=30)
+
+        self.assertTrue(np.all(np.abs(self.measured) <= 10.0))
+        self.assertTrue(np.all(np.abs(d_range) <= 10.0))
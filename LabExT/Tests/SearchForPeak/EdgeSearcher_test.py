@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, Mock
+
+import numpy as np
+
+from LabExT.Experiments.AutosaveDict import AutosaveDict
+from LabExT.Movement.Transformations import StageCoordinate
+from LabExT.SearchForPeak.EdgeSearcher import ContactDetector, EdgeSearcher
+
+
+class ContactDetectorTest(unittest.TestCase):
+    """
+    Tests for the contact criteria of the edge approach.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def test_disabled_criteria_never_fire(self):
+        detector = ContactDetector()
+        detector.update(1.0, -10.0, np.zeros((2, 2)))
+        self.assertIsNone(detector.update(1.0, -50.0, np.ones((2, 2))))
+
+    def test_power_gradient(self):
+        detector = ContactDetector(max_power_gradient=1.0)
+        self.assertIsNone(detector.update(2.0, -10.0))
+        self.assertIsNone(detector.update(2.0, -11.5))
+        self.assertIn("power gradient", detector.update(2.0, -14.0))
+
+    def test_image_change(self):
+        detector = ContactDetector(max_image_change=0.2)
+        image = np.full((4, 4), 100, dtype=np.uint8)
+        self.assertIsNone(detector.update(1.0, -10.0, image))
+        self.assertIsNone(detector.update(1.0, -10.0, image + 10))
+        self.assertIn("image change", detector.update(1.0, -10.0, image + 50))
+
+
+class EdgeApproachTest(unittest.TestCase):
+    """
+    Tests for the automatic edge approach of the edge searcher.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.position = [0.0, 0.0, 0.0]
+
+        calibration = Mock()
+        calibration.get_position.side_effect = lambda: StageCoordinate.from_list(self.position)
+        calibration.move_relative.side_effect = self.move_relative
+        mover = MagicMock(left_calibration=calibration, right_calibration=None)
+
+        self.edge_searcher = EdgeSearcher(mover=mover)
+        self.edge_searcher.parameters = EdgeSearcher.get_default_parameter()
+        self.edge_searcher.parameters['Motor Z increment'].value = -1.0
+        self.edge_searcher.parameters['Edge approach steps'].value = 8
+
+        self.edge_searcher.instr_laser = MagicMock()
+        self.edge_searcher.instr_powermeter = Mock(power=-10.0)
+        self.edge_searcher.instr_powermeter.fetch_power.side_effect = self.power
+        self.edge_searcher.camera = Mock()
+        self.edge_searcher.camera.snap_photo.side_effect = lambda: np.full((4, 4), 100 + self.position[2])
+        self.edge_searcher.image_stack = Mock()
+
+        self.edge_searcher.results = AutosaveDict(file_path=os.path.join(self.tmp_dir.name, "results.json"))
+        self.edge_searcher.results.update({'measured location': [], 'measured power': [], 'measurement time': []})
+        self.edge_searcher._capture_pool = ThreadPoolExecutor(max_workers=1)
+        self.edge_searcher._store_pool = ThreadPoolExecutor(max_workers=1)
+        self.edge_searcher._setup_plots()
+
+    def tearDown(self) -> None:
+        self.edge_searcher._capture_pool.shutdown()
+        self.edge_searcher._store_pool.shutdown()
+        self.tmp_dir.cleanup()
+
+    def move_relative(self, coordinate):
+        self.position = [p + d for p, d in zip(self.position, coordinate.to_list())]
+
+    def power(self):
+        # the fiber touches the edge after 5um
+        return -10.0 if self.position[2] > -5.0 else -20.0
+
+    def test_runs_all_steps_without_contact_criteria(self):
+        results = self.edge_searcher.run_edge_approach()
+
+        self.assertEqual(results['edge approach']['steps'], 8)
+        self.assertEqual(self.edge_searcher.image_stack.append.call_count, 8)
+        self.assertEqual(self.position[2], -8.0)
+
+    def test_stops_at_power_gradient(self):
+        self.edge_searcher.parameters['Stop power gradient'].value = 5.0
+
+        results = self.edge_searcher.run_edge_approach()
+
+        self.assertEqual(results['edge approach']['steps'], 5)
+        self.assertIn("power gradient", results['edge approach']['stop reason'])
+        self.assertEqual(self.edge_searcher.image_stack.append.call_count, 5)
+
+    def test_plot_traces_are_updated_in_place(self):
+        plot_x, plot_z = self.edge_searcher.plots_left
+        plot_image, = self.edge_searcher.plots_right
+
+        self.edge_searcher.run_edge_approach()
+
+        self.assertEqual(self.edge_searcher.plots_left, [plot_x, plot_z])
+        self.assertEqual(self.edge_searcher.plots_right, [plot_image])
+        np.testing.assert_array_equal(plot_z.x, -np.arange(8))
+
+        _, snapshot = self.edge_searcher.plot_snapshots.latest()
+        np.testing.assert_array_equal(snapshot['left'][1].y, [-10.0] * 4 + [-20.0] * 4)
+        np.testing.assert_array_equal(snapshot['right'][0].image, np.full((4, 4), 92.0))
+
+    def test_stop_request_aborts_approach(self):
+        self.edge_searcher.instr_powermeter.fetch_power.side_effect = \
+            lambda: self.edge_searcher.stop_requested.set() or -10.0
+
+        results = self.edge_searcher.run_edge_approach()
+
+        self.assertEqual(results['edge approach'], {'steps': 1, 'stop reason': 'stopped by user'})
+
+    def test_capture_is_refused_during_approach(self):
+        capture_errors = []
+
+        def capture_during_approach():
+            try:
+                self.edge_searcher.capture_data()
+            except RuntimeError as err:
+                capture_errors.append(err)
+            return -10.0
+        self.edge_searcher.instr_powermeter.fetch_power.side_effect = capture_during_approach
+
+        results = self.edge_searcher.run_edge_approach()
+
+        self.assertEqual(len(capture_errors), 8)
+        self.assertEqual(results['edge approach']['steps'], 8)
+        self.assertEqual(self.position[2], -8.0)
+
+    def test_capture_after_approach(self):
+        self.edge_searcher.parameters['Edge approach steps'].value = 2
+        self.edge_searcher.run_edge_approach()
+
+        self.edge_searcher.capture_data()
+
+        self.assertEqual(self.position[2], -3.0)
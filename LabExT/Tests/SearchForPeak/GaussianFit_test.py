@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2022  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY;
+for details see LICENSE file.
+"""
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from parameterized import parameterized
+
+from LabExT.SearchForPeak import GaussianFit
+from LabExT.SearchForPeak.GaussianFit import gaussian, gaussian_jacobian, log_parabola_initial_guess, \
+    warm_start_initial_guess, fit_gaussian, fit_gaussians_batch
+
+
+class GaussianFitTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.rng = np.random.default_rng(42)
+
+    def _noisy_gaussian(self, params, n_points=41, noise=0.05):
+        x = np.linspace(-5, 5, n_points)
+        return x, gaussian(x, *params) + self.rng.normal(0, noise, n_points)
+
+    def test_jacobian_matches_finite_differences(self):
+        x = np.linspace(-5, 5, 31)
+        params = np.array([12.0, 0.7, 1.3, -40.0])
+        eps = 1e-6
+
+        numeric = np.stack([
+            (gaussian(x, *(params + eps * e)) - gaussian(x, *(params - eps * e))) / (2 * eps)
+            for e in np.eye(4)], axis=1)
+
+        np.testing.assert_allclose(gaussian_jacobian(x, *params), numeric, atol=1e-6)
+
+    def test_log_parabola_guess_is_exact_without_noise_and_offset(self):
+        x = np.linspace(-5, 5, 41)
+        y = gaussian(x, 3.0, -1.2, 1.5, 0.0)
+        # the minimum of the sampled data is used as offset, add a constant background far below the peak
+        a, mu, sigma, _ = log_parabola_initial_guess(x, y + 1e-9)
+
+        self.assertAlmostEqual(mu, -1.2, places=2)
+        self.assertAlmostEqual(sigma, 1.5, delta=0.1)
+        self.assertAlmostEqual(a, 3.0, delta=0.2)
+
+    def test_log_parabola_guess_falls_back_on_valley(self):
+        x = np.linspace(-5, 5, 41)
+        guess = log_parabola_initial_guess(x, -gaussian(x, 3.0, 0.0, 1.5, 0.0), sigma_hint=2.0)
+
+        self.assertEqual(guess[2], 2.0)
+
+    @parameterized.expand([
+        ([15.0, 0.3, 1.2, -45.0],),
+        ([8.0, -2.5, 2.0, -30.0],),
+        ([20.0, 3.1, 0.8, -50.0],),
+    ])
+    def test_fit_gaussian_finds_peak(self, params):
+        x, y = self._noisy_gaussian(params)
+
+        popt, perr = fit_gaussian(x, y)
+
+        self.assertAlmostEqual(popt[1], params[1], delta=0.05)
+        self.assertTrue(np.all(perr >= 0))
+
+    def test_batch_fit_matches_single_fits(self):
+        params = [[15.0, 0.3, 1.2, -45.0], [8.0, -2.5, 2.0, -30.0], [20.0, 3.1, 0.8, -50.0]]
+        datasets = [self._noisy_gaussian(p, n_points=n) for p, n in zip(params, [21, 41, 501])]
+
+        popt_batch, perr_batch, converged = fit_gaussians_batch([d[0] for d in datasets], [d[1] for d in datasets])
+
+        self.assertTrue(np.all(converged))
+        for (x, y), p_batch, e_batch in zip(datasets, popt_batch, perr_batch):
+            popt, perr = fit_gaussian(x, y)
+            np.testing.assert_allclose(p_batch, popt, rtol=1e-4, atol=1e-4)
+            np.testing.assert_allclose(e_batch, perr, rtol=1e-2)
+
+    def _coarse_noisy_gaussians(self, n_sets=30):
+        # few samples with strong noise, as in a fast stepped SfP
+        x = np.linspace(-5, 5, 9)
+        return x, [gaussian(x, 10.0, 0.8, 1.5, -40.0) + self.rng.normal(0, 2.0, len(x)) for _ in range(n_sets)]
+
+    def test_sigma_hint_improves_fit_start(self):
+        x, datasets = self._coarse_noisy_gaussians()
+
+        for y in datasets:
+            closed_form = log_parabola_initial_guess(x, y)
+            warm_start = warm_start_initial_guess(x, y, sigma_hint=1.5)
+            self.assertLessEqual(
+                np.sum((gaussian(x, *warm_start) - y) ** 2), np.sum((gaussian(x, *closed_form) - y) ** 2))
+
+    def test_sigma_hint_reduces_function_evaluations(self):
+        x, datasets = self._coarse_noisy_gaussians()
+
+        def count_evaluations(sigma_hint):
+            with patch.object(GaussianFit, 'gaussian', wraps=gaussian) as gaussian_mock:
+                for y in datasets:
+                    fit_gaussian(x, y, sigma_hint=sigma_hint)
+                return gaussian_mock.call_count
+
+        self.assertLess(count_evaluations(sigma_hint=1.5), count_evaluations(sigma_hint=None))
+
+    def test_warm_start_without_hint_is_closed_form_estimate(self):
+        x, y = self._noisy_gaussian([15.0, 0.3, 1.2, -45.0])
+
+        self.assertEqual(warm_start_initial_guess(x, y), log_parabola_initial_guess(x, y))
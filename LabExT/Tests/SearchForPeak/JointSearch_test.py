@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import unittest
+from unittest.mock import Mock
+
+import numpy as np
+from parameterized import parameterized
+
+from LabExT.SearchForPeak.PeakSearcher import PeakSearcher
+
+
+def tilted_gaussian_params(n_dims, rng):
+    """Returns parameters of a gaussian with a random, non-diagonal precision matrix."""
+    Q = np.linalg.qr(rng.normal(size=(n_dims, n_dims)))[0]
+    sigmas = rng.uniform(2.0, 4.0, n_dims)
+    A = Q @ np.diag(1 / sigmas ** 2) @ Q.T
+    mu = rng.uniform(-2.0, 2.0, n_dims)
+    return np.concatenate([[12.0], mu, A[np.triu_indices(n_dims)], [-45.0]])
+
+
+class MultivariateGaussianTest(unittest.TestCase):
+    """
+    Tests for the multivariate gaussian fit of the joint SfP type.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        self.peak_searcher = PeakSearcher(mover=Mock())
+        self.rng = np.random.default_rng(5)
+
+    @parameterized.expand([(2,), (3,), (4,)])
+    def test_jacobian_matches_finite_differences(self, n_dims):
+        params = tilted_gaussian_params(n_dims, self.rng)
+        x_data = self.rng.uniform(-6, 6, (40, n_dims))
+        eps = 1e-6
+
+        numeric = np.stack([
+            (PeakSearcher._multivariate_gaussian(x_data, params + eps * e) -
+             PeakSearcher._multivariate_gaussian(x_data, params - eps * e)) / (2 * eps)
+            for e in np.eye(len(params))], axis=1)
+
+        np.testing.assert_allclose(
+            PeakSearcher._multivariate_gaussian_jacobian(x_data, params), numeric, atol=1e-6)
+
+    @parameterized.expand([(2, 60), (4, 200)])
+    def test_fit_recovers_tilted_gaussian(self, n_dims, n_points):
+        params = tilted_gaussian_params(n_dims, self.rng)
+        x_data = PeakSearcher._space_filling_pattern(n_dims, 8.0, n_points)
+        y_data = PeakSearcher._multivariate_gaussian(x_data, params) + self.rng.normal(0, 0.05, n_points)
+
+        a, mu, A, offset, mu_std_dev = self.peak_searcher.fit_multivariate_gaussian(x_data, y_data, sigma_init=3.0)
+
+        _, mu_true, A_true, _ = PeakSearcher._multivariate_gaussian_unpack(params, n_dims)
+        np.testing.assert_allclose(mu, mu_true, atol=0.1)
+        np.testing.assert_allclose(A, A_true, atol=0.02)
+        self.assertAlmostEqual(a, 12.0, delta=0.3)
+        self.assertAlmostEqual(offset, -45.0, delta=0.3)
+        self.assertTrue(np.all(mu_std_dev < 0.1))
+
+    def test_fit_rejects_valley(self):
+        params = tilted_gaussian_params(2, self.rng)
+        x_data = PeakSearcher._space_filling_pattern(2, 8.0, 60)
+        y_data = -PeakSearcher._multivariate_gaussian(x_data, params)
+
+        with self.assertRaises(RuntimeError):
+            self.peak_searcher.fit_multivariate_gaussian(x_data, y_data, sigma_init=3.0)
+
+
+class SpaceFillingPatternTest(unittest.TestCase):
+    """
+    Tests for the sample pattern of the joint SfP type.
+
+    Required lab setup: none, only SW testing
+    """
+
+    @parameterized.expand([(2, 50), (3, 80), (4, 120)])
+    def test_shape_and_radius(self, n_dims, n_points):
+        pattern = PeakSearcher._space_filling_pattern(n_dims, 10.0, n_points)
+
+        self.assertEqual(pattern.shape, (n_points, n_dims))
+        np.testing.assert_allclose(pattern[0], 0, atol=1e-12)
+        self.assertTrue(np.all(np.abs(pattern) <= 10.0 + 1e-9))
+
+    def test_spiral_stays_within_radius(self):
+        pattern = PeakSearcher._space_filling_pattern(2, 10.0, 50)
+
+        self.assertLessEqual(np.linalg.norm(pattern, axis=1).max(), 10.0 + 1e-9)
+
+    @parameterized.expand([(2, 50), (3, 80), (4, 120)])
+    def test_samples_are_equally_spaced_along_curve(self, n_dims, n_points):
+        pattern = PeakSearcher._space_filling_pattern(n_dims, 10.0, n_points)
+        # the same curve, sampled much finer
+        curve = PeakSearcher._space_filling_curve(n_dims, 10.0, n_points, oversampling=2000)
+        arc_length = np.concatenate([[0], np.cumsum(np.linalg.norm(np.diff(curve, axis=0), axis=1))])
+
+        # arc length position of every sample on the fine curve
+        nearest = [np.argmin(np.linalg.norm(curve - p, axis=1)) for p in pattern]
+        spacing = np.diff(arc_length[nearest])
+
+        np.testing.assert_allclose(spacing, arc_length[-1] / (n_points - 1), rtol=0.02)
+        # neighbouring samples are never further apart than the spacing along the curve
+        self.assertTrue(np.all(np.linalg.norm(np.diff(pattern, axis=0), axis=1) <= spacing * 1.001))
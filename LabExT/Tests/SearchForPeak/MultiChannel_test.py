@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import unittest
+from unittest.mock import Mock
+
+import numpy as np
+
+from LabExT.SearchForPeak.PeakSearcher import PeakSearcher
+
+
+class MultiChannelObjectiveTest(unittest.TestCase):
+    """
+    Tests for the combination of several power meter channels in the Search for Peak.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        self.peak_searcher = PeakSearcher(mover=Mock())
+        self.peak_searcher.parameters = PeakSearcher.get_default_parameter()
+        self.channel_powers = np.array([[-10.0, -10.0], [-3.0, -20.0]])
+
+    def objective(self, name, weights=None):
+        self.peak_searcher.parameters['Multi-channel objective'].value = name
+        if weights is not None:
+            self.peak_searcher.parameters['Multi-channel weights'].value = weights
+        return self.peak_searcher.combine_channel_powers(self.channel_powers)
+
+    def test_sum_adds_linear_powers(self):
+        np.testing.assert_allclose(self.objective('sum')[0], -10 + 10 * np.log10(2))
+
+    def test_min_selects_weakest_channel(self):
+        np.testing.assert_array_equal(self.objective('min'), [-10, -20])
+
+    def test_weighted_mean(self):
+        np.testing.assert_allclose(self.objective('weighted', '0,1'), [-10, -20])
+        np.testing.assert_allclose(self.objective('weighted', '1,1')[0], -10)
+
+    def test_weights_must_match_channels(self):
+        with self.assertRaises(ValueError):
+            self.objective('weighted', '1,1,1')
+
+    def test_single_channel_is_unchanged(self):
+        for name in ['sum', 'min', 'weighted']:
+            self.peak_searcher.parameters['Multi-channel objective'].value = name
+            self.assertEqual(self.peak_searcher.combine_channel_powers([-7.5]), -7.5)
+
+    def test_objective_is_logged_per_channel(self):
+        pm_1, pm_2 = Mock(power=-3.0), Mock(power=-20.0)
+        self.peak_searcher.instr_powermeters = [pm_1, pm_2]
+        self.peak_searcher.parameters['Multi-channel objective'].value = 'min'
+
+        self.assertEqual(self.peak_searcher._measure_objective(), -20.0)
+        np.testing.assert_array_equal(self.peak_searcher._channel_log[-1], [-3.0, -20.0])
+
+    def test_batch_readers_are_read_in_one_transaction(self):
+        class BatchPowerMeter:
+            def __init__(self, lj, lj_port):
+                self.lj, self.lj_port = lj, lj_port
+
+            def fetch_power_all(self, ports):
+                return self.lj.read(ports)
+
+        lj = Mock()
+        lj.read.return_value = {"AIN1": -20.0, "AIN0": -3.0}
+        self.peak_searcher.instr_powermeters = [BatchPowerMeter(lj, "AIN0"), Mock(power=-7.0),
+                                                BatchPowerMeter(lj, "AIN1")]
+
+        np.testing.assert_array_equal(self.peak_searcher._read_channel_powers(), [-3.0, -7.0, -20.0])
+        lj.read.assert_called_once_with(["AIN0", "AIN1"])
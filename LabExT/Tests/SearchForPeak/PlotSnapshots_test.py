@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import unittest
+from unittest.mock import Mock
+
+import numpy as np
+
+from LabExT.SearchForPeak.PeakSearcher import PeakSearcher
+from LabExT.View.Controls.PlotControl import PlotData, update_plot_data_source
+from LabExT.ViewModel.Utilities.ObservableList import ObservableList
+from LabExT.ViewModel.Utilities.SnapshotChannel import SnapshotChannel
+
+
+class SnapshotChannelTest(unittest.TestCase):
+    """
+    Tests for the drop-old channel between the Search for Peak and its plots.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def test_consumer_gets_only_latest_snapshot(self):
+        channel = SnapshotChannel()
+        self.assertEqual(channel.latest(), (0, None))
+
+        channel.publish('first')
+        channel.publish('second')
+
+        version, snapshot = channel.latest()
+        self.assertEqual(snapshot, 'second')
+        self.assertEqual(channel.latest(version), (version, None))
+
+    def test_published_plots_are_detached_from_peak_searcher(self):
+        peak_searcher = PeakSearcher(mover=Mock())
+        meas_plot = PlotData([], [], 'scatter', color='C0')
+        peak_searcher.plots_left.append(meas_plot)
+        meas_plot.x.append(1.0)
+        meas_plot.y.append(-10.0)
+
+        peak_searcher.publish_plots()
+        meas_plot.x.append(2.0)
+        meas_plot.y.append(-5.0)
+
+        _, snapshot = peak_searcher.plot_snapshots.latest()
+        np.testing.assert_array_equal(snapshot['left'][0].x, [1.0])
+        self.assertEqual(snapshot['left'][0].plot_type, 'scatter')
+        self.assertEqual(snapshot['right'], [])
+
+    def test_update_plot_data_source_updates_in_place(self):
+        data_source = ObservableList()
+        update_plot_data_source(data_source, [PlotData(np.array([1.0]), np.array([2.0]), marker='x')])
+        plot_data = data_source[0]
+        changed = Mock()
+        plot_data.data_changed.append(changed)
+
+        update_plot_data_source(data_source, [PlotData(np.array([1.0, 2.0]), np.array([2.0, 3.0]), marker='x')])
+
+        self.assertIs(data_source[0], plot_data)
+        np.testing.assert_array_equal(plot_data.x, [1.0, 2.0])
+        changed.assert_called()
+
+    def test_update_plot_data_source_refills_on_new_plots(self):
+        data_source = ObservableList()
+        added = Mock()
+        data_source.item_added.append(added)
+        update_plot_data_source(data_source, [PlotData([1.0], [2.0])])
+
+        update_plot_data_source(data_source, [PlotData([1.0], [2.0]), PlotData([1.0], [2.0], 'scatter')])
+
+        self.assertEqual(len(data_source), 2)
+        self.assertEqual(added.call_count, 3)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import time
+import unittest
+from unittest.mock import Mock
+
+import numpy as np
+
+from LabExT.SearchForPeak.PeakSearcher import PeakSearcher
+from LabExT.SearchForPeak.ResultCache import SfPResult, SfPResultCache
+from LabExT.Wafer.Device import Device
+
+
+class SfPResultCacheTest(unittest.TestCase):
+    """
+    Tests for the per-device cache of Search for Peak results.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        self.chip = Mock()
+        self.chip.name = "chip A"
+        self.other_chip = Mock()
+        self.other_chip.name = "chip B"
+
+        self.device_1 = Device(id="1", type="GC", in_position=[0, 0], out_position=[100, 0])
+        self.device_2 = Device(id="2", type="GC", in_position=[0, 100], out_position=[100, 100])
+        self.device_far = Device(id="3", type="GC", in_position=[0, 5000], out_position=[100, 5000])
+
+        self.cache = SfPResultCache(max_age=60, max_start_deviation=5, max_temperature_change=0.5)
+
+    def store(self, device, offset, chip=None, start=(10, 20), **kwargs):
+        self.cache.store(chip or self.chip, device, SfPResult(
+            start_location=list(start),
+            optimized_location=list(np.add(start, offset)),
+            through_power=-10.0,
+            **kwargs))
+
+    def test_lookup_returns_stored_result(self):
+        self.store(self.device_1, [1, -1])
+
+        entry = self.cache.lookup(self.chip, self.device_1, [10, 20])
+
+        np.testing.assert_allclose(entry.offset, [1, -1])
+        self.assertIsNone(self.cache.lookup(self.other_chip, self.device_1, [10, 20]))
+        self.assertIsNone(self.cache.lookup(self.chip, self.device_2, [10, 20]))
+
+    def test_outdated_entries_are_removed(self):
+        self.store(self.device_1, [1, -1], timestamp=time.time() - 120)
+
+        self.assertIsNone(self.cache.lookup(self.chip, self.device_1, [10, 20]))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_entry_is_invalid_if_stages_arrive_elsewhere(self):
+        self.store(self.device_1, [1, -1])
+
+        self.assertIsNotNone(self.cache.lookup(self.chip, self.device_1, [12, 20]))
+        self.assertIsNone(self.cache.lookup(self.chip, self.device_1, [20, 20]))
+
+    def test_entry_is_invalid_after_temperature_change(self):
+        temperature = Mock(return_value=25.0)
+        self.cache.temperature_source = temperature
+        self.store(self.device_1, [1, -1])
+
+        temperature.return_value = 25.2
+        self.assertIsNotNone(self.cache.lookup(self.chip, self.device_1))
+        temperature.return_value = 26.0
+        self.assertIsNone(self.cache.lookup(self.chip, self.device_1))
+
+    def test_predict_offset_without_entries(self):
+        self.assertIsNone(self.cache.predict_offset(self.chip, self.device_1, 2))
+
+    def test_predict_offset_prefers_nearest_devices(self):
+        self.cache.n_neighbours = 2
+        self.store(self.device_1, [1, 1])
+        self.store(self.device_far, [-5, -5])
+        self.store(self.device_1, [2, 2], chip=self.other_chip)
+
+        predicted = self.cache.predict_offset(self.chip, self.device_2, 2)
+
+        # weighted towards the close device 1, not influenced by the other chip
+        self.assertTrue(np.all(predicted > 0.5))
+        self.assertTrue(np.all(predicted < 1))
+
+    def test_invalidate_chip(self):
+        self.store(self.device_1, [1, 1])
+        self.store(self.device_2, [1, 1])
+        self.store(self.device_1, [1, 1], chip=self.other_chip)
+
+        self.cache.invalidate(self.chip)
+
+        self.assertEqual(len(self.cache), 1)
+        self.assertIn(SfPResultCache.key(self.other_chip, self.device_1), self.cache)
+
+
+class SearchForPeakOnDeviceTest(unittest.TestCase):
+    """
+    Tests for the use of the result cache by the Search for Peak in automated sweeps.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        self.peak_searcher = PeakSearcher(mover=Mock(drift_correction_enabled=False))
+        self.peak_searcher.parameters = PeakSearcher.get_default_parameter()
+        self.peak_searcher.get_stage_coordinates = Mock(return_value=[10.0, 20.0])
+        self.peak_searcher._move_stages_absolute = Mock()
+        self.peak_searcher.measure_through_power = Mock(return_value=-5.0)
+        self.peak_searcher.search_for_peak = Mock(return_value={
+            'fitting information': {0: {'sfp decision': PeakSearcher.SFP_DECISION_OPTIMIZED}},
+            'optimized location': [11.0, 21.0],
+            'optimized through power': -5.0})
+
+        self.chip = Mock()
+        self.chip.name = "chip A"
+        self.device = Device(id="1", type="GC", in_position=[0, 0], out_position=[100, 0])
+
+    def test_cache_is_disabled_by_default(self):
+        self.peak_searcher.search_for_peak_on_device(self.chip, self.device)
+        self.peak_searcher.search_for_peak_on_device(self.chip, self.device)
+
+        self.assertEqual(self.peak_searcher.search_for_peak.call_count, 2)
+        self.assertEqual(len(self.peak_searcher.result_cache), 0)
+
+    def test_cached_result_skips_search(self):
+        self.peak_searcher.parameters['Result cache enabled'].value = True
+
+        self.peak_searcher.search_for_peak_on_device(self.chip, self.device)
+        results = self.peak_searcher.search_for_peak_on_device(self.chip, self.device)
+
+        self.peak_searcher.search_for_peak.assert_called_once()
+        self.assertEqual(results['result cache'], 'cached result, search skipped')
+
+    def test_temperature_change_invalidates_cached_result(self):
+        self.peak_searcher.parameters['Result cache enabled'].value = True
+        self.peak_searcher.parameters['Result cache temperature tolerance'].value = 0.5
+        temperature = Mock(return_value=25.0)
+        self.peak_searcher.set_temperature_source(temperature)
+
+        self.peak_searcher.search_for_peak_on_device(self.chip, self.device)
+        self.assertEqual(self.peak_searcher.result_cache.lookup(self.chip, self.device).temperature, 25.0)
+
+        temperature.return_value = 26.0
+        results = self.peak_searcher.search_for_peak_on_device(self.chip, self.device)
+
+        self.assertEqual(self.peak_searcher.search_for_peak.call_count, 2)
+        self.assertNotEqual(results['result cache'], 'cached result, search skipped')
+
+    def init_instruments(self, selected_roles):
+        self.peak_searcher._experiment_manager = Mock()
+        self.peak_searcher.selected_instruments = {role: {'class': 'Driver'} for role in selected_roles}
+        self.temperature_controller = Mock(temperature=24.5)
+
+        def create_instrument_obj(role, selected_instruments, instruments):
+            instruments[(role, 'Driver')] = self.temperature_controller if role == 'Temperature Controller' else Mock()
+        self.peak_searcher._experiment_manager.instrument_api.create_instrument_obj.side_effect = create_instrument_obj
+
+        self.peak_searcher.init_instruments()
+
+    def test_temperature_controller_is_temperature_source(self):
+        self.init_instruments(PeakSearcher.get_wanted_instrument() + [PeakSearcher.TEMPERATURE_ROLE])
+
+        self.assertEqual(self.peak_searcher.result_cache.current_temperature(), 24.5)
+        self.temperature_controller.open.assert_called()
+
+    def test_no_temperature_source_without_temperature_controller(self):
+        self.init_instruments(PeakSearcher.get_wanted_instrument())
+
+        self.assertIsNone(self.peak_searcher.result_cache.current_temperature())
+        self.assertNotIn((PeakSearcher.TEMPERATURE_ROLE, 'Driver'), self.peak_searcher.instruments)
+
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import time
+import unittest
+
+import numpy as np
+
+from LabExT.SearchForPeak.SweepSampler import SweepSampler
+
+
+class SweepSamplerTest(unittest.TestCase):
+    """
+    Tests for the concurrent position and power sampling of the swept Search for Peak.
+
+    Required lab setup: none, only SW testing
+    """
+
+    SPEED = 20.0  # um/s
+
+    def setUp(self) -> None:
+        self.t_start = time.perf_counter()
+
+    def position(self):
+        return self.SPEED * (time.perf_counter() - self.t_start)
+
+    def power(self):
+        # a slow power meter, whose reading is a function of the position in the middle of the read-out
+        time.sleep(0.002)
+        value = -10 - 0.1 * self.position() ** 2
+        time.sleep(0.002)
+        return value
+
+    def test_aligned_positions_match_power_readings(self):
+        with SweepSampler(self.position, self.power, sample_interval=0.005) as sampler:
+            time.sleep(0.3)
+
+        positions, power = sampler.aligned_samples()
+
+        self.assertGreater(len(power), 10)
+        self.assertTrue(np.all(np.diff(positions) > 0))
+        np.testing.assert_allclose(power, -10 - 0.1 * positions ** 2, atol=0.5)
+
+    def test_position_samples_enclose_power_samples(self):
+        with SweepSampler(self.position, self.power) as sampler:
+            time.sleep(0.05)
+
+        t_pos, _, t_pow, _ = sampler.raw_samples()
+        positions, _ = sampler.aligned_samples()
+
+        self.assertLessEqual(t_pos[0], t_pow[0])
+        self.assertGreaterEqual(t_pos[-1], t_pow[-1])
+        self.assertEqual(len(positions), len(t_pow))
+
+    def test_errors_in_sampling_threads_are_raised(self):
+        def broken_power_meter():
+            raise ValueError("read-out failed")
+
+        with self.assertRaises(ValueError):
+            with SweepSampler(self.position, broken_power_meter):
+                time.sleep(0.01)
+
+    def test_multi_channel_power_is_aligned(self):
+        def channels():
+            position = self.position()
+            return [position, 2 * position]
+
+        with SweepSampler(self.position, channels, sample_interval=0.005) as sampler:
+            time.sleep(0.1)
+
+        positions, power = sampler.aligned_samples()
+
+        self.assertEqual(power.shape, (len(positions), 2))
+        np.testing.assert_allclose(power[:, 1], 2 * power[:, 0])
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import threading
+import unittest
+from queue import Queue
+from unittest.mock import Mock
+
+from LabExT.View.LiveViewer.Cards.PowerMeterCard import PowerMeterCard
+
+
+class BatchPowerMeter:
+    """Power meter reading its detector port through a shared device, like the PD10R."""
+
+    def __init__(self, card, lj_port):
+        self.card = card
+        self.lj_port = lj_port
+        self.thread_lock = threading.Lock()
+        self.read_ports = []
+
+    def fetch_power_all(self, ports):
+        self.read_ports.append(ports)
+        self.card.stop_thread = True
+        return {port: -12.5 for port in ports}
+
+
+class PowerMeterCardPollingTest(unittest.TestCase):
+    """
+    Tests for the polling of power meters in the live viewer card.
+
+    Required lab setup: none, only SW testing
+    """
+
+    def setUp(self) -> None:
+        self.card = Mock(stop_thread=False, data_to_plot_queue=Queue())
+
+    def test_batch_reader_reads_its_own_port(self):
+        self.card.instrument = BatchPowerMeter(self.card, "AIN2")
+        self.card.enabled_channels = {'1': 'Ch1'}
+
+        PowerMeterCard.poll_pm(self.card)
+
+        self.assertEqual(self.card.instrument.read_ports, [["AIN2"]])
+        point = self.card.data_to_plot_queue.get_nowait()
+        self.assertEqual(point.trace_name, 'Ch1')
+        self.assertEqual(point.y_value, -12.5)
+        self.assertTrue(self.card.data_to_plot_queue.empty())
+        self.assertTrue(self.card.thread_finished)
+
+    def test_channel_instrument_is_read_per_channel(self):
+        instrument = Mock(thread_lock=threading.Lock())
+        instrument.fetch_power.side_effect = [-3.0, -4.0]
+        self.card.instrument = instrument
+        self.card.enabled_channels = {'1': 'Ch1', '2': 'Ch2'}
+
+        def stop_after_second_round(*args):
+            if instrument.trigger.call_count == 4:
+                self.card.stop_thread = True
+        instrument.trigger.side_effect = stop_after_second_round
+
+        PowerMeterCard.poll_pm(self.card)
+
+        points = [self.card.data_to_plot_queue.get_nowait() for _ in range(2)]
+        self.assertEqual([(p.trace_name, p.y_value) for p in points], [('Ch1', -3.0), ('Ch2', -4.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
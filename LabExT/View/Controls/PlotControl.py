@@ -106,11 +106,40 @@ class PlotData(object):
         """Gets called in case that x and y are observable and one of them has changed"""
         self.__update__()
 
+    def snapshot(self):
+        """Returns a detached copy of this plot data, which can be safely handed to another thread."""
+        return PlotData(x=None if self.x is None else np.array(self.x),
+                        y=None if self.y is None else np.array(self.y),
+                        plot_type=self.plot_type,
+                        image=None if self.image is None else np.array(self.image),
+                        color=self._color,
+                        **self.plot_args)
+
     def __update__(self):
         for callback in self.data_changed:
             callback(self)
 
 
+def update_plot_data_source(data_source: ObservableList, snapshots: list):
+    """
+    Makes the plot data in data_source equal to the given snapshots, see PlotData.snapshot().
+
+    Existing plot data is updated in place if the snapshots have the same plot types, otherwise the data source is
+    refilled. Must be called from the thread owning the plots observing data_source.
+    """
+    if len(data_source) == len(snapshots) and all(
+            p.plot_type == s.plot_type and p.plot_args == s.plot_args for p, s in zip(data_source, snapshots)):
+        for plot_data, snapshot in zip(data_source, snapshots):
+            plot_data.x = snapshot.x
+            plot_data.y = snapshot.y
+            if snapshot.image is not None:
+                plot_data.image = snapshot.image
+    else:
+        data_source.clear()
+        for snapshot in snapshots:
+            data_source.append(snapshot)
+
+
 def execute_in_plotting_thread(func):
     """ This wrapper is used inside PlotControl to force execution
      of the function inside the thread which created the plot. """
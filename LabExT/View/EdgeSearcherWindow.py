@@ -6,6 +6,7 @@ This program is free software and comes with ABSOLUTELY NO WARRANTY; for details
 """
 
 import logging
+import threading
 from tkinter import Tk, Toplevel, Button, messagebox
 
 from LabExT.Utils import get_visa_address
@@ -13,7 +14,8 @@ from LabExT.View.Controls.CustomFrame import CustomFrame
 from LabExT.View.Controls.InstrumentSelector import InstrumentRole, InstrumentSelector
 from LabExT.View.Controls.ParameterTable import ParameterTable
 from LabExT.View.Controls.MovementTable import MovementTable
-from LabExT.View.Controls.PlotControl import PlotControl
+from LabExT.View.Controls.PlotControl import PlotControl, update_plot_data_source
+from LabExT.ViewModel.Utilities.ObservableList import ObservableList
 
 
 class EdgeSearcherWindowModel:
@@ -30,6 +32,8 @@ class EdgeSearcherWindowModel:
 
         self.plots_left = None
         self.plots_right = None
+        # version of the last plot snapshot of the edge searcher shown in the plots
+        self.plot_snapshot_version = 0
 
     @property
     def settings_path(self):
@@ -79,20 +83,22 @@ class EdgeSearcherWindowModel:
         self.settings_path = self.edge_searcher.settings_path_full
 
     def load_observed_list(self):
-        # create observed list for plots
-        self.plots_left = self.edge_searcher.plots_left
-        self.plots_right = self.edge_searcher.plots_right
+        # create observed list for plots, filled with the plot snapshots published by the edge searcher
+        self.plots_left = ObservableList()
+        self.plots_right = ObservableList()
+        self.plot_snapshot_version = 0
 
-        self.plots_left.item_added.clear()
-        self.plots_left.item_removed.clear()
-        self.plots_left.on_clear.clear()
-
-        self.plots_right.item_added.clear()
-        self.plots_right.item_removed.clear()
-        self.plots_right.on_clear.clear()
-
-        self.plots_left.clear()
-        self.plots_right.clear()
+    def update_plots_from_edge_searcher(self):
+        """
+        Shows the latest plot snapshot of the edge searcher, if there is a new one. Call from the GUI thread only.
+        Returns True if the plots were updated.
+        """
+        self.plot_snapshot_version, snapshot = self.edge_searcher.plot_snapshots.latest(self.plot_snapshot_version)
+        if snapshot is None:
+            return False
+        update_plot_data_source(self.plots_left, snapshot['left'])
+        update_plot_data_source(self.plots_right, snapshot['right'])
+        return True
 
 
 class PlottingSettingWidget(Toplevel):
@@ -144,20 +150,30 @@ class PlottingFrame(CustomFrame):
         self.parameter_chooser_widget = ParameterChooserWidget(self, self.model)
         self.parameter_chooser_widget.grid(row=5, column=0, rowspan=1, columnspan=3)
 
-        self.set_parameters_button = AcceptButton(self,
-                                                  controller.execute_instr_open_manually,
-                                                  "2. Open Instruments and Camera")
-        self.set_parameters_button.grid(row=5, column=3)
+        self.open_instruments_button = AcceptButton(self,
+                                                    controller.execute_instr_open_manually,
+                                                    "2. Open Instruments and Camera")
+        self.open_instruments_button.grid(row=5, column=3)
+
+        self.capture_button = AcceptButton(self,
+                                           controller.execute_grab_data_manually,
+                                           "3. Capture Power, Location, and Image")
+        self.capture_button.grid(row=6, column=3)
 
-        self.set_parameters_button = AcceptButton(self,
-                                                  controller.execute_grab_data_manually,
-                                                  "3. Capture Power, Location, and Image")
-        self.set_parameters_button.grid(row=6, column=3)
+        self.edge_approach_button = AcceptButton(self,
+                                                 controller.execute_edge_approach,
+                                                 "4. Run Automatic Edge Approach")
+        self.edge_approach_button.grid(row=7, column=3)
 
-        self.set_parameters_button = AcceptButton(self,
+        self.stop_edge_approach_button = AcceptButton(self,
+                                                      controller.stop_edge_approach,
+                                                      "Stop Edge Approach")
+        self.stop_edge_approach_button.grid(row=7, column=2)
+
+        self.end_experiment_button = AcceptButton(self,
                                                   controller.end_experiment,
-                                                  "4. End Experiment and Close Instruments")
-        self.set_parameters_button.grid(row=7, column=3)
+                                                  "5. End Experiment and Close Instruments")
+        self.end_experiment_button.grid(row=8, column=3)
 
 
 class PlotsWidget(PlotControl):
@@ -263,6 +279,9 @@ class EdgeSearcherWindowController:
     Controller class for SearchForPeakPlotsWindow. Gets set up first, and then sets up both model and view subclasses.
     Contains all logic as function, and is stored as a reference in both the model and view classes.
     """
+
+    PLOT_UPDATE_PERIOD_MS = 200
+
     def __init__(self, parent: Tk, experiment_manager):
         # set up model and view classes
         self.model = EdgeSearcherWindowModel(experiment_manager)
@@ -281,12 +300,32 @@ class EdgeSearcherWindowController:
 
         self.view = EdgeSearcherWindowView(parent, self.model, self)
 
+        # thread running the automatic edge approach and its outcome
+        self._edge_approach_thread = None
+        self._edge_approach_error = None
+
+        self._plot_update_ref = None
+        self._update_plots()
+
+    def _update_plots(self):
+        """
+        Periodically shows the plot data published by the edge searcher and checks if the edge approach finished.
+        """
+        self.model.update_plots_from_edge_searcher()
+        if self._edge_approach_thread is not None and not self._edge_approach_thread.is_alive():
+            self._edge_approach_thread = None
+            self._edge_approach_finished()
+        self._plot_update_ref = self.view.main_window.after(self.PLOT_UPDATE_PERIOD_MS, self._update_plots)
+
     def on_close(self):
         """
         If user presses 'x', exit the plotting window.
         """
-        # Clear all callbacks because the PeakSearcher object still exists after killing this window
-        # but contains callbacks to this window which we are about to destroy now.
+        # Stop a running edge approach and the plot updates and detach the plots from their data sources
+        self.model.edge_searcher.stop_requested.set()
+        if self._plot_update_ref is not None:
+            self.view.main_window.after_cancel(self._plot_update_ref)
+            self._plot_update_ref = None
         self.view.main_window.plotting_frame.plot_left.data_source = None
         self.view.main_window.plotting_frame.plot_right.data_source = None
 
@@ -300,19 +339,29 @@ class EdgeSearcherWindowController:
         self.view.current_window.destroy()
         self.view.current_window = None
 
+    def _action_buttons(self):
+        plotting_frame = self.view.main_window.plotting_frame
+        return [plotting_frame.set_instruments_button,
+                plotting_frame.open_instruments_button,
+                plotting_frame.capture_button,
+                plotting_frame.edge_approach_button,
+                plotting_frame.end_experiment_button]
+
     def disable_buttons(self):
         """
-        A function that disables all buttons.
+        A function that disables all buttons, except the one stopping the edge approach.
         """
-        self.view.main_window.plotting_frame.set_instruments_button.config(state="disabled")
-        self.view.main_window.plotting_frame.set_parameters_button.config(state="disabled")
+        for button in self._action_buttons():
+            button.config(state="disabled")
 
     def enable_buttons(self):
         """
-        A function that enables all buttons.
+        A function that enables all buttons. They stay disabled while the edge approach is running.
         """
-        self.view.main_window.plotting_frame.set_instruments_button.config(state="normal")
-        self.view.main_window.plotting_frame.set_parameters_button.config(state="normal")
+        if self._edge_approach_thread is not None and self._edge_approach_thread.is_alive():
+            return
+        for button in self._action_buttons():
+            button.config(state="normal")
 
     def set_instruments(self):
         """If user selected instruments, initialise them and continue.
@@ -347,6 +396,8 @@ class EdgeSearcherWindowController:
     def execute_instr_open_manually(self):
         """Function to manually start the search for peak algorithm.
         """
+        if self._edge_approach_thread is not None:
+            return
 
         self.disable_buttons()
 
@@ -379,6 +430,8 @@ class EdgeSearcherWindowController:
     def execute_grab_data_manually(self):
         """Function to manually start the search for peak algorithm.
         """
+        if self._edge_approach_thread is not None:
+            return
 
         self.disable_buttons()
         # save SFP parameters to measurement
@@ -402,6 +455,8 @@ class EdgeSearcherWindowController:
             #                     parent=self.view.main_window)
             self.logger.debug("Search for peak algorithm done.")
 
+        self.model.update_plots_from_edge_searcher()
+
         # beautify plots with legends, axes labels, and titles
         # self.view.main_window.plotting_frame.plot_left.ax.legend(loc='lower center')
         # self.view.main_window.plotting_frame.plot_left.set_axes('deviation from start [um]', 'power [dBm]')
@@ -414,9 +469,53 @@ class EdgeSearcherWindowController:
 
         self.enable_buttons()
 
+    def execute_edge_approach(self):
+        """Starts the automatic edge approach in a background thread, such that the plots stay responsive.
+        """
+        if self._edge_approach_thread is not None:
+            return
+
+        self.disable_buttons()
+        self.model.edge_searcher.parameters = \
+            self.view.main_window.plotting_frame.parameter_chooser_widget.to_meas_param()
+        if self.view.main_window.plotting_frame.parameter_chooser_widget.serialize(self.model.settings_path):
+            self.logger.debug("Saving EdgeSearcher parameters to file.")
+
+        self._edge_approach_error = None
+        self._edge_approach_thread = threading.Thread(target=self._run_edge_approach,
+                                                      name="EdgeApproach",
+                                                      daemon=True)
+        self._edge_approach_thread.start()
+
+    def _run_edge_approach(self):
+        try:
+            self.model.edge_searcher.run_edge_approach()
+        except Exception as err:
+            self._edge_approach_error = err
+            self.logger.exception("The edge approach failed.")
+
+    def _edge_approach_finished(self):
+        if self._edge_approach_error is not None:
+            messagebox.showerror("Edge approach error!",
+                                 "The edge approach failed. Reason: " + repr(self._edge_approach_error),
+                                 parent=self.view.main_window)
+        else:
+            messagebox.showinfo("Edge Searcher",
+                                "Edge approach stopped: {:s}.".format(
+                                    self.model.edge_searcher.results['edge approach']['stop reason']),
+                                parent=self.view.main_window)
+        self.enable_buttons()
+
+    def stop_edge_approach(self):
+        """Stops a running edge approach after its current step.
+        """
+        self.model.edge_searcher.stop_requested.set()
+
     def end_experiment(self):
         """If user selected instruments, initialise them and continue.
         """
+        if self._edge_approach_thread is not None:
+            return
 
         self.disable_buttons()
 
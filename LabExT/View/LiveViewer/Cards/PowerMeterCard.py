@@ -201,7 +201,22 @@ class PowerMeterCard(CardFrame):
         Function to be run in a thread, continuously polls the pm.
         """
         first = True
+        # power meters reading their detector through a shared device (e.g. PD10R on a LabJack) read their own port
+        # in a single transaction, the channel designators of the card do not select a port for them
+        batch_read = getattr(type(self.instrument), 'fetch_power_all', None) is not None
         while not self.stop_thread:
+            if batch_read:
+                port = self.instrument.lj_port
+                with self.instrument.thread_lock:
+                    power_data = self.instrument.fetch_power_all([port])[port]
+                time_stamp = time.time()
+                for _, trace in self.enabled_channels.items():
+                    self.data_to_plot_queue.put(PlotDataPoint(trace_name=trace,
+                                                              timestamp=time_stamp,
+                                                              y_value=power_data))
+                sleep(1e-3)
+                continue
+
             with self.instrument.thread_lock:
                 for ac, trace in self.enabled_channels.items():
 
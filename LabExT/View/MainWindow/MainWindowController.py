@@ -504,6 +504,36 @@ class MainWindowController:
             self.logger.warning(msg)
             messagebox.showwarning("No ToDo Selected", msg)
 
+    def todo_toggle_pin(self):
+        """
+        Called on user click on "Pin ToDo"
+        """
+        sel_idx = self.view.frame.to_do_table.get_selected_todo_index()
+        todo_list = self.experiment_manager.exp.to_do_list
+        if sel_idx is not None and sel_idx < len(todo_list):
+            todo = todo_list[sel_idx]
+            todo.pinned = not todo.pinned
+            self.logger.info(f"{'Pinned' if todo.pinned else 'Unpinned'} {todo}.")
+            self.update_tables()
+        else:
+            msg = "No ToDo selected for pinning. Click on the row in the ToDo Queue which you want to pin."
+            self.logger.warning(msg)
+            messagebox.showwarning("No ToDo Selected", msg)
+
+    def todo_optimize_order(self):
+        """
+        Called on user click on "Optimize Order"
+        """
+        try:
+            time_before, time_after = self.experiment_manager.exp.optimize_to_do_list()
+        except ValueError as err:
+            self.logger.warning(f"Cannot optimize the ToDo order: {err}")
+            messagebox.showwarning("Cannot Optimize Order", str(err))
+            return
+        self.update_tables()
+        self.logger.info(
+            f"Optimized ToDo order, estimated stage travel time reduced by {time_before - time_after:.1f}s.")
+
     def todo_delete_all(self):
         """
         Called on user click on "Delete All"
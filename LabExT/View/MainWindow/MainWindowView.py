@@ -518,6 +518,13 @@ class MainWindowToDoFrame(CustomFrame):
         _delete_all_todo_meas = Button(self, text="Delete All", command=self.controller.todo_delete_all, width=10)
         _delete_all_todo_meas.grid(row=0, column=6, padx=5, pady=5, sticky="w")
 
+        _pin_todo_meas = Button(self, text="Pin ToDo", command=self.controller.todo_toggle_pin, width=10)
+        _pin_todo_meas.grid(row=0, column=7, padx=5, pady=5, sticky="w")
+
+        _optimize_todo_order = Button(self, text="Optimize Order", command=self.controller.todo_optimize_order,
+                                      width=12)
+        _optimize_todo_order.grid(row=0, column=8, padx=5, pady=5, sticky="w")
+
 
 class MainWindowFrame(Frame):
     """
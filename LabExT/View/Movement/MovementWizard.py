@@ -191,6 +191,7 @@ class MoverWizard(Wizard):
                 self.mover.speed_z = speed_z
                 self.mover.acceleration_xy = acceleration_xy
                 self.mover.z_lift = z_lift
+                self.mover.path_planning_strategy = self.configure_mover_step.path_planning_var.get()
 
                 self.mover.dump_settings()
 
@@ -645,6 +646,9 @@ class ConfigureMoverStep(Step):
         self.z_lift_var = DoubleVar(
             self.wizard,
             self.mover.z_lift if self.mover._z_lift else self.mover.DEFAULT_Z_LIFT)
+        self.path_planning_var = StringVar(
+            self.wizard,
+            self.mover.path_planning_strategy)
 
     def build(self, frame: Type[CustomFrame]):
         """
@@ -702,6 +706,18 @@ class ConfigureMoverStep(Step):
             label="Z channel up-movement during xy movement:",
             unit="[um]")
 
+        path_planning_frame = Frame(stage_properties_frame)
+        path_planning_frame.pack(side=TOP, fill=X, pady=2)
+        Label(
+            path_planning_frame,
+            text="Path planning for moves with multiple stages:"
+        ).pack(side=LEFT)
+        OptionMenu(
+            path_planning_frame,
+            self.path_planning_var,
+            *self.mover.PATH_PLANNING_STRATEGIES
+        ).pack(side=RIGHT, padx=10)
+
     def _build_entry_with_label(
             self,
             parent,
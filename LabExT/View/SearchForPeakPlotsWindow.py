@@ -12,7 +12,8 @@ from LabExT.Utils import get_visa_address
 from LabExT.View.Controls.CustomFrame import CustomFrame
 from LabExT.View.Controls.InstrumentSelector import InstrumentRole, InstrumentSelector
 from LabExT.View.Controls.ParameterTable import ParameterTable
-from LabExT.View.Controls.PlotControl import PlotControl
+from LabExT.View.Controls.PlotControl import PlotControl, update_plot_data_source
+from LabExT.ViewModel.Utilities.ObservableList import ObservableList
 
 
 class SearchForPeakPlotsWindowModel:
@@ -29,6 +30,8 @@ class SearchForPeakPlotsWindowModel:
 
         self.plots_left = None
         self.plots_right = None
+        # version of the last plot snapshot of the peak searcher shown in the plots
+        self.plot_snapshot_version = 0
 
     @property
     def settings_path(self):
@@ -78,20 +81,22 @@ class SearchForPeakPlotsWindowModel:
         self.settings_path = self.peak_searcher.settings_path_full
 
     def load_observed_list(self):
-        # create observed list for plots
-        self.plots_left = self.peak_searcher.plots_left
-        self.plots_right = self.peak_searcher.plots_right
+        # create observed list for plots, filled with the plot snapshots published by the peak searcher
+        self.plots_left = ObservableList()
+        self.plots_right = ObservableList()
+        self.plot_snapshot_version = 0
 
-        self.plots_left.item_added.clear()
-        self.plots_left.item_removed.clear()
-        self.plots_left.on_clear.clear()
-
-        self.plots_right.item_added.clear()
-        self.plots_right.item_removed.clear()
-        self.plots_right.on_clear.clear()
-
-        self.plots_left.clear()
-        self.plots_right.clear()
+    def update_plots_from_peak_searcher(self):
+        """
+        Shows the latest plot snapshot of the peak searcher, if there is a new one. Call from the GUI thread only.
+        Returns True if the plots were updated.
+        """
+        self.plot_snapshot_version, snapshot = self.peak_searcher.plot_snapshots.latest(self.plot_snapshot_version)
+        if snapshot is None:
+            return False
+        update_plot_data_source(self.plots_left, snapshot['left'])
+        update_plot_data_source(self.plots_right, snapshot['right'])
+        return True
 
 
 class PlottingSettingWidget(Toplevel):
@@ -182,11 +187,21 @@ class InstrumentsChooserWidget(InstrumentSelector):
         self.logger = logging.getLogger()
 
         available_instruments = dict()
-        # we specifically only want a laser and a powermeter
+        # we specifically only want a laser and powermeters, the additional powermeter channels are only used if
+        # the search for peak is configured to read several channels
         io_set = get_visa_address('Laser')
         available_instruments.update({'Laser': InstrumentRole(self.parent.parent.root, io_set)})
         io_set = get_visa_address('Power Meter')
-        available_instruments.update({'Power Meter': InstrumentRole(self.parent.parent.root, io_set)})
+        for role in self.model.peak_searcher.POWER_METER_ROLES:
+            available_instruments.update({role: InstrumentRole(self.parent.parent.root, io_set)})
+        # the temperature controller for the result cache is optional, it is offered only if one is configured
+        try:
+            io_set = get_visa_address(self.model.peak_searcher.TEMPERATURE_ROLE)
+        except RuntimeError:
+            io_set = None
+        if io_set:
+            available_instruments.update({
+                self.model.peak_searcher.TEMPERATURE_ROLE: InstrumentRole(self.parent.parent.root, io_set)})
 
         self.title = 'Choose instruments'
         self.instrument_source = available_instruments
@@ -249,6 +264,10 @@ class SearchForPeakPlotsWindowController:
     Controller class for SearchForPeakPlotsWindow. Gets set up first, and then sets up both model and view subclasses.
     Contains all logic as function, and is stored as a reference in both the model and view classes.
     """
+
+    # period in which the plots are updated with the latest data of the peak searcher
+    PLOT_UPDATE_PERIOD_MS = 200
+
     def __init__(self, parent: Tk, experiment_manager):
         # set up model and view classes
         self.model = SearchForPeakPlotsWindowModel(experiment_manager)
@@ -267,12 +286,24 @@ class SearchForPeakPlotsWindowController:
 
         self.view = SearchForPeakPlotsWindowView(parent, self.model, self)
 
+        self._plot_update_ref = None
+        self._update_plots()
+
+    def _update_plots(self):
+        """
+        Periodically shows the plot data published by the peak searcher, which may run in another thread.
+        """
+        self.model.update_plots_from_peak_searcher()
+        self._plot_update_ref = self.view.main_window.after(self.PLOT_UPDATE_PERIOD_MS, self._update_plots)
+
     def on_close(self):
         """
         If user presses 'x', exit the plotting window.
         """
-        # Clear all callbacks because the PeakSearcher object still exists after killing this window
-        # but contains callbacks to this window which we are about to destroy now.
+        # Stop the plot updates and detach the plots from their data sources
+        if self._plot_update_ref is not None:
+            self.view.main_window.after_cancel(self._plot_update_ref)
+            self._plot_update_ref = None
         self.view.main_window.plotting_frame.plot_left.data_source = None
         self.view.main_window.plotting_frame.plot_right.data_source = None
 
@@ -360,6 +391,9 @@ class SearchForPeakPlotsWindowController:
                                 parent=self.view.main_window)
             self.logger.debug("Search for peak algorithm done.")
 
+        # the search ran in the GUI thread, show its final plots right away
+        self.model.update_plots_from_peak_searcher()
+
         # beautify plots with legends, axes labels, and titles
         self.view.main_window.plotting_frame.plot_left.ax.legend(loc='lower center')
         self.view.main_window.plotting_frame.plot_left.set_axes('deviation from start [um]', 'power [dBm]')
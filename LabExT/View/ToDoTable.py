@@ -111,6 +111,11 @@ class ToDoTable(CustomFrame):
         self.logger.debug('Selected ToDo index: %s', todo_idx)
         return todo_idx
 
+    @staticmethod
+    def _device_label(todo):
+        """Device ID shown in the table, pinned ToDos are marked since they are not moved by "Optimize Order"."""
+        return f"{todo.device.id} (pinned)" if getattr(todo, 'pinned', False) else todo.device.id
+
     def regenerate(self):
         """
         Repopulate the table based on the to do list.
@@ -142,13 +147,14 @@ class ToDoTable(CustomFrame):
             # case: item in original list and displayed list, all fine, skip to next
             if todo_hash in leftover_hashes:
                 self._tree.set(item=todo_hash, column=0, value=str(tidx))
+                self._tree.set(item=todo_hash, column=1, value=self._device_label(todo))
                 self._tree.move(item=todo_hash, parent="", index=tidx)
                 leftover_hashes.remove(todo_hash)
                 continue
 
             # case: new item added to original list and not yet in displayed list
             dev, measurement = todo.device, todo.measurement
-            todo_values = (tidx, dev.id, dev.type, measurement.get_name_with_id())
+            todo_values = (tidx, self._device_label(todo), dev.type, measurement.get_name_with_id())
 
             self._tree.insert(parent="", index=tidx, iid=todo_hash, values=todo_values)
 
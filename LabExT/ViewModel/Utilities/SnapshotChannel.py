@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LabExT  Copyright (C) 2021  ETH Zurich and Polariton Technologies AG
+This program is free software and comes with ABSOLUTELY NO WARRANTY; for details see LICENSE file.
+"""
+
+import threading
+from typing import Generic, Optional, Tuple, TypeVar
+
+_T = TypeVar("_T")
+
+
+class SnapshotChannel(Generic[_T]):
+    """Hands the latest state of a producer thread over to a consumer thread, e.g. a GUI.
+
+    Publishing never blocks and replaces the previous snapshot, whether it was consumed or not. The consumer polls
+    for snapshots newer than the last one it has seen and thus always gets the most recent state, skipping
+    intermediate ones. Snapshots must not be modified after publishing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_T] = None
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """Number of snapshots published so far."""
+        return self._version
+
+    def publish(self, snapshot: _T) -> None:
+        """Replaces the current snapshot.
+
+        Parameters
+        ----------
+        snapshot : variable type
+            The new state, must not be modified afterwards.
+        """
+        with self._lock:
+            self._snapshot = snapshot
+            self._version += 1
+
+    def latest(self, since_version: int = 0) -> Tuple[int, Optional[_T]]:
+        """Returns the current snapshot if it is newer than `since_version`.
+
+        Parameters
+        ----------
+        since_version : int
+            Version of the last snapshot the consumer has seen.
+
+        Returns
+        -------
+        version : int
+            Version of the returned snapshot, or `since_version` if there is no newer one.
+        snapshot : variable type
+            The current snapshot, or None if there is no newer one.
+        """
+        with self._lock:
+            if self._version > since_version:
+                return self._version, self._snapshot
+            return since_version, None